@@ -0,0 +1,72 @@
+"""Add organization migration run tracking tables
+
+Revision ID: 033_org_migration_runs
+Revises: add_organizations_001
+Create Date: 2026-02-02
+
+Stores per-tenant progress of fleet-wide organization database migrations
+so interrupted rollouts can be resumed.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from typing import Union, Sequence
+
+# revision identifiers, used by Alembic.
+revision = '033_org_migration_runs'
+down_revision: Union[str, None] = 'add_organizations_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(conn, name: str) -> bool:
+    return inspect(conn).has_table(name)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    if not _table_exists(conn, 'organization_migration_runs'):
+        op.create_table(
+            'organization_migration_runs',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('target_revision', sa.String(64), nullable=False),
+            sa.Column('status', sa.String(20), server_default='running', nullable=False),
+            sa.Column('total_count', sa.Integer, server_default='0', nullable=False),
+            sa.Column('succeeded_count', sa.Integer, server_default='0', nullable=False),
+            sa.Column('failed_count', sa.Integer, server_default='0', nullable=False),
+            sa.Column('skipped_count', sa.Integer, server_default='0', nullable=False),
+            sa.Column('started_by', sa.Integer(), sa.ForeignKey('users.id', ondelete='SET NULL'), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('ix_organization_migration_runs_id', 'organization_migration_runs', ['id'])
+        op.create_index('ix_organization_migration_runs_status', 'organization_migration_runs', ['status'])
+
+    if not _table_exists(conn, 'organization_migration_statuses'):
+        op.create_table(
+            'organization_migration_statuses',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('run_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('organization_migration_runs.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('organization_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('status', sa.String(20), server_default='pending', nullable=False),
+            sa.Column('from_revision', sa.String(64), nullable=True),
+            sa.Column('to_revision', sa.String(64), nullable=True),
+            sa.Column('duration_ms', sa.Integer(), nullable=True),
+            sa.Column('error', sa.Text, nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('ix_organization_migration_statuses_id', 'organization_migration_statuses', ['id'])
+        op.create_index('ix_organization_migration_statuses_organization_id', 'organization_migration_statuses', ['organization_id'])
+        op.create_index('idx_org_migration_statuses_run_status', 'organization_migration_statuses', ['run_id', 'status'])
+        op.create_unique_constraint('uq_org_migration_run_tenant', 'organization_migration_statuses', ['run_id', 'organization_id'])
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if _table_exists(conn, 'organization_migration_statuses'):
+        op.drop_table('organization_migration_statuses')
+    if _table_exists(conn, 'organization_migration_runs'):
+        op.drop_table('organization_migration_runs')
@@ -0,0 +1,73 @@
+"""Turn webhook_events into a durable processing queue
+
+Revision ID: 034_webhook_event_queue
+Revises: 033_org_migration_runs
+Create Date: 2026-02-10
+
+Stripe webhooks are now persisted and acknowledged immediately, then
+processed by background workers:
+- status (pending / processing / processed / dead), attempts, next_attempt_at,
+  locked_until and last_error for retries and dead-lettering
+- object_key and stripe_created to process events of one Stripe object in order
+- processed_at becomes nullable (set when processing succeeds)
+
+Existing rows were processed inline and are marked processed.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from typing import Union, Sequence
+
+# revision identifiers, used by Alembic.
+revision = '034_webhook_event_queue'
+down_revision: Union[str, None] = '033_org_migration_runs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NEW_COLUMNS = [
+    sa.Column('status', sa.String(20), nullable=False, server_default='processed'),
+    sa.Column('object_key', sa.String(255), nullable=True),
+    sa.Column('stripe_created', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if not inspector.has_table('webhook_events'):
+        return
+
+    existing = {c['name'] for c in inspector.get_columns('webhook_events')}
+    for column in NEW_COLUMNS:
+        if column.name not in existing:
+            op.add_column('webhook_events', column)
+
+    # Rows written from now on start as pending; legacy rows keep 'processed'
+    op.alter_column('webhook_events', 'status', server_default='pending')
+    op.alter_column('webhook_events', 'processed_at', nullable=True, server_default=None)
+
+    indexes = {idx['name'] for idx in inspector.get_indexes('webhook_events')}
+    if 'idx_webhook_events_queue' not in indexes:
+        op.create_index(
+            'idx_webhook_events_queue', 'webhook_events', ['status', 'next_attempt_at'],
+            postgresql_where=sa.text("status IN ('pending', 'processing')"),
+        )
+    if 'idx_webhook_events_object_order' not in indexes:
+        op.create_index(
+            'idx_webhook_events_object_order', 'webhook_events', ['object_key', 'stripe_created', 'id'],
+            postgresql_where=sa.text("status IN ('pending', 'processing')"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_webhook_events_object_order', table_name='webhook_events')
+    op.drop_index('idx_webhook_events_queue', table_name='webhook_events')
+    op.execute("UPDATE webhook_events SET processed_at = coalesce(processed_at, created_at)")
+    op.alter_column('webhook_events', 'processed_at', nullable=False, server_default=sa.text('now()'))
+    for column in reversed(NEW_COLUMNS):
+        op.drop_column('webhook_events', column.name)
@@ -0,0 +1,200 @@
+"""Partition security_audit_logs by month and add hourly audit stats
+
+Revision ID: 035_partition_audit_logs
+Revises: 034_webhook_event_queue
+Create Date: 2026-02-17
+
+- security_audit_logs becomes a table range-partitioned by month on timestamp
+  (security_audit_logs_yYYYYmMM plus a default partition); the primary key is
+  (id, timestamp) and ids keep their sequence
+- indexes follow the audit trail access paths: (user_id, timestamp, id) and
+  (timestamp, id) for keyset pages, (event_type, timestamp)
+- security_audit_stats_hourly holds per-user hourly counts by event type,
+  severity and result, backfilled from existing events
+
+Upcoming partitions and retention are handled by the
+maintain_security_audit_partitions task (app/tasks/security_audit_tasks.py).
+"""
+import logging
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from typing import Union, Sequence
+
+logger = logging.getLogger('alembic')
+
+# revision identifiers, used by Alembic.
+revision = '035_partition_audit_logs'
+down_revision: Union[str, None] = '034_webhook_event_queue'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Partitions created ahead of the current month
+MONTHS_AHEAD = 2
+
+COLUMNS = """
+    id BIGINT NOT NULL DEFAULT nextval('security_audit_logs_id_seq'),
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT now(),
+    event_type VARCHAR(50) NOT NULL,
+    severity VARCHAR(20) NOT NULL DEFAULT 'info',
+    user_id INTEGER,
+    user_email VARCHAR(255),
+    api_key_id INTEGER,
+    ip_address VARCHAR(45),
+    user_agent VARCHAR(500),
+    request_method VARCHAR(10),
+    request_path VARCHAR(500),
+    description TEXT NOT NULL,
+    metadata JSON,
+    success VARCHAR(10) NOT NULL DEFAULT 'unknown'
+"""
+
+COLUMN_NAMES = (
+    "id, timestamp, event_type, severity, user_id, user_email, api_key_id, ip_address, "
+    "user_agent, request_method, request_path, description, metadata, success"
+)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes(table: str) -> None:
+    op.execute(f"CREATE INDEX IF NOT EXISTS idx_security_audit_user_timestamp ON {table} (user_id, timestamp, id)")
+    op.execute(f"CREATE INDEX IF NOT EXISTS idx_security_audit_event_type_timestamp ON {table} (event_type, timestamp)")
+    op.execute(f"CREATE INDEX IF NOT EXISTS idx_security_audit_timestamp_id ON {table} (timestamp, id)")
+    op.execute(f"CREATE INDEX IF NOT EXISTS idx_security_audit_ip_address ON {table} (ip_address)")
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if not inspector.has_table('security_audit_logs'):
+        logger.info("[035_partition_audit_logs] security_audit_logs missing, skipping")
+        return
+
+    is_partitioned = conn.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'security_audit_logs')"
+    )).scalar()
+
+    if not is_partitioned:
+        # Index names are global: move the legacy ones out of the way
+        legacy_indexes = [index['name'] for index in inspector.get_indexes('security_audit_logs')]
+        op.execute("ALTER TABLE security_audit_logs RENAME TO security_audit_logs_legacy")
+        for name in legacy_indexes:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        op.execute("ALTER TABLE security_audit_logs_legacy DROP CONSTRAINT IF EXISTS security_audit_logs_pkey")
+        op.execute("CREATE SEQUENCE IF NOT EXISTS security_audit_logs_id_seq")
+        op.execute("ALTER SEQUENCE security_audit_logs_id_seq OWNED BY NONE")
+
+        op.execute(f"""
+            CREATE TABLE security_audit_logs ({COLUMNS},
+                PRIMARY KEY (id, timestamp)
+            ) PARTITION BY RANGE (timestamp)
+        """)
+        _create_indexes('security_audit_logs')
+
+        oldest = conn.execute(sa.text("SELECT min(timestamp) FROM security_audit_logs_legacy")).scalar()
+        today = datetime.now(timezone.utc).date()
+        month = date(oldest.year, oldest.month, 1) if oldest else date(today.year, today.month, 1)
+        last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+        count = 0
+        while month <= last:
+            op.execute(
+                f"CREATE TABLE IF NOT EXISTS security_audit_logs_y{month.year:04d}m{month.month:02d} "
+                f"PARTITION OF security_audit_logs "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+            month = _add_months(month, 1)
+            count += 1
+        op.execute("CREATE TABLE IF NOT EXISTS security_audit_logs_default PARTITION OF security_audit_logs DEFAULT")
+
+        op.execute(f"""
+            INSERT INTO security_audit_logs ({COLUMN_NAMES})
+            SELECT {COLUMN_NAMES} FROM security_audit_logs_legacy
+        """)
+        op.execute("""
+            SELECT setval('security_audit_logs_id_seq',
+                          greatest((SELECT coalesce(max(id), 0) FROM security_audit_logs), 1))
+        """)
+        op.execute("DROP TABLE security_audit_logs_legacy")
+        op.execute("ALTER SEQUENCE security_audit_logs_id_seq OWNED BY security_audit_logs.id")
+        logger.info(f"[035_partition_audit_logs] ✓ security_audit_logs partitioned by month ({count} partitions)")
+
+    if not inspector.has_table('security_audit_stats_hourly'):
+        op.create_table(
+            'security_audit_stats_hourly',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('event_type', sa.String(50), nullable=False),
+            sa.Column('severity', sa.String(20), nullable=False),
+            sa.Column('success', sa.String(10), nullable=False),
+            sa.Column('event_count', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('user_id', 'bucket', 'event_type', 'severity', 'success'),
+        )
+        op.create_index('idx_security_audit_stats_bucket', 'security_audit_stats_hourly', ['bucket'])
+        op.execute("""
+            INSERT INTO security_audit_stats_hourly (user_id, bucket, event_type, severity, success, event_count)
+            SELECT coalesce(user_id, 0), date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                   event_type, severity, success, count(*)
+            FROM security_audit_logs
+            GROUP BY 1, 2, 3, 4, 5
+        """)
+        logger.info("[035_partition_audit_logs] ✓ security_audit_stats_hourly created and backfilled")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if inspector.has_table('security_audit_stats_hourly'):
+        op.drop_index('idx_security_audit_stats_bucket', table_name='security_audit_stats_hourly')
+        op.drop_table('security_audit_stats_hourly')
+
+    if not inspector.has_table('security_audit_logs'):
+        return
+
+    op.execute("ALTER SEQUENCE security_audit_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE security_audit_logs RENAME TO security_audit_logs_partitioned")
+    for name in (
+        'idx_security_audit_user_timestamp', 'idx_security_audit_event_type_timestamp',
+        'idx_security_audit_timestamp_id', 'idx_security_audit_ip_address',
+    ):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER TABLE security_audit_logs_partitioned DROP CONSTRAINT IF EXISTS security_audit_logs_pkey")
+    op.execute("""
+        CREATE TABLE security_audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('security_audit_logs_id_seq') PRIMARY KEY,
+            timestamp TIMESTAMPTZ NOT NULL DEFAULT now(),
+            event_type VARCHAR(50) NOT NULL,
+            severity VARCHAR(20) NOT NULL DEFAULT 'info',
+            user_id INTEGER,
+            user_email VARCHAR(255),
+            api_key_id INTEGER,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(500),
+            request_method VARCHAR(10),
+            request_path VARCHAR(500),
+            description TEXT NOT NULL,
+            metadata JSON,
+            success VARCHAR(10) NOT NULL DEFAULT 'unknown'
+        )
+    """)
+    op.execute(f"""
+        INSERT INTO security_audit_logs ({COLUMN_NAMES})
+        SELECT {COLUMN_NAMES} FROM security_audit_logs_partitioned
+    """)
+    # Dropping the parent drops every partition
+    op.execute("DROP TABLE security_audit_logs_partitioned")
+    op.execute("ALTER SEQUENCE security_audit_logs_id_seq OWNED BY security_audit_logs.id")
+    op.create_index('idx_security_audit_user_id', 'security_audit_logs', ['user_id'])
+    op.create_index('idx_security_audit_event_type', 'security_audit_logs', ['event_type'])
+    op.create_index('idx_security_audit_timestamp', 'security_audit_logs', ['timestamp'])
+    op.create_index('idx_security_audit_ip_address', 'security_audit_logs', ['ip_address'])
+    op.create_index('ix_security_audit_logs_id', 'security_audit_logs', ['id'])
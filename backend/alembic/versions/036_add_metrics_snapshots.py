@@ -0,0 +1,47 @@
+"""Add metrics_snapshots for precomputed dashboard statistics
+
+Revision ID: 036_metrics_snapshots
+Revises: 035_partition_audit_logs
+Create Date: 2026-02-24
+
+Tenancy and platform statistics are computed by a background job and read
+by the admin and platform monitoring dashboards (see
+app/services/metrics_snapshot_service.py).
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from typing import Union, Sequence
+
+logger = logging.getLogger('alembic')
+
+# revision identifiers, used by Alembic.
+revision = '036_metrics_snapshots'
+down_revision: Union[str, None] = '035_partition_audit_logs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if inspect(conn).has_table('metrics_snapshots'):
+        return
+
+    op.create_table(
+        'metrics_snapshots',
+        sa.Column('scope', sa.String(50), nullable=False),
+        sa.Column('scope_key', sa.String(100), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('source_updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('scope', 'scope_key'),
+    )
+    logger.info("[036_metrics_snapshots] ✓ metrics_snapshots created")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if inspect(conn).has_table('metrics_snapshots'):
+        op.drop_table('metrics_snapshots')
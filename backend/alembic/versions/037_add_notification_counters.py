@@ -0,0 +1,85 @@
+"""Add notification coalescing columns and per-user unread counters
+
+Revision ID: 037_notification_counters
+Revises: 036_metrics_snapshots
+Create Date: 2026-03-18
+
+notifications gains group_key/occurrence_count for coalescing, and
+notification_counters holds the unread count of every user, backfilled from
+the existing notifications (see app/services/notification_fanout_service.py).
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from typing import Union, Sequence
+
+logger = logging.getLogger('alembic')
+
+# revision identifiers, used by Alembic.
+revision = '037_notification_counters'
+down_revision: Union[str, None] = '036_metrics_snapshots'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if not inspector.has_table('notifications'):
+        logger.warning("[037_notification_counters] notifications table missing, skipping")
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('notifications')]
+    if 'group_key' not in columns:
+        op.add_column('notifications', sa.Column('group_key', sa.String(200), nullable=True))
+    if 'occurrence_count' not in columns:
+        op.add_column(
+            'notifications',
+            sa.Column('occurrence_count', sa.Integer(), server_default='1', nullable=False),
+        )
+
+    indexes = [index['name'] for index in inspector.get_indexes('notifications')]
+    if 'idx_notifications_user_group_unread' not in indexes:
+        op.create_index(
+            'idx_notifications_user_group_unread',
+            'notifications',
+            ['user_id', 'group_key', 'created_at'],
+            postgresql_where=sa.text('read = false AND group_key IS NOT NULL'),
+        )
+
+    if not inspector.has_table('notification_counters'):
+        op.create_table(
+            'notification_counters',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id'),
+        )
+        op.execute(
+            """
+            INSERT INTO notification_counters (user_id, unread_count)
+            SELECT user_id, count(*) FILTER (WHERE NOT read)
+            FROM notifications
+            GROUP BY user_id
+            """
+        )
+        logger.info("[037_notification_counters] ✓ notification_counters created and backfilled")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if inspector.has_table('notification_counters'):
+        op.drop_table('notification_counters')
+    if not inspector.has_table('notifications'):
+        return
+    indexes = [index['name'] for index in inspector.get_indexes('notifications')]
+    if 'idx_notifications_user_group_unread' in indexes:
+        op.drop_index('idx_notifications_user_group_unread', table_name='notifications')
+    columns = [col['name'] for col in inspector.get_columns('notifications')]
+    for column in ('occurrence_count', 'group_key'):
+        if column in columns:
+            op.drop_column('notifications', column)
@@ -0,0 +1,90 @@
+"""Add email_batches and email_batch_recipients for bulk email sends
+
+Revision ID: 038_email_batches
+Revises: 037_notification_counters
+Create Date: 2026-03-19
+
+A bulk send stores its rendered variants and one status row per recipient;
+the Celery worker sends pending recipients many per SendGrid request (see
+app/services/bulk_email_service.py).
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from typing import Union, Sequence
+
+logger = logging.getLogger('alembic')
+
+# revision identifiers, used by Alembic.
+revision = '038_email_batches'
+down_revision: Union[str, None] = '037_notification_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if not inspector.has_table('email_batches'):
+        op.create_table(
+            'email_batches',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('template_key', sa.String(100), nullable=True),
+            sa.Column('status', sa.String(20), server_default='pending', nullable=False),
+            sa.Column('variants', sa.JSON(), nullable=False),
+            sa.Column('total_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('sent_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_by_id', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ondelete='SET NULL'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_email_batches_id', 'email_batches', ['id'])
+        op.create_index('idx_email_batches_status', 'email_batches', ['status'])
+        op.create_index('idx_email_batches_created_at', 'email_batches', ['created_at'])
+        logger.info("[038_email_batches] ✓ email_batches created")
+
+    if not inspector.has_table('email_batch_recipients'):
+        op.create_table(
+            'email_batch_recipients',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('batch_id', sa.Integer(), nullable=False),
+            sa.Column('email', sa.String(255), nullable=False),
+            sa.Column('name', sa.String(200), nullable=True),
+            sa.Column('variant', sa.String(10), nullable=False),
+            sa.Column('substitutions', sa.JSON(), nullable=True),
+            sa.Column('status', sa.String(20), server_default='pending', nullable=False),
+            sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('message_id', sa.String(100), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['batch_id'], ['email_batches.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_email_batch_recipients_id', 'email_batch_recipients', ['id'])
+        op.create_index(
+            'idx_email_batch_recipients_pending',
+            'email_batch_recipients',
+            ['batch_id', 'variant', 'id'],
+            postgresql_where=sa.text("status = 'pending'"),
+        )
+        op.create_index(
+            'idx_email_batch_recipients_batch_status', 'email_batch_recipients', ['batch_id', 'status']
+        )
+        logger.info("[038_email_batches] ✓ email_batch_recipients created")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if inspector.has_table('email_batch_recipients'):
+        op.drop_table('email_batch_recipients')
+    if inspector.has_table('email_batches'):
+        op.drop_table('email_batches')
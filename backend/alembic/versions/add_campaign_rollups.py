@@ -0,0 +1,64 @@
+"""Index completed donations per campaign and backfill campaign rollups
+
+Revision ID: add_campaign_rollups_005
+Revises: add_donor_tag_index_004
+Create Date: 2026-02-08
+
+campaigns.total_raised, donation_count and donor_count are now maintained
+incrementally by CampaignRollupService:
+- idx_donations_campaign_donor_completed: partial (campaign_id, donor_id)
+  INCLUDE (amount) index on completed donations, used for distinct-donor
+  checks and the grouped reconciliation
+- backfills the rollups of every existing campaign in one grouped UPDATE
+"""
+from alembic import op
+import sqlalchemy as sa
+from typing import Union, Sequence
+
+# revision identifiers, used by Alembic.
+revision = 'add_campaign_rollups_005'
+down_revision: Union[str, None] = 'add_donor_tag_index_004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    import logging
+    logger = logging.getLogger('alembic')
+
+    existing_tables = sa.inspect(conn).get_table_names()
+    if not {'donations', 'campaigns'}.issubset(existing_tables):
+        logger.info("[add_campaign_rollups_005] donations/campaigns tables not found, skipping")
+        return
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_donations_campaign_donor_completed
+        ON donations (campaign_id, donor_id) INCLUDE (amount)
+        WHERE payment_status = 'completed'
+    """)
+    logger.info("[add_campaign_rollups_005] ✓ Created idx_donations_campaign_donor_completed")
+
+    op.execute("""
+        UPDATE campaigns c
+        SET total_raised = coalesce(t.total_raised, 0),
+            donation_count = coalesce(t.donation_count, 0),
+            donor_count = coalesce(t.donor_count, 0)
+        FROM campaigns c2
+        LEFT JOIN (
+            SELECT campaign_id,
+                   sum(amount) AS total_raised,
+                   count(*) AS donation_count,
+                   count(DISTINCT donor_id) AS donor_count
+            FROM donations
+            WHERE payment_status = 'completed' AND campaign_id IS NOT NULL
+            GROUP BY campaign_id
+        ) AS t ON t.campaign_id = c2.id
+        WHERE c.id = c2.id
+    """)
+    logger.info("[add_campaign_rollups_005] ✓ Backfilled campaign rollups")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_donations_campaign_donor_completed")
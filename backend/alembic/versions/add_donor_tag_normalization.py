@@ -0,0 +1,95 @@
+"""Backfill donor tag assignments from donors.tags and index tag lookups
+
+Revision ID: add_donor_tag_index_004
+Revises: add_donor_search_003
+Create Date: 2026-02-06
+
+donor_tag_assignments becomes the single source of truth for donor tags:
+- creates missing donor_tags rows for every name found in donors.tags (JSON)
+- creates the matching donor_tag_assignments rows
+- recomputes donor_tags.donor_count
+- adds idx_donor_tag_assignments_tag_donor (tag_id, donor_id) so multi-tag
+  filters are index-only lookups
+
+donors.tags is kept as a read-only mirror of the assigned tag names.
+"""
+from alembic import op
+import sqlalchemy as sa
+from typing import Union, Sequence
+
+# revision identifiers, used by Alembic.
+revision = 'add_donor_tag_index_004'
+down_revision: Union[str, None] = 'add_donor_search_003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSON_TAG_NAMES = """
+    SELECT d.id AS donor_id, d.organization_id, btrim(t.name) AS name
+    FROM donors d
+    CROSS JOIN LATERAL json_array_elements_text(d.tags::json) AS t(name)
+    WHERE d.tags IS NOT NULL
+    AND json_typeof(d.tags::json) = 'array'
+    AND btrim(t.name) <> ''
+    AND length(btrim(t.name)) <= 100
+"""
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    import logging
+    logger = logging.getLogger('alembic')
+
+    existing_tables = sa.inspect(conn).get_table_names()
+    if not {'donors', 'donor_tags', 'donor_tag_assignments'}.issubset(existing_tables):
+        logger.info("[add_donor_tag_index_004] donor tag tables not found, skipping")
+        return
+
+    op.execute(f"""
+        INSERT INTO donor_tags (id, organization_id, name, donor_count, created_at)
+        SELECT gen_random_uuid(), organization_id, name, 0, now()
+        FROM (SELECT DISTINCT organization_id, name FROM ({JSON_TAG_NAMES}) AS json_tags) AS names
+        ON CONFLICT ON CONSTRAINT uq_org_tag_name DO NOTHING
+    """)
+
+    op.execute(f"""
+        INSERT INTO donor_tag_assignments (id, donor_id, tag_id, assigned_at)
+        SELECT gen_random_uuid(), json_tags.donor_id, dt.id, now()
+        FROM (SELECT DISTINCT donor_id, organization_id, name FROM ({JSON_TAG_NAMES}) AS raw) AS json_tags
+        JOIN donor_tags dt ON dt.organization_id = json_tags.organization_id AND dt.name = json_tags.name
+        ON CONFLICT ON CONSTRAINT uq_donor_tag DO NOTHING
+    """)
+    logger.info("[add_donor_tag_index_004] ✓ Backfilled donor_tag_assignments from donors.tags")
+
+    op.execute("""
+        UPDATE donor_tags dt
+        SET donor_count = (SELECT count(*) FROM donor_tag_assignments a WHERE a.tag_id = dt.id)
+    """)
+
+    # Re-sync the mirror so it matches the assignments (trimmed, deduplicated),
+    # in the order DonorTagService.refresh_mirror(s) use
+    op.execute("""
+        UPDATE donors d
+        SET tags = coalesce((
+            SELECT json_agg(dt.name ORDER BY a.assigned_at, dt.name)
+            FROM donor_tag_assignments a
+            JOIN donor_tags dt ON dt.id = a.tag_id
+            WHERE a.donor_id = d.id
+        ), '[]'::json)
+        WHERE d.tags IS NOT NULL
+        AND json_typeof(d.tags::json) = 'array'
+        AND json_array_length(d.tags::json) > 0
+    """)
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_donor_tag_assignments_tag_donor "
+        "ON donor_tag_assignments (tag_id, donor_id)"
+    )
+    op.execute("ANALYZE donor_tag_assignments")
+    logger.info("[add_donor_tag_index_004] ✓ Created idx_donor_tag_assignments_tag_donor")
+
+
+def downgrade() -> None:
+    # Backfilled rows are kept: they are valid tag assignments
+    op.execute("DROP INDEX IF EXISTS idx_donor_tag_assignments_tag_donor")
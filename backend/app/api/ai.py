@@ -1,9 +1,12 @@
 """AI endpoints using OpenAI and Anthropic (Claude)."""
 
+import json
 from typing import Optional, List, Literal
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from app.core.logging import logger
 from app.dependencies import get_current_user
 from app.models import User
 from app.services.ai_service import AIService, AIProvider
@@ -43,6 +46,7 @@ class ChatResponse(BaseModel):
     provider: str
     usage: dict
     finish_reason: str
+    cached: bool = False
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -127,31 +131,22 @@ async def simple_chat(
         )
 
 
-@router.post("/chat/template", response_model=ChatResponse)
-async def template_chat(
-    request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Chat completion with template documentation context.
-    This endpoint automatically includes template documentation in the system prompt.
-    """
-    if not AIService.is_configured():
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="No AI provider is configured. Please set OPENAI_API_KEY or ANTHROPIC_API_KEY.",
-        )
+def _retrieval_query(messages: List[ChatMessage], user_turns: int = 3) -> str:
+    """Latest user messages, so that follow-up questions keep their subject"""
+    user_messages = [msg.content for msg in messages if msg.role == "user"]
+    return "\n".join(user_messages[-user_turns:])
+
+
+async def _template_system_prompt(request: ChatRequest) -> str:
+    """System prompt with the documentation sections relevant to the conversation"""
+    # Retrieve the documentation excerpts relevant to the conversation
+    doc_service = get_documentation_service()
+    documentation_context = await doc_service.retrieve_context(_retrieval_query(request.messages))
     
-    try:
-        # Load documentation
-        doc_service = get_documentation_service()
-        documentation_context = doc_service.format_documentation_for_context(max_total_size=80000)
-        doc_summary = doc_service.get_documentation_summary()
-        
-        # Build enhanced system prompt
-        base_system_prompt = request.system_prompt or """You are a helpful AI assistant specialized in helping users understand and work with the Next.js Full-Stack Template.
+    # Build enhanced system prompt
+    base_system_prompt = request.system_prompt or """You are a helpful AI assistant specialized in helping users understand and work with the Next.js Full-Stack Template.
 
-You have access to the complete template documentation. Use this information to provide accurate, helpful answers about:
+You have access to the template documentation. Use this information to provide accurate, helpful answers about:
 - Template features and capabilities
 - Setup and configuration
 - Architecture and design patterns
@@ -166,17 +161,38 @@ Always cite specific documentation when providing answers. If you're unsure abou
 
 Be friendly, professional, and concise. Format your responses clearly with proper markdown when appropriate."""
 
-        enhanced_system_prompt = f"""{base_system_prompt}
+    if not documentation_context:
+        documentation_context = "No documentation section matches this question."
 
-=== TEMPLATE DOCUMENTATION ===
+    return f"""{base_system_prompt}
 
-{doc_summary}
+=== TEMPLATE DOCUMENTATION (relevant excerpts) ===
 
 {documentation_context}
 
 === END DOCUMENTATION ===
 
-Remember: You have access to the complete template documentation above. Use it to provide accurate, detailed answers."""
+Remember: the excerpts above were selected for this question; each one starts with its file and section. Cite them, and say so when they do not cover the question."""
+
+
+@router.post("/chat/template", response_model=ChatResponse)
+async def template_chat(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Chat completion with template documentation context.
+    This endpoint automatically includes the documentation sections relevant to the
+    latest user messages in the system prompt.
+    """
+    if not AIService.is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No AI provider is configured. Please set OPENAI_API_KEY or ANTHROPIC_API_KEY.",
+        )
+    
+    try:
+        enhanced_system_prompt = await _template_system_prompt(request)
 
         # Resolve provider
         provider = AIProvider(request.provider) if request.provider != "auto" else AIProvider.AUTO
@@ -207,6 +223,93 @@ Remember: You have access to the complete template documentation above. Use it t
         )
 
 
+def _sse_response(
+    service: AIService,
+    request: ChatRequest,
+    system_prompt: Optional[str],
+    default_max_tokens: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    Server-sent events of a streamed completion.
+    
+    Events (JSON in data lines): 'delta' with a text fragment, then 'done' with the
+    model, usage and finish reason, or 'error' if the provider fails mid-stream.
+    """
+    messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
+    
+    async def event_generator():
+        try:
+            async for event in service.stream_chat_completion(
+                messages=messages,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens or default_max_tokens,
+                system_prompt=system_prompt,
+            ):
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"AI stream error: {e}", exc_info=True)
+            yield f"data: {json.dumps({'type': 'error', 'detail': f'AI service error: {str(e)}'})}\n\n"
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.post("/chat/stream")
+async def stream_chat_completion(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Streamed chat completion (server-sent events) using OpenAI or Anthropic (Claude)."""
+    if not AIService.is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No AI provider is configured. Please set OPENAI_API_KEY or ANTHROPIC_API_KEY.",
+        )
+    
+    try:
+        provider = AIProvider(request.provider) if request.provider != "auto" else AIProvider.AUTO
+        service = AIService(provider=provider)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    return _sse_response(service, request, request.system_prompt)
+
+
+@router.post("/chat/template/stream")
+async def stream_template_chat(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Streamed chat completion (server-sent events) with template documentation context."""
+    if not AIService.is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No AI provider is configured. Please set OPENAI_API_KEY or ANTHROPIC_API_KEY.",
+        )
+    
+    try:
+        provider = AIProvider(request.provider) if request.provider != "auto" else AIProvider.AUTO
+        service = AIService(provider=provider)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    return _sse_response(service, request, await _template_system_prompt(request), default_max_tokens=2000)
+
+
 @router.get("/health")
 async def ai_health_check(
     current_user: User = Depends(get_current_user),
@@ -25,7 +25,7 @@ from app.core.tenancy import (
     get_user_tenants,
 )
 from app.core.tenant_database_manager import TenantDatabaseManager
-from app.core.tenancy_metrics import TenancyMetrics
+from app.services.metrics_snapshot_service import MetricsSnapshotService
 from app.services.rbac_service import RBACService
 from app.models import Permission, RolePermission
 
@@ -603,14 +603,13 @@ async def get_tenancy_metrics(
 ):
     """
     Get tenancy metrics and statistics.
+    Read from the metrics snapshots (refreshed in the background).
     Requires superadmin authentication.
     """
+    snapshots = MetricsSnapshotService(db)
     if tenant_id:
-        stats = await TenancyMetrics.get_tenant_statistics(db, tenant_id)
-        return stats
-    else:
-        stats = await TenancyMetrics.get_system_statistics(db)
-        return stats
+        return await snapshots.tenant_statistics(tenant_id)
+    return await snapshots.system_statistics()
 
 
 @router.get(
@@ -628,7 +627,7 @@ async def get_tenant_statistics(
     Get statistics for a specific tenant.
     Requires superadmin authentication.
     """
-    stats = await TenancyMetrics.get_tenant_statistics(db, tenant_id)
+    stats = await MetricsSnapshotService(db).tenant_statistics(tenant_id)
     if not stats:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
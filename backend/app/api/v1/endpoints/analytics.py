@@ -7,14 +7,12 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 from datetime import datetime, timedelta
 
 from app.models.user import User
-from app.models.project import Project
 from app.dependencies import get_current_user, get_db
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
-from app.core.tenancy_helpers import apply_tenant_scope
+from app.services.project_analytics_service import ProjectAnalyticsService
 from fastapi import Request
 
 router = APIRouter()
@@ -53,42 +51,11 @@ async def get_analytics_metrics(
     else:
         start_dt = end_dt - timedelta(days=30)
     
-    # Calculate metrics from projects
-    projects_query = select(Project).where(
-        Project.user_id == current_user.id,
-        Project.created_at >= start_dt,
-        Project.created_at <= end_dt
-    )
-    projects_query = apply_tenant_scope(projects_query, Project)
-    
-    result = await db.execute(projects_query)
-    projects = result.scalars().all()
-    
-    # Calculate previous period for comparison
-    period_duration = end_dt - start_dt
-    prev_start_dt = start_dt - period_duration
-    prev_end_dt = start_dt
-    
-    prev_projects_query = select(Project).where(
-        Project.user_id == current_user.id,
-        Project.created_at >= prev_start_dt,
-        Project.created_at < prev_end_dt
-    )
-    prev_projects_query = apply_tenant_scope(prev_projects_query, Project)
-    prev_result = await db.execute(prev_projects_query)
-    prev_projects = prev_result.scalars().all()
-    
-    # Calculate metrics
-    total_projects = len(projects)
-    active_projects = len([p for p in projects if p.status == 'active'])
-    prev_total = len(prev_projects)
-    
-    # Calculate growth
-    growth = 0.0
-    if prev_total > 0:
-        growth = ((total_projects - prev_total) / prev_total) * 100
-    elif total_projects > 0:
-        growth = 100.0
+    # Current and previous period in one query (cached per user, tenant and range)
+    period = await ProjectAnalyticsService(db, current_user.id).period_metrics(start_dt, end_dt)
+    total_projects = period["total"]
+    active_projects = period["active"]
+    growth = period["growth"]
     
     # Build metrics
     metrics = [
@@ -608,10 +608,21 @@ async def get_connection_status(
                 "summary": {}
             }
         
+        # Organization databases: last probe snapshot only, never probed inline
+        organizations_result = {}
+        try:
+            from app.core.organization_health_prober import OrganizationHealthProber
+            snapshot = await OrganizationHealthProber.get_snapshot(wait_if_missing=False)
+            organizations_result = snapshot.summary() if snapshot else {"message": "First health probe in progress"}
+        except Exception as e:
+            logger.warning(f"Could not read organization database health: {e}")
+            organizations_result = {"error": str(e)}
+        
         return {
             "success": True,
             "frontend": frontend_result.get("summary", {}),
             "backend": backend_result.get("summary", {}),
+            "organizations": organizations_result,
             "timestamp": asyncio.get_event_loop().time(),
         }
     except Exception as e:
@@ -3,7 +3,7 @@ Audit Trail API Endpoints
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -11,7 +11,8 @@ from app.models.user import User
 from app.core.security_audit import SecurityAuditLog
 from app.dependencies import get_current_user, is_superadmin
 from app.core.database import get_db
-from sqlalchemy import select, and_, or_, desc
+from app.services.audit_log_storage import encode_cursor, get_audit_stats as read_audit_stats, paginate
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
@@ -46,19 +47,23 @@ class AuditLogResponse(BaseModel):
 
 @router.get("/audit-trail", response_model=List[AuditLogResponse], tags=["audit-trail"])
 async def get_audit_trail(
+    response: Response,
     user_id: Optional[int] = Query(None),
     event_type: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    limit: int = Query(100, le=1000),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    offset: int = Query(0, ge=0, le=10000, deprecated=True, description="Use cursor instead"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get audit trail logs
+    """Get audit trail logs, newest first
     
     Superadmins can see all logs. Regular users can only see their own logs.
+    Pages are keyset-paginated on (timestamp, id): when more logs may follow,
+    the X-Next-Cursor response header holds the cursor of the next page.
     """
     from app.core.logging import logger
     
@@ -95,13 +100,18 @@ async def get_audit_trail(
         if end_date:
             query = query.where(SecurityAuditLog.timestamp <= end_date)
         
-        result = await db.execute(
-            query.order_by(desc(SecurityAuditLog.timestamp))
-            .limit(limit)
-            .offset(offset)
-        )
+        try:
+            query = paginate(query, cursor, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if offset and not cursor:
+            query = query.offset(offset)
+        
+        result = await db.execute(query)
         
         logs = result.scalars().all()
+        if len(logs) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(logs[-1])
         
         # Convert to response with message field mapped from description
         response_logs = []
@@ -149,44 +159,9 @@ async def get_audit_stats(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get audit trail statistics"""
-    from sqlalchemy import func
-    
-    query = select(SecurityAuditLog).where(SecurityAuditLog.user_id == current_user.id)
-    
-    if start_date:
-        query = query.where(SecurityAuditLog.timestamp >= start_date)
-    
-    if end_date:
-        query = query.where(SecurityAuditLog.timestamp <= end_date)
-    
-    # Count by event type
-    event_type_result = await db.execute(
-        select(
-            SecurityAuditLog.event_type,
-            func.count(SecurityAuditLog.id).label('count')
-        ).where(
-            SecurityAuditLog.user_id == current_user.id
-        ).group_by(SecurityAuditLog.event_type)
-    )
-    event_type_counts = {row[0]: row[1] for row in event_type_result.all()}
+    """Get audit trail statistics
     
-    # Count by severity
-    severity_result = await db.execute(
-        select(
-            SecurityAuditLog.severity,
-            func.count(SecurityAuditLog.id).label('count')
-        ).where(
-            SecurityAuditLog.user_id == current_user.id
-        ).group_by(SecurityAuditLog.severity)
-    )
-    severity_counts = {row[0]: row[1] for row in severity_result.all()}
-    
-    return {
-        'event_type_counts': event_type_counts,
-        'severity_counts': severity_counts,
-    }
-
-
-
-
+    Counts come from the hourly rollups (security_audit_stats_hourly); only the
+    partial hours at the edges of [start_date, end_date] are counted from raw logs.
+    """
+    return await read_audit_stats(db, current_user.id, start_date, end_date)
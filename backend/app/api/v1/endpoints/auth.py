@@ -345,7 +345,7 @@ async def login(
                 metadata={"reason": "invalid_credentials"}
             )
             if audit_log:
-                logger.info(f"✅ Login failure audit log created successfully (ID: {audit_log.id})")
+                logger.info(f"✅ Login failure audit log recorded (ID: {audit_log.id or 'batched'})")
             else:
                 logger.error("❌ Login failure audit log returned None - logging may have failed silently")
         except Exception as e:
@@ -633,7 +633,7 @@ async def logout(
             success="success"
         )
         if audit_log:
-            logger.info(f"✅ Logout audit log created successfully (ID: {audit_log.id})")
+            logger.info(f"✅ Logout audit log recorded (ID: {audit_log.id or 'batched'})")
         else:
             logger.error("❌ Logout audit log returned None - logging may have failed silently")
     except Exception as e:
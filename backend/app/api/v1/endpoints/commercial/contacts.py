@@ -21,6 +21,7 @@ from io import BytesIO
 
 from app.core.database import get_db
 from app.core.cache_enhanced import cache_query
+from app.core.query_optimization import BatchLoader
 from app.dependencies import get_current_user
 from app.models.contact import Contact
 from app.models.company import Company
@@ -236,14 +237,18 @@ async def find_company_by_name(
     return None
 
 
-def _contact_to_schema(contact: Contact) -> ContactSchema:
-    """Convert Contact model to ContactSchema"""
+def _contact_to_schema(
+    contact: Contact,
+    company: Optional[Company] = None,
+    employee: Optional[User] = None,
+) -> ContactSchema:
+    """Convert Contact model to ContactSchema (company and employee loaded by the caller)"""
     return ContactSchema(
         id=contact.id,
         first_name=contact.first_name,
         last_name=contact.last_name,
         company_id=contact.company_id,
-        company_name=contact.company.name if contact.company else None,
+        company_name=company.name if company else None,
         position=contact.position,
         circle=contact.circle,
         linkedin=contact.linkedin,
@@ -256,7 +261,7 @@ def _contact_to_schema(contact: Contact) -> ContactSchema:
         birthday=contact.birthday,
         language=contact.language,
         employee_id=contact.employee_id,
-        employee_name=f"{contact.employee.first_name} {contact.employee.last_name}" if contact.employee else None,
+        employee_name=f"{employee.first_name} {employee.last_name}" if employee else None,
         created_at=contact.created_at,
         updated_at=contact.updated_at,
     )
@@ -309,7 +314,7 @@ async def list_contacts(
             detail=f"A database error occurred: {str(e)}"
         )
     
-    return [_contact_to_schema(contact) for contact in contacts]
+    return [_contact_to_schema(contact, contact.company, contact.employee) for contact in contacts]
 
 
 @router.get("/{contact_id}", response_model=ContactSchema)
@@ -355,7 +360,7 @@ async def get_contact(
             detail="Contact not found"
         )
     
-    return _contact_to_schema(contact)
+    return _contact_to_schema(contact, contact.company, contact.employee)
 
 
 @router.post("/", response_model=ContactSchema, status_code=status.HTTP_201_CREATED)
@@ -388,12 +393,11 @@ async def create_contact(
             final_company_id = matched_company_id
             logger.info(f"Auto-matched company '{contact_data.company_name}' to company ID {matched_company_id}")
     
-    # Validate company exists if provided
+    # Validate company exists if provided (the loaders keep them for the response)
+    companies = BatchLoader.for_session(db, Company)
+    employees = BatchLoader.for_session(db, User)
     if final_company_id:
-        company_result = await db.execute(
-            select(Company).where(Company.id == final_company_id)
-        )
-        if not company_result.scalar_one_or_none():
+        if not await companies.load(final_company_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Company not found"
@@ -401,10 +405,7 @@ async def create_contact(
     
     # Validate employee exists if provided
     if contact_data.employee_id:
-        employee_result = await db.execute(
-            select(User).where(User.id == contact_data.employee_id)
-        )
-        if not employee_result.scalar_one_or_none():
+        if not await employees.load(contact_data.employee_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Employee not found"
@@ -433,10 +434,11 @@ async def create_contact(
     await db.commit()
     await db.refresh(contact)
     
-    # Load relationships
-    await db.refresh(contact, ["company", "employee"])
-    
-    return _contact_to_schema(contact)
+    return _contact_to_schema(
+        contact,
+        await companies.load(contact.company_id),
+        await employees.load(contact.employee_id),
+    )
 
 
 @router.put("/{contact_id}", response_model=ContactSchema)
@@ -485,12 +487,11 @@ async def update_contact(
             final_company_id = matched_company_id
             logger.info(f"Auto-matched company '{contact_data.company_name}' to company ID {matched_company_id}")
     
-    # Validate company exists if provided
+    # Validate company exists if provided (the loaders keep them for the response)
+    companies = BatchLoader.for_session(db, Company)
+    employees = BatchLoader.for_session(db, User)
     if final_company_id is not None:
-        company_result = await db.execute(
-            select(Company).where(Company.id == final_company_id)
-        )
-        if not company_result.scalar_one_or_none():
+        if not await companies.load(final_company_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Company not found"
@@ -498,10 +499,7 @@ async def update_contact(
     
     # Validate employee exists if provided
     if contact_data.employee_id is not None:
-        employee_result = await db.execute(
-            select(User).where(User.id == contact_data.employee_id)
-        )
-        if not employee_result.scalar_one_or_none():
+        if not await employees.load(contact_data.employee_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Employee not found"
@@ -519,9 +517,12 @@ async def update_contact(
     
     await db.commit()
     await db.refresh(contact)
-    await db.refresh(contact, ["company", "employee"])
     
-    return _contact_to_schema(contact)
+    return _contact_to_schema(
+        contact,
+        await companies.load(contact.company_id),
+        await employees.load(contact.employee_id),
+    )
 
 
 @router.delete("/bulk", status_code=status.HTTP_200_OK)
@@ -1358,9 +1359,13 @@ async def import_contacts(
         try:
             if created_contacts:
                 await db.commit()
+                # Reload the server-generated columns of every contact in one query
+                await db.execute(
+                    select(Contact)
+                    .where(Contact.id.in_([contact.id for contact in created_contacts]))
+                    .execution_options(populate_existing=True)
+                )
                 for contact in created_contacts:
-                    await db.refresh(contact)
-                    
                     # Categorize as updated or new
                     if contact.id in existing_contact_ids:
                         updated_contacts.append(contact)
@@ -1381,16 +1386,21 @@ async def import_contacts(
         all_warnings = (result.get('warnings') or []) + warnings
         
         try:
+            # Companies and employees of all contacts: one query each
+            companies = await BatchLoader.for_session(db, Company).load_many(c.company_id for c in created_contacts)
+            employees = await BatchLoader.for_session(db, User).load_many(c.employee_id for c in created_contacts)
+            
             # Regenerate presigned URLs for all contacts before serialization
             serialized_contacts = []
             for contact in created_contacts:
-                await db.refresh(contact, ["company", "employee"])
+                company = companies.get(contact.company_id)
+                employee = employees.get(contact.employee_id)
                 contact_dict = {
                     "id": contact.id,
                     "first_name": contact.first_name,
                     "last_name": contact.last_name,
                     "company_id": contact.company_id,
-                    "company_name": contact.company.name if contact.company else None,
+                    "company_name": company.name if company else None,
                     "position": contact.position,
                     "circle": contact.circle,
                     "linkedin": contact.linkedin,
@@ -1403,7 +1413,7 @@ async def import_contacts(
                     "birthday": contact.birthday.isoformat() if contact.birthday else None,
                     "language": contact.language,
                     "employee_id": contact.employee_id,
-                    "employee_name": f"{contact.employee.first_name} {contact.employee.last_name}" if contact.employee else None,
+                    "employee_name": f"{employee.first_name} {employee.last_name}" if employee else None,
                     "created_at": contact.created_at,
                     "updated_at": contact.updated_at,
                 }
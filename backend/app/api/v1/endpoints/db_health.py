@@ -5,11 +5,13 @@ Comprehensive database health check for monitoring
 
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import text
 
 from app.core.database import AsyncSessionLocal
 from app.core.config import settings
+from app.core.organization_health_prober import OrganizationHealthProber
+from app.dependencies import require_superadmin
 
 router = APIRouter()
 
@@ -221,3 +223,27 @@ async def database_health_check() -> Dict[str, Any]:
         
         return health_status
 
+
+@router.get("/organizations", response_model=Dict[str, Any])
+async def organization_databases_health(
+    refresh: bool = Query(False, description="Run a probe round now instead of serving the cached snapshot"),
+    _: None = Depends(require_superadmin),
+) -> Dict[str, Any]:
+    """
+    Health of all organization databases (SuperAdmin only)
+    
+    Served from the last probe snapshot; a stale snapshot triggers a
+    background refresh instead of blocking the request.
+    
+    Returns:
+        Fleet summary and per-organization status with latency percentiles
+    """
+    if refresh:
+        snapshot = await OrganizationHealthProber.refresh()
+    else:
+        snapshot = await OrganizationHealthProber.get_snapshot()
+    
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **snapshot.to_dict(),
+    }
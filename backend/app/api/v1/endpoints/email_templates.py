@@ -2,14 +2,18 @@
 Email Templates API Endpoints
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 
 from app.services.email_template_service import EmailTemplateService
+from app.services.bulk_email_service import EmailBatchService
 from app.models.user import User
 from app.dependencies import get_current_user
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.logging import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
@@ -63,6 +67,43 @@ class TemplateResponse(BaseModel):
         from_attributes = True
 
 
+class BulkRecipient(BaseModel):
+    email: EmailStr
+    name: Optional[str] = Field(None, max_length=200)
+    language: Optional[str] = Field(None, max_length=10, description="Template language (default: the request's)")
+    variables: Optional[Dict[str, Any]] = Field(None, description="Per-recipient variables")
+
+
+class BulkSendRequest(BaseModel):
+    recipients: List[BulkRecipient] = Field(..., min_length=1)
+    variables: Dict[str, Any] = Field(default_factory=dict, description="Shared variables, rendered once per language")
+    language: str = Field('en', max_length=10)
+
+    @field_validator('recipients')
+    @classmethod
+    def validate_recipient_count(cls, v: List[BulkRecipient]) -> List[BulkRecipient]:
+        if len(v) > settings.BULK_EMAIL_MAX_RECIPIENTS:
+            raise ValueError(f"At most {settings.BULK_EMAIL_MAX_RECIPIENTS} recipients per batch")
+        return v
+
+
+class EmailBatchResponse(BaseModel):
+    id: int
+    template_key: Optional[str]
+    status: str
+    total_count: int
+    sent_count: int
+    failed_count: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    task_id: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class VersionResponse(BaseModel):
     id: int
     template_id: int
@@ -215,5 +256,60 @@ async def delete_template(
     )
 
 
+@router.post("/email-templates/{key}/send-bulk", response_model=EmailBatchResponse, status_code=status.HTTP_202_ACCEPTED, tags=["email-templates"])
+async def send_bulk(
+    key: str,
+    send_data: BulkSendRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Send a template to many recipients
+    
+    The template is rendered once per language; recipients are sent in the
+    background, up to 1000 per SendGrid request. Poll the batch for progress.
+    """
+    service = EmailBatchService(db)
+    try:
+        batch = await service.create_batch(
+            key,
+            [recipient.model_dump() for recipient in send_data.recipients],
+            variables=send_data.variables,
+            default_language=send_data.language,
+            created_by_id=current_user.id
+        )
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    try:
+        from app.tasks.email_tasks import send_email_batch_task
+        task = send_email_batch_task.delay(batch.id)
+    except Exception as e:
+        logger.error(f"Failed to queue email batch {batch.id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Email batch {batch.id} created but could not be queued"
+        )
+    
+    response = EmailBatchResponse.model_validate(batch)
+    response.task_id = task.id
+    return response
 
 
+@router.get("/email-templates/batches/{batch_id}", response_model=EmailBatchResponse, tags=["email-templates"])
+async def get_email_batch(
+    batch_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the progress of a bulk email batch"""
+    batch = await EmailBatchService(db).get_batch(batch_id)
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Email batch not found"
+        )
+    return EmailBatchResponse.model_validate(batch)
@@ -7,18 +7,16 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.query_optimization import BatchLoader
 from app.core.permissions import Permission, require_permission
 from app.dependencies import get_current_user
 from app.models.user import User
-from app.models.invoice import Invoice
 from app.schemas.erp import (
     ERPInvoiceResponse,
     ERPInvoiceListResponse,
 )
 from app.services.erp_service import ERPService
 from app.utils.invoice_helpers import convert_invoice_to_erp_response
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 router = APIRouter(prefix="/erp/invoices", tags=["ERP Portal - Invoices"])
 
@@ -51,10 +49,12 @@ async def get_erp_invoices(
     total_pages = (total + limit - 1) // limit if limit > 0 else 0
     page = (skip // limit) + 1 if limit > 0 else 1
     
-    # Convert to ERP response format
-    # Note: User relationship is already loaded via selectinload in ERPService
+    # Convert to ERP response format (clients of the page in one query)
+    clients = await BatchLoader.for_session(db, User).load_many(invoice.user_id for invoice in invoices)
     invoice_items = [
-        ERPInvoiceResponse.model_validate(convert_invoice_to_erp_response(invoice))
+        ERPInvoiceResponse.model_validate(
+            convert_invoice_to_erp_response(invoice, clients.get(invoice.user_id))
+        )
         for invoice in invoices
     ]
     
@@ -88,12 +88,7 @@ async def get_erp_invoice(
             detail="Invoice not found",
         )
     
-    # Load user relationship if not already loaded
-    if not hasattr(invoice, 'user') or invoice.user is None:
-        invoice_query = select(Invoice).where(Invoice.id == invoice.id).options(selectinload(Invoice.user))
-        invoice_result = await db.execute(invoice_query)
-        invoice = invoice_result.scalar_one()
-    
     # Convert to ERP response format
-    return ERPInvoiceResponse.model_validate(convert_invoice_to_erp_response(invoice))
+    client = await BatchLoader.for_session(db, User).load(invoice.user_id)
+    return ERPInvoiceResponse.model_validate(convert_invoice_to_erp_response(invoice, client))
 
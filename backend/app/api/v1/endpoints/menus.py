@@ -3,9 +3,10 @@ Menus API Endpoints
 Navigation menus management
 """
 
+from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -14,6 +15,7 @@ from app.models.user import User
 from app.dependencies import get_current_user, get_db, is_superadmin
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
 from app.core.tenancy_helpers import apply_tenant_scope
+from app.services.published_content_cache import MENU_LISTS, MENUS, content_response, published_content
 from fastapi import Request
 
 router = APIRouter()
@@ -48,17 +50,18 @@ class MenuResponse(BaseModel):
     created_at: str
     updated_at: str
 
+    @field_validator("created_at", "updated_at", mode="before")
+    @classmethod
+    def _isoformat(cls, value):
+        """Timestamps are sent as ISO 8601 strings"""
+        return value.isoformat() if isinstance(value, datetime) else value
+
     class Config:
         from_attributes = True
 
 
-@router.get("/menus", response_model=List[MenuResponse], tags=["menus"])
-async def list_menus(
-    location: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    """List all menus"""
+async def menus_payload(db: AsyncSession, location: Optional[str] = None):
+    """Menus of a location (or all of them) and their latest update"""
     query = select(Menu)
     if location:
         query = query.where(Menu.location == location)
@@ -66,7 +69,26 @@ async def list_menus(
     query = apply_tenant_scope(query, Menu)
     result = await db.execute(query.order_by(Menu.created_at.desc()))
     menus = result.scalars().all()
-    return [MenuResponse.model_validate(menu) for menu in menus]
+    updated_at = max((menu.updated_at for menu in menus if menu.updated_at), default=None)
+    return [MenuResponse.model_validate(menu) for menu in menus], updated_at
+
+
+@router.get("/menus", response_model=List[MenuResponse], tags=["menus"])
+async def list_menus(
+    request: Request,
+    location: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """List all menus (served from the published content cache)"""
+    ident = location or "all"
+    
+    async def build():
+        payload, updated_at = await menus_payload(db, location)
+        return payload, updated_at, ident in MENU_LISTS
+    
+    content = await published_content.get_or_build(MENUS, ident, build)
+    return content_response(request, content, MENUS)
 
 
 @router.get("/menus/{menu_id}", response_model=MenuResponse, tags=["menus"])
@@ -108,6 +130,7 @@ async def create_menu(
     db.add(menu)
     await db.commit()
     await db.refresh(menu)
+    await published_content.invalidate_menus()
     
     # Log data modification
     try:
@@ -162,6 +185,7 @@ async def update_menu(
     
     await db.commit()
     await db.refresh(menu)
+    await published_content.invalidate_menus()
     
     # Log data modification
     try:
@@ -211,6 +235,7 @@ async def delete_menu(
     menu_name = menu.name  # Save before deletion
     await db.delete(menu)
     await db.commit()
+    await published_content.invalidate_menus()
     
     # Log data deletion
     try:
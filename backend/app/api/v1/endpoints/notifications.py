@@ -7,6 +7,11 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.notification_service import NotificationService
+from app.services.notification_fanout_service import (
+    NotificationFanoutService,
+    NotificationPayload,
+    audience_query,
+)
 from app.models.user import User
 from app.models.notification import NotificationType
 from app.schemas.notification import (
@@ -14,9 +19,11 @@ from app.schemas.notification import (
     NotificationUpdate,
     NotificationResponse,
     NotificationListResponse,
-    NotificationUnreadCountResponse
+    NotificationUnreadCountResponse,
+    NotificationFanoutRequest,
+    NotificationFanoutResponse
 )
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, require_superadmin
 from app.core.database import get_db
 from app.core.logging import logger
 
@@ -82,7 +89,7 @@ async def get_unread_count(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> NotificationUnreadCountResponse:
-    """Get count of unread notifications for the current user"""
+    """Get count of unread notifications for the current user (from the counter, not a row count)"""
     service = NotificationService(db)
     unread_count = await service.get_unread_count(current_user.id)
     
@@ -233,3 +240,40 @@ async def create_notification(
     
     return NotificationResponse.model_validate(notification)
 
+
+@router.post(
+    "/notifications/fan-out",
+    response_model=NotificationFanoutResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["notifications"]
+)
+async def fan_out_notification(
+    request: NotificationFanoutRequest,
+    _: None = Depends(require_superadmin),
+    db: AsyncSession = Depends(get_db),
+) -> NotificationFanoutResponse:
+    """
+    Send a notification to an audience (superadmin only)
+    
+    One INSERT ... SELECT stores the notification for every recipient and
+    increments their unread counters; with a **group_key**, a recipient's unread
+    notification of the group within the coalescing window is updated instead.
+    
+    - **user_ids** / **team_id** / **all_users**: the audience (exactly one)
+    """
+    payload = NotificationPayload(
+        title=request.title,
+        message=request.message,
+        notification_type=request.notification_type.value,
+        action_url=request.action_url,
+        action_label=request.action_label,
+        metadata=request.metadata,
+        group_key=request.group_key,
+    )
+    audience = audience_query(user_ids=request.user_ids, team_id=request.team_id)
+    
+    summary = await NotificationFanoutService(db).fan_out(
+        audience, payload, coalesce_window_seconds=request.coalesce_window_seconds
+    )
+    
+    return NotificationFanoutResponse(**summary)
@@ -34,6 +34,7 @@ from app.schemas.organization_donors import (
     Donor as DonorSchema,
     DonorWithStats,
     DonorList,
+    DonorSuggestionList,
     DonationCreate,
     DonationUpdate,
     Donation as DonationSchema,
@@ -45,6 +46,9 @@ from app.schemas.organization_donors import (
     DonorActivity as DonorActivitySchema,
     DonorHistory,
     DonorStats,
+    DonorProfile,
+    DonorBulkRequest,
+    DonorBulkResult,
     RefundRequest,
     DonorSegmentCreate,
     DonorSegmentUpdate,
@@ -68,6 +72,11 @@ from app.schemas.organization_donors import (
     RecurringDonation as RecurringDonationSchema,
     RecurringDonationList,
 )
+from app.services.donor_search_service import DonorSearchService
+from app.services.donor_tag_service import DonorTagService
+from app.services.campaign_rollup_service import COUNTED_STATUS, CampaignRollupService, DonationState
+from app.services.donor_bulk_service import DonorBulkService, DonorSelection
+from app.services.donor_profile_service import PROFILE_SECTIONS, DonorProfileService, parse_sections
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -85,8 +94,10 @@ async def list_donors(
     search: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     tags: Optional[List[str]] = Query(None),
+    tag_match: str = Query("all", pattern="^(all|any)$"),
     min_total_donated: Optional[Decimal] = Query(None),
     max_total_donated: Optional[Decimal] = Query(None),
+    count_mode: str = Query("exact", pattern="^(exact|estimated)$"),
     org_db: AsyncSession = Depends(get_organization_db),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -95,61 +106,50 @@ async def list_donors(
     List donors for organization
     
     Supports pagination, search, and filtering.
+    tag_match=all returns donors having every tag, tag_match=any donors having at least one.
+    Search uses the trigram/full-text indexes and orders results by relevance.
+    count_mode=estimated returns an exact total up to 1000 matches and a planner
+    estimate beyond (total_is_estimate=true).
     """
     from sqlalchemy.exc import ProgrammingError, OperationalError
     
     try:
-        # Build query - always filter by organization_id
-        query = select(Donor).where(Donor.organization_id == organization_id)
+        search_service = DonorSearchService(org_db, organization_id)
         
-        # Apply filters
-        if search:
-            search_filter = or_(
-                Donor.email.ilike(f"%{search}%"),
-                Donor.first_name.ilike(f"%{search}%"),
-                Donor.last_name.ilike(f"%{search}%"),
-            )
-            query = query.where(search_filter)
+        # Filters shared by the page query and the count
+        conditions = []
+        rank = None
+        if search and search.strip():
+            search_filter, rank = await search_service.search_filter(search)
+            conditions.append(search_filter)
         
         if is_active is not None:
-            query = query.where(Donor.is_active == is_active)
+            conditions.append(Donor.is_active == is_active)
         
         if tags:
-            # Filter by tags (JSON array contains)
-            for tag in tags:
-                query = query.where(Donor.tags.contains([tag]))
+            # Served by donor_tag_assignments (tag_id, donor_id) index
+            tag_filter = await DonorTagService(org_db, organization_id).tag_filter(tags, match=tag_match)
+            if tag_filter is not None:
+                conditions.append(tag_filter)
         
         if min_total_donated is not None:
-            query = query.where(Donor.total_donated >= min_total_donated)
+            conditions.append(Donor.total_donated >= min_total_donated)
         
         if max_total_donated is not None:
-            query = query.where(Donor.total_donated <= max_total_donated)
+            conditions.append(Donor.total_donated <= max_total_donated)
         
-        # Get total count - build count query with same filters
-        count_query = select(func.count(Donor.id)).where(Donor.organization_id == organization_id)
-        if search:
-            search_filter = or_(
-                Donor.email.ilike(f"%{search}%"),
-                Donor.first_name.ilike(f"%{search}%"),
-                Donor.last_name.ilike(f"%{search}%"),
-            )
-            count_query = count_query.where(search_filter)
-        if is_active is not None:
-            count_query = count_query.where(Donor.is_active == is_active)
-        if tags:
-            for tag in tags:
-                count_query = count_query.where(Donor.tags.contains([tag]))
-        if min_total_donated is not None:
-            count_query = count_query.where(Donor.total_donated >= min_total_donated)
-        if max_total_donated is not None:
-            count_query = count_query.where(Donor.total_donated <= max_total_donated)
+        total, total_is_estimate = await search_service.count(conditions, mode=count_mode)
         
-        total_result = await org_db.execute(count_query)
-        total = total_result.scalar_one() or 0
+        # Build query - always filter by organization_id
+        query = select(Donor).where(Donor.organization_id == organization_id, *conditions)
+        if rank is not None:
+            query = query.order_by(rank.desc(), Donor.created_at.desc())
+        else:
+            query = query.order_by(Donor.created_at.desc())
         
         # Apply pagination
         offset = (page - 1) * page_size
-        query = query.order_by(Donor.created_at.desc()).offset(offset).limit(page_size)
+        query = query.offset(offset).limit(page_size)
         
         # Execute query
         result = await org_db.execute(query)
@@ -164,6 +164,7 @@ async def list_donors(
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
+            "total_is_estimate": total_is_estimate,
         }
         
     except (ProgrammingError, OperationalError) as e:
@@ -183,6 +184,29 @@ async def list_donors(
         )
 
 
+@router.get("/{organization_id}/donors/autocomplete", response_model=DonorSuggestionList)
+async def autocomplete_donors(
+    organization_id: UUID,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+    org_db: AsyncSession = Depends(get_organization_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Donor search-box suggestions (name and email prefixes), ordered by relevance
+    """
+    from sqlalchemy.exc import ProgrammingError, OperationalError
+    
+    try:
+        items = await DonorSearchService(org_db, organization_id).autocomplete(q, limit=limit)
+        return {"items": items}
+    except (ProgrammingError, OperationalError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+
 @router.get("/{organization_id}/donors/{donor_id}", response_model=DonorWithStats)
 async def get_donor(
     organization_id: UUID,
@@ -195,58 +219,16 @@ async def get_donor(
     from sqlalchemy.exc import ProgrammingError, OperationalError
     
     try:
-        # Build query - always filter by organization_id to ensure donor belongs to organization
-        query = select(Donor).where(
-            and_(
-                Donor.id == donor_id,
-                Donor.organization_id == organization_id
-            )
-        )
-        result = await org_db.execute(query)
-        donor = result.scalar_one_or_none()
+        # Donor and its donation statistics in one query (scoped to the organization)
+        summary = await DonorProfileService(org_db, organization_id).summary(donor_id)
         
-        if not donor:
+        if not summary:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Donor not found"
             )
         
-        # Calculate additional stats
-        donations_query = select(Donation).where(Donation.donor_id == donor_id)
-        donations_result = await org_db.execute(donations_query)
-        donations = donations_result.scalars().all()
-        
-        avg_donation = None
-        last_donation_amount = None
-        
-        if donations:
-            completed_donations = [d for d in donations if d.payment_status == 'completed']
-            if completed_donations:
-                total = sum(d.amount for d in completed_donations)
-                avg_donation = total / len(completed_donations)
-                
-                # Get last donation
-                last_donation = max(completed_donations, key=lambda d: d.payment_date or d.created_at)
-                last_donation_amount = last_donation.amount
-        
-        # Convert donor to dict and map extra_data to metadata
-        donor_dict = {
-            **{k: v for k, v in donor.__dict__.items() if not k.startswith('_')},
-        }
-        
-        # Convert Decimal fields to strings for API
-        if 'total_donated' in donor_dict and donor_dict['total_donated'] is not None:
-            donor_dict['total_donated'] = str(donor_dict['total_donated'])
-        
-        # Map extra_data to metadata for API response
-        if 'extra_data' in donor_dict:
-            donor_dict['metadata'] = donor_dict.pop('extra_data')
-        
-        # Add calculated stats
-        donor_dict['average_donation'] = str(avg_donation) if avg_donation else None
-        donor_dict['last_donation_amount'] = str(last_donation_amount) if last_donation_amount else None
-        
-        return DonorWithStats(**donor_dict)
+        return DonorWithStats(**DonorProfileService.donor_with_stats(summary))
         
     except (ProgrammingError, OperationalError) as e:
         error_msg = str(e).lower()
@@ -288,13 +270,17 @@ async def create_donor(
                 detail="Donor with this email already exists"
             )
         
-        # Create donor
+        # Create donor (tags are stored as assignments, see DonorTagService)
         donor = Donor(
-            **donor_in.dict(),
+            **donor_in.dict(exclude={"tags"}),
+            tags=[],
             organization_id=organization_id,
         )
         
         org_db.add(donor)
+        if donor_in.tags:
+            await org_db.flush()
+            await DonorTagService(org_db, organization_id).set_donor_tags(donor, donor_in.tags, assigned_by=current_user.id)
         await org_db.commit()
         await org_db.refresh(donor)
         
@@ -356,8 +342,15 @@ async def update_donor(
     # Update fields
     update_data = donor_update.dict(exclude_unset=True)
     for field, value in update_data.items():
+        if field == "tags":
+            continue
         setattr(donor, field, value)
     
+    if "tags" in update_data:
+        await DonorTagService(org_db, donor.organization_id).set_donor_tags(
+            donor, update_data["tags"] or [], assigned_by=current_user.id
+        )
+    
     await org_db.commit()
     await org_db.refresh(donor)
     
@@ -397,12 +390,67 @@ async def delete_donor(
             detail="Donor not found"
         )
     
+    # Donations cascade with the donor: their campaigns' rollups must be recomputed
+    campaigns = await org_db.execute(
+        select(Donation.campaign_id)
+        .where(
+            Donation.donor_id == donor.id,
+            Donation.campaign_id.isnot(None),
+            Donation.payment_status == COUNTED_STATUS,
+        )
+        .distinct()
+    )
+    campaign_ids = list(campaigns.scalars().all())
+    
     await org_db.delete(donor)
+    await org_db.flush()
+    if campaign_ids:
+        await CampaignRollupService(org_db, donor.organization_id).reconcile(campaign_ids)
     await org_db.commit()
     
     return None
 
 
+@router.post("/{organization_id}/donors/bulk", response_model=DonorBulkResult)
+async def bulk_donor_action(
+    organization_id: UUID,
+    request: DonorBulkRequest,
+    org_db: AsyncSession = Depends(get_organization_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply one action to many donors
+    
+    Actions: add_tag, remove_tag, add_to_segment, remove_from_segment, activate,
+    deactivate, delete. Donors are given as donor_ids (up to 10000, with a per-donor
+    result) or as a filter (same filters as the donor list, at least one required).
+    Runs as set-based statements in one transaction.
+    """
+    if request.filter is not None:
+        selection = DonorSelection(**request.filter.model_dump())
+    else:
+        selection = DonorSelection(donor_ids=request.donor_ids)
+    
+    try:
+        summary = await DonorBulkService(org_db, organization_id).run(
+            request.action,
+            selection,
+            tag_id=request.tag_id,
+            segment_id=request.segment_id,
+            performed_by=current_user.id,
+        )
+    except LookupError as e:
+        await org_db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        await org_db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    await org_db.commit()
+    
+    return summary
+
+
 # ============= Donations =============
 
 @router.get("/{organization_id}/donors/{donor_id}/donations", response_model=DonationList)
@@ -534,6 +582,8 @@ async def create_donation(
     org_db.add(donation)
     await org_db.flush()
     
+    await CampaignRollupService(org_db, organization_id).apply(None, DonationState.of(donation))
+    
     # Update donor statistics if donation is completed
     if donation.payment_status == 'completed':
         donor.total_donated = (donor.total_donated or Decimal('0.00')) + donation.amount
@@ -589,6 +639,7 @@ async def update_donation(
     # Track status change for donor stats update
     old_status = donation.payment_status
     old_amount = donation.amount
+    before = DonationState.of(donation)
     
     # Update fields - map metadata to extra_data
     update_data = donation_update.dict(exclude_unset=True)
@@ -600,6 +651,8 @@ async def update_donation(
     
     await org_db.flush()
     
+    await CampaignRollupService(org_db, donation.organization_id).apply(before, DonationState.of(donation))
+    
     # Update donor statistics if status changed
     if donation.payment_status != old_status or donation.amount != old_amount:
         donor_query = select(Donor).where(Donor.id == donation.donor_id)
@@ -662,12 +715,15 @@ async def refund_donation(
         )
     
     # Update donation status
+    before = DonationState.of(donation)
     refund_amount = refund_request.amount or donation.amount
     donation.payment_status = 'refunded'
     donation.notes = (donation.notes or "") + f"\n[Refund] {refund_request.reason or 'No reason provided'}"
     
     await org_db.flush()
     
+    await CampaignRollupService(org_db, donation.organization_id).apply(before, DonationState.of(donation))
+    
     # Update donor statistics
     donor_query = select(Donor).where(Donor.id == donation.donor_id)
     donor_result = await org_db.execute(donor_query)
@@ -724,46 +780,28 @@ async def refund_donation(
 async def get_donor_history(
     organization_id: UUID,
     donor_id: UUID,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
     org_db: AsyncSession = Depends(get_organization_db),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get donor history (donations + activities)"""
+    """Get donor history (donations + activities), paginated"""
     from sqlalchemy.exc import ProgrammingError, OperationalError
     
     try:
-        # Verify donor exists and belongs to organization
-        donor_query = select(Donor).where(
-            and_(
-                Donor.id == donor_id,
-                Donor.organization_id == organization_id
-            )
-        )
-        donor_result = await org_db.execute(donor_query)
-        donor = donor_result.scalar_one_or_none()
+        profiles = DonorProfileService(org_db, organization_id)
         
-        if not donor:
+        # Verify donor exists and belongs to organization (totals come with it)
+        summary = await profiles.summary(donor_id)
+        
+        if not summary:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Donor not found"
             )
         
-        # Get donations
-        donations_query = select(Donation).where(Donation.donor_id == donor_id).order_by(Donation.payment_date.desc(), Donation.created_at.desc())
-        donations_result = await org_db.execute(donations_query)
-        donations = donations_result.scalars().all()
-        
-        # Get activities
-        activities_query = select(DonorActivity).where(DonorActivity.donor_id == donor_id).order_by(DonorActivity.created_at.desc())
-        activities_result = await org_db.execute(activities_query)
-        activities = activities_result.scalars().all()
-        
-        return {
-            "donations": donations,
-            "activities": activities,
-            "total_donations": len(donations),
-            "total_activities": len(activities),
-        }
+        return await profiles.history(summary, page, page_size)
         
     except (ProgrammingError, OperationalError) as e:
         error_msg = str(e).lower()
@@ -790,59 +828,77 @@ async def get_donor_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get donor statistics"""
+    """Get donor statistics (computed in SQL)"""
     from sqlalchemy.exc import ProgrammingError, OperationalError
     
     try:
-        # Verify donor exists and belongs to organization
-        donor_query = select(Donor).where(
-            and_(
-                Donor.id == donor_id,
-                Donor.organization_id == organization_id
-            )
-        )
-        donor_result = await org_db.execute(donor_query)
-        donor = donor_result.scalar_one_or_none()
+        summary = await DonorProfileService(org_db, organization_id).summary(donor_id)
         
-        if not donor:
+        if not summary:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Donor not found"
             )
         
-        # Get all completed donations
-        donations_query = select(Donation).where(
-            and_(
-                Donation.donor_id == donor_id,
-                Donation.payment_status == 'completed'
+        return DonorProfileService.stats(summary)
+        
+    except (ProgrammingError, OperationalError) as e:
+        error_msg = str(e).lower()
+        if "does not exist" in error_msg or "relation" in error_msg:
+            # Table doesn't exist - migrations needed
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=(
+                    "Database tables not found. Please run migrations on the organization database. "
+                    f"Use POST /api/v1/organizations/{organization_id}/database/migrate to run migrations."
+                )
             )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+
+@router.get("/{organization_id}/donors/{donor_id}/profile", response_model=DonorProfile)
+async def get_donor_profile(
+    organization_id: UUID,
+    donor_id: UUID,
+    include: Optional[List[str]] = Query(
+        None,
+        description=f"Sections to load besides the donor ({', '.join(PROFILE_SECTIONS)}); all by default",
+    ),
+    history_page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    org_db: AsyncSession = Depends(get_organization_db),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the donor 360 profile in one request
+    
+    Donor with statistics, a page of history (donations + activities), latest notes,
+    tags, latest communications and recurring donations. include restricts the
+    sections (include=stats&include=history or include=stats,history); the others are null.
+    """
+    from sqlalchemy.exc import ProgrammingError, OperationalError
+    
+    try:
+        sections = parse_sections(include)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        profile = await DonorProfileService(org_db, organization_id).profile(
+            donor_id, sections, history_page=history_page, page_size=page_size
         )
-        donations_result = await org_db.execute(donations_query)
-        donations = donations_result.scalars().all()
-        
-        from datetime import datetime, timezone
-        now = datetime.now(timezone.utc)
-        this_year_start = datetime(now.year, 1, 1, tzinfo=timezone.utc)
-        this_month_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
-        
-        this_year_donations = [d for d in donations if (d.payment_date or d.created_at) >= this_year_start]
-        this_month_donations = [d for d in donations if (d.payment_date or d.created_at) >= this_month_start]
         
-        amounts = [d.amount for d in donations] if donations else []
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Donor not found"
+            )
         
-        return {
-            "total_donated": str(donor.total_donated or Decimal('0.00')),
-            "donation_count": donor.donation_count or 0,
-            "average_donation": str(sum(amounts) / len(amounts) if amounts else Decimal('0.00')),
-            "first_donation_date": donor.first_donation_date,
-            "last_donation_date": donor.last_donation_date,
-            "last_donation_amount": str(amounts[-1]) if amounts else None,
-            "largest_donation": str(max(amounts)) if amounts else None,
-            "this_year_total": str(sum(d.amount for d in this_year_donations)),
-            "this_year_count": len(this_year_donations),
-            "this_month_total": str(sum(d.amount for d in this_month_donations)),
-            "this_month_count": len(this_month_donations),
-        }
+        return profile
         
     except (ProgrammingError, OperationalError) as e:
         error_msg = str(e).lower()
@@ -1115,6 +1171,8 @@ async def assign_tag_to_donor(
     # Update tag count
     tag.donor_count = (tag.donor_count or 0) + 1
     
+    await org_db.flush()
+    await DonorTagService(org_db, organization_id).refresh_mirror(donor)
     await org_db.commit()
     await org_db.refresh(tag)
     
@@ -1155,6 +1213,13 @@ async def remove_tag_from_donor(
         tag.donor_count = max(0, (tag.donor_count or 0) - 1)
     
     await org_db.delete(assignment)
+    await org_db.flush()
+    
+    donor_result = await org_db.execute(select(Donor).where(Donor.id == donor_id))
+    donor = donor_result.scalar_one_or_none()
+    if donor:
+        await DonorTagService(org_db, organization_id).refresh_mirror(donor)
+    
     await org_db.commit()
     
     return None
@@ -1461,24 +1526,12 @@ async def recalculate_segment(organization_id: UUID, segment_id: UUID, org_db: A
         donors_query = donors_query.where(Donor.is_active == criteria['is_active'])
     
     if 'tags' in criteria and criteria['tags']:
-        # Filter by tags (using tag assignments)
-        tag_names = criteria['tags']
-        tag_query = select(DonorTag.id).where(
-            and_(
-                DonorTag.organization_id == organization_id,
-                DonorTag.name.in_(tag_names)
-            )
+        # Filter by tags (using tag assignments, any of the tags unless tag_match is "all")
+        tag_filter = await DonorTagService(org_db, organization_id).tag_filter(
+            criteria['tags'], match=criteria.get('tag_match', 'any')
         )
-        tag_result = await org_db.execute(tag_query)
-        tag_ids = [t.id for t in tag_result.scalars().all()]
-        
-        if tag_ids:
-            assignment_query = select(DonorTagAssignment.donor_id).where(
-                DonorTagAssignment.tag_id.in_(tag_ids)
-            )
-            assignment_result = await org_db.execute(assignment_query)
-            donor_ids_with_tags = set(a for a in assignment_result.scalars().all())
-            donors_query = donors_query.where(Donor.id.in_(donor_ids_with_tags))
+        if tag_filter is not None:
+            donors_query = donors_query.where(tag_filter)
     
     # Execute query
     donors_result = await org_db.execute(donors_query)
@@ -1932,6 +1985,25 @@ async def get_campaign_stats(
     }
 
 
+@router.post("/{organization_id}/campaigns/rollups/reconcile")
+async def reconcile_campaign_rollups(
+    organization_id: UUID,
+    org_db: AsyncSession = Depends(get_organization_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Recompute total_raised, donation_count and donor_count of every campaign
+    from completed donations (one grouped query) and fix the ones that drifted
+    """
+    corrected = await CampaignRollupService(org_db, organization_id).reconcile()
+    await org_db.commit()
+    
+    return {
+        "success": True,
+        "corrected_campaigns": [str(campaign_id) for campaign_id in corrected],
+    }
+
+
 # ============= Recurring Donations Endpoints =============
 
 @router.get("/{organization_id}/donors/{donor_id}/recurring", response_model=RecurringDonationList)
@@ -4,7 +4,7 @@ Organizations API Endpoints
 CRUD operations for organizations (SuperAdmin only).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
@@ -36,6 +36,9 @@ from app.schemas.organization import (
     MigrateDatabaseResponse,
     DatabaseTablesResponse,
     TableInfo,
+    MigrateAllDatabasesRequest,
+    OrganizationMigrationRunResponse,
+    OrganizationMigrationTenantStatus,
 )
 
 router = APIRouter()
@@ -745,11 +748,9 @@ async def create_organization_database(
             )
         
         # Normalize connection string before saving
-        connection_string = OrganizationDatabaseManager.normalize_connection_string(connection_string)
-        
-        # Parse to get database name
-        parsed = OrganizationDatabaseManager.parse_db_connection_string(connection_string)
-        db_name = parsed['database']
+        spec = OrganizationDatabaseManager.get_connection_spec(connection_string)
+        connection_string = spec.asyncpg_url
+        db_name = spec.database
         
         # Update organization with new connection string
         old_connection_string = organization.db_connection_string
@@ -822,8 +823,7 @@ async def migrate_organization_database(
         
         # Parse connection string to get database name for logging
         try:
-            parsed = OrganizationDatabaseManager.parse_db_connection_string(organization.db_connection_string)
-            db_name = parsed['database']
+            db_name = OrganizationDatabaseManager.get_connection_spec(organization.db_connection_string).database
             logger.info(f"📊 Base de données cible (extrait de la connection string): '{db_name}'")
         except Exception as parse_error:
             logger.warning(f"Could not parse connection string for database name: {parse_error}")
@@ -987,12 +987,11 @@ async def get_organization_database_tables(
             organization.db_connection_string
         )
         
-        parsed = OrganizationDatabaseManager.parse_db_connection_string(organization.db_connection_string)
-        db_name = parsed['database']
+        spec = OrganizationDatabaseManager.get_connection_spec(organization.db_connection_string)
+        db_name = spec.database
         
         # Get detailed table information including schema
-        normalized_conn = OrganizationDatabaseManager.normalize_connection_string(organization.db_connection_string)
-        engine = create_async_engine(normalized_conn, echo=False, pool_pre_ping=True)
+        engine = create_async_engine(spec.asyncpg_url, echo=False, pool_pre_ping=True)
         
         tables_detailed = []
         current_schema = None
@@ -1056,3 +1055,93 @@ async def get_organization_database_tables(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to list tables: {str(e)}"
         )
+
+
+# ============= Fleet Migrations =============
+
+async def _execute_migration_run(run_id: UUID, organization_ids: List[UUID] | None, max_workers: int) -> None:
+    """Background job: execute a migration run with its own main-database session"""
+    from app.core.database import AsyncSessionLocal
+    from app.core.organization_migration_orchestrator import OrganizationMigrationOrchestrator
+    from app.models.organization_migration import OrganizationMigrationRun
+    
+    async with AsyncSessionLocal() as session:
+        run = await session.get(OrganizationMigrationRun, run_id)
+        if not run:
+            logger.error(f"Migration run {run_id} disappeared before execution")
+            return
+        orchestrator = OrganizationMigrationOrchestrator(
+            session,
+            target_revision=run.target_revision,
+            max_workers=max_workers,
+        )
+        try:
+            await orchestrator.execute(run, organization_ids=organization_ids)
+        except Exception as e:
+            logger.error(f"Migration run {run_id} aborted: {e}", exc_info=True)
+
+
+def _migration_run_response(run, tenants) -> OrganizationMigrationRunResponse:
+    """Build the run response without touching lazy relationships"""
+    return OrganizationMigrationRunResponse(
+        id=run.id,
+        target_revision=run.target_revision,
+        status=run.status,
+        total_count=run.total_count or 0,
+        succeeded_count=run.succeeded_count or 0,
+        failed_count=run.failed_count or 0,
+        skipped_count=run.skipped_count or 0,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+        tenants=[OrganizationMigrationTenantStatus.model_validate(t) for t in tenants],
+    )
+
+
+@router.post("/migrations/runs", response_model=OrganizationMigrationRunResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_migration_run(
+    request: MigrateAllDatabasesRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(require_superadmin),
+):
+    """
+    Migrate all organization databases to the latest schema (SuperAdmin only)
+    
+    Returns immediately; poll GET /migrations/runs/{run_id} for progress.
+    Pass resumeRunId to continue an interrupted run.
+    """
+    from app.core.organization_migration_orchestrator import OrganizationMigrationOrchestrator
+    
+    orchestrator = OrganizationMigrationOrchestrator(db, max_workers=request.max_workers)
+    try:
+        run = await orchestrator.start_run(
+            started_by=current_user.id,
+            resume_run_id=request.resume_run_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    background_tasks.add_task(_execute_migration_run, run.id, request.organization_ids, request.max_workers)
+    return _migration_run_response(run, [])
+
+
+@router.get("/migrations/runs/{run_id}", response_model=OrganizationMigrationRunResponse)
+async def get_migration_run(
+    run_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(require_superadmin),
+):
+    """
+    Get progress of an organization migration run (SuperAdmin only)
+    """
+    from app.core.organization_migration_orchestrator import get_migration_run_statuses
+    
+    data = await get_migration_run_statuses(db, run_id)
+    if not data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Migration run not found"
+        )
+    
+    return _migration_run_response(data["run"], data["tenants"])
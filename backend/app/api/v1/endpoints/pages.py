@@ -3,9 +3,10 @@ Pages API Endpoints
 CMS pages management
 """
 
+from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
@@ -14,6 +15,7 @@ from app.models.user import User
 from app.dependencies import get_current_user, get_db, is_superadmin
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
 from app.core.tenancy_helpers import apply_tenant_scope
+from app.services.published_content_cache import PAGE, content_response, published_content
 from fastapi import Request
 
 router = APIRouter()
@@ -67,6 +69,12 @@ class PageResponse(BaseModel):
     updated_at: str
     published_at: Optional[str] = None
 
+    @field_validator("created_at", "updated_at", "published_at", mode="before")
+    @classmethod
+    def _isoformat(cls, value):
+        """Timestamps are sent as ISO 8601 strings"""
+        return value.isoformat() if isinstance(value, datetime) else value
+
     class Config:
         from_attributes = True
 
@@ -115,21 +123,27 @@ async def list_pages(
 
 @router.get("/pages/{slug}", response_model=PageResponse, tags=["pages"])
 async def get_page(
+    request: Request,
     slug: str,
     current_user: Optional[User] = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get a page by slug"""
-    query = select(Page).where(Page.slug == slug)
-    # Apply tenant scoping if tenancy is enabled
-    query = apply_tenant_scope(query, Page)
-    result = await db.execute(query)
-    page = result.scalar_one_or_none()
+    """Get a page by slug (published pages are served from the published content cache)"""
+    async def build():
+        query = select(Page).where(Page.slug == slug)
+        # Apply tenant scoping if tenancy is enabled
+        query = apply_tenant_scope(query, Page)
+        result = await db.execute(query)
+        page = result.scalar_one_or_none()
+        if not page:
+            return None
+        return PageResponse.model_validate(page), page.updated_at, page.status == 'published'
     
-    if not page:
+    content = await published_content.get_or_build(PAGE, slug, build)
+    if not content:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Page not found")
     
-    return PageResponse.model_validate(page)
+    return content_response(request, content, PAGE)
 
 
 @router.post("/pages", response_model=PageResponse, status_code=status.HTTP_201_CREATED, tags=["pages"])
@@ -172,6 +186,7 @@ async def create_page(
     db.add(page)
     await db.commit()
     await db.refresh(page)
+    await published_content.invalidate(PAGE, page.slug)
     
     # Log data modification
     try:
@@ -253,6 +268,7 @@ async def update_page(
     
     await db.commit()
     await db.refresh(page)
+    await published_content.invalidate(PAGE, slug, page.slug)
     
     # Log data modification
     try:
@@ -303,6 +319,7 @@ async def delete_page(
     page_id = page.id
     await db.delete(page)
     await db.commit()
+    await published_content.invalidate(PAGE, slug)
     
     # Log data deletion
     try:
@@ -351,6 +368,7 @@ async def delete_page_by_id(
     page_slug = page.slug
     await db.delete(page)
     await db.commit()
+    await published_content.invalidate(PAGE, page_slug)
     
     # Log deletion
     try:
@@ -4,12 +4,12 @@ Platform Monitoring API Endpoints
 Provides platform-wide statistics and monitoring data for SuperAdmins.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, or_
 from sqlalchemy.orm import selectinload
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from uuid import UUID
 
 from app.core.database import get_db
@@ -17,16 +17,13 @@ from app.dependencies import require_superadmin, get_current_user
 from app.models import (
     User,
     Organization,
-    OrganizationModule,
-    OrganizationMember,
     Role,
     Permission,
     UserRole,
-    Subscription,
     Invoice,
-    AVAILABLE_MODULES,
 )
 from app.core.logging import logger
+from app.services.metrics_snapshot_service import MODULES_KEY, STATS_KEY, MetricsSnapshotService
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -64,6 +61,7 @@ class ModuleUsageStats(BaseModel):
 
 @router.get("/stats", response_model=PlatformStatsResponse)
 async def get_platform_stats(
+    refresh: bool = Query(False, description="Recompute instead of reading the snapshot"),
     db: AsyncSession = Depends(get_db),
     _: None = Depends(require_superadmin),
 ):
@@ -77,90 +75,11 @@ async def get_platform_stats(
     - Member statistics
     - Subscription statistics
     - Recent activity
+    
+    Read from the platform metrics snapshot (refreshed in the background).
     """
     try:
-        # Organizations stats
-        org_total = await db.execute(select(func.count()).select_from(Organization))
-        org_active = await db.execute(
-            select(func.count()).select_from(Organization).where(Organization.is_active == True)
-        )
-        org_inactive = await db.execute(
-            select(func.count()).select_from(Organization).where(Organization.is_active == False)
-        )
-        
-        # Users stats
-        user_total = await db.execute(select(func.count()).select_from(User))
-        user_active = await db.execute(
-            select(func.count()).select_from(User).where(User.is_active == True)
-        )
-        user_inactive = await db.execute(
-            select(func.count()).select_from(User).where(User.is_active == False)
-        )
-        
-        # Module stats
-        module_enabled = await db.execute(
-            select(func.count()).select_from(OrganizationModule).where(OrganizationModule.is_enabled == True)
-        )
-        module_total = await db.execute(select(func.count()).select_from(OrganizationModule))
-        
-        # Members stats
-        member_total = await db.execute(select(func.count()).select_from(OrganizationMember))
-        member_joined = await db.execute(
-            select(func.count()).select_from(OrganizationMember).where(OrganizationMember.joined_at.isnot(None))
-        )
-        member_pending = await db.execute(
-            select(func.count()).select_from(OrganizationMember).where(OrganizationMember.joined_at.is_(None))
-        )
-        
-        # Subscriptions stats (if available)
-        try:
-            subscription_total = await db.execute(select(func.count()).select_from(Subscription))
-            subscription_active = await db.execute(
-                select(func.count()).select_from(Subscription).where(Subscription.status == 'active')
-            )
-        except Exception:
-            subscription_total = None
-            subscription_active = None
-        
-        # Recent organizations (last 7 days)
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        org_recent = await db.execute(
-            select(func.count()).select_from(Organization).where(Organization.created_at >= seven_days_ago)
-        )
-        
-        # Recent users (last 7 days)
-        user_recent = await db.execute(
-            select(func.count()).select_from(User).where(User.created_at >= seven_days_ago)
-        )
-        
-        return {
-            "organizations": {
-                "total": org_total.scalar() or 0,
-                "active": org_active.scalar() or 0,
-                "inactive": org_inactive.scalar() or 0,
-                "new_last_7_days": org_recent.scalar() or 0,
-            },
-            "users": {
-                "total": user_total.scalar() or 0,
-                "active": user_active.scalar() or 0,
-                "inactive": user_inactive.scalar() or 0,
-                "new_last_7_days": user_recent.scalar() or 0,
-            },
-            "modules": {
-                "total_enabled": module_enabled.scalar() or 0,
-                "total_configured": module_total.scalar() or 0,
-            },
-            "members": {
-                "total": member_total.scalar() or 0,
-                "joined": member_joined.scalar() or 0,
-                "pending": member_pending.scalar() or 0,
-            },
-            "subscriptions": {
-                "total": subscription_total.scalar() if subscription_total else 0,
-                "active": subscription_active.scalar() if subscription_active else 0,
-            },
-            "recent_activity": [],  # TODO: Implement activity tracking
-        }
+        return await MetricsSnapshotService(db).platform_view(STATS_KEY, force=refresh)
     except Exception as e:
         logger.error(f"Error getting platform stats: {e}")
         raise HTTPException(
@@ -217,6 +136,7 @@ async def get_organizations_stats(
 
 @router.get("/modules/usage", response_model=List[ModuleUsageStats])
 async def get_module_usage_stats(
+    refresh: bool = Query(False, description="Recompute instead of reading the snapshot"),
     db: AsyncSession = Depends(get_db),
     _: None = Depends(require_superadmin),
 ):
@@ -224,31 +144,7 @@ async def get_module_usage_stats(
     Get module usage statistics across all organizations (SuperAdmin only)
     """
     try:
-        # Get total number of organizations
-        org_total_result = await db.execute(select(func.count()).select_from(Organization))
-        total_orgs = org_total_result.scalar() or 1  # Avoid division by zero
-        
-        # Get enabled count for each module
-        module_stats = []
-        for module_key in AVAILABLE_MODULES:
-            enabled_result = await db.execute(
-                select(func.count()).select_from(OrganizationModule).where(
-                    and_(
-                        OrganizationModule.module_key == module_key,
-                        OrganizationModule.is_enabled == True
-                    )
-                )
-            )
-            enabled_count = enabled_result.scalar() or 0
-            
-            module_stats.append({
-                "module_key": module_key,
-                "enabled_count": enabled_count,
-                "total_organizations": total_orgs,
-                "usage_percentage": (enabled_count / total_orgs) * 100 if total_orgs > 0 else 0,
-            })
-        
-        return module_stats
+        return await MetricsSnapshotService(db).platform_view(MODULES_KEY, force=refresh)
     except Exception as e:
         logger.error(f"Error getting module usage stats: {e}")
         raise HTTPException(
@@ -13,8 +13,10 @@ from app.models.post import Post
 from app.models.user import User
 from app.models.tag import Category
 from app.dependencies import get_current_user, get_db
+from app.core.query_optimization import BatchLoader
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
 from app.core.tenancy_helpers import apply_tenant_scope
+from app.services.published_content_cache import POST, content_response, published_content
 from fastapi import Request
 
 router = APIRouter()
@@ -72,6 +74,43 @@ class PostResponse(BaseModel):
         from_attributes = True
 
 
+def _author_name(author: Optional[User]) -> Optional[str]:
+    if not author:
+        return None
+    return f"{author.first_name or ''} {author.last_name or ''}".strip() or author.email
+
+
+async def _post_responses(db: AsyncSession, posts: List[Post]) -> List[PostResponse]:
+    """Responses of posts, with authors and categories loaded in one query each"""
+    authors = await BatchLoader.for_session(db, User).load_many(post.author_id for post in posts)
+    categories = await BatchLoader.for_session(db, Category).load_many(post.category_id for post in posts)
+    
+    post_responses = []
+    for post in posts:
+        category = categories.get(post.category_id)
+        post_responses.append(PostResponse(
+            id=post.id,
+            title=post.title,
+            slug=post.slug,
+            excerpt=post.excerpt,
+            content=post.content,
+            content_html=post.content_html,
+            status=post.status,
+            author_id=post.author_id,
+            author_name=_author_name(authors.get(post.author_id)),
+            category_id=post.category_id,
+            category_name=category.name if category else None,
+            tags=post.tags if isinstance(post.tags, list) else None,
+            meta_title=post.meta_title,
+            meta_description=post.meta_description,
+            meta_keywords=post.meta_keywords,
+            published_at=post.published_at.isoformat() if post.published_at else None,
+            created_at=post.created_at.isoformat(),
+            updated_at=post.updated_at.isoformat(),
+        ))
+    return post_responses
+
+
 @router.get("/posts", response_model=List[PostResponse], tags=["posts"])
 async def list_posts(
     request: Request,
@@ -159,42 +198,7 @@ async def list_posts(
     posts = result.scalars().all()
     
     # Load author and category names
-    post_responses = []
-    for post in posts:
-        author_name = None
-        if post.author_id:
-            author_result = await db.execute(select(User).where(User.id == post.author_id))
-            author = author_result.scalar_one_or_none()
-            if author:
-                author_name = f"{author.first_name or ''} {author.last_name or ''}".strip() or author.email
-        
-        category_name = None
-        if post.category_id:
-            category_result = await db.execute(select(Category).where(Category.id == post.category_id))
-            category = category_result.scalar_one_or_none()
-            if category:
-                category_name = category.name
-        
-        post_responses.append(PostResponse(
-            id=post.id,
-            title=post.title,
-            slug=post.slug,
-            excerpt=post.excerpt,
-            content=post.content,
-            content_html=post.content_html,
-            status=post.status,
-            author_id=post.author_id,
-            author_name=author_name,
-            category_id=post.category_id,
-            category_name=category_name,
-            tags=post.tags if isinstance(post.tags, list) else None,
-            meta_title=post.meta_title,
-            meta_description=post.meta_description,
-            meta_keywords=post.meta_keywords,
-            published_at=post.published_at.isoformat() if post.published_at else None,
-            created_at=post.created_at.isoformat(),
-            updated_at=post.updated_at.isoformat(),
-        ))
+    post_responses = await _post_responses(db, posts)
     
     # Log data access
     if current_user:
@@ -219,39 +223,29 @@ async def get_post_by_slug(
     current_user: Optional[User] = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get a post by slug"""
-    query = select(Post).where(Post.slug == slug)
-    
-    # If not authenticated or not admin, only show published posts
-    if not current_user:
-        query = query.where(Post.status == 'published')
-    
-    query = apply_tenant_scope(query, Post)
-    
-    result = await db.execute(query)
-    post = result.scalar_one_or_none()
-    
-    if not post:
+    """Get a post by slug (published posts are served from the published content cache)"""
+    async def build():
+        query = select(Post).where(Post.slug == slug)
+        
+        # If not authenticated or not admin, only show published posts
+        if not current_user:
+            query = query.where(Post.status == 'published')
+        
+        query = apply_tenant_scope(query, Post)
+        
+        result = await db.execute(query)
+        post = result.scalar_one_or_none()
+        if not post:
+            return None
+        return (await _post_responses(db, [post]))[0], post.updated_at, post.status == 'published'
+    
+    content = await published_content.get_or_build(POST, slug, build)
+    if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
     
-    # Load author and category names
-    author_name = None
-    if post.author_id:
-        author_result = await db.execute(select(User).where(User.id == post.author_id))
-        author = author_result.scalar_one_or_none()
-        if author:
-            author_name = f"{author.first_name or ''} {author.last_name or ''}".strip() or author.email
-    
-    category_name = None
-    if post.category_id:
-        category_result = await db.execute(select(Category).where(Category.id == post.category_id))
-        category = category_result.scalar_one_or_none()
-        if category:
-            category_name = category.name
-    
     # Log data access
     if current_user:
         try:
@@ -265,26 +259,7 @@ async def get_post_by_slug(
         except Exception:
             pass
     
-    return PostResponse(
-        id=post.id,
-        title=post.title,
-        slug=post.slug,
-        excerpt=post.excerpt,
-        content=post.content,
-        content_html=post.content_html,
-        status=post.status,
-        author_id=post.author_id,
-        author_name=author_name,
-        category_id=post.category_id,
-        category_name=category_name,
-        tags=post.tags if isinstance(post.tags, list) else None,
-        meta_title=post.meta_title,
-        meta_description=post.meta_description,
-        meta_keywords=post.meta_keywords,
-        published_at=post.published_at.isoformat() if post.published_at else None,
-        created_at=post.created_at.isoformat(),
-        updated_at=post.updated_at.isoformat(),
-    )
+    return content_response(request, content, POST)
 
 
 @router.post("/posts", response_model=PostResponse, status_code=status.HTTP_201_CREATED, tags=["posts"])
@@ -327,16 +302,10 @@ async def create_post(
     db.add(post)
     await db.commit()
     await db.refresh(post)
+    await published_content.invalidate(POST, post.slug)
     
-    # Load author and category names
-    author_name = f"{current_user.first_name or ''} {current_user.last_name or ''}".strip() or current_user.email
-    
-    category_name = None
-    if post.category_id:
-        category_result = await db.execute(select(Category).where(Category.id == post.category_id))
-        category = category_result.scalar_one_or_none()
-        if category:
-            category_name = category.name
+    # The author is the current user: no query for it
+    BatchLoader.for_session(db, User).prime(current_user.id, current_user)
     
     # Log creation
     try:
@@ -350,26 +319,7 @@ async def create_post(
     except Exception:
         pass
     
-    return PostResponse(
-        id=post.id,
-        title=post.title,
-        slug=post.slug,
-        excerpt=post.excerpt,
-        content=post.content,
-        content_html=post.content_html,
-        status=post.status,
-        author_id=post.author_id,
-        author_name=author_name,
-        category_id=post.category_id,
-        category_name=category_name,
-        tags=post.tags if isinstance(post.tags, list) else None,
-        meta_title=post.meta_title,
-        meta_description=post.meta_description,
-        meta_keywords=post.meta_keywords,
-        published_at=post.published_at.isoformat() if post.published_at else None,
-        created_at=post.created_at.isoformat(),
-        updated_at=post.updated_at.isoformat(),
-    )
+    return (await _post_responses(db, [post]))[0]
 
 
 @router.put("/posts/{post_id}", response_model=PostResponse, tags=["posts"])
@@ -402,6 +352,8 @@ async def update_post(
                 detail="You don't have permission to edit this post"
             )
     
+    previous_slug = post.slug
+    
     # Check if slug is being changed and if new slug exists
     if post_data.slug and post_data.slug != post.slug:
         existing = await db.execute(select(Post).where(Post.slug == post_data.slug, Post.id != post_id))
@@ -441,21 +393,7 @@ async def update_post(
     
     await db.commit()
     await db.refresh(post)
-    
-    # Load author and category names
-    author_name = None
-    if post.author_id:
-        author_result = await db.execute(select(User).where(User.id == post.author_id))
-        author = author_result.scalar_one_or_none()
-        if author:
-            author_name = f"{author.first_name or ''} {author.last_name or ''}".strip() or author.email
-    
-    category_name = None
-    if post.category_id:
-        category_result = await db.execute(select(Category).where(Category.id == post.category_id))
-        category = category_result.scalar_one_or_none()
-        if category:
-            category_name = category.name
+    await published_content.invalidate(POST, previous_slug, post.slug)
     
     # Log update
     try:
@@ -469,26 +407,7 @@ async def update_post(
     except Exception:
         pass
     
-    return PostResponse(
-        id=post.id,
-        title=post.title,
-        slug=post.slug,
-        excerpt=post.excerpt,
-        content=post.content,
-        content_html=post.content_html,
-        status=post.status,
-        author_id=post.author_id,
-        author_name=author_name,
-        category_id=post.category_id,
-        category_name=category_name,
-        tags=post.tags if isinstance(post.tags, list) else None,
-        meta_title=post.meta_title,
-        meta_description=post.meta_description,
-        meta_keywords=post.meta_keywords,
-        published_at=post.published_at.isoformat() if post.published_at else None,
-        created_at=post.created_at.isoformat(),
-        updated_at=post.updated_at.isoformat(),
-    )
+    return (await _post_responses(db, [post]))[0]
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["posts"])
@@ -520,8 +439,10 @@ async def delete_post(
                 detail="You don't have permission to delete this post"
             )
     
+    post_slug = post.slug
     await db.delete(post)
     await db.commit()
+    await published_content.invalidate(POST, post_slug)
     
     # Log deletion
     try:
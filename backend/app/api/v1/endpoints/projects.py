@@ -17,6 +17,7 @@ from app.dependencies import get_current_user
 from app.models.project import Project, ProjectStatus
 from app.models.user import User
 from app.schemas.project import Project as ProjectSchema, ProjectCreate, ProjectUpdate
+from app.services.project_analytics_service import invalidate_project_analytics
 
 router = APIRouter()
 
@@ -133,6 +134,7 @@ async def create_project(
     db.add(project)
     await db.commit()
     await db.refresh(project)
+    await invalidate_project_analytics(current_user.id)
     
     return project
 
@@ -183,6 +185,7 @@ async def update_project(
     
     await db.commit()
     await db.refresh(project)
+    await invalidate_project_analytics(current_user.id)
     
     return project
 
@@ -223,4 +226,5 @@ async def delete_project(
     
     await db.delete(project)
     await db.commit()
+    await invalidate_project_analytics(current_user.id)
 
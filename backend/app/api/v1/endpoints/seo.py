@@ -4,7 +4,7 @@ SEO settings management
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -12,6 +12,7 @@ from sqlalchemy import select
 from app.models.user_preference import UserPreference
 from app.models.user import User
 from app.dependencies import get_current_user, get_db
+from app.services.published_content_cache import SEO, SEO_SETTINGS_KEY, content_response, published_content
 
 router = APIRouter()
 
@@ -42,21 +43,27 @@ class SEOSettingsResponse(BaseModel):
 
 @router.get("/seo/settings", response_model=SEOSettingsResponse, tags=["seo"])
 async def get_seo_settings(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get SEO settings"""
-    result = await db.execute(
-        select(UserPreference)
-        .where(UserPreference.user_id == current_user.id)
-        .where(UserPreference.key == 'seo_settings')
-    )
-    preference = result.scalar_one_or_none()
-    
-    if preference:
-        return SEOSettingsResponse(settings=preference.value if isinstance(preference.value, dict) else {})
+    """Get SEO settings (served from the published content cache)"""
+    async def build():
+        result = await db.execute(
+            select(UserPreference)
+            .where(UserPreference.user_id == current_user.id)
+            .where(UserPreference.key == SEO_SETTINGS_KEY)
+        )
+        preference = result.scalar_one_or_none()
+        
+        if preference:
+            settings = preference.value if isinstance(preference.value, dict) else {}
+            return SEOSettingsResponse(settings=settings), preference.updated_at, True
+        
+        return SEOSettingsResponse(settings={}), None, True
     
-    return SEOSettingsResponse(settings={})
+    content = await published_content.get_or_build(SEO, current_user.id, build)
+    return content_response(request, content, SEO)
 
 
 @router.put("/seo/settings", response_model=SEOSettingsResponse, tags=["seo"])
@@ -71,7 +78,7 @@ async def update_seo_settings(
     result = await db.execute(
         select(UserPreference)
         .where(UserPreference.user_id == current_user.id)
-        .where(UserPreference.key == 'seo_settings')
+        .where(UserPreference.key == SEO_SETTINGS_KEY)
     )
     preference = result.scalar_one_or_none()
     
@@ -80,13 +87,14 @@ async def update_seo_settings(
     else:
         preference = UserPreference(
             user_id=current_user.id,
-            key='seo_settings',
+            key=SEO_SETTINGS_KEY,
             value=settings_dict,
         )
         db.add(preference)
     
     await db.commit()
     await db.refresh(preference)
+    await published_content.invalidate(SEO, current_user.id)
     
     return SEOSettingsResponse(settings=preference.value if isinstance(preference.value, dict) else {})
 
@@ -3,7 +3,7 @@ API endpoints for theme management.
 """
 from typing import List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text, func
 from pydantic import BaseModel, Field
@@ -19,6 +19,7 @@ from app.models.theme import Theme
 from app.core.database import get_db
 from app.core.cache import cached, invalidate_cache_pattern
 from app.dependencies import get_current_user, require_superadmin
+from app.services.published_content_cache import ACTIVE_THEME, THEME, content_response, published_content
 
 router = APIRouter()
 
@@ -138,14 +139,20 @@ async def ensure_default_theme(db: AsyncSession, created_by: int = 1) -> Theme:
 
 
 @router.get("/active", response_model=ThemeConfigResponse, tags=["themes"])
-async def get_active_theme(db: AsyncSession = Depends(get_db)):
+async def get_active_theme(request: Request, db: AsyncSession = Depends(get_db)):
     """
     Get the currently active theme configuration.
     Public endpoint - no authentication required.
     Returns the global theme that applies to all users.
     Creates a default theme if none exists.
-    Note: Cache disabled to ensure theme is always created in DB when needed.
+    Served from the published content cache; every theme mutation invalidates it.
     """
+    content = await published_content.get_or_build(THEME, ACTIVE_THEME, lambda: _build_active_theme(db))
+    return content_response(request, content, THEME)
+
+
+async def _build_active_theme(db: AsyncSession):
+    """Active theme response, its last update and whether it can be cached"""
     result = await db.execute(select(Theme).where(Theme.is_active == True))
     theme = result.scalar_one_or_none()
     
@@ -161,13 +168,15 @@ async def get_active_theme(db: AsyncSession = Depends(get_db)):
             # This should rarely happen, but handle gracefully
             from app.core.theme_defaults import DEFAULT_THEME_CONFIG
             default_config = DEFAULT_THEME_CONFIG.copy()
-            return ThemeConfigResponse(
+            response = ThemeConfigResponse(
                 id=32,  # Virtual theme ID (TemplateTheme)
                 name="TemplateTheme",
                 display_name="Template Theme",
                 config=default_config,
                 updated_at=datetime.now()
             )
+            # Not cached: the next request retries creating the theme
+            return response, None, False
     
     # Ensure config has a mode field
     config = theme.config or {}
@@ -177,13 +186,14 @@ async def get_active_theme(db: AsyncSession = Depends(get_db)):
         await db.commit()
         await db.refresh(theme)
     
-    return ThemeConfigResponse(
+    response = ThemeConfigResponse(
         id=theme.id,
         name=theme.name,
         display_name=theme.display_name,
         config=config,
         updated_at=theme.updated_at
     )
+    return response, theme.updated_at, True
 
 
 @router.get("", response_model=ThemeListResponse, tags=["themes"])
@@ -259,6 +269,7 @@ async def list_themes(
         from app.core.cache import invalidate_cache_pattern
         invalidate_cache_pattern("themes:*")
         invalidate_cache_pattern("theme:*")
+        await published_content.invalidate(THEME, ACTIVE_THEME)
     
     # Convert themes to response format with error handling
     try:
@@ -346,6 +357,8 @@ async def create_theme(
     db.add(theme)
     await db.commit()
     await db.refresh(theme)
+    if theme.is_active:
+        await published_content.invalidate(THEME, ACTIVE_THEME)
     return ThemeResponse.model_validate(theme)
 
 
@@ -409,6 +422,8 @@ async def update_theme(
     
     await db.commit()
     await db.refresh(theme)
+    # The updated theme may be (or may have stopped being) the active one
+    await published_content.invalidate(THEME, ACTIVE_THEME)
     return ThemeResponse.model_validate(theme)
 
 
@@ -442,6 +457,7 @@ async def activate_theme(
     theme.is_active = True
     await db.commit()
     await db.refresh(theme)
+    await published_content.invalidate(THEME, ACTIVE_THEME)
     return ThemeResponse.model_validate(theme)
 
 
@@ -473,8 +489,10 @@ async def update_active_theme_mode(
     
     await db.commit()
     await db.refresh(theme)
+    await published_content.invalidate(THEME, ACTIVE_THEME)
     
     return ThemeConfigResponse(
+        id=theme.id,
         name=theme.name,
         display_name=theme.display_name,
         config=config,
@@ -7,115 +7,62 @@ from fastapi import APIRouter, Request, HTTPException, status, Header, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
 from sqlalchemy import select
+import json
 import stripe
 # Note: In recent Stripe versions, exceptions are directly in stripe module, not stripe.error
 import os
 
 from app.core.database import get_db
+from app.dependencies import require_superadmin
 from app.services.stripe_service import StripeService
 from app.services.subscription_service import SubscriptionService
 from app.services.invoice_service import InvoiceService
 from app.services.email_service import EmailService
 from app.services.email_templates import EmailTemplates
+from app.services.stripe_webhook_queue import StripeWebhookWorker, enqueue_event, get_queue_stats, requeue_event
 # from app.services.booking_service import BookingService  # Removed: booking service depends on masterclass models
 from app.utils.stripe_helpers import map_stripe_status, parse_timestamp
 from app.core.logging import logger
-from app.models import Subscription, WebhookEvent, User
+from app.models import Subscription, User
 from app.models.invoice import InvoiceStatus
 from app.models.booking import Booking, BookingStatus, PaymentStatus
 
 router = APIRouter(prefix="/webhooks/stripe", tags=["webhooks"])
 
 
-async def check_event_processed(event_id: str, db: AsyncSession) -> bool:
-    """Check if webhook event has already been processed (idempotency)"""
-    if not event_id:
-        return False
-    
-    result = await db.execute(
-        select(WebhookEvent).where(WebhookEvent.stripe_event_id == event_id)
-    )
-    return result.scalar_one_or_none() is not None
-
-
-async def mark_event_processed(
-    event_id: str,
-    event_type: str,
-    event_data: dict,
-    db: AsyncSession
-) -> None:
-    """Mark webhook event as processed"""
-    if not event_id:
-        return
-    
-    import json
-    
-    webhook_event = WebhookEvent(
-        stripe_event_id=event_id,
-        event_type=event_type,
-        event_data=json.dumps(event_data) if event_data else None,
-    )
-    db.add(webhook_event)
-    await db.commit()
-
-
 @router.post("")
 async def stripe_webhook(
     request: Request,
     stripe_signature: str = Header(..., alias="stripe-signature"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Handle Stripe webhook events"""
+    """
+    Receive Stripe webhook events
+    
+    Verifies the signature, stores the event (idempotent on the Stripe event ID)
+    and acknowledges immediately. Events are processed by StripeWebhookWorker.
+    """
     payload = await request.body()
     
     stripe_service = StripeService(db)
-    subscription_service = SubscriptionService(db)
-    invoice_service = InvoiceService(db)
     
     try:
-        event_data = await stripe_service.handle_webhook(payload, stripe_signature)
-        event_type = event_data["type"]
-        event_object = event_data["data"]["object"]
-        event_id = event_data.get("id")  # Stripe event ID for idempotency
-        
-        logger.info(f"Stripe webhook received: {event_type} (event_id: {event_id})")
-        
-        # Idempotency check: prevent duplicate processing
-        if await check_event_processed(event_id, db):
-            logger.info(f"Event {event_id} already processed, skipping")
-            return {"status": "success", "message": "Event already processed"}
-        
-        # Handle different event types
-        if event_type == "checkout.session.completed":
-            await handle_checkout_completed(event_object, db, subscription_service)
-        
-        elif event_type == "customer.subscription.created":
-            await handle_subscription_created(event_object, db, subscription_service)
-        
-        elif event_type == "customer.subscription.updated":
-            await handle_subscription_updated(event_object, db, subscription_service)
-        
-        elif event_type == "customer.subscription.deleted":
-            await handle_subscription_deleted(event_object, db, subscription_service)
-        
-        elif event_type == "invoice.paid":
-            await handle_invoice_paid(event_object, db, invoice_service, subscription_service)
-        
-        elif event_type == "invoice.payment_failed":
-            await handle_invoice_payment_failed(event_object, db, invoice_service, subscription_service)
-        
-        elif event_type == "payment_intent.succeeded":
-            await handle_payment_intent_succeeded(event_object, db)
-        
-        elif event_type == "payment_intent.payment_failed":
-            await handle_payment_intent_failed(event_object, db)
-        
-        else:
-            logger.debug(f"Unhandled webhook event type: {event_type}")
+        verified = await stripe_service.handle_webhook(payload, stripe_signature)
+        # Store the raw event exactly as Stripe sent it (signature verified above)
+        event = json.loads(payload)
+        queued = await enqueue_event(db, event)
+        
+        logger.info(
+            f"Stripe webhook received: {verified['type']} (event_id: {verified['id']}, "
+            f"{'queued' if queued else 'duplicate'})"
+        )
         
-        # Mark event as processed after successful handling
-        await mark_event_processed(event_id, event_type, event_data, db)
+        worker = StripeWebhookWorker.get()
+        if worker is not None and queued:
+            worker.notify()
         
+        if not queued:
+            return {"status": "success", "message": "Event already received"}
         return {"status": "success"}
     
     except ValueError as e:
@@ -131,13 +78,82 @@ async def stripe_webhook(
             detail="Invalid signature"
         )
     except Exception as e:
-        logger.error(f"Error handling Stripe webhook: {e}", exc_info=True)
+        logger.error(f"Error storing Stripe webhook: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Webhook processing error: {str(e)}"
         )
 
 
+async def process_stripe_event(event_type: str, event_object: dict, db: AsyncSession) -> None:
+    """
+    Run the handler of a stored Stripe event (called by StripeWebhookWorker)
+    
+    Exceptions propagate so the worker retries the event.
+    """
+    subscription_service = SubscriptionService(db)
+    invoice_service = InvoiceService(db)
+    
+    if event_type == "checkout.session.completed":
+        await handle_checkout_completed(event_object, db, subscription_service)
+    
+    elif event_type == "customer.subscription.created":
+        await handle_subscription_created(event_object, db, subscription_service)
+    
+    elif event_type == "customer.subscription.updated":
+        await handle_subscription_updated(event_object, db, subscription_service)
+    
+    elif event_type == "customer.subscription.deleted":
+        await handle_subscription_deleted(event_object, db, subscription_service)
+    
+    elif event_type == "invoice.paid":
+        await handle_invoice_paid(event_object, db, invoice_service, subscription_service)
+    
+    elif event_type == "invoice.payment_failed":
+        await handle_invoice_payment_failed(event_object, db, invoice_service, subscription_service)
+    
+    elif event_type == "payment_intent.succeeded":
+        await handle_payment_intent_succeeded(event_object, db)
+    
+    elif event_type == "payment_intent.payment_failed":
+        await handle_payment_intent_failed(event_object, db)
+    
+    else:
+        logger.debug(f"Unhandled webhook event type: {event_type}")
+
+
+@router.get("/metrics")
+async def stripe_webhook_metrics(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_superadmin),
+):
+    """Webhook queue depth, lag, throughput and dead letters"""
+    worker = StripeWebhookWorker.get()
+    return {
+        "queue": await get_queue_stats(db),
+        "worker": worker.metrics() if worker is not None else None,
+    }
+
+
+@router.post("/events/{event_id}/retry")
+async def retry_dead_stripe_event(
+    event_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_superadmin),
+):
+    """Requeue a dead-lettered webhook event"""
+    if not await requeue_event(db, event_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No dead-lettered event with this ID"
+        )
+    
+    worker = StripeWebhookWorker.get()
+    if worker is not None:
+        worker.notify()
+    return {"status": "success", "event_id": event_id}
+
+
 async def handle_checkout_completed(event_object: dict, db: AsyncSession, subscription_service: SubscriptionService):
     """Handle checkout.session.completed event"""
     from app.core.config import settings
@@ -3,6 +3,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 # Create Celery app
 celery_app = Celery(
@@ -20,9 +21,62 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
+    imports=(
+        "app.tasks.notification_tasks",
+        "app.tasks.campaign_rollup_tasks",
+        "app.tasks.recurring_donation_tasks",
+        "app.tasks.security_audit_tasks",
+        "app.tasks.metrics_snapshot_tasks",
+    ),
+    beat_schedule={
+        # Safety net for the incremental campaign rollups
+        "reconcile-campaign-rollups": {
+            "task": "app.tasks.campaign_rollup_tasks.reconcile_campaign_rollups_task",
+            "schedule": 60 * 60,  # hourly
+        },
+        "process-recurring-donations": {
+            "task": "app.tasks.recurring_donation_tasks.process_recurring_donations_task",
+            "schedule": 15 * 60,  # every 15 minutes
+        },
+        # Upcoming monthly partitions and retention of security_audit_logs
+        "maintain-security-audit-partitions": {
+            "task": "app.tasks.security_audit_tasks.maintain_security_audit_partitions_task",
+            "schedule": 24 * 60 * 60,  # daily
+        },
+        # Dashboard metrics: changed tenants only, plus a full pass for deletions
+        "refresh-metrics-snapshots": {
+            "task": "app.tasks.metrics_snapshot_tasks.refresh_metrics_snapshots_task",
+            "schedule": 5 * 60,  # every 5 minutes
+        },
+        "refresh-metrics-snapshots-full": {
+            "task": "app.tasks.metrics_snapshot_tasks.refresh_metrics_snapshots_task",
+            "schedule": 60 * 60,  # hourly
+            "kwargs": {"full": True},
+        },
+        # Safety net for the unread notification counters
+        "reconcile-notification-counters": {
+            "task": "app.tasks.notification_tasks.reconcile_notification_counters_task",
+            "schedule": 24 * 60 * 60,  # daily
+        },
+    },
 )
 
 
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """One pooled database engine per worker process, created after the fork"""
+    from app.tasks.worker_db import init_worker_engine
+    init_worker_engine()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    from app.services.bulk_email_service import close_http_client
+    from app.tasks.worker_db import dispose_worker_engine
+    dispose_worker_engine()
+    close_http_client()
+
+
 @celery_app.task(bind=True)
 def debug_task(self):
     """Debug task."""
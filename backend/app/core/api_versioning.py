@@ -4,17 +4,19 @@ Handles API versioning through headers and URL paths
 """
 
 from typing import Optional
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.asgi import on_response_start
 from app.core.logging import logger
 
 
-class APIVersioningMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle API versioning"""
+class APIVersioningMiddleware:
+    """Middleware to handle API versioning, pure ASGI"""
     
-    def __init__(self, app, default_version: str = "v1", supported_versions: list = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, default_version: str = "v1", supported_versions: list = None):
+        self.app = app
         self.default_version = default_version
         self.supported_versions = supported_versions or ["v1"]
     
@@ -63,18 +65,23 @@ class APIVersioningMiddleware(BaseHTTPMiddleware):
         
         return self.default_version
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and add version info"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
         version = self.get_api_version(request)
         
         # Store version in request state
         request.state.api_version = version
         
         # Add version to response headers
-        response = await call_next(request)
-        response.headers["X-API-Version"] = version
+        def add_version_header(message: Message, headers: MutableHeaders) -> None:
+            headers["X-API-Version"] = version
         
-        return response
+        await self.app(scope, receive, on_response_start(send, add_version_header))
 
 
 def setup_api_versioning(app, default_version: str = "v1", supported_versions: list = None) -> None:
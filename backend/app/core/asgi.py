@@ -0,0 +1,194 @@
+"""
+ASGI Middleware
+Helpers for the pure ASGI middlewares of the application, plus the request
+logging and response headers middlewares of the app pipeline
+
+- middlewares are plain ASGI callables instead of BaseHTTPMiddleware, so a
+  request no longer pays, per layer, for a task group, a memory stream and a
+  wrapping StreamingResponse, and streamed bodies are not re-chunked
+- on_response_start() edits the headers of the http.response.start message
+- hold_response_start() gives the whole body of single-message responses to
+  a middleware (ETag, compression); streamed responses pass through
+- send_error() answers a rejected request with the JSON body FastAPI gives
+  an HTTPException ({"detail": ...}): exception handlers are registered
+  inside the middleware stack and never see errors raised by a middleware
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging import logger
+
+
+def on_response_start(send: Send, callback: Callable[[Message, MutableHeaders], None]) -> Send:
+    """Wrap send so that callback(start_message, headers) runs before the response starts"""
+
+    async def send_wrapper(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            callback(message, MutableHeaders(scope=message))
+        await send(message)
+
+    return send_wrapper
+
+
+def hold_response_start(
+    send: Send,
+    complete: Callable[[Message, MutableHeaders, bytes], bytes],
+    streaming: Optional[Callable[[Message, MutableHeaders], None]] = None,
+) -> Send:
+    """
+    Wrap send so that a response sent in a single body message can be rewritten.
+
+    The http.response.start message is held back until the first body
+    message. When that message is the whole body, complete(start, headers,
+    body) returns the body to send and may change the status and headers.
+    Streamed responses are sent as they come, after streaming(start, headers).
+    """
+    held: Optional[Message] = None
+
+    async def send_wrapper(message: Message) -> None:
+        nonlocal held
+        if message["type"] == "http.response.start":
+            held = message
+            return
+
+        start, held = held, None
+        if start is None:
+            await send(message)
+            return
+
+        headers = MutableHeaders(scope=start)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            body = complete(start, headers, message.get("body", b""))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if streaming is not None:
+            streaming(start, headers)
+        await send(start)
+        await send(message)
+
+    return send_wrapper
+
+
+async def send_error(
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+    status_code: int,
+    detail: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    """Send a JSON error response, as FastAPI does for an HTTPException"""
+    response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+    await response(scope, receive, send)
+
+
+class RequestLoggingMiddleware:
+    """Log each request with its status code and duration"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        method, path = scope["method"], scope["path"]
+        client = scope.get("client")
+        logger.info(f"Incoming request: {method} {path} from {client[0] if client else 'unknown'}")
+
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            process_time = time.time() - start_time
+            logger.error(f"Request failed: {method} {path} - {str(e)} ({process_time:.4f}s)", exc_info=True)
+            # Re-raise so the outer middlewares (CORS, server errors) build the error response
+            raise
+
+        process_time = time.time() - start_time
+        if status_code is not None:
+            logger.info(f"Request completed: {method} {path} - {status_code} ({process_time:.4f}s)")
+        else:
+            logger.info(f"Request completed: {method} {path} ({process_time:.4f}s)")
+
+
+# Content Security Policy (strict in production, relaxed in development)
+#
+# SECURITY: Production CSP is strict (no unsafe-inline/unsafe-eval)
+# Use nonces for inline scripts/styles in production
+# See: https://developer.mozilla.org/en-US/docs/Web/HTTP/CSP
+PRODUCTION_CSP = (
+    "default-src 'self'; "
+    "script-src 'self'; "  # Strict: no unsafe-inline/eval (use nonces)
+    "style-src 'self'; "  # Strict: no unsafe-inline (use nonces)
+    "img-src 'self' data: https:; "
+    "font-src 'self' data:; "
+    "connect-src 'self' https://api.stripe.com; "
+    "frame-ancestors 'none'; "
+    "base-uri 'self'; "
+    "form-action 'self';"
+)
+
+# SECURITY: CSP is relaxed in development (unsafe-inline/unsafe-eval)
+# This is acceptable for dev but MUST be tightened in production using nonces
+DEVELOPMENT_CSP = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "  # Development only
+    "style-src 'self' 'unsafe-inline'; "  # Development only
+    "img-src 'self' data: https:; "
+    "font-src 'self' data:; "
+    "connect-src 'self' https://api.stripe.com; "
+    "frame-ancestors 'none';"
+)
+
+
+class ResponseHeadersMiddleware:
+    """Add timing and security headers to every response"""
+
+    def __init__(self, app: ASGIApp, environment: Optional[str] = None):
+        self.app = app
+        environment = environment or os.getenv("ENVIRONMENT", "development")
+        self.security_headers: List[Tuple[str, str]] = [
+            ("Strict-Transport-Security", "max-age=31536000; includeSubDomains"),
+            ("X-Content-Type-Options", "nosniff"),
+            ("X-Frame-Options", "DENY"),
+            ("X-XSS-Protection", "1; mode=block"),
+            ("Referrer-Policy", "strict-origin-when-cross-origin"),
+            ("Permissions-Policy", "geolocation=(), microphone=(), camera=()"),
+            ("Content-Security-Policy", PRODUCTION_CSP if environment == "production" else DEVELOPMENT_CSP),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+
+        def add_headers(message: Message, headers: MutableHeaders) -> None:
+            process_time = time.time() - start_time
+            headers["X-Response-Time"] = f"{process_time:.4f}s"
+            headers["X-Process-Time"] = str(process_time)
+            headers["X-Timestamp"] = datetime.now(timezone.utc).isoformat()
+            for name, value in self.security_headers:
+                headers[name] = value
+
+        await self.app(scope, receive, on_response_start(send, add_headers))
@@ -0,0 +1,208 @@
+"""
+Database Bootstrap
+One-shot schema bootstrap (create_all, auto-migrated columns, default theme,
+recommended indexes, ANALYZE), run once per deploy instead of on every worker boot.
+
+- A Postgres advisory lock makes sure a single process bootstraps at a time
+- A fingerprint of the model metadata and index set is stored once applied, so
+  workers only compare fingerprints at boot and skip the DDL entirely
+
+Run with: python scripts/bootstrap_db.py
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.logging import logger
+
+
+# Arbitrary 64-bit key for pg_advisory_lock, shared by every process of the app
+BOOTSTRAP_LOCK_KEY = 7_204_118_530_091_301
+
+# Bump when a bootstrap step changes behaviour without changing models or indexes
+BOOTSTRAP_VERSION = 1
+
+BOOTSTRAP_STATE_TABLE = "schema_bootstrap_state"
+
+
+@dataclass
+class BootstrapResult:
+    """Outcome of a bootstrap attempt"""
+    fingerprint: str
+    status: str  # applied, up_to_date, locked
+    steps: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+async def _create_tables() -> None:
+    from app.core.database import init_db
+    await init_db()
+
+
+async def _ensure_columns() -> None:
+    from app.core.migrations import ensure_theme_preference_column, ensure_avatar_column
+    await ensure_theme_preference_column()
+    await ensure_avatar_column()
+
+
+async def _ensure_default_theme() -> None:
+    from app.core.database import AsyncSessionLocal
+    from app.api.v1.endpoints.themes import ensure_default_theme
+    async with AsyncSessionLocal() as db:
+        theme = await ensure_default_theme(db, created_by=1)
+        logger.info(f"Default theme ensured: {theme.name} (ID: {theme.id}, Active: {theme.is_active})")
+
+
+async def _create_indexes() -> None:
+    from app.core.database import AsyncSessionLocal
+    from app.core.database_indexes import create_recommended_indexes, analyze_tables
+    async with AsyncSessionLocal() as session:
+        index_results = await create_recommended_indexes(session)
+        if index_results.get("created"):
+            logger.info(f"Created {len(index_results['created'])} indexes")
+        if index_results.get("errors"):
+            logger.warning(f"Failed to create {len(index_results['errors'])} indexes")
+        await analyze_tables(session)
+
+
+# Ordered bootstrap steps; a failing step is logged and does not stop the others
+BOOTSTRAP_STEPS: List[Tuple[str, Callable[[], Awaitable[None]]]] = [
+    ("create_tables", _create_tables),
+    ("ensure_columns", _ensure_columns),
+    ("ensure_default_theme", _ensure_default_theme),
+    ("create_indexes", _create_indexes),
+]
+
+
+def compute_schema_fingerprint() -> str:
+    """
+    Hash of everything the bootstrap applies: model tables/columns/indexes,
+    the recommended index set, the step list and BOOTSTRAP_VERSION.
+    """
+    import app.models  # noqa: F401 - registers all models on Base.metadata
+    from app.core.database import Base
+    from app.core.database_indexes import RECOMMENDED_INDEXES
+
+    tables = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        tables.append({
+            "name": table.name,
+            "columns": [
+                [column.name, str(column.type), bool(column.nullable)]
+                for column in table.columns
+            ],
+            "indexes": sorted(
+                [index.name or "", [c.name for c in index.columns], bool(index.unique)]
+                for index in table.indexes
+            ),
+        })
+
+    payload = {
+        "version": BOOTSTRAP_VERSION,
+        "steps": [name for name, _ in BOOTSTRAP_STEPS],
+        "tables": tables,
+        "indexes": [[i["name"], i["table"], i["columns"]] for i in RECOMMENDED_INDEXES],
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+async def get_applied_fingerprint(conn: AsyncConnection) -> Optional[str]:
+    """Fingerprint recorded by the last successful bootstrap (None if never bootstrapped)"""
+    exists = await conn.execute(text("SELECT to_regclass(:name)"), {"name": BOOTSTRAP_STATE_TABLE})
+    if exists.scalar() is None:
+        return None
+    result = await conn.execute(text(f"SELECT fingerprint FROM {BOOTSTRAP_STATE_TABLE} WHERE id = 1"))
+    return result.scalar()
+
+
+async def _record_fingerprint(conn: AsyncConnection, fingerprint: str, steps: List[str]) -> None:
+    await conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {BOOTSTRAP_STATE_TABLE} (
+            id INTEGER PRIMARY KEY,
+            fingerprint VARCHAR(64) NOT NULL,
+            steps TEXT,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """))
+    await conn.execute(text(f"""
+        INSERT INTO {BOOTSTRAP_STATE_TABLE} (id, fingerprint, steps, applied_at)
+        VALUES (1, :fingerprint, :steps, now())
+        ON CONFLICT (id) DO UPDATE
+        SET fingerprint = EXCLUDED.fingerprint, steps = EXCLUDED.steps, applied_at = EXCLUDED.applied_at
+    """), {"fingerprint": fingerprint, "steps": ",".join(steps)})
+
+
+async def is_bootstrapped(engine: Optional[AsyncEngine] = None) -> bool:
+    """Cheap boot-time check: one SELECT comparing the stored and expected fingerprints"""
+    if engine is None:
+        from app.core.database import engine
+    async with engine.connect() as conn:
+        return await get_applied_fingerprint(conn) == compute_schema_fingerprint()
+
+
+async def run_bootstrap(
+    engine: Optional[AsyncEngine] = None,
+    force: bool = False,
+    wait: bool = True,
+) -> BootstrapResult:
+    """
+    Apply the bootstrap steps under the advisory lock.
+
+    Args:
+        engine: Engine for the main database (defaults to app.core.database.engine)
+        force: Run the steps even if the stored fingerprint already matches
+        wait: Block until the lock is free; if False, return status "locked"
+              immediately when another process holds it
+
+    Returns:
+        BootstrapResult
+    """
+    if engine is None:
+        from app.core.database import engine
+
+    fingerprint = compute_schema_fingerprint()
+
+    # The lock is session-level, held by this connection while the steps use their own
+    async with engine.connect() as lock_conn:
+        if wait:
+            await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+        else:
+            acquired = await lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+            if not acquired.scalar():
+                logger.info("Bootstrap already running in another process, skipping")
+                return BootstrapResult(fingerprint=fingerprint, status="locked")
+        await lock_conn.commit()
+
+        try:
+            # Another process may have finished the bootstrap while we waited
+            if not force and await get_applied_fingerprint(lock_conn) == fingerprint:
+                await lock_conn.commit()
+                logger.info(f"Database schema already bootstrapped ({fingerprint[:12]})")
+                return BootstrapResult(fingerprint=fingerprint, status="up_to_date")
+            await lock_conn.commit()
+
+            result = BootstrapResult(fingerprint=fingerprint, status="applied")
+            for name, step in BOOTSTRAP_STEPS:
+                try:
+                    await step()
+                    result.steps.append(name)
+                    logger.info(f"Bootstrap step '{name}' completed")
+                except Exception as e:
+                    result.errors.append(f"{name}: {e}")
+                    logger.error(f"Bootstrap step '{name}' failed: {e}", exc_info=True)
+
+            # Only a clean run is recorded, so a failed step is retried next time
+            if not result.errors:
+                await _record_fingerprint(lock_conn, fingerprint, result.steps)
+                await lock_conn.commit()
+                logger.info(f"Database bootstrap applied ({fingerprint[:12]})")
+            return result
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+            await lock_conn.commit()
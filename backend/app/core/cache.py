@@ -26,6 +26,7 @@ except ImportError:
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import CACHE_REQUESTS
 
 
 class CacheBackend:
@@ -57,7 +58,9 @@ class CacheBackend:
         try:
             value = await self.redis_client.get(key)
             if not value:
+                CACHE_REQUESTS.inc(("miss",))
                 return None
+            CACHE_REQUESTS.inc(("hit",))
             
             # Vérifier si compressé (préfixe binaire)
             if value.startswith(b"zlib:"):
@@ -76,6 +79,7 @@ class CacheBackend:
                 else:
                     return json.loads(value.decode('utf-8'))
         except Exception as e:
+            CACHE_REQUESTS.inc(("error",))
             logger.error(f"Cache get error: {e}")
         return None
     
@@ -3,81 +3,92 @@ Cache Headers Middleware
 Adds Cache-Control and ETag headers to API responses
 """
 
-from fastapi import Request
-from fastapi.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import hashlib
-import json
-from typing import Callable
 from datetime import datetime, timedelta, timezone
 
+from app.core.asgi import hold_response_start, on_response_start
 
-class CacheHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware for adding cache headers to responses"""
 
-    def __init__(self, app, default_max_age: int = 300):
-        super().__init__(app)
+NO_CACHE_HEADERS = (
+    ("Cache-Control", "no-cache, no-store, must-revalidate"),
+    ("Pragma", "no-cache"),
+    ("Expires", "0"),
+)
+
+
+class CacheHeadersMiddleware:
+    """Middleware for adding cache headers to responses, pure ASGI"""
+
+    def __init__(self, app: ASGIApp, default_max_age: int = 300):
+        self.app = app
         self.default_max_age = default_max_age
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Skip cache headers for non-GET requests
-        if request.method != "GET":
-            response = await call_next(request)
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
-            return response
-        
-        # Call the next middleware/endpoint
-        response = await call_next(request)
-        
-        # Skip cache headers for error responses
-        if response.status_code >= 400:
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
-            return response
-        
-        # Get path from request URL (works with both Request and _CachedRequest)
-        path = request.url.path if hasattr(request, 'url') else getattr(request, 'path', '/')
-        
-        # Skip ETag generation for responses without body attribute (e.g., StreamingResponse, RedirectResponse)
-        if not hasattr(response, 'body'):
-            # Still add cache headers but skip ETag
-            max_age = self._get_cache_max_age(path)
-            response.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
-            response.headers["Vary"] = "Accept, Accept-Encoding"
-            expires = datetime.now(timezone.utc) + timedelta(seconds=max_age)
-            response.headers["Expires"] = expires.strftime("%a, %d %b %Y %H:%M:%S GMT")
-            return response
-        
-        # Generate ETag from response body
-        try:
-            body = response.body
-            etag = hashlib.md5(body).hexdigest()
-            response.headers["ETag"] = f'"{etag}"'
-            
+        if scope["method"] != "GET":
+            await self.app(scope, receive, on_response_start(send, self._add_no_cache_headers))
+            return
+
+        path = scope["path"]
+
+        def add_cache_headers(message: Message, headers: MutableHeaders) -> None:
+            # Respect a Cache-Control set by the endpoint itself
+            if "cache-control" not in headers:
+                max_age = self._get_cache_max_age(path)
+                headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
+                expires = datetime.now(timezone.utc) + timedelta(seconds=max_age)
+                headers["Expires"] = expires.strftime("%a, %d %b %Y %H:%M:%S GMT")
+            headers["Vary"] = "Accept, Accept-Encoding"
+
+        def add_etag(message: Message, headers: MutableHeaders, body: bytes) -> bytes:
+            if self._skip(message, headers):
+                return body
+
+            # Generate ETag from response body
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            headers["ETag"] = etag
+            add_cache_headers(message, headers)
+
             # Check if client sent If-None-Match header
-            if_none_match = request.headers.get("If-None-Match")
-            if if_none_match and if_none_match.strip() == f'"{etag}"':
+            if_none_match = Headers(scope=scope).get("If-None-Match")
+            if if_none_match and if_none_match.strip() == etag:
                 # Response hasn't changed, return 304 Not Modified
-                return Response(status_code=304, headers=response.headers)
-        except AttributeError:
-            # Response doesn't have body attribute, skip ETag
-            pass
-        
-        # Determine cache max-age based on endpoint
-        max_age = self._get_cache_max_age(path)
-        
-        # Add cache headers
-        response.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
-        response.headers["Vary"] = "Accept, Accept-Encoding"
-        
-        # Add Expires header
-        expires = datetime.now(timezone.utc) + timedelta(seconds=max_age)
-        response.headers["Expires"] = expires.strftime("%a, %d %b %Y %H:%M:%S GMT")
-        
-        return response
+                message["status"] = 304
+                del headers["Content-Length"]
+                return b""
+            return body
+
+        def add_headers_without_etag(message: Message, headers: MutableHeaders) -> None:
+            # Streaming responses still get cache headers, without ETag
+            if not self._skip(message, headers):
+                add_cache_headers(message, headers)
+
+        await self.app(scope, receive, hold_response_start(send, add_etag, add_headers_without_etag))
+
+    def _skip(self, message: Message, headers: MutableHeaders) -> bool:
+        """Handle the responses that get no generated cache headers"""
+        # Skip cache headers for error responses
+        if message["status"] >= 400:
+            self._add_no_cache_headers(message, headers)
+            return True
+
+        # Responses carrying their own validators (published content cache) keep their headers
+        if "etag" in headers:
+            headers.setdefault("Vary", "Accept, Accept-Encoding")
+            return True
+
+        return False
+
+    @staticmethod
+    def _add_no_cache_headers(message: Message, headers: MutableHeaders) -> None:
+        for name, value in NO_CACHE_HEADERS:
+            headers[name] = value
 
     def _get_cache_max_age(self, path: str) -> int:
         """Determine cache max-age based on endpoint"""
@@ -1,22 +1,32 @@
 """
 HTTP Compression Middleware
-Enhanced GZip/Brotli compression for API responses with streaming support
+Enhanced GZip/Brotli compression for API responses (streamed responses pass through)
 """
 
-from fastapi import Request
-from fastapi.responses import Response, StreamingResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 import gzip
 import brotli
-from typing import Callable, AsyncGenerator, Optional
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.asgi import hold_response_start
 from app.core.logging import logger
 
 
-class CompressionMiddleware(BaseHTTPMiddleware):
-    """Enhanced middleware for response compression (GZip/Brotli) with streaming support"""
+# Only compress JSON, text, and JavaScript responses
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/",
+    "application/javascript",
+    "application/xml",
+    "application/xhtml+xml",
+)
 
-    def __init__(self, app, min_size: int = 1024, compress_level: int = 6, use_brotli: bool = True):
-        super().__init__(app)
+
+class CompressionMiddleware:
+    """Middleware for response compression (GZip/Brotli), pure ASGI"""
+
+    def __init__(self, app: ASGIApp, min_size: int = 1024, compress_level: int = 6, use_brotli: bool = True):
+        self.app = app
         self.min_size = min_size  # Minimum size to compress (bytes)
         self.compress_level = compress_level  # Compression level (1-9)
         self.use_brotli = use_brotli  # Use Brotli if available
@@ -39,122 +49,62 @@ class CompressionMiddleware(BaseHTTPMiddleware):
         except Exception:
             return None
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def _compress(self, body: bytes, supports_gzip: bool, supports_brotli: bool) -> tuple[Optional[bytes], Optional[str]]:
+        """Compress body with the best encoding the client accepts (Brotli preferred, fallback to GZip)"""
+        if supports_brotli:
+            compressed_body = self._compress_brotli(body)
+            if compressed_body and len(compressed_body) < len(body):
+                return compressed_body, "br"
+
+        if supports_gzip:
+            compressed_body = self._compress_gzip(body)
+            if compressed_body and len(compressed_body) < len(body):
+                return compressed_body, "gzip"
+
+        return None, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Check if client accepts compression
-        accept_encoding = request.headers.get("Accept-Encoding", "")
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
         supports_gzip, supports_brotli = self._supports_compression(accept_encoding)
-        
-        # Call the next middleware/endpoint
-        response = await call_next(request)
-        
-        # Skip compression for certain status codes
-        if response.status_code >= 400:
-            return response
-        
-        # Skip compression for streaming responses or responses without body
-        if not hasattr(response, 'body'):
-            return response
-        
-        # Get content type
-        content_type = response.headers.get("Content-Type", "")
-        
-        # Only compress JSON, text, and JavaScript responses
-        compressible_types = [
-            "application/json",
-            "text/",
-            "application/javascript",
-            "application/xml",
-            "application/xhtml+xml",
-        ]
-        
-        if not any(ct in content_type for ct in compressible_types):
-            return response
-        
-        # Skip if already compressed
-        if response.headers.get("Content-Encoding"):
-            return response
-        
-        try:
-            body = response.body
-            
-            # Skip if too small (compression overhead not worth it)
-            if len(body) < self.min_size:
-                return response
-            
-            # Choose compression algorithm (Brotli preferred, fallback to GZip)
-            compressed_body: Optional[bytes] = None
-            encoding: Optional[str] = None
-            
-            if supports_brotli:
-                compressed_body = self._compress_brotli(body)
-                if compressed_body and len(compressed_body) < len(body):
-                    encoding = "br"
-            
-            if not encoding and supports_gzip:
-                compressed_body = self._compress_gzip(body)
-                if compressed_body and len(compressed_body) < len(body):
-                    encoding = "gzip"
-            
-            # Apply compression if beneficial
-            if encoding and compressed_body:
-                # For very large responses (>500KB), use streaming
-                if len(body) > 500 * 1024:
-                    async def compress_stream() -> AsyncGenerator[bytes, None]:
-                        if encoding == "br":
-                            compressor = brotli.Compressor(quality=self.compress_level)
-                        else:
-                            compressor = gzip.GzipFile(mode='wb', compresslevel=self.compress_level)
-                        
-                        chunk_size = 8192
-                        for i in range(0, len(body), chunk_size):
-                            chunk = body[i:i + chunk_size]
-                            if encoding == "br":
-                                compressed_chunk = compressor.process(chunk)
-                            else:
-                                compressed_chunk = compressor.compress(chunk)
-                            
-                            if compressed_chunk:
-                                yield compressed_chunk
-                        
-                        # Flush remaining data
-                        if encoding == "br":
-                            final = compressor.finish()
-                        else:
-                            final = compressor.flush()
-                        
-                        if final:
-                            yield final
-                    
-                    return StreamingResponse(
-                        compress_stream(),
-                        status_code=response.status_code,
-                        headers={
-                            **response.headers,
-                            "Content-Encoding": encoding,
-                            "Vary": "Accept-Encoding",
-                        },
-                        media_type=content_type
-                    )
-                else:
-                    # In-memory compression for smaller responses
-                    response.body = compressed_body
-                    response.headers["Content-Encoding"] = encoding
-                    response.headers["Content-Length"] = str(len(compressed_body))
-                    
-                    # Update Vary header
-                    vary = response.headers.get("Vary", "")
-                    if "Accept-Encoding" not in vary:
-                        response.headers["Vary"] = (
-                            f"{vary}, Accept-Encoding".strip(", ") if vary else "Accept-Encoding"
-                        )
-                    
-                    logger.debug(
-                        f"Compressed response: {len(body)} -> {len(compressed_body)} bytes "
-                        f"({(1 - len(compressed_body)/len(body))*100:.1f}% reduction)"
-                    )
-        
-        except Exception as e:
-            logger.error(f"Compression error: {e}")
-            # Return uncompressed response on error
-        
-        return response
+        if not supports_gzip and not supports_brotli:
+            await self.app(scope, receive, send)
+            return
+
+        def compress(message: Message, headers: MutableHeaders, body: bytes) -> bytes:
+            # Skip compression for error responses, small bodies and already encoded bodies
+            if message["status"] >= 400 or len(body) < self.min_size or "content-encoding" in headers:
+                return body
+
+            content_type = headers.get("Content-Type", "")
+            if not any(ct in content_type for ct in COMPRESSIBLE_TYPES):
+                return body
+
+            try:
+                compressed_body, encoding = self._compress(body, supports_gzip, supports_brotli)
+            except Exception as e:
+                logger.error(f"Compression error: {e}")
+                # Return uncompressed response on error
+                return body
+
+            if not encoding:
+                return body
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed_body))
+            vary = headers.get("Vary", "")
+            if "Accept-Encoding" not in vary:
+                headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+            logger.debug(
+                f"Compressed response: {len(body)} -> {len(compressed_body)} bytes "
+                f"({(1 - len(compressed_body)/len(body))*100:.1f}% reduction)"
+            )
+            return compressed_body
+
+        # Streaming responses are sent as they come, uncompressed
+        await self.app(scope, receive, hold_response_start(send, compress))
@@ -208,6 +208,38 @@ class Settings(BaseSettings):
         description="Redis connection URL for caching",
     )
 
+    # Published content cache (public pages, posts, menus, SEO, active theme)
+    PUBLISHED_CACHE_TTL_SECONDS: int = Field(
+        default=86400,
+        ge=60,
+        le=604800,
+        description="Lifetime of cached published content (writes invalidate it before)",
+    )
+    PUBLISHED_CACHE_WARMUP_ON_STARTUP: bool = Field(
+        default=True,
+        description="Serialize published pages, posts, menus and the active theme into the cache at startup",
+    )
+
+    # Metrics (/metrics, Prometheus text format)
+    METRICS_ENABLED: bool = Field(
+        default=True,
+        description="Record request latency, cache, pool and queue metrics and serve /metrics",
+    )
+    METRICS_TOKEN: str = Field(
+        default="",
+        description="Bearer token required to read /metrics (empty: no authentication)",
+    )
+    METRICS_PUBLISH_INTERVAL_SECONDS: float = Field(
+        default=15.0,
+        ge=1.0,
+        le=300.0,
+        description="How often each worker publishes its metrics to Redis for aggregation",
+    )
+    METRICS_CELERY_QUEUES: List[str] = Field(
+        default=["celery"],
+        description="Celery broker queues whose depth is reported",
+    )
+
     # SendGrid Email Configuration
     SENDGRID_API_KEY: str = Field(
         default="",
@@ -222,6 +254,31 @@ class Settings(BaseSettings):
         description="Default sender name",
     )
 
+    # Bulk Email (batched SendGrid delivery)
+    SENDGRID_PERSONALIZATIONS_PER_REQUEST: int = Field(
+        default=1000,
+        ge=1,
+        le=1000,
+        description="Recipients per SendGrid mail/send request (API limit: 1000 personalizations)",
+    )
+    BULK_EMAIL_MAX_RECIPIENTS: int = Field(
+        default=50000,
+        ge=1,
+        description="Largest recipient list accepted by one bulk email batch",
+    )
+    BULK_EMAIL_MIN_INTERVAL_SECONDS: float = Field(
+        default=0.0,
+        ge=0,
+        le=60,
+        description="Minimum delay between SendGrid requests (the delay grows on 429 responses)",
+    )
+    BULK_EMAIL_MAX_ATTEMPTS: int = Field(
+        default=5,
+        ge=1,
+        le=20,
+        description="Attempts per SendGrid request before the batch task is retried later",
+    )
+
     @field_validator("SENDGRID_FROM_EMAIL")
     @classmethod
     def validate_email_format(cls, v: str) -> str:
@@ -277,6 +334,24 @@ class Settings(BaseSettings):
         le=10.0,
         description="Threshold in seconds to log slow queries",
     )
+    QUERY_INSTRUMENTATION_ENABLED: bool = Field(
+        default=True,
+        description="Count and time the SQL statements of each request (engine events)",
+    )
+    QUERY_SERVER_TIMING_ENABLED: bool = Field(
+        default=True,
+        description="Send the request's query count and DB time in a Server-Timing header",
+    )
+    QUERY_N_PLUS_ONE_THRESHOLD: int = Field(
+        default=5,
+        ge=2,
+        le=1000,
+        description="Executions of the same statement shape in one request reported as an N+1 pattern",
+    )
+    QUERY_BUDGET_STRICT: bool = Field(
+        default=False,
+        description="Fail requests exceeding their route query budget (enable in tests) instead of logging",
+    )
 
     # Multi-Tenancy Configuration
     TENANCY_MODE: str = Field(
@@ -292,6 +367,12 @@ class Settings(BaseSettings):
         description="Base database URL for tenant databases (used in separate_db mode for pattern-based DB creation)",
     )
 
+    # Database Bootstrap
+    AUTO_BOOTSTRAP_ON_STARTUP: bool = Field(
+        default=True,
+        description="Let one worker (advisory lock) run the schema bootstrap at boot when its fingerprint is outdated. Disable when scripts/bootstrap_db.py runs as a deploy job",
+    )
+
     # Organization Database Configuration
     ORG_DB_BASE_URL: Optional[str] = Field(
         default=None,
@@ -313,6 +394,129 @@ class Settings(BaseSettings):
         le=50,
         description="Database connection pool max overflow per organization",
     )
+    ORG_DB_HEALTH_PROBE_TIMEOUT: float = Field(
+        default=5.0,
+        gt=0,
+        le=60,
+        description="Timeout in seconds for a single organization database health probe",
+    )
+    ORG_DB_HEALTH_PROBE_CONCURRENCY: int = Field(
+        default=20,
+        ge=1,
+        le=200,
+        description="Maximum number of organization databases probed concurrently",
+    )
+    ORG_DB_HEALTH_CACHE_TTL: int = Field(
+        default=60,
+        ge=0,
+        description="Seconds a fleet health snapshot is served before a background refresh is triggered",
+    )
+
+    # Recurring Donations Processing
+    RECURRING_DONATION_BATCH_SIZE: int = Field(
+        default=200,
+        ge=1,
+        le=5000,
+        description="Due recurring donations locked and charged per batch (FOR UPDATE SKIP LOCKED)",
+    )
+    RECURRING_DONATION_CONCURRENCY: int = Field(
+        default=10,
+        ge=1,
+        le=100,
+        description="Maximum number of concurrent charges per worker",
+    )
+    RECURRING_DONATION_MAX_FAILURES: int = Field(
+        default=3,
+        ge=1,
+        description="Consecutive failed charges before a recurring donation is marked failed",
+    )
+    RECURRING_DONATION_RETRY_HOURS: int = Field(
+        default=24,
+        ge=1,
+        description="Delay before a failed recurring charge is retried",
+    )
+
+    # Stripe Webhook Processing
+    STRIPE_WEBHOOK_WORKER_ENABLED: bool = Field(
+        default=True,
+        description="Process queued Stripe webhook events in a background worker of each API process",
+    )
+    STRIPE_WEBHOOK_WORKER_CONCURRENCY: int = Field(
+        default=8,
+        ge=1,
+        le=100,
+        description="Stripe webhook events processed concurrently (events of one Stripe object stay ordered)",
+    )
+    STRIPE_WEBHOOK_MAX_ATTEMPTS: int = Field(
+        default=8,
+        ge=1,
+        description="Processing attempts before a Stripe webhook event is dead-lettered",
+    )
+    STRIPE_WEBHOOK_POLL_INTERVAL: float = Field(
+        default=5.0,
+        gt=0,
+        description="Seconds between queue polls when no webhook wakes the worker",
+    )
+
+    # Security Audit Log
+    AUDIT_LOG_BATCHED_WRITES: bool = Field(
+        default=True,
+        description="Buffer audit events logged without a session and insert them in batches",
+    )
+    AUDIT_LOG_BATCH_SIZE: int = Field(
+        default=500,
+        ge=1,
+        le=10000,
+        description="Maximum audit events inserted per batch",
+    )
+    AUDIT_LOG_FLUSH_INTERVAL: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds between flushes of buffered audit events",
+    )
+    AUDIT_LOG_RETENTION_DAYS: int = Field(
+        default=365,
+        ge=31,
+        description="Audit log retention; whole monthly partitions older than this are dropped",
+    )
+    AUDIT_LOG_PARTITIONS_AHEAD: int = Field(
+        default=2,
+        ge=1,
+        le=24,
+        description="Monthly audit log partitions created ahead of the current month",
+    )
+
+    # Dashboard Metrics Snapshots
+    METRICS_SNAPSHOT_MAX_AGE_SECONDS: int = Field(
+        default=900,
+        ge=60,
+        description="Age after which dashboards recompute a metrics snapshot instead of reading it",
+    )
+
+    # Celery Workers
+    CELERY_DB_POOL_SIZE: int = Field(
+        default=2,
+        ge=1,
+        le=20,
+        description="Database connections kept per Celery worker process",
+    )
+    CELERY_DB_MAX_OVERFLOW: int = Field(
+        default=3,
+        ge=0,
+        le=20,
+        description="Additional database connections per Celery worker process",
+    )
+    NOTIFICATION_BATCH_MAX_USERS: int = Field(
+        default=5000,
+        ge=1,
+        description="Largest user list accepted by one batched notification task",
+    )
+    NOTIFICATION_COALESCE_WINDOW_SECONDS: int = Field(
+        default=300,
+        ge=0,
+        le=86400,
+        description="Window in which notifications of the same group update the unread one instead of adding rows (0 disables)",
+    )
 
     # Stripe Configuration
     STRIPE_SECRET_KEY: str = Field(
@@ -384,6 +588,44 @@ class Settings(BaseSettings):
         le=1.0,
         description="Temperature for Anthropic responses",
     )
+    AI_REQUEST_TIMEOUT_SECONDS: float = Field(
+        default=60.0,
+        ge=1.0,
+        le=600.0,
+        description="Timeout of an AI provider request (read timeout between streamed chunks)",
+    )
+    AI_RESPONSE_CACHE_TTL_SECONDS: int = Field(
+        default=3600,
+        ge=0,
+        le=604800,
+        description="Cache lifetime of deterministic (temperature 0) AI responses; 0 disables the cache",
+    )
+
+    # Documentation retrieval (AI template chat)
+    DOCS_RETRIEVAL_TOP_K: int = Field(
+        default=8,
+        ge=1,
+        le=50,
+        description="Documentation chunks retrieved per question",
+    )
+    DOCS_CONTEXT_MAX_CHARS: int = Field(
+        default=12000,
+        ge=1000,
+        le=100000,
+        description="Maximum documentation characters added to a prompt",
+    )
+    DOCS_CHUNK_CHARS: int = Field(
+        default=1500,
+        ge=200,
+        le=10000,
+        description="Maximum size of an indexed documentation chunk",
+    )
+    DOCS_INDEX_CHECK_INTERVAL_SECONDS: int = Field(
+        default=30,
+        ge=0,
+        le=3600,
+        description="How often the documentation files are checked for changes",
+    )
 
     # SendGrid Marketing Lists
     SENDGRID_NEWSLETTER_LIST_ID: str = Field(
@@ -6,8 +6,12 @@ Tightened CORS settings for better security
 import os
 from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.asgi import on_response_start
 from app.core.config import settings
 from app.core.logging import logger
 
@@ -70,6 +74,76 @@ def get_cors_origins() -> List[str]:
     return cors_origins
 
 
+class CORSHeadersMiddleware:
+    """Ensure CORS headers are always present, even on errors (pure ASGI)"""
+    
+    def __init__(self, app: ASGIApp, cors_origins: List[str], allowed_headers: List[str], is_production: bool):
+        self.app = app
+        self.cors_origins = cors_origins
+        self.is_production = is_production
+        self.cors_headers = {
+            "Access-Control-Allow-Credentials": "true",
+            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, PATCH, OPTIONS",
+            "Access-Control-Allow-Headers": ", ".join(allowed_headers),
+        }
+    
+    def get_allowed_origin(self, origin: str) -> Optional[str]:
+        """Determine allowed origin"""
+        cors_origins = self.cors_origins
+        # In production, be more permissive if origin matches Railway domain pattern
+        if origin and cors_origins and validate_origin(origin, cors_origins):
+            return origin
+        elif "*" in cors_origins:
+            return "*"
+        elif cors_origins:
+            # Check if origin matches any Railway domain pattern
+            if origin and (".up.railway.app" in origin or ".railway.app" in origin):
+                # Allow Railway domains if any Railway domain is in allowed origins
+                for allowed in cors_origins:
+                    if ".railway.app" in allowed or ".up.railway.app" in allowed:
+                        logger.info(f"CORS: Allowing Railway origin {origin} (matched pattern {allowed})")
+                        return origin
+            return cors_origins[0]
+        elif not self.is_production:
+            return origin or "*"
+        else:
+            # In production, allow Railway domains even if not explicitly configured
+            if origin and (".up.railway.app" in origin or ".railway.app" in origin):
+                logger.info(f"CORS: Allowing Railway origin {origin} (production fallback)")
+                return origin
+            logger.warning(f"CORS: Origin {origin} not in allowed list {cors_origins}")
+            return None
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        allowed_origin = self.get_allowed_origin(Headers(scope=scope).get("Origin", ""))
+        
+        # Handle OPTIONS preflight requests explicitly
+        if scope["method"] == "OPTIONS":
+            headers = {}
+            if allowed_origin:
+                headers = {
+                    "Access-Control-Allow-Origin": allowed_origin,
+                    **self.cors_headers,
+                    "Access-Control-Max-Age": "3600",
+                }
+            await Response(headers=headers)(scope, receive, send)
+            return
+        
+        # Ensure CORS headers are present on successful response
+        # Exceptions are not intercepted: they propagate to error handlers,
+        # and CORSMiddleware adds CORS headers to the error responses
+        def add_cors_headers(message: Message, headers: MutableHeaders) -> None:
+            if allowed_origin and "Access-Control-Allow-Origin" not in headers:
+                headers["Access-Control-Allow-Origin"] = allowed_origin
+                headers.update(self.cors_headers)
+        
+        await self.app(scope, receive, on_response_start(send, add_cors_headers))
+
+
 def setup_cors(app: FastAPI) -> None:
     """Setup CORS middleware with tightened security"""
     cors_origins = get_cors_origins()
@@ -102,6 +176,7 @@ def setup_cors(app: FastAPI) -> None:
         "X-RateLimit-Limit",
         "X-RateLimit-Remaining",
         "X-RateLimit-Reset",
+        "X-Next-Cursor",
     ]
     
     # Use CORSMiddleware - it handles OPTIONS requests automatically
@@ -125,75 +200,12 @@ def setup_cors(app: FastAPI) -> None:
     # Note: In FastAPI, middlewares are executed in reverse order of addition
     # So this middleware (added after CORSMiddleware) runs BEFORE CORSMiddleware
     # This ensures we can add CORS headers even if CORSMiddleware doesn't
-    @app.middleware("http")
-    async def add_cors_headers_middleware(request: Request, call_next):
-        """Ensure CORS headers are always present, even on errors"""
-        # Get origin from request
-        origin = request.headers.get("Origin", "")
-        
-        # Determine allowed origin
-        def get_allowed_origin():
-            # In production, be more permissive if origin matches Railway domain pattern
-            if origin and cors_origins and validate_origin(origin, cors_origins):
-                return origin
-            elif "*" in cors_origins:
-                return "*"
-            elif cors_origins:
-                # Check if origin matches any Railway domain pattern
-                if origin and (".up.railway.app" in origin or ".railway.app" in origin):
-                    # Allow Railway domains if any Railway domain is in allowed origins
-                    for allowed in cors_origins:
-                        if ".railway.app" in allowed or ".up.railway.app" in allowed:
-                            logger.info(f"CORS: Allowing Railway origin {origin} (matched pattern {allowed})")
-                            return origin
-                return cors_origins[0]
-            elif not is_production:
-                return origin or "*"
-            else:
-                # In production, allow Railway domains even if not explicitly configured
-                if origin and (".up.railway.app" in origin or ".railway.app" in origin):
-                    logger.info(f"CORS: Allowing Railway origin {origin} (production fallback)")
-                    return origin
-                logger.warning(f"CORS: Origin {origin} not in allowed list {cors_origins}")
-                return None
-        
-        allowed_origin = get_allowed_origin()
-        
-        # Helper function to add CORS headers to any response
-        def add_cors_to_response(resp):
-            from starlette.responses import Response
-            # Ensure resp is a Response instance before accessing headers
-            if not isinstance(resp, Response):
-                return resp
-            if allowed_origin and "Access-Control-Allow-Origin" not in resp.headers:
-                resp.headers["Access-Control-Allow-Origin"] = allowed_origin
-                resp.headers["Access-Control-Allow-Credentials"] = "true"
-                resp.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
-                resp.headers["Access-Control-Allow-Headers"] = ", ".join(allowed_headers)
-            return resp
-        
-        # Handle OPTIONS preflight requests explicitly
-        if request.method == "OPTIONS":
-            from starlette.responses import Response
-            response = Response()
-            if allowed_origin:
-                response.headers["Access-Control-Allow-Origin"] = allowed_origin
-                response.headers["Access-Control-Allow-Credentials"] = "true"
-                response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
-                response.headers["Access-Control-Allow-Headers"] = ", ".join(allowed_headers)
-                response.headers["Access-Control-Max-Age"] = "3600"
-            return response
-        
-        # Process the request
-        try:
-            response = await call_next(request)
-            # Ensure CORS headers are present on successful response
-            return add_cors_to_response(response)
-        except Exception as e:
-            # Don't intercept exceptions - let them propagate to error handlers
-            # The error handlers will create proper responses, and CORSMiddleware
-            # will add CORS headers automatically
-            raise
+    app.add_middleware(
+        CORSHeadersMiddleware,
+        cors_origins=cors_origins,
+        allowed_headers=allowed_headers,
+        is_production=is_production,
+    )
     
     logger.info("✅ CORS middleware configured with tightened security")
 
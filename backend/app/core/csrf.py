@@ -4,78 +4,77 @@ Implements double-submit cookie pattern for CSRF protection
 """
 
 import secrets
+from http.cookies import SimpleCookie
 from typing import Optional
-from fastapi import Request, HTTPException, status
-from fastapi.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.asgi import on_response_start, send_error
 
-class CSRFMiddleware(BaseHTTPMiddleware):
-    """CSRF protection middleware using double-submit cookie pattern"""
+
+CSRF_EXEMPT_PREFIXES = ("/api/", "/docs", "/redoc", "/openapi.json")
+
+
+class CSRFMiddleware:
+    """CSRF protection middleware using double-submit cookie pattern, pure ASGI"""
     
-    def __init__(self, app, secret_key: str, cookie_name: str = "csrf_token"):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, secret_key: str, cookie_name: str = "csrf_token"):
+        self.app = app
         self.secret_key = secret_key
         self.cookie_name = cookie_name
         self.header_name = "X-CSRF-Token"
     
-    async def dispatch(self, request: Request, call_next):
+    def _csrf_cookie(self, secure: bool) -> str:
+        """Set-Cookie value carrying a fresh CSRF token"""
+        cookie: SimpleCookie = SimpleCookie()
+        cookie[self.cookie_name] = generate_csrf_token()
+        cookie[self.cookie_name]["max-age"] = 3600  # 1 hour
+        cookie[self.cookie_name]["path"] = "/"
+        if secure:
+            cookie[self.cookie_name]["secure"] = True
+        # Not httponly: must be readable by JavaScript for double-submit
+        cookie[self.cookie_name]["samesite"] = "strict"
+        return cookie.output(header="").strip()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and validate CSRF token"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
         # Skip CSRF check for safe methods (GET, HEAD, OPTIONS)
-        if request.method in ("GET", "HEAD", "OPTIONS"):
-            response = await call_next(request)
-            # Generate and set CSRF token cookie for safe methods
-            csrf_token = secrets.token_urlsafe(32)
-            response.set_cookie(
-                key=self.cookie_name,
-                value=csrf_token,
-                httponly=False,  # Must be readable by JavaScript for double-submit
-                secure=request.url.scheme == "https",
-                samesite="strict",
-                max_age=3600,  # 1 hour
-            )
-            return response
-        
         # Skip CSRF for API endpoints that use JWT authentication
         # CSRF protection is not needed for API endpoints using Bearer tokens
         # as they are protected by CORS and JWT validation
-        path = request.url.path
-        if path.startswith("/api/") or path.startswith("/docs") or path.startswith("/redoc") or path.startswith("/openapi.json"):
-            # For API endpoints, skip CSRF check but still set cookie for browser-based requests
-            response = await call_next(request)
-            # Optionally set CSRF token cookie for API endpoints too
-            csrf_token = secrets.token_urlsafe(32)
-            response.set_cookie(
-                key=self.cookie_name,
-                value=csrf_token,
-                httponly=False,
-                secure=request.url.scheme == "https",
-                samesite="strict",
-                max_age=3600,
-            )
-            return response
+        path = scope["path"]
+        if scope["method"] in ("GET", "HEAD", "OPTIONS") or path.startswith(CSRF_EXEMPT_PREFIXES):
+            # Generate and set CSRF token cookie for browser-based requests
+            secure = scope.get("scheme") == "https"
+            
+            def set_csrf_cookie(message: Message, headers: MutableHeaders) -> None:
+                headers.append("set-cookie", self._csrf_cookie(secure))
+            
+            await self.app(scope, receive, on_response_start(send, set_csrf_cookie))
+            return
         
         # For unsafe methods (POST, PUT, DELETE, PATCH) on non-API endpoints, validate CSRF token
+        request = Request(scope)
         csrf_token_cookie = request.cookies.get(self.cookie_name)
         csrf_token_header = request.headers.get(self.header_name)
         
         # Both cookie and header must be present and match
         if not csrf_token_cookie or not csrf_token_header:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="CSRF token missing"
-            )
+            await send_error(scope, receive, send, status.HTTP_403_FORBIDDEN, "CSRF token missing")
+            return
         
         if csrf_token_cookie != csrf_token_header:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="CSRF token mismatch"
-            )
+            await send_error(scope, receive, send, status.HTTP_403_FORBIDDEN, "CSRF token mismatch")
+            return
         
         # CSRF validation passed, continue
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
 
 def generate_csrf_token() -> str:
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.core.query_instrumentation import instrument_engine
 
 # Create async engine with optimized connection pooling
 # Enhanced pool configuration for better performance
@@ -36,6 +37,9 @@ engine = create_async_engine(
     },
 )
 
+# Per-request query count/time, N+1 and slow query logging
+instrument_engine(engine)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
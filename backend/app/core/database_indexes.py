@@ -9,6 +9,112 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.logging import logger
 
 
+# Indexes for users table
+USER_INDEXES = [
+    {
+        "name": "idx_users_email_active",
+        "table": "users",
+        "columns": ["email", "is_active"],
+        "description": "Composite index for email lookup with active filter",
+    },
+    {
+        "name": "idx_users_created_at_desc",
+        "table": "users",
+        "columns": ["created_at DESC"],
+        "description": "Index for sorting by creation date (descending)",
+    },
+    {
+        "name": "idx_users_name_search",
+        "table": "users",
+        "columns": ["first_name", "last_name"],
+        "description": "Composite index for name search",
+    },
+]
+
+# Indexes for projects table (if exists)
+PROJECT_INDEXES = [
+    {
+        "name": "idx_projects_user_created",
+        "table": "projects",
+        "columns": ["user_id", "created_at DESC"],
+        "description": "Composite index for user's projects sorted by date",
+    },
+    {
+        "name": "idx_projects_status",
+        "table": "projects",
+        "columns": ["status"],
+        "description": "Index for filtering by status",
+    },
+    {
+        "name": "idx_projects_user_status",
+        "table": "projects",
+        "columns": ["user_id", "status"],
+        "description": "Composite index for user's projects filtered by status",
+    },
+]
+
+# Indexes for subscriptions table (if exists)
+SUBSCRIPTION_INDEXES = [
+    {
+        "name": "idx_subscriptions_user_status",
+        "table": "subscriptions",
+        "columns": ["user_id", "status"],
+        "description": "Composite index for user subscriptions filtered by status",
+    },
+    {
+        "name": "idx_subscriptions_status_expires",
+        "table": "subscriptions",
+        "columns": ["status", "current_period_end"],
+        "description": "Index for finding expiring subscriptions",
+    },
+]
+
+# Indexes for teams table (if exists)
+TEAM_INDEXES = [
+    {
+        "name": "idx_teams_owner_created",
+        "table": "teams",
+        "columns": ["owner_id", "created_at DESC"],
+        "description": "Composite index for owner's teams sorted by date",
+    },
+]
+
+# Indexes for team_members table (if exists)
+TEAM_MEMBER_INDEXES = [
+    {
+        "name": "idx_team_members_user_team",
+        "table": "team_members",
+        "columns": ["user_id", "team_id"],
+        "description": "Composite index for user-team membership lookup",
+    },
+    {
+        "name": "idx_team_members_team_role",
+        "table": "team_members",
+        "columns": ["team_id", "role"],
+        "description": "Composite index for team members filtered by role",
+    },
+]
+
+# Indexes for invoices table (if exists)
+INVOICE_INDEXES = [
+    {
+        "name": "idx_invoices_user_created",
+        "table": "invoices",
+        "columns": ["user_id", "created_at DESC"],
+        "description": "Composite index for user invoices sorted by date",
+    },
+    {
+        "name": "idx_invoices_status",
+        "table": "invoices",
+        "columns": ["status"],
+        "description": "Index for filtering invoices by status",
+    },
+]
+
+# Indexes created at bootstrap (also hashed into the bootstrap schema fingerprint)
+RECOMMENDED_INDEXES = USER_INDEXES + PROJECT_INDEXES
+
+
 async def create_recommended_indexes(session: AsyncSession) -> dict:
     """
     Create recommended indexes for optimal query performance
@@ -25,109 +131,7 @@ async def create_recommended_indexes(session: AsyncSession) -> dict:
         "errors": [],
     }
     
-    # Indexes for users table
-    user_indexes = [
-        {
-            "name": "idx_users_email_active",
-            "table": "users",
-            "columns": ["email", "is_active"],
-            "description": "Composite index for email lookup with active filter",
-        },
-        {
-            "name": "idx_users_created_at_desc",
-            "table": "users",
-            "columns": ["created_at DESC"],
-            "description": "Index for sorting by creation date (descending)",
-        },
-        {
-            "name": "idx_users_name_search",
-            "table": "users",
-            "columns": ["first_name", "last_name"],
-            "description": "Composite index for name search",
-        },
-    ]
-    
-    # Indexes for projects table (if exists)
-    project_indexes = [
-        {
-            "name": "idx_projects_user_created",
-            "table": "projects",
-            "columns": ["user_id", "created_at DESC"],
-            "description": "Composite index for user's projects sorted by date",
-        },
-        {
-            "name": "idx_projects_status",
-            "table": "projects",
-            "columns": ["status"],
-            "description": "Index for filtering by status",
-        },
-        {
-            "name": "idx_projects_user_status",
-            "table": "projects",
-            "columns": ["user_id", "status"],
-            "description": "Composite index for user's projects filtered by status",
-        },
-    ]
-    
-    # Indexes for subscriptions table (if exists)
-    subscription_indexes = [
-        {
-            "name": "idx_subscriptions_user_status",
-            "table": "subscriptions",
-            "columns": ["user_id", "status"],
-            "description": "Composite index for user subscriptions filtered by status",
-        },
-        {
-            "name": "idx_subscriptions_status_expires",
-            "table": "subscriptions",
-            "columns": ["status", "current_period_end"],
-            "description": "Index for finding expiring subscriptions",
-        },
-    ]
-    
-    # Indexes for teams table (if exists)
-    team_indexes = [
-        {
-            "name": "idx_teams_owner_created",
-            "table": "teams",
-            "columns": ["owner_id", "created_at DESC"],
-            "description": "Composite index for owner's teams sorted by date",
-        },
-    ]
-    
-    # Indexes for team_members table (if exists)
-    team_member_indexes = [
-        {
-            "name": "idx_team_members_user_team",
-            "table": "team_members",
-            "columns": ["user_id", "team_id"],
-            "description": "Composite index for user-team membership lookup",
-        },
-        {
-            "name": "idx_team_members_team_role",
-            "table": "team_members",
-            "columns": ["team_id", "role"],
-            "description": "Composite index for team members filtered by role",
-        },
-    ]
-    
-    # Indexes for invoices table (if exists)
-    invoice_indexes = [
-        {
-            "name": "idx_invoices_user_created",
-            "table": "invoices",
-            "columns": ["user_id", "created_at DESC"],
-            "description": "Composite index for user invoices sorted by date",
-        },
-        {
-            "name": "idx_invoices_status",
-            "table": "invoices",
-            "columns": ["status"],
-            "description": "Index for filtering invoices by status",
-        },
-    ]
-    
-    all_indexes = user_indexes + project_indexes
+    all_indexes = RECOMMENDED_INDEXES
     
     for index_def in all_indexes:
         try:
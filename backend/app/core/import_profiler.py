@@ -0,0 +1,144 @@
+"""
+Import-Time Profiler
+Measures the cold import cost of a module (app.main by default) in a fresh
+interpreter using `python -X importtime`, and aggregates it per module and
+per top-level package.
+
+Run with: python scripts/profile_imports.py [--module app.main] [--top 30]
+"""
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Heavy optional dependencies that must stay out of the cold import path
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "openpyxl",
+    "reportlab",
+    "boto3",
+    "botocore",
+    "openai",
+    "anthropic",
+    "sendgrid",
+)
+
+# Default cold-import budget for app.main, in milliseconds
+DEFAULT_IMPORT_BUDGET_MS = 6000
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+@dataclass
+class ImportRecord:
+    """One line of -X importtime output (times in microseconds)"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    """Parsed import-time profile of a cold import"""
+    target: str
+    records: List[ImportRecord] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        """Cumulative time of the target module itself"""
+        for record in self.records:
+            if record.module == self.target:
+                return record.cumulative_us / 1000
+        return sum(r.self_us for r in self.records) / 1000
+
+    @property
+    def modules(self) -> List[str]:
+        return [r.module for r in self.records]
+
+    def imported(self, name: str) -> bool:
+        """Whether `name` or any of its submodules was imported"""
+        prefix = name + "."
+        return any(m == name or m.startswith(prefix) for m in self.modules)
+
+    def by_package(self) -> Dict[str, float]:
+        """Self time aggregated per top-level package, in ms, most expensive first"""
+        totals: Dict[str, int] = {}
+        for record in self.records:
+            package = record.module.split(".")[0]
+            totals[package] = totals.get(package, 0) + record.self_us
+        return {k: v / 1000 for k, v in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)}
+
+    def slowest(self, top: int = 20) -> List[ImportRecord]:
+        """Modules with the highest cumulative import time"""
+        return sorted(self.records, key=lambda r: r.cumulative_us, reverse=True)[:top]
+
+
+def parse_importtime(output: str, target: str) -> ImportProfile:
+    """Parse the stderr of `python -X importtime`"""
+    profile = ImportProfile(target=target)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            head, cumulative_part, module_part = line.split("|", 2)
+            record = ImportRecord(
+                module=module_part.strip(),
+                self_us=int(head.rsplit(":", 1)[1].strip()),
+                cumulative_us=int(cumulative_part.strip()),
+                # Nesting is encoded as two spaces per level after one separator space
+                depth=(len(module_part) - len(module_part.lstrip()) - 1) // 2,
+            )
+        except (ValueError, IndexError):
+            continue
+        profile.records.append(record)
+    return profile
+
+
+def profile_imports(module: str = "app.main", env: Optional[Dict[str, str]] = None, timeout: int = 120) -> ImportProfile:
+    """
+    Import `module` in a fresh interpreter and return its import-time profile.
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    run_env = dict(os.environ)
+    run_env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    if env:
+        run_env.update(env)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(BACKEND_ROOT),
+        env=run_env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.splitlines()[-20:])
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+    return parse_importtime(result.stderr, module)
+
+
+def format_report(profile: ImportProfile, top: int = 20) -> str:
+    """Human-readable report: total, heavy modules, top packages and modules"""
+    lines = [f"Cold import of {profile.target}: {profile.total_ms:.0f} ms ({len(profile.records)} modules)"]
+
+    heavy = [name for name in HEAVY_MODULES if profile.imported(name)]
+    lines.append(f"Heavy modules imported: {', '.join(heavy) if heavy else 'none'}")
+
+    lines.append("")
+    lines.append(f"Top {top} packages (self time):")
+    for package, ms in list(profile.by_package().items())[:top]:
+        lines.append(f"  {ms:9.1f} ms  {package}")
+
+    lines.append("")
+    lines.append(f"Top {top} modules (cumulative time):")
+    for record in profile.slowest(top):
+        lines.append(f"  {record.cumulative_us / 1000:9.1f} ms  {record.module}")
+    return "\n".join(lines)
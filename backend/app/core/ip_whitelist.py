@@ -5,9 +5,10 @@ Restricts admin endpoints to whitelisted IP addresses
 
 import os
 from typing import List, Optional
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request, status
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.core.asgi import send_error
 from app.core.logging import logger
 
 
@@ -46,11 +47,11 @@ def parse_ip_whitelist(whitelist_str: Optional[str]) -> List[str]:
     return ips
 
 
-class IPWhitelistMiddleware(BaseHTTPMiddleware):
-    """Middleware to restrict endpoints to whitelisted IPs"""
+class IPWhitelistMiddleware:
+    """Middleware to restrict endpoints to whitelisted IPs, pure ASGI"""
     
-    def __init__(self, app, whitelist: List[str], admin_paths: List[str] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, whitelist: List[str], admin_paths: List[str] = None):
+        self.app = app
         self.whitelist = whitelist
         self.admin_paths = admin_paths or ["/api/v1/admin"]
     
@@ -83,26 +84,28 @@ class IPWhitelistMiddleware(BaseHTTPMiddleware):
         
         return False
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Check IP whitelist for admin endpoints"""
         
         # Only check whitelist for admin paths
-        if not self.is_admin_path(str(request.url.path)):
-            return await call_next(request)
+        if scope["type"] != "http" or not self.is_admin_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
         
         # Get client IP
-        client_ip = get_client_ip(request)
+        client_ip = get_client_ip(Request(scope))
         
         # Check if IP is allowed
         if not self.is_ip_allowed(client_ip):
-            logger.warning(f"⚠️ IP whitelist violation: {client_ip} attempted to access {request.url.path}")
-            raise HTTPException(
+            logger.warning(f"⚠️ IP whitelist violation: {client_ip} attempted to access {scope['path']}")
+            await send_error(
+                scope, receive, send,
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied: IP address not whitelisted"
             )
+            return
         
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
 
 def setup_ip_whitelist(app, admin_paths: List[str] = None) -> None:
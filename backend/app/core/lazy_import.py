@@ -0,0 +1,75 @@
+"""
+Lazy Imports
+Defers heavy optional dependencies (pandas, reportlab, boto3, openai, anthropic,
+sendgrid...) until first use, so importing the app - and booting a worker -
+doesn't pay for libraries a given request never touches.
+
+@example
+```python
+from app.core.lazy_import import is_available, lazy_module
+
+pd = lazy_module("pandas")
+PANDAS_AVAILABLE = is_available("pandas")
+
+def to_frame(rows):
+    return pd.DataFrame(rows)  # pandas is imported here, on first access
+```
+"""
+
+import importlib
+import importlib.util
+import threading
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, Optional
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """
+    Check whether a module can be imported, without importing it.
+
+    Only the import machinery's finders are consulted; the module's code does not run.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        # Parent package missing, or a broken __spec__
+        return False
+
+
+class LazyModule:
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    Thread-safe; after the first access the proxy only forwards attributes.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only reached for attributes not set in __init__
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Return a proxy for module `name` that imports it on first use"""
+    return LazyModule(name)
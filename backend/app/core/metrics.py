@@ -0,0 +1,399 @@
+"""
+Application Metrics
+Counters, gauges and histograms exposed in the Prometheus text format
+
+- updates on the hot path are in-memory (a lock, a dict lookup, a bisect)
+- gauges that are cheaper to read than to maintain (DB pools, WebSocket
+  connections, Celery queue depth) are filled by collectors at collection time
+- with several uvicorn workers, each worker publishes its snapshot to Redis
+  every METRICS_PUBLISH_INTERVAL_SECONDS (MetricsPublisher); /metrics merges
+  the snapshots of every live worker: counters and histograms are summed,
+  gauges are summed or take the maximum (values shared by all workers)
+- without Redis, /metrics reports the worker that serves the scrape
+
+A worker that stops disappears after three publish intervals; Prometheus
+handles the resulting counter decrease as a reset.
+"""
+
+import asyncio
+import bisect
+import json
+import os
+import socket
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+WORKER_KEY_PREFIX = "metrics:worker:"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class: a named family of samples keyed by label values"""
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, object] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(labels), self._copy(value)] for labels, value in self._values.items()]
+
+    def _copy(self, value):
+        return value
+
+    def render(self, samples: Dict[LabelValues, object]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(samples.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    @staticmethod
+    def merge(values: List[float]) -> float:
+        return sum(values)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), aggregate: str = "sum"):
+        super().__init__(name, description, labels)
+        # "sum": per-worker quantities (connections); "max": a value every worker observes (queue depth)
+        self.aggregate = aggregate
+
+    def set(self, labels: LabelValues, value: float) -> None:
+        with self._lock:
+            self._values[labels] = float(value)
+
+    def merge(self, values: List[float]) -> float:
+        return max(values) if self.aggregate == "max" else sum(values)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket counts (last one is +Inf), sum, count
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    @staticmethod
+    def merge(values: List[list]) -> list:
+        counts = [sum(column) for column in zip(*(value[0] for value in values), strict=True)]
+        return [counts, sum(value[1] for value in values), sum(value[2] for value in values)]
+
+    def render(self, samples: Dict[LabelValues, object]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        for labels, (counts, total, count) in sorted(samples.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts, strict=True):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+Collector = Callable[[], Awaitable[None]]
+
+
+class MetricsRegistry:
+    """Metrics of the process, their collectors and the merge of worker snapshots"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Collector] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = (), aggregate: str = "sum") -> Gauge:
+        return self.register(Gauge(name, description, labels, aggregate))
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, description, labels, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    async def collect(self) -> None:
+        """Refresh the collected gauges (a failing collector only skips its gauges)"""
+        for collector in self.collectors:
+            try:
+                await collector()
+            except Exception as e:
+                logger.debug(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+
+    def snapshot(self) -> Dict[str, List[list]]:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def render(self, snapshots: Optional[Iterable[Dict[str, List[list]]]] = None) -> str:
+        """Prometheus text exposition of the merged snapshots (default: this process)"""
+        snapshots = list(snapshots) if snapshots is not None else [self.snapshot()]
+        lines = []
+        for name, metric in self.metrics.items():
+            grouped: Dict[LabelValues, list] = {}
+            for snapshot in snapshots:
+                for labels, value in snapshot.get(name, []):
+                    grouped.setdefault(tuple(labels), []).append(value)
+            samples = {labels: metric.merge(values) for labels, values in grouped.items()}
+            lines.extend(metric.render(samples))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total",
+    "Redis cache lookups by result (hit, miss, error)",
+    ("result",),
+)
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429 by the rate limiter",
+    ("route",),
+)
+DB_POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out_connections",
+    "Database connections in use",
+    ("engine",),
+)
+DB_POOL_OVERFLOW = registry.gauge(
+    "db_pool_overflow_connections",
+    "Database connections opened beyond the pool size",
+    ("engine",),
+)
+DB_POOL_SIZE = registry.gauge(
+    "db_pool_size",
+    "Configured database pool size",
+    ("engine",),
+)
+WEBSOCKET_CONNECTIONS = registry.gauge(
+    "websocket_connections",
+    "Open WebSocket connections",
+)
+CELERY_QUEUE_DEPTH = registry.gauge(
+    "celery_queue_depth",
+    "Tasks waiting in the Celery broker queue",
+    ("queue",),
+    aggregate="max",
+)
+
+
+def route_template(scope: dict) -> str:
+    """Path template of the matched route (bounded label values), "unmatched" otherwise"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency of each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                (scope["method"], route_template(scope), f"{status_code // 100}xx"),
+                time.perf_counter() - started,
+            )
+
+
+# Collectors
+
+def _observe_pool(engine_name: str, engine) -> None:
+    pool = getattr(engine, "sync_engine", engine).pool
+    for gauge, reader in (
+        (DB_POOL_CHECKED_OUT, "checkedout"),
+        (DB_POOL_OVERFLOW, "overflow"),
+        (DB_POOL_SIZE, "size"),
+    ):
+        read = getattr(pool, reader, None)
+        if read is not None:
+            gauge.set((engine_name,), max(read(), 0))
+
+
+async def collect_db_pools() -> None:
+    from app.core.database import engine
+    from app.core.organization_database_manager import OrganizationDatabaseManager
+
+    for gauge in (DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_SIZE):
+        gauge.clear()
+    _observe_pool("main", engine)
+    for organization_id, org_engine in list(OrganizationDatabaseManager._engines.items()):
+        _observe_pool(f"org:{organization_id[:8]}", org_engine)
+
+
+async def collect_websockets() -> None:
+    from app.api.v1.endpoints.websocket import manager
+
+    WEBSOCKET_CONNECTIONS.set((), sum(len(connections) for connections in manager.active_connections.values()))
+
+
+async def collect_celery_queues() -> None:
+    from app.core.cache import cache_backend
+
+    if cache_backend.redis_client is None:
+        return
+    # The broker is the Redis of REDIS_URL; the default queue is a list named "celery"
+    for queue in settings.METRICS_CELERY_QUEUES:
+        CELERY_QUEUE_DEPTH.set((queue,), await cache_backend.redis_client.llen(queue))
+
+
+def register_default_collectors() -> None:
+    for collector in (collect_db_pools, collect_websockets, collect_celery_queues):
+        registry.add_collector(collector)
+
+
+# Multi-worker aggregation
+
+async def publish_snapshot(redis_client, ttl: int) -> None:
+    await redis_client.set(WORKER_KEY_PREFIX + WORKER_ID, json.dumps(registry.snapshot()), ex=ttl)
+
+
+async def gather_snapshots(redis_client) -> List[Dict[str, List[list]]]:
+    """Snapshots of the other live workers, then this worker's current one"""
+    keys = [key async for key in redis_client.scan_iter(match=WORKER_KEY_PREFIX + "*", count=100)]
+    own_key = (WORKER_KEY_PREFIX + WORKER_ID).encode()
+    keys = [key for key in keys if (key if isinstance(key, bytes) else key.encode()) != own_key]
+    snapshots = []
+    if keys:
+        for raw in await redis_client.mget(keys):
+            if raw:
+                snapshots.append(json.loads(raw))
+    snapshots.append(registry.snapshot())
+    return snapshots
+
+
+async def render_metrics() -> str:
+    """Exposition of every worker's metrics (this worker only without Redis)"""
+    from app.core.cache import cache_backend
+
+    await registry.collect()
+    redis_client = cache_backend.redis_client
+    if redis_client is None:
+        return registry.render()
+    try:
+        return registry.render(await gather_snapshots(redis_client))
+    except Exception as e:
+        logger.warning(f"Metrics aggregation failed, reporting this worker only: {e}")
+        return registry.render()
+
+
+class MetricsPublisher:
+    """Background task publishing this worker's snapshot to Redis"""
+
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def start(cls, redis_client, interval: Optional[float] = None) -> None:
+        if cls._task is not None and not cls._task.done():
+            return
+        interval = interval or settings.METRICS_PUBLISH_INTERVAL_SECONDS
+        cls._task = asyncio.create_task(cls._run(redis_client, interval))
+
+    @classmethod
+    async def _run(cls, redis_client, interval: float) -> None:
+        ttl = int(interval * 3) + 1
+        while True:
+            try:
+                await registry.collect()
+                await publish_snapshot(redis_client, ttl)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Metrics snapshot publish failed: {e}")
+            await asyncio.sleep(interval)
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task is None:
+            return
+        cls._task.cancel()
+        try:
+            await cls._task
+        except (asyncio.CancelledError, Exception):
+            pass
+        cls._task = None
@@ -9,7 +9,13 @@ This module handles:
 - Running migrations for organization databases
 """
 
-from typing import Optional, Dict, List
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, List, Set
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy import text, create_engine, pool
@@ -19,6 +25,122 @@ from urllib.parse import urlparse, urlunparse
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.query_instrumentation import instrument_engine
+
+
+# Alembic revisions of the organization database branch (separate from the main DB chain)
+ORG_DB_REVISIONS = (
+    "add_donor_tables_001",
+    "add_donor_crm_002",
+    "add_donor_search_003",
+    "add_donor_tag_index_004",
+    "add_campaign_rollups_005",
+)
+ORG_DB_BASE_REVISION = ORG_DB_REVISIONS[0]
+ORG_DB_HEAD_REVISION = ORG_DB_REVISIONS[-1]
+
+# Maximum number of distinct connection strings kept in the ConnectionSpec cache
+CONNECTION_SPEC_CACHE_SIZE = 512
+
+
+@dataclass(frozen=True)
+class ConnectionSpec:
+    """
+    Parsed and normalized view of an organization connection string.
+    
+    Computed once per distinct connection string (see
+    OrganizationDatabaseManager.get_connection_spec) so engine creation,
+    migrations, health checks and log masking never re-run the parser.
+    """
+    raw: str = field(repr=False)
+    asyncpg_url: str = field(repr=False)
+    psycopg2_url: str = field(repr=False)
+    masked: str
+    host: str
+    port: int
+    database: Optional[str]
+    user: Optional[str]
+    password: Optional[str] = field(default=None, repr=False)
+    railway_internal_url: Optional[str] = field(default=None, repr=False)
+    
+    def mask(self, url: str) -> str:
+        """Mask this spec's password in any URL derived from it"""
+        if self.password:
+            return url.replace(self.password, '*' * len(self.password))
+        return url
+    
+    @property
+    def masked_psycopg2(self) -> str:
+        return self.mask(self.psycopg2_url)
+    
+    def url_for_database(self, database: str, driver: str = "asyncpg") -> str:
+        """Build a URL on the same server for another database (e.g. 'postgres' for admin work)"""
+        user_pass = ''
+        if self.user:
+            user_pass = f"{self.user}:{self.password}@" if self.password else f"{self.user}@"
+        return f"postgresql+{driver}://{user_pass}{self.host}:{self.port}/{database}"
+
+
+class _ConnectionSpecCache:
+    """Thread-safe bounded LRU cache of ConnectionSpec (migrations run in worker threads)"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, ConnectionSpec]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[ConnectionSpec]:
+        with self._lock:
+            spec = self._items.get(key)
+            if spec is not None:
+                self._items.move_to_end(key)
+            return spec
+    
+    def put(self, spec: ConnectionSpec, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._items[key] = spec
+                self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+    
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_connection_spec_cache = _ConnectionSpecCache(CONNECTION_SPEC_CACHE_SIZE)
+
+
+@lru_cache(maxsize=1)
+def _find_alembic_ini() -> Path:
+    """
+    Locate alembic.ini once per process.
+    
+    Raises:
+        ValueError: If no alembic.ini can be found
+    """
+    import os
+    
+    # app/core/ -> app/ -> backend/
+    backend_dir = Path(__file__).parent.parent.parent
+    candidates = [
+        backend_dir / "alembic.ini",
+        Path("alembic.ini"),
+        Path("backend/alembic.ini"),
+        Path(os.getcwd()) / "alembic.ini",
+        Path(os.getcwd()) / "backend" / "alembic.ini",
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    
+    error_msg = f"Cannot find alembic.ini. Tried: {', '.join(str(c) for c in candidates)}"
+    logger.error(error_msg)
+    raise ValueError(f"Cannot find alembic.ini configuration file. {error_msg}")
 
 
 class OrganizationDatabaseManager:
@@ -31,6 +153,8 @@ class OrganizationDatabaseManager:
     
     _engines: Dict[str, any] = {}  # Key: organization_id (UUID as string)
     _sessions: Dict[str, async_sessionmaker] = {}  # Key: organization_id (UUID as string)
+    _engine_specs: Dict[str, ConnectionSpec] = {}  # Key: organization_id (UUID as string)
+    _dispose_tasks: Set[asyncio.Task] = set()  # Background disposals of invalidated engines
     
     @classmethod
     def _convert_railway_url_to_internal(cls, url: str) -> str:
@@ -600,6 +724,70 @@ class OrganizationDatabaseManager:
             logger.error(f"Failed to parse connection string: {e}", exc_info=True)
             raise ValueError(f"Invalid connection string format: {e}")
     
+    @classmethod
+    def get_connection_spec(cls, connection_string: str) -> ConnectionSpec:
+        """
+        Get the parsed ConnectionSpec for a connection string.
+        
+        The spec is memoized in a bounded LRU cache keyed by the raw string and
+        by its canonical asyncpg/psycopg2 URLs, so repeated lookups skip the
+        normalization and parsing work entirely.
+        
+        Args:
+            connection_string: PostgreSQL connection string (any format)
+        
+        Returns:
+            ConnectionSpec
+        
+        Raises:
+            ValueError: If the connection string cannot be parsed
+        """
+        spec = _connection_spec_cache.get(connection_string)
+        if spec is None:
+            spec = cls._build_connection_spec(connection_string)
+            _connection_spec_cache.put(spec, connection_string, spec.asyncpg_url, spec.psycopg2_url)
+        return spec
+    
+    @classmethod
+    def _build_connection_spec(cls, connection_string: str) -> ConnectionSpec:
+        """Run the full normalization/parsing pipeline once for a connection string"""
+        normalized = cls.normalize_connection_string(connection_string)
+        parsed = cls.parse_db_connection_string(normalized)
+        port = cls._normalize_port(parsed['port'])
+        
+        user_pass = ''
+        if parsed['user']:
+            if parsed['password']:
+                user_pass = f"{parsed['user']}:{parsed['password']}@"
+            else:
+                user_pass = f"{parsed['user']}@"
+        db_part = f"/{parsed['database']}" if parsed['database'] else ''
+        asyncpg_url = f"postgresql+asyncpg://{user_pass}{parsed['host']}:{port}{db_part}"
+        psycopg2_url = asyncpg_url.replace("postgresql+asyncpg://", "postgresql+psycopg2://", 1)
+        
+        password = parsed['password'] or None
+        masked = asyncpg_url.replace(password, '*' * len(password)) if password else asyncpg_url
+        
+        internal_url = cls._convert_railway_url_to_internal(asyncpg_url)
+        
+        return ConnectionSpec(
+            raw=connection_string,
+            asyncpg_url=asyncpg_url,
+            psycopg2_url=psycopg2_url,
+            masked=masked,
+            host=parsed['host'],
+            port=port,
+            database=parsed['database'] or None,
+            user=parsed['user'] or None,
+            password=password,
+            railway_internal_url=internal_url if internal_url != asyncpg_url else None,
+        )
+    
+    @classmethod
+    def clear_connection_spec_cache(cls) -> None:
+        """Drop all memoized ConnectionSpecs (e.g. after Railway environment changes)"""
+        _connection_spec_cache.clear()
+    
     @classmethod
     def mask_connection_string(cls, connection_string: str) -> str:
         """
@@ -611,6 +799,9 @@ class OrganizationDatabaseManager:
         Returns:
             Connection string with masked password
         """
+        spec = _connection_spec_cache.get(connection_string)
+        if spec is not None:
+            return spec.mask(connection_string)
         try:
             parsed = cls.parse_db_connection_string(connection_string)
             if parsed['password']:
@@ -737,50 +928,25 @@ class OrganizationDatabaseManager:
         if not db_connection_string:
             return False, "Connection string is empty", None
         
-        # Normalize connection string
         original_url = db_connection_string
-        db_connection_string = cls.normalize_connection_string(db_connection_string)
-        
-        # Log for debugging
-        logger.debug(f"Original URL: {cls.mask_connection_string(original_url)}")
-        logger.debug(f"Normalized URL: {cls.mask_connection_string(db_connection_string)}")
         
-        # Validate format after normalization
-        if not db_connection_string.startswith('postgresql+asyncpg://'):
-            return False, (
-                f"Format de chaîne de connexion invalide. Doit être une chaîne de connexion PostgreSQL valide.\n"
-                f"URL reçue: {cls.mask_connection_string(original_url)}\n"
-                f"URL normalisée: {cls.mask_connection_string(db_connection_string)}"
-            ), None
-        
-        # Parse to validate and ensure port is valid
+        # Normalize, validate and rebuild the URL with a guaranteed valid port (memoized)
         try:
-            parsed = cls.parse_db_connection_string(db_connection_string)
-            logger.debug(f"Parsed connection - host: {parsed.get('host')}, port: {parsed.get('port')}, database: {parsed.get('database')}")
-            # Reconstruct URL with guaranteed valid port to avoid asyncpg parsing issues
-            port = parsed['port']
-            if not isinstance(port, int) or port < 1 or port > 65535:
-                port = 5432
-            
-            user_pass = ''
-            if parsed['user']:
-                if parsed['password']:
-                    user_pass = f"{parsed['user']}:{parsed['password']}@"
-                else:
-                    user_pass = f"{parsed['user']}@"
-            
-            db_part = f"/{parsed['database']}" if parsed['database'] else ''
-            # Reconstruct URL with validated components to ensure asyncpg can parse it
-            db_connection_string = f"postgresql+asyncpg://{user_pass}{parsed['host']}:{port}{db_part}"
+            spec = cls.get_connection_spec(db_connection_string)
         except ValueError as e:
             return False, f"Format de chaîne de connexion invalide: {str(e)}", None
         except Exception as e:
             logger.error(f"Error parsing connection string in test_connection: {e}", exc_info=True)
             return False, f"Erreur lors de l'analyse de la chaîne de connexion: {str(e)}", None
         
+        db_connection_string = spec.asyncpg_url
+        parsed = {'host': spec.host, 'port': spec.port, 'database': spec.database}
+        logger.debug(f"Original URL: {spec.mask(original_url)}")
+        logger.debug(f"Parsed connection - host: {spec.host}, port: {spec.port}, database: {spec.database}")
+        
         try:
             # Log the connection string (masked) for debugging
-            logger.debug(f"Testing connection with URL: {cls.mask_connection_string(db_connection_string)}")
+            logger.debug(f"Testing connection with URL: {spec.masked}")
             
             # Create a temporary engine for testing
             test_engine = create_async_engine(
@@ -810,7 +976,6 @@ class OrganizationDatabaseManager:
             
             await test_engine.dispose()
             
-            parsed = cls.parse_db_connection_string(db_connection_string)
             return True, f"Connection successful to database '{db_name}'", db_name
             
         except OperationalError as e:
@@ -950,15 +1115,12 @@ class OrganizationDatabaseManager:
                 )
         
         # Normalize and clean the connection string before using it
-        db_connection_string = cls.normalize_connection_string(db_connection_string)
-        
-        parsed = cls.parse_db_connection_string(db_connection_string)
-        db_name = parsed['database']
+        spec = cls.get_connection_spec(db_connection_string)
+        db_connection_string = spec.asyncpg_url
+        db_name = spec.database
         
         # Get admin connection (connect to 'postgres' database)
-        # Ensure port is always an integer (parsed['port'] should already be int from parse_db_connection_string)
-        port = cls._normalize_port(parsed['port'])
-        admin_url = f"postgresql+asyncpg://{parsed['user']}:{parsed['password']}@{parsed['host']}:{port}/postgres"
+        admin_url = spec.url_for_database("postgres")
         
         try:
             # Create async engine for admin connection
@@ -1047,6 +1209,22 @@ class OrganizationDatabaseManager:
         """
         Run database migrations on an organization database.
         
+        Alembic and psycopg2 are synchronous, so the upgrade runs in a worker
+        thread to keep the event loop responsive.
+        
+        Args:
+            db_connection_string: Connection string to the organization database
+        """
+        await asyncio.to_thread(cls.run_migrations_for_organization_sync, db_connection_string)
+    
+    @classmethod
+    def run_migrations_for_organization_sync(cls, db_connection_string: str) -> None:
+        """
+        Blocking implementation of run_migrations_for_organization.
+        
+        Alembic's context/op proxies are process-global: concurrent upgrades
+        must each run in their own process (see OrganizationMigrationOrchestrator).
+        
         Args:
             db_connection_string: Connection string to the organization database
         """
@@ -1056,61 +1234,29 @@ class OrganizationDatabaseManager:
             from alembic import command
             import contextlib  # Import at function level for use in error handlers
             
-            # Normalize connection string
-            db_connection_string = cls.normalize_connection_string(db_connection_string)
-            
-            # Convert asyncpg to psycopg2 for Alembic (Alembic doesn't support asyncpg)
-            # This matches what env.py does
-            alembic_db_url = db_connection_string
-            if "postgresql+asyncpg://" in alembic_db_url:
-                alembic_db_url = alembic_db_url.replace("postgresql+asyncpg://", "postgresql+psycopg2://")
-            elif "postgresql://" in alembic_db_url and "+" not in alembic_db_url:
-                alembic_db_url = alembic_db_url.replace("postgresql://", "postgresql+psycopg2://")
-            
-            # Create alembic config - use absolute path to alembic.ini
-            import os
-            from pathlib import Path
-            
-            # Find alembic.ini - it should be in the backend directory
-            # Get the directory where this file is located (app/core/)
-            current_file = Path(__file__)
-            # Go up to backend directory: app/core/ -> app/ -> backend/
-            backend_dir = current_file.parent.parent.parent
-            alembic_ini_path = backend_dir / "alembic.ini"
-            
-            if not alembic_ini_path.exists():
-                # Fallback: try relative to current working directory
-                alembic_ini_path = Path("alembic.ini")
-                if not alembic_ini_path.exists():
-                    # Try backend/alembic.ini
-                    alembic_ini_path = Path("backend/alembic.ini")
-                    if not alembic_ini_path.exists():
-                        # Try from current working directory
-                        import os
-                        cwd = Path(os.getcwd())
-                        alembic_ini_path = cwd / "alembic.ini"
-                        if not alembic_ini_path.exists():
-                            alembic_ini_path = cwd / "backend" / "alembic.ini"
-            
-            if not alembic_ini_path.exists():
-                error_msg = f"Cannot find alembic.ini. Tried: {backend_dir / 'alembic.ini'}, {Path('alembic.ini')}, {Path('backend/alembic.ini')}, {Path(os.getcwd()) / 'alembic.ini'}"
-                logger.error(error_msg)
-                raise ValueError(f"Cannot find alembic.ini configuration file. {error_msg}")
+            # Normalize connection string (memoized)
+            spec = cls.get_connection_spec(db_connection_string)
+            db_connection_string = spec.asyncpg_url
+            
+            # Alembic doesn't support asyncpg: use the psycopg2 variant (matches env.py)
+            alembic_db_url = spec.psycopg2_url
+            
+            # Create alembic config - the alembic.ini location is resolved once per process
+            alembic_ini_path = _find_alembic_ini()
             
             logger.info(f"Using Alembic config from: {alembic_ini_path.absolute()}")
             alembic_cfg = Config(str(alembic_ini_path))
             alembic_cfg.set_main_option("sqlalchemy.url", alembic_db_url)
             
             # Log the connection string (masked) for debugging
-            logger.info(f"Migration target database URL: {cls.mask_connection_string(alembic_db_url)}")
+            logger.info(f"Migration target database URL: {spec.masked_psycopg2}")
             
             # CRITICAL: Verify connection and confirm database name
-            parsed_conn = cls.parse_db_connection_string(db_connection_string)
-            expected_db_name = parsed_conn.get('database')
+            expected_db_name = spec.database
             logger.info("=" * 80)
             logger.info("🔍 CONFIRMATION DE LA BASE DE DONNÉES CIBLE")
             logger.info(f"📊 Nom de la base de données attendu (extrait de la connection string): '{expected_db_name}'")
-            logger.info(f"🔗 Connection string (masquée): {cls.mask_connection_string(db_connection_string)}")
+            logger.info(f"🔗 Connection string (masquée): {spec.masked}")
             logger.info("=" * 80)
             
             try:
@@ -1162,10 +1308,10 @@ class OrganizationDatabaseManager:
                 ) from conn_test_error
             
             # For organization databases, we need to apply only the organization-specific migrations
-            # These migrations start with add_donor_tables_001 and end with add_donor_crm_002
+            # These migrations start with ORG_DB_BASE_REVISION and end with ORG_DB_HEAD_REVISION
             # We'll try to upgrade to the specific revision for organization databases
-            target_revision = "add_donor_crm_002"  # Latest organization database migration
-            base_revision = "add_donor_tables_001"  # Base revision for organization databases
+            target_revision = ORG_DB_HEAD_REVISION
+            base_revision = ORG_DB_BASE_REVISION
             
             # Check current revision before migration and verify migrations exist
             try:
@@ -1254,7 +1400,7 @@ class OrganizationDatabaseManager:
                 ) from script_error
             
             logger.info(f"Running migrations for organization database, target revision: {target_revision}")
-            logger.info(f"Connection string (masked): {cls.mask_connection_string(db_connection_string)}")
+            logger.info(f"Connection string (masked): {spec.masked}")
             
             # Check current revision in the database and determine migration strategy
             is_empty_db = False
@@ -1287,7 +1433,7 @@ class OrganizationDatabaseManager:
                         if current_rev_in_db and current_rev_in_db not in [None, base_revision, target_revision]:
                             # Check if it's a main database revision (numeric or different format)
                             # Main DB revisions are typically numeric like '032', '033', etc.
-                            if current_rev_in_db.isdigit() or current_rev_in_db not in ['add_donor_tables_001', 'add_donor_crm_002']:
+                            if current_rev_in_db.isdigit() or current_rev_in_db not in ORG_DB_REVISIONS:
                                 logger.warning(
                                     f"Database has revision '{current_rev_in_db}' which appears to be from main database. "
                                     f"Stamping to base organization revision '{base_revision}'..."
@@ -1314,7 +1460,7 @@ class OrganizationDatabaseManager:
                     logger.info("STARTING MIGRATION FROM EMPTY DATABASE")
                     logger.info(f"Database state: is_empty_db={is_empty_db}, current_rev_in_db={current_rev_in_db}")
                     logger.info(f"Alembic config script_location: {alembic_cfg.get_main_option('script_location')}")
-                    logger.info(f"Target database URL: {cls.mask_connection_string(alembic_db_url)}")
+                    logger.info(f"Target database URL: {spec.masked_psycopg2}")
                     logger.info("=" * 80)
                     
                     # Verify migrations exist before attempting upgrade
@@ -1971,8 +2117,7 @@ class OrganizationDatabaseManager:
                             f"Vérifiez les logs du backend pour plus de détails."
                         ) from revision_error
             
-            parsed = cls.parse_db_connection_string(db_connection_string)
-            db_name = parsed['database']
+            db_name = spec.database
             logger.info("=" * 80)
             logger.info(f"✅ Migrations terminées pour la base de données: '{db_name}'")
             logger.info("=" * 80)
@@ -2121,8 +2266,7 @@ class OrganizationDatabaseManager:
                     logger.warning("Multiple heads error caught, attempting to upgrade all heads as fallback...")
                     alembic_cfg.set_main_option("sqlalchemy.url", alembic_db_url)
                     command.upgrade(alembic_cfg, "heads")
-                    parsed = cls.parse_db_connection_string(db_connection_string)
-                    logger.info(f"Ran migrations on organization database (using heads): {parsed['database']}")
+                    logger.info(f"Ran migrations on organization database (using heads): {spec.database}")
                 except Exception as fallback_error:
                     logger.error(f"Failed to run migrations even with 'heads': {fallback_error}", exc_info=True)
                     raise ValueError(
@@ -2148,8 +2292,9 @@ class OrganizationDatabaseManager:
         from typing import List
         
         try:
-            # Normalize connection string
-            db_connection_string = cls.normalize_connection_string(db_connection_string)
+            # Normalize connection string (memoized)
+            spec = cls.get_connection_spec(db_connection_string)
+            db_connection_string = spec.asyncpg_url
             
             # Create temporary engine
             test_engine = create_async_engine(
@@ -2174,8 +2319,7 @@ class OrganizationDatabaseManager:
             
             await test_engine.dispose()
             
-            parsed = cls.parse_db_connection_string(db_connection_string)
-            logger.debug(f"Found {len(tables)} tables in database {parsed['database']}")
+            logger.debug(f"Found {len(tables)} tables in database {spec.database}")
             
             return tables
             
@@ -2199,16 +2343,16 @@ class OrganizationDatabaseManager:
             SQLAlchemy async engine
         """
         org_id_str = str(organization_id)
+        spec = cls.get_connection_spec(db_connection_string)
         
-        # Invalidate cache if connection string changed
-        if org_id_str in cls._engines:
-            # Note: In a real implementation, you might want to check if the connection string
-            # has changed and invalidate the cache accordingly
-            pass
+        # Rebuild the engine if the organization's connection string changed
+        cached_spec = cls._engine_specs.get(org_id_str)
+        if org_id_str in cls._engines and cached_spec is not None and cached_spec.asyncpg_url != spec.asyncpg_url:
+            logger.info(f"Connection string changed for organization {org_id_str}, recreating engine")
+            cls.invalidate_cache(organization_id)
         
         if org_id_str not in cls._engines:
-            # Normalize connection string to ensure asyncpg driver
-            db_connection_string = cls.normalize_connection_string(db_connection_string)
+            db_connection_string = spec.asyncpg_url
             
             cls._engines[org_id_str] = create_async_engine(
                 db_connection_string,
@@ -2225,6 +2369,8 @@ class OrganizationDatabaseManager:
                     "command_timeout": 60,
                 },
             )
+            instrument_engine(cls._engines[org_id_str])
+            cls._engine_specs[org_id_str] = spec
             logger.debug(f"Created engine for organization {org_id_str}")
         
         return cls._engines[org_id_str]
@@ -2276,6 +2422,12 @@ class OrganizationDatabaseManager:
             finally:
                 await session.close()
     
+    @classmethod
+    def _dispose_done(cls, task: asyncio.Task) -> None:
+        cls._dispose_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Failed to dispose invalidated organization engine: {task.exception()}")
+    
     @classmethod
     def invalidate_cache(cls, organization_id: UUID) -> None:
         """
@@ -2286,9 +2438,18 @@ class OrganizationDatabaseManager:
             organization_id: Organization UUID
         """
         org_id_str = str(organization_id)
-        if org_id_str in cls._engines:
-            # Note: In a real implementation, you'd want to dispose the engine properly
-            del cls._engines[org_id_str]
+        engine = cls._engines.pop(org_id_str, None)
+        if engine is not None:
+            # Dispose the old pool in the background when called from async code
+            try:
+                task = asyncio.get_running_loop().create_task(engine.dispose())
+            except RuntimeError:
+                pass
+            else:
+                # The loop only keeps weak references to tasks
+                cls._dispose_tasks.add(task)
+                task.add_done_callback(cls._dispose_done)
+        cls._engine_specs.pop(org_id_str, None)
         if org_id_str in cls._sessions:
             del cls._sessions[org_id_str]
         logger.debug(f"Invalidated cache for organization {org_id_str}")
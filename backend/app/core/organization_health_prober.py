@@ -0,0 +1,317 @@
+"""
+Organization Database Health Prober
+
+Checks the health of every organization (tenant) database:
+- Probes all tenants concurrently, bounded by a semaphore and a short per-tenant timeout
+- Reuses the pooled engines from OrganizationDatabaseManager instead of throwaway engines
+- Keeps a rolling window of latencies per tenant to report p50/p95/p99
+- Caches the last fleet snapshot with a TTL; stale snapshots are served immediately
+  while a single background refresh runs
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.organization_database_manager import OrganizationDatabaseManager
+from app.models.organization import Organization
+
+
+# Number of successful probe latencies kept per tenant for percentiles
+LATENCY_WINDOW = 100
+
+STATUS_HEALTHY = "healthy"
+STATUS_UNHEALTHY = "unhealthy"
+STATUS_TIMEOUT = "timeout"
+
+
+def percentile(samples: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a sequence of samples (None if empty)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class TenantHealth:
+    """Result of the last probe of one organization database"""
+    organization_id: UUID
+    slug: str
+    status: str
+    latency_ms: Optional[float]
+    checked_at: datetime
+    error: Optional[str] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    samples: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.status == STATUS_HEALTHY
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "organization_id": str(self.organization_id),
+            "slug": self.slug,
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at.isoformat(),
+            "error": self.error,
+            "latency_percentiles_ms": {
+                "p50": self.p50_ms,
+                "p95": self.p95_ms,
+                "p99": self.p99_ms,
+                "samples": self.samples,
+            },
+        }
+
+
+@dataclass
+class FleetHealthSnapshot:
+    """Health of all organization databases at the end of one probe round"""
+    tenants: List[TenantHealth]
+    started_at: datetime
+    duration_ms: float
+    created_monotonic: float = field(default_factory=time.monotonic, repr=False)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.created_monotonic
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = [t.latency_ms for t in self.tenants if t.latency_ms is not None]
+        unhealthy = sum(1 for t in self.tenants if not t.healthy)
+        return {
+            "status": "healthy" if unhealthy == 0 else ("degraded" if unhealthy < len(self.tenants) else "unhealthy"),
+            "total": len(self.tenants),
+            "healthy": len(self.tenants) - unhealthy,
+            "unhealthy": unhealthy,
+            "checked_at": self.started_at.isoformat(),
+            "age_seconds": round(self.age_seconds, 1),
+            "probe_duration_ms": round(self.duration_ms, 1),
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+            },
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary(),
+            "tenants": [t.to_dict() for t in self.tenants],
+        }
+
+
+class OrganizationHealthProber:
+    """
+    Fleet-wide health prober for organization databases.
+
+    State (snapshot, latency windows, refresh task) is kept at class level,
+    like the engine cache in OrganizationDatabaseManager, so every request
+    in the process shares one snapshot.
+
+    Usage:
+        snapshot = await OrganizationHealthProber.get_snapshot()
+        snapshot.summary()
+    """
+
+    _snapshot: Optional[FleetHealthSnapshot] = None
+    _latencies: Dict[str, Deque[float]] = {}
+    _refresh_task: Optional[asyncio.Task] = None
+    _refresh_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def _lock(cls) -> asyncio.Lock:
+        if cls._refresh_lock is None:
+            cls._refresh_lock = asyncio.Lock()
+        return cls._refresh_lock
+
+    @staticmethod
+    async def _ping(organization_id: UUID, db_connection_string: str) -> None:
+        engine = OrganizationDatabaseManager.get_organization_db_engine(organization_id, db_connection_string)
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    @classmethod
+    def _record_latency(cls, organization_id: UUID, latency_ms: float) -> Deque[float]:
+        window = cls._latencies.get(str(organization_id))
+        if window is None:
+            window = deque(maxlen=LATENCY_WINDOW)
+            cls._latencies[str(organization_id)] = window
+        window.append(latency_ms)
+        return window
+
+    @classmethod
+    async def probe_tenant(
+        cls,
+        organization_id: UUID,
+        slug: str,
+        db_connection_string: str,
+        timeout: float,
+    ) -> TenantHealth:
+        """Probe one organization database with SELECT 1 over its pooled engine"""
+        checked_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        status = STATUS_HEALTHY
+        latency_ms: Optional[float] = None
+        error: Optional[str] = None
+
+        try:
+            await asyncio.wait_for(cls._ping(organization_id, db_connection_string), timeout=timeout)
+            latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        except asyncio.TimeoutError:
+            status = STATUS_TIMEOUT
+            error = f"No response within {timeout:g}s"
+        except Exception as e:
+            status = STATUS_UNHEALTHY
+            error = OrganizationDatabaseManager.mask_connection_string(str(e))[:500]
+
+        if latency_ms is not None:
+            window = cls._record_latency(organization_id, latency_ms)
+        else:
+            window = cls._latencies.get(str(organization_id), ())
+
+        return TenantHealth(
+            organization_id=organization_id,
+            slug=slug,
+            status=status,
+            latency_ms=latency_ms,
+            checked_at=checked_at,
+            error=error,
+            p50_ms=percentile(window, 50),
+            p95_ms=percentile(window, 95),
+            p99_ms=percentile(window, 99),
+            samples=len(window),
+        )
+
+    @classmethod
+    async def probe_all(
+        cls,
+        organizations: Sequence[Organization],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> FleetHealthSnapshot:
+        """Probe the given organizations concurrently and store the resulting snapshot"""
+        concurrency = concurrency or settings.ORG_DB_HEALTH_PROBE_CONCURRENCY
+        timeout = timeout or settings.ORG_DB_HEALTH_PROBE_TIMEOUT
+        semaphore = asyncio.Semaphore(concurrency)
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+
+        async def bounded(org: Organization) -> TenantHealth:
+            async with semaphore:
+                return await cls.probe_tenant(org.id, org.slug, org.db_connection_string, timeout)
+
+        tenants = list(await asyncio.gather(*(bounded(org) for org in organizations)))
+        snapshot = FleetHealthSnapshot(
+            tenants=tenants,
+            started_at=started_at,
+            duration_ms=(time.perf_counter() - start) * 1000,
+        )
+
+        # Forget latency windows of organizations that are no longer probed
+        probed = {str(org.id) for org in organizations}
+        for org_id in list(cls._latencies):
+            if org_id not in probed:
+                cls._latencies.pop(org_id, None)
+
+        cls._snapshot = snapshot
+        unhealthy = [t.slug for t in tenants if not t.healthy]
+        if unhealthy:
+            logger.warning(f"Organization DB health: {len(unhealthy)}/{len(tenants)} unhealthy ({', '.join(unhealthy[:10])})")
+        else:
+            logger.debug(f"Organization DB health: {len(tenants)} tenant(s) healthy in {snapshot.duration_ms:.0f}ms")
+        return snapshot
+
+    @staticmethod
+    async def _load_organizations(db: AsyncSession) -> List[Organization]:
+        query = select(Organization).where(
+            Organization.is_active == True,
+            Organization.db_connection_string.isnot(None),
+        ).order_by(Organization.slug)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    @classmethod
+    async def refresh(cls, db: Optional[AsyncSession] = None) -> FleetHealthSnapshot:
+        """
+        Run a full probe round. Concurrent callers share the same round
+        instead of starting their own.
+        """
+        lock = cls._lock()
+        if lock.locked():
+            async with lock:
+                if cls._snapshot is not None:
+                    return cls._snapshot
+
+        async with lock:
+            if db is not None:
+                organizations = await cls._load_organizations(db)
+            else:
+                from app.core.database import AsyncSessionLocal
+                async with AsyncSessionLocal() as session:
+                    organizations = await cls._load_organizations(session)
+            return await cls.probe_all(organizations)
+
+    @classmethod
+    def _schedule_refresh(cls) -> None:
+        if cls._refresh_task is not None and not cls._refresh_task.done():
+            return
+
+        async def runner() -> None:
+            try:
+                await cls.refresh()
+            except Exception as e:
+                logger.error(f"Organization DB health refresh failed: {e}", exc_info=True)
+
+        cls._refresh_task = asyncio.create_task(runner())
+
+    @classmethod
+    async def get_snapshot(
+        cls,
+        max_age: Optional[float] = None,
+        wait_if_missing: bool = True,
+    ) -> Optional[FleetHealthSnapshot]:
+        """
+        Return the last fleet snapshot without probing inline.
+
+        A snapshot older than max_age (defaults to ORG_DB_HEALTH_CACHE_TTL) is
+        still returned, and a single background refresh is scheduled. When no
+        snapshot exists yet, the first round is awaited unless wait_if_missing
+        is False, in which case None is returned and the round runs in the
+        background.
+        """
+        max_age = settings.ORG_DB_HEALTH_CACHE_TTL if max_age is None else max_age
+        snapshot = cls._snapshot
+
+        if snapshot is None:
+            if wait_if_missing:
+                return await cls.refresh()
+            cls._schedule_refresh()
+            return None
+
+        if snapshot.age_seconds >= max_age:
+            cls._schedule_refresh()
+        return snapshot
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the cached snapshot and latency windows"""
+        cls._snapshot = None
+        cls._latencies.clear()
+        cls._refresh_task = None
+        cls._refresh_lock = None
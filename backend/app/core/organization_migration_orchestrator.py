@@ -0,0 +1,387 @@
+"""
+Organization Migration Orchestrator
+
+Rolls out the organization database schema across all tenants:
+- Reads each tenant's alembic_version concurrently over the pooled async engines
+- Skips tenants already at the target revision
+- Runs the remaining Alembic upgrades in a bounded pool of worker processes:
+  Alembic's context/op proxies are process-global, so two upgrades must never
+  share an interpreter
+- Persists per-tenant progress, durations and failures so a run can be resumed
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.core.organization_database_manager import OrganizationDatabaseManager, ORG_DB_HEAD_REVISION
+from app.models.organization import Organization
+from app.models.organization_migration import OrganizationMigrationRun, OrganizationMigrationStatus
+
+
+# Sentinel used when a tenant's alembic_version could not be read at all
+UNREACHABLE = "__unreachable__"
+
+
+@dataclass
+class TenantRevision:
+    """Current Alembic revision of one organization database"""
+    organization_id: UUID
+    slug: str
+    db_connection_string: str
+    current_revision: Optional[str]
+    error: Optional[str] = None
+
+    @property
+    def reachable(self) -> bool:
+        return self.current_revision != UNREACHABLE
+
+
+class OrganizationMigrationOrchestrator:
+    """
+    Orchestrates migrations for all organization databases.
+
+    Usage:
+        orchestrator = OrganizationMigrationOrchestrator(db, max_workers=8)
+        run = await orchestrator.run()
+        # Later, after an interruption:
+        run = await orchestrator.run(resume_run_id=run.id)
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        target_revision: str = ORG_DB_HEAD_REVISION,
+        max_workers: int = 4,
+        probe_concurrency: int = 20,
+        probe_timeout: float = 10.0,
+    ):
+        """
+        Args:
+            db: Session on the main database (stores run progress)
+            target_revision: Alembic revision every tenant should reach
+            max_workers: Maximum number of concurrent Alembic upgrades (one process each)
+            probe_concurrency: Maximum number of concurrent alembic_version reads
+            probe_timeout: Timeout in seconds for each alembic_version read
+        """
+        self.db = db
+        self.target_revision = target_revision
+        self.max_workers = max(1, max_workers)
+        self.probe_concurrency = max(1, probe_concurrency)
+        self.probe_timeout = probe_timeout
+        # The main session is not safe for concurrent use; serialize progress writes
+        self._db_lock = asyncio.Lock()
+
+    # ============= Revision discovery =============
+
+    @staticmethod
+    async def read_revision(organization: Organization) -> Optional[str]:
+        """
+        Read the current alembic_version of an organization database.
+
+        Uses the pooled engine from OrganizationDatabaseManager so no throwaway
+        connections are created.
+
+        Returns:
+            Revision string, or None if the database has never been migrated
+        """
+        engine = OrganizationDatabaseManager.get_organization_db_engine(
+            organization.id, organization.db_connection_string
+        )
+        async with engine.connect() as conn:
+            try:
+                result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+                return result.scalar_one_or_none()
+            except ProgrammingError:
+                # alembic_version does not exist yet: empty database
+                return None
+
+    async def read_revisions(self, organizations: Sequence[Organization]) -> List[TenantRevision]:
+        """
+        Read alembic_version for all organizations concurrently.
+
+        Args:
+            organizations: Organizations to inspect
+
+        Returns:
+            One TenantRevision per organization, in input order
+        """
+        semaphore = asyncio.Semaphore(self.probe_concurrency)
+
+        async def probe(org: Organization) -> TenantRevision:
+            async with semaphore:
+                try:
+                    revision = await asyncio.wait_for(self.read_revision(org), timeout=self.probe_timeout)
+                    return TenantRevision(org.id, org.slug, org.db_connection_string, revision)
+                except Exception as e:
+                    logger.warning(f"Could not read alembic_version for organization {org.slug}: {e}")
+                    return TenantRevision(org.id, org.slug, org.db_connection_string, UNREACHABLE, error=str(e))
+
+        return list(await asyncio.gather(*(probe(org) for org in organizations)))
+
+    def partition(self, revisions: Sequence[TenantRevision]) -> tuple[List[TenantRevision], List[TenantRevision]]:
+        """
+        Split tenants into (needs_upgrade, up_to_date).
+
+        Unreachable tenants are kept in needs_upgrade so the upgrade attempt
+        records the failure.
+        """
+        needs_upgrade = [r for r in revisions if r.current_revision != self.target_revision]
+        up_to_date = [r for r in revisions if r.current_revision == self.target_revision]
+        return needs_upgrade, up_to_date
+
+    # ============= Run bookkeeping =============
+
+    async def _load_organizations(self, organization_ids: Optional[Sequence[UUID]]) -> List[Organization]:
+        query = select(Organization).where(
+            Organization.is_active == True,
+            Organization.db_connection_string.isnot(None),
+        )
+        if organization_ids:
+            query = query.where(Organization.id.in_(list(organization_ids)))
+        result = await self.db.execute(query.order_by(Organization.slug))
+        return list(result.scalars().all())
+
+    async def start_run(
+        self,
+        started_by: Optional[int] = None,
+        resume_run_id: Optional[UUID] = None,
+    ) -> OrganizationMigrationRun:
+        """
+        Create a new migration run, or reopen an existing one for resumption.
+
+        Raises:
+            ValueError: If the run to resume does not exist or targets another revision
+        """
+        if resume_run_id:
+            run = await self.db.get(OrganizationMigrationRun, resume_run_id)
+            if not run:
+                raise ValueError(f"Migration run {resume_run_id} not found")
+            if run.target_revision != self.target_revision:
+                raise ValueError(
+                    f"Migration run {resume_run_id} targets {run.target_revision}, "
+                    f"cannot resume it with target {self.target_revision}"
+                )
+            run.status = "running"
+            run.finished_at = None
+        else:
+            run = OrganizationMigrationRun(
+                target_revision=self.target_revision,
+                status="running",
+                started_by=started_by,
+            )
+            self.db.add(run)
+        await self.db.commit()
+        await self.db.refresh(run)
+        return run
+
+    async def _completed_organizations(self, run_id: UUID) -> set:
+        result = await self.db.execute(
+            select(OrganizationMigrationStatus.organization_id).where(
+                OrganizationMigrationStatus.run_id == run_id,
+                OrganizationMigrationStatus.status.in_(["succeeded", "skipped"]),
+            )
+        )
+        return set(result.scalars().all())
+
+    async def _upsert_status(self, run_id: UUID, organization_id: UUID, **values) -> None:
+        async with self._db_lock:
+            result = await self.db.execute(
+                select(OrganizationMigrationStatus).where(
+                    OrganizationMigrationStatus.run_id == run_id,
+                    OrganizationMigrationStatus.organization_id == organization_id,
+                )
+            )
+            row = result.scalar_one_or_none()
+            if row is None:
+                row = OrganizationMigrationStatus(run_id=run_id, organization_id=organization_id)
+                self.db.add(row)
+            for key, value in values.items():
+                setattr(row, key, value)
+            await self.db.commit()
+
+    async def _finish_run(self, run: OrganizationMigrationRun) -> None:
+        async with self._db_lock:
+            result = await self.db.execute(
+                select(OrganizationMigrationStatus.status).where(OrganizationMigrationStatus.run_id == run.id)
+            )
+            statuses = list(result.scalars().all())
+            run.total_count = len(statuses)
+            run.succeeded_count = statuses.count("succeeded")
+            run.failed_count = statuses.count("failed")
+            run.skipped_count = statuses.count("skipped")
+            run.status = "failed" if run.failed_count else "completed"
+            run.finished_at = datetime.now(timezone.utc)
+            await self.db.commit()
+            await self.db.refresh(run)
+
+    # ============= Execution =============
+
+    async def _upgrade_tenant(
+        self,
+        run_id: UUID,
+        tenant: TenantRevision,
+        executor: Executor,
+    ) -> bool:
+        started_at = datetime.now(timezone.utc)
+        from_revision = tenant.current_revision if tenant.reachable else None
+        await self._upsert_status(
+            run_id,
+            tenant.organization_id,
+            status="running",
+            from_revision=from_revision,
+            started_at=started_at,
+            finished_at=None,
+            error=None,
+        )
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                executor,
+                OrganizationDatabaseManager.run_migrations_for_organization_sync,
+                tenant.db_connection_string,
+            )
+        except Exception as e:
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            logger.error(f"Migration failed for organization {tenant.slug} after {duration_ms}ms: {e}")
+            await self._upsert_status(
+                run_id,
+                tenant.organization_id,
+                status="failed",
+                duration_ms=duration_ms,
+                error=str(e)[:4000],
+                finished_at=datetime.now(timezone.utc),
+            )
+            return False
+
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        logger.info(f"Migrated organization {tenant.slug} {from_revision} -> {self.target_revision} in {duration_ms}ms")
+        await self._upsert_status(
+            run_id,
+            tenant.organization_id,
+            status="succeeded",
+            to_revision=self.target_revision,
+            duration_ms=duration_ms,
+            finished_at=datetime.now(timezone.utc),
+        )
+        return True
+
+    async def execute(
+        self,
+        run: OrganizationMigrationRun,
+        organization_ids: Optional[Sequence[UUID]] = None,
+    ) -> OrganizationMigrationRun:
+        """
+        Migrate organization databases within an already started run.
+
+        Tenants the run has already completed (succeeded or skipped) are not
+        touched again, which is what makes a run resumable.
+
+        Args:
+            run: Run returned by start_run()
+            organization_ids: Restrict the run to these organizations (default: all active)
+
+        Returns:
+            The finished OrganizationMigrationRun with aggregated counters
+        """
+        organizations = await self._load_organizations(organization_ids)
+        done = await self._completed_organizations(run.id)
+        if done:
+            organizations = [org for org in organizations if org.id not in done]
+            logger.info(f"Resuming migration run {run.id}: {len(done)} tenant(s) already done")
+
+        revisions = await self.read_revisions(organizations)
+        needs_upgrade, up_to_date = self.partition(revisions)
+        logger.info(
+            f"Migration run {run.id}: {len(needs_upgrade)} tenant(s) to upgrade, "
+            f"{len(up_to_date)} already at {self.target_revision}"
+        )
+
+        for tenant in up_to_date:
+            await self._upsert_status(
+                run.id,
+                tenant.organization_id,
+                status="skipped",
+                from_revision=tenant.current_revision,
+                to_revision=tenant.current_revision,
+                duration_ms=0,
+            )
+        for tenant in needs_upgrade:
+            await self._upsert_status(
+                run.id,
+                tenant.organization_id,
+                status="pending",
+                from_revision=tenant.current_revision if tenant.reachable else None,
+            )
+
+        if needs_upgrade:
+            # The semaphore keeps "running" statuses accurate while tenants wait for a worker
+            semaphore = asyncio.Semaphore(self.max_workers)
+
+            async def upgrade(tenant: TenantRevision) -> bool:
+                async with semaphore:
+                    return await self._upgrade_tenant(run.id, tenant, executor)
+
+            # One upgrade at a time per process; spawn so workers do not inherit the event loop or pools
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                await asyncio.gather(*(upgrade(tenant) for tenant in needs_upgrade))
+
+        await self._finish_run(run)
+        logger.info(
+            f"Migration run {run.id} {run.status}: {run.succeeded_count} succeeded, "
+            f"{run.failed_count} failed, {run.skipped_count} skipped"
+        )
+        return run
+
+    async def run(
+        self,
+        organization_ids: Optional[Sequence[UUID]] = None,
+        resume_run_id: Optional[UUID] = None,
+        started_by: Optional[int] = None,
+    ) -> OrganizationMigrationRun:
+        """
+        Migrate all active organization databases to the target revision.
+
+        Args:
+            organization_ids: Restrict the run to these organizations (default: all active)
+            resume_run_id: Continue an earlier run, skipping tenants it already completed
+            started_by: User ID that triggered the run
+
+        Returns:
+            The finished OrganizationMigrationRun with aggregated counters
+        """
+        run = await self.start_run(started_by=started_by, resume_run_id=resume_run_id)
+        return await self.execute(run, organization_ids=organization_ids)
+
+
+async def get_migration_run_statuses(db: AsyncSession, run_id: UUID) -> Dict[str, object]:
+    """
+    Load a migration run with its per-tenant statuses.
+
+    Returns:
+        Dict with "run" and "tenants" keys, or an empty dict if the run does not exist
+    """
+    run = await db.get(OrganizationMigrationRun, run_id)
+    if not run:
+        return {}
+    result = await db.execute(
+        select(OrganizationMigrationStatus)
+        .where(OrganizationMigrationStatus.run_id == run_id)
+        .order_by(OrganizationMigrationStatus.id)
+    )
+    return {"run": run, "tenants": list(result.scalars().all())}
@@ -0,0 +1,208 @@
+"""
+Query Instrumentation
+Counts and times every SQL statement through SQLAlchemy engine events
+
+- instrument_engine() hooks the main engine and each organization engine
+- QueryInstrumentationMiddleware collects, per request, the number of
+  statements, the total database time and how often each statement shape
+  (the SQL with its parameters and literals erased) was executed
+- the totals are sent in a Server-Timing header, shapes executed at least
+  QUERY_N_PLUS_ONE_THRESHOLD times are logged as N+1 patterns
+- routes may declare a query budget with @query_budget(n): exceeding it is
+  logged, or fails the request when QUERY_BUDGET_STRICT is set (tests)
+- assert_max_queries(n) gives the same check around any block of code
+
+Slow statements (SLOW_QUERY_THRESHOLD) are logged whether or not a request
+is being tracked.
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.asgi import on_response_start
+from app.core.config import settings
+from app.core.logging import logger
+
+
+_SHAPE_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+(?:::\w+(?:\[\])?)?"), "?"),
+    (re.compile(r"%\(\w+\)s|%s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+)
+
+_START_ATTRIBUTE = "_query_instrumentation_start"
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """More statements than allowed were executed"""
+
+
+def statement_shape(statement: str) -> str:
+    """SQL statement with its parameters and literals erased (IN lists collapsed)"""
+    shape = statement
+    for pattern, replacement in _SHAPE_PATTERNS:
+        shape = pattern.sub(replacement, shape)
+    return shape.strip()
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while tracking (a request or an assert_max_queries block)"""
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements executed in this block (and the tasks it starts)"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than max_queries statements.
+
+    Usage:
+        with assert_max_queries(2):
+            await list_posts(...)
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(_budget_message("Query budget exceeded", stats, max_queries))
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declare the maximum number of statements of a route (checked by the middleware).
+
+    Usage:
+        @router.get("/posts")
+        @query_budget(4)
+        async def list_posts(...):
+            ...
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+def _budget_message(scope: str, stats: QueryStats, max_queries: int) -> str:
+    top = "; ".join(f"{count}x {shape[:120]}" for shape, count in stats.shapes.most_common(3))
+    return f"{scope}: {stats.count} queries executed, budget is {max_queries} ({top})"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        setattr(context, _START_ATTRIBUTE, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, _START_ATTRIBUTE, None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration > settings.SLOW_QUERY_THRESHOLD:
+        logger.warning(
+            f"Slow query detected ({duration:.3f}s > {settings.SLOW_QUERY_THRESHOLD}s threshold)",
+            extra={
+                "query": statement[:500],
+                "execution_time": duration,
+                "threshold": settings.SLOW_QUERY_THRESHOLD,
+            }
+        )
+
+
+def instrument_engine(engine) -> None:
+    """Time the statements of an engine (sync or async); safe to call more than once"""
+    if not settings.QUERY_INSTRUMENTATION_ENABLED:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not isinstance(sync_engine, Engine):
+        return
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryInstrumentationMiddleware:
+    """Middleware reporting the statements executed by each request, pure ASGI"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            # The endpoint has run when the response starts: report then, as
+            # statements executed while a body streams are not attributed
+            def report(message: Message, headers: MutableHeaders) -> None:
+                if stats.count == 0:
+                    return
+
+                if settings.QUERY_SERVER_TIMING_ENABLED:
+                    headers.append("Server-Timing", stats.server_timing())
+
+                route = f"{scope['method']} {scope['path']}"
+                for shape, count in stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+                    logger.warning(
+                        f"N+1 query pattern on {route}: {count} executions of the same statement",
+                        extra={"query": shape[:500], "occurrences": count, "route": route},
+                    )
+
+                max_queries = getattr(scope.get("endpoint"), "__query_budget__", None)
+                if max_queries is not None and stats.count > max_queries:
+                    budget = _budget_message(route, stats, max_queries)
+                    if settings.QUERY_BUDGET_STRICT:
+                        raise QueryBudgetExceeded(budget)
+                    logger.warning(f"Query budget exceeded on {budget}")
+
+            await self.app(scope, receive, on_response_start(send, report))
@@ -3,8 +3,9 @@ Database Query Optimization Utilities
 Provides utilities for optimizing database queries
 """
 
-from typing import Optional, List, Any
-from sqlalchemy import select, func, and_, or_
+import asyncio
+from typing import Optional, List, Any, Dict, Iterable, Sequence, Set
+from sqlalchemy import select, func, and_, or_, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload, contains_eager
 from sqlalchemy.sql import Select
@@ -172,3 +173,141 @@ class QueryCache:
         
         return list(data)
 
+
+
+# Key of the request's loaders in AsyncSession.info (sessions are per request)
+BATCH_LOADERS_INFO_KEY = "batch_loaders"
+
+
+class BatchLoader:
+    """
+    Request-scoped batch loader (DataLoader pattern)
+    
+    Collects the keys needed to build a response (e.g. the author_id of every
+    post of a page) and resolves them with one ``WHERE key IN (...)`` query per
+    entity type instead of one query per row. Resolved objects, and misses, are
+    cached for the rest of the request.
+    
+    - load_many(keys): resolve a collection of keys at once
+    - load(key): load() calls awaited together (asyncio.gather) share one query
+    - prime(key, obj): seed the cache with an object already in hand
+    
+    Usage:
+        users = BatchLoader.for_session(db, User)
+        authors = await users.load_many(post.author_id for post in posts)
+        author = authors.get(post.author_id)
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        model: Any,
+        key: Any = None,
+        options: Sequence[Any] = (),
+        chunk_size: int = 1000,
+    ):
+        """
+        Args:
+            db: Database session (loaders must not outlive it)
+            model: Mapped class to load
+            key: Column attribute matched by the keys (default: primary key)
+            options: Loader options added to the query (e.g. selectinload)
+            chunk_size: Maximum keys per IN list
+        """
+        if key is None:
+            mapper = inspect(model)
+            key = getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+        self.db = db
+        self.model = model
+        self.key = key
+        self.options = tuple(options)
+        self.chunk_size = chunk_size
+        self.queries = 0
+        self._cache: Dict[Any, Any] = {}
+        self._waiting: Dict[Any, asyncio.Future] = {}
+        self._scheduled = False
+        # Dispatch tasks in flight (the loop only keeps weak references to tasks)
+        self._tasks: Set[asyncio.Task] = set()
+    
+    @classmethod
+    def for_session(cls, db: AsyncSession, model: Any, key: Any = None) -> "BatchLoader":
+        """Loader of the model shared by everything that uses this session"""
+        loaders = db.info.setdefault(BATCH_LOADERS_INFO_KEY, {})
+        loader_key = (model, key.key if key is not None else None)
+        loader = loaders.get(loader_key)
+        if loader is None:
+            loader = loaders[loader_key] = cls(db, model, key)
+        return loader
+    
+    def prime(self, key: Any, obj: Any) -> None:
+        """Cache an object already loaded (no query for its key)"""
+        if key is not None:
+            self._cache[key] = obj
+    
+    def clear(self, key: Any = None) -> None:
+        """Forget a key (or everything) after a write"""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+    
+    async def load_many(self, keys: Iterable[Any]) -> Dict[Any, Any]:
+        """
+        Objects of the keys (None keys are ignored)
+        
+        Returns:
+            Dict of key -> object, without the keys that match nothing
+        """
+        wanted = {key for key in keys if key is not None}
+        missing = [key for key in wanted if key not in self._cache]
+        if missing:
+            await self._fetch(missing)
+        return {key: self._cache[key] for key in wanted if self._cache.get(key) is not None}
+    
+    async def load(self, key: Any) -> Optional[Any]:
+        """Object of one key; concurrent calls are batched into one query"""
+        if key is None:
+            return None
+        if key in self._cache:
+            return self._cache[key]
+        
+        future = self._waiting.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._waiting[key] = loop.create_future()
+            if not self._scheduled:
+                # Dispatch once the other tasks of this tick have queued their keys
+                self._scheduled = True
+                loop.call_soon(self._start_dispatch)
+        return await future
+    
+    def _start_dispatch(self) -> None:
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _dispatch(self) -> None:
+        waiting, self._waiting, self._scheduled = self._waiting, {}, False
+        try:
+            await self._fetch([key for key in waiting if key not in self._cache])
+        except Exception as e:
+            for future in waiting.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in waiting.items():
+            if not future.done():
+                future.set_result(self._cache.get(key))
+    
+    async def _fetch(self, keys: List[Any]) -> None:
+        for start in range(0, len(keys), self.chunk_size):
+            chunk = keys[start:start + self.chunk_size]
+            query = select(self.model).where(self.key.in_(chunk))
+            if self.options:
+                query = query.options(*self.options)
+            result = await self.db.execute(query)
+            self.queries += 1
+            for obj in result.scalars().all():
+                self._cache[getattr(obj, self.key.key)] = obj
+            for key in chunk:
+                self._cache.setdefault(key, None)
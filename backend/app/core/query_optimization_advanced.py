@@ -3,12 +3,14 @@ Advanced Query Optimization Utilities
 Query plan analysis, N+1 detection, and optimization helpers
 """
 
+from collections import Counter
 from typing import Any, Optional, List, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, inspect
 from sqlalchemy.engine import Result
 from app.core.logging import logger
 from app.core.cache_enhanced import cache_query
+from app.core.query_instrumentation import statement_shape
 
 
 class QueryAnalyzer:
@@ -162,32 +164,34 @@ class QueryOptimizer:
     """Optimize database queries"""
     
     @staticmethod
-    def detect_n_plus_one(queries: List[str]) -> List[Dict[str, Any]]:
+    def detect_n_plus_one(queries: List[str], threshold: int = 5) -> List[Dict[str, Any]]:
         """
         Detect potential N+1 query patterns
         
+        Queries are grouped by shape (parameters and literals erased), so the
+        same statement run for different ids is counted together. Requests are
+        checked automatically by QueryInstrumentationMiddleware.
+        
         Args:
             queries: List of query strings
+            threshold: Occurrences of a shape reported as N+1
             
         Returns:
             List of detected N+1 patterns
         """
-        n_plus_one_patterns = []
-        
-        # Simple pattern detection
-        for i, query in enumerate(queries):
-            # Look for queries in loops (simplified detection)
-            if "SELECT" in query.upper() and "WHERE" in query.upper():
-                # Check if this query pattern appears multiple times
-                count = queries.count(query)
-                if count > 5:  # Threshold for N+1 detection
-                    n_plus_one_patterns.append({
-                        "query": query[:100],
-                        "occurrences": count,
-                        "suggestion": "Consider using JOIN or eager loading",
-                    })
-        
-        return n_plus_one_patterns
+        shapes = Counter(
+            statement_shape(query) for query in queries
+            if "SELECT" in query.upper() and "WHERE" in query.upper()
+        )
+        return [
+            {
+                "query": shape[:100],
+                "occurrences": count,
+                "suggestion": "Consider using JOIN or eager loading",
+            }
+            for shape, count in shapes.most_common()
+            if count >= threshold
+        ]
     
     @staticmethod
     async def suggest_indexes(session: AsyncSession, table_name: str, column_name: str) -> List[str]:
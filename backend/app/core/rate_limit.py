@@ -33,6 +33,7 @@ from datetime import datetime, timedelta
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import RATE_LIMIT_REJECTIONS, route_template
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
 from app.core.database import AsyncSessionLocal
 
@@ -42,21 +43,15 @@ def get_storage_uri() -> str:
     Get storage URI for rate limiter.
     
     Prioritizes Redis for distributed rate limiting across multiple instances.
-    Falls back to in-memory storage if Redis is unavailable.
+    Redis is not contacted here (no blocking ping at import); if it is
+    unreachable at request time, the limiter falls back to in-memory storage
+    (see in_memory_fallback_enabled below).
     
     @returns Storage URI string (Redis URL or "memory://")
     """
     if settings.REDIS_URL:
-        try:
-            # Verify Redis is available
-            import redis
-            redis_client = redis.from_url(settings.REDIS_URL)
-            redis_client.ping()
-            logger.info("Using Redis for distributed rate limiting")
-            return settings.REDIS_URL
-        except Exception as e:
-            logger.warning(f"Redis not available for rate limiting, using memory: {e}")
-            return "memory://"
+        logger.info("Using Redis for distributed rate limiting (in-memory fallback if unreachable)")
+        return settings.REDIS_URL
     logger.info("Using in-memory rate limiting (Redis not configured)")
     return "memory://"
 
@@ -94,7 +89,8 @@ def get_rate_limit_key(request: Request) -> str:
 limiter = Limiter(
     key_func=get_rate_limit_key,
     default_limits=["1000/hour"],  # Default limit: 1000 requests per hour
-    storage_uri=get_storage_uri(),  # Redis if available, otherwise memory
+    storage_uri=get_storage_uri(),  # Redis if configured, otherwise memory
+    in_memory_fallback_enabled=True,  # Use memory while Redis is unreachable
     headers_enabled=True,  # Enable rate limit headers in responses
 )
 
@@ -213,6 +209,8 @@ def setup_rate_limiting(app) -> Any:
         
         Returns 429 Too Many Requests with rate limit information in headers.
         """
+        RATE_LIMIT_REJECTIONS.inc((route_template(request.scope),))
+        
         # Log rate limit exceeded event
         try:
             # Get user from request state if available
@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any
 from app.api.v1.endpoints.websocket import manager
 from app.core.realtime_config import WEBSOCKET_EVENTS
 from app.core.logging import logger
+from app.services.realtime_channel import publish_user_message
 
 
 async def emit_event(
@@ -46,8 +47,8 @@ async def emit_event(
             logger.debug(f"Event {event_type} sent to room {room_id}")
             
         elif user_id:
-            # Send to specific user
-            await manager.send_personal_message(message, user_id)
+            # Send to specific user (through the realtime channel: the user may be connected to another process)
+            await publish_user_message(user_id, message)
             logger.debug(f"Event {event_type} sent to user {user_id}")
             
         else:
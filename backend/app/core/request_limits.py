@@ -3,33 +3,40 @@ Request Size Limits Middleware
 Prevents DoS attacks by limiting request body size
 """
 
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.core.asgi import send_error
 
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware to limit request body size"""
+
+class RequestSizeLimitMiddleware:
+    """Middleware to limit request body size, pure ASGI"""
     
     # Default limits (in bytes)
     DEFAULT_LIMIT = 10 * 1024 * 1024  # 10 MB
     JSON_LIMIT = 1 * 1024 * 1024  # 1 MB for JSON
     FILE_UPLOAD_LIMIT = 50 * 1024 * 1024  # 50 MB for file uploads
     
-    def __init__(self, app, default_limit: int = None, json_limit: int = None, file_upload_limit: int = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, default_limit: int = None, json_limit: int = None, file_upload_limit: int = None):
+        self.app = app
         self.default_limit = default_limit or self.DEFAULT_LIMIT
         self.json_limit = json_limit or self.JSON_LIMIT
         self.file_upload_limit = file_upload_limit or self.FILE_UPLOAD_LIMIT
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Check request size before processing"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        content_length = request.headers.get("content-length")
+        headers = Headers(scope=scope)
+        content_length = headers.get("content-length")
         
         if content_length:
             try:
                 size = int(content_length)
-                content_type = request.headers.get("content-type", "").lower()
+                content_type = headers.get("content-type", "").lower()
                 
                 # Determine limit based on content type
                 if "multipart/form-data" in content_type or "application/octet-stream" in content_type:
@@ -40,14 +47,15 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
                     limit = self.default_limit
                 
                 if size > limit:
-                    raise HTTPException(
+                    await send_error(
+                        scope, receive, send,
                         status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                         detail=f"Request body too large. Maximum size: {limit / (1024 * 1024):.1f} MB"
                     )
+                    return
             except ValueError:
                 # Invalid content-length header, continue
                 pass
         
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
@@ -7,18 +7,19 @@ import hmac
 import hashlib
 import time
 from typing import Optional
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request, status
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.core.asgi import send_error
 from app.core.config import settings
 from app.core.logging import logger
 
 
-class RequestSigningMiddleware(BaseHTTPMiddleware):
-    """Middleware to verify request signatures"""
+class RequestSigningMiddleware:
+    """Middleware to verify request signatures, pure ASGI"""
     
-    def __init__(self, app, secret_key: str, header_name: str = "X-Signature", timestamp_header: str = "X-Timestamp", max_age: int = 300):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, secret_key: str, header_name: str = "X-Signature", timestamp_header: str = "X-Timestamp", max_age: int = 300):
+        self.app = app
         self.secret_key = secret_key
         self.header_name = header_name
         self.timestamp_header = timestamp_header
@@ -70,13 +71,16 @@ class RequestSigningMiddleware(BaseHTTPMiddleware):
         # Use constant-time comparison to prevent timing attacks
         return hmac.compare_digest(signature, expected_signature)
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and verify signature"""
         
         # Skip signature verification for safe methods (GET, HEAD, OPTIONS)
-        if request.method in ("GET", "HEAD", "OPTIONS"):
-            return await call_next(request)
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
         
+        request = Request(scope)
+
         # Get signature and timestamp from headers
         signature = request.headers.get(self.header_name)
         timestamp = request.headers.get(self.timestamp_header)
@@ -92,13 +96,14 @@ class RequestSigningMiddleware(BaseHTTPMiddleware):
         if signature and timestamp:
             # Verify signature
             if not self.verify_signature(request, signature, timestamp):
-                raise HTTPException(
+                await send_error(
+                    scope, receive, send,
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid request signature"
                 )
+                return
         
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
 
 def compute_request_signature(method: str, path: str, body: str, timestamp: str, secret_key: str) -> str:
@@ -3,10 +3,12 @@ Security Audit Logging
 Comprehensive security event logging for audit trails
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from enum import Enum
-from sqlalchemy import Column, DateTime, Integer, String, Text, JSON, Index, func
+from sqlalchemy import (
+    DDL, BigInteger, Column, DateTime, Integer, String, Text, JSON, Index, Sequence, event, func,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import Base, AsyncSessionLocal
@@ -54,29 +56,42 @@ class SecurityEventType(str, Enum):
 
 
 class SecurityAuditLog(Base):
-    """Security audit log model"""
+    """
+    Security audit log model
+
+    Range-partitioned by month on timestamp (see app/services/audit_log_storage.py),
+    so the primary key includes timestamp.
+    """
     __tablename__ = "security_audit_logs"
     __table_args__ = (
-        Index("idx_security_audit_user_id", "user_id"),
-        Index("idx_security_audit_event_type", "event_type"),
-        Index("idx_security_audit_timestamp", "timestamp"),
+        Index("idx_security_audit_user_timestamp", "user_id", "timestamp", "id"),
+        Index("idx_security_audit_event_type_timestamp", "event_type", "timestamp"),
+        Index("idx_security_audit_timestamp_id", "timestamp", "id"),
         Index("idx_security_audit_ip_address", "ip_address"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    id = Column(BigInteger, Sequence("security_audit_logs_id_seq"), primary_key=True)
+    # Set when the event happens, not when a batch is flushed
+    timestamp = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
     
     # Event details
-    event_type = Column(String(50), nullable=False, index=True)
+    event_type = Column(String(50), nullable=False)
     severity = Column(String(20), default="info", nullable=False)  # info, warning, error, critical
     
     # User context
-    user_id = Column(Integer, nullable=True, index=True)
+    user_id = Column(Integer, nullable=True)
     user_email = Column(String(255), nullable=True)  # Denormalized for audit trail
     api_key_id = Column(Integer, nullable=True)  # If event was via API key
     
     # Request context
-    ip_address = Column(String(45), nullable=True, index=True)  # IPv4 or IPv6
+    ip_address = Column(String(45), nullable=True)  # IPv4 or IPv6
     user_agent = Column(String(500), nullable=True)
     request_method = Column(String(10), nullable=True)
     request_path = Column(String(500), nullable=True)
@@ -92,6 +107,32 @@ class SecurityAuditLog(Base):
         return f"<SecurityAuditLog(id={self.id}, event_type={self.event_type}, user_id={self.user_id}, timestamp={self.timestamp})>"
 
 
+# Rows outside every monthly partition land here until the partition is created
+event.listen(
+    SecurityAuditLog.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS security_audit_logs_default "
+        "PARTITION OF security_audit_logs DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+class SecurityAuditStatsHourly(Base):
+    """Hourly event counts per user, maintained with every audit log write"""
+    __tablename__ = "security_audit_stats_hourly"
+    __table_args__ = (
+        Index("idx_security_audit_stats_bucket", "bucket"),
+    )
+    
+    user_id = Column(Integer, primary_key=True)  # 0 for events without a user
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Start of the hour (UTC)
+    event_type = Column(String(50), primary_key=True)
+    severity = Column(String(20), primary_key=True)
+    success = Column(String(10), primary_key=True)
+    event_count = Column(BigInteger, nullable=False, default=0)
+
+
 class SecurityAuditLogger:
     """Security audit logger"""
     
@@ -130,35 +171,47 @@ class SecurityAuditLogger:
             metadata: Additional structured data
         
         Returns:
-            Created SecurityAuditLog record, or None if logging failed
+            Created SecurityAuditLog record (not yet flushed when batched), or None if logging failed
         """
-        # Use provided session or create a new one for audit logging
+        from app.services.audit_log_storage import AuditLogWriter, event_row, record_stats
+        
+        audit_log = SecurityAuditLog(
+            timestamp=datetime.now(timezone.utc),
+            event_type=event_type.value,
+            description=description,
+            user_id=user_id,
+            user_email=user_email,
+            api_key_id=api_key_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            request_method=request_method,
+            request_path=request_path,
+            severity=severity,
+            success=success,
+            event_metadata=metadata or {},
+        )
+        
+        # Without a session, the API process hands the event to the batched writer
+        # (inserted within AUDIT_LOG_FLUSH_INTERVAL, id not assigned yet)
+        writer = AuditLogWriter.get() if db is None else None
+        
+        # Otherwise use the provided session or create a new one for audit logging
         # Creating a separate session ensures the log is saved even if the main transaction fails
-        use_separate_session = db is None
+        use_separate_session = db is None and writer is None
         if use_separate_session:
             db = AsyncSessionLocal()
         
         try:
-            audit_log = SecurityAuditLog(
-                event_type=event_type.value,
-                description=description,
-                user_id=user_id,
-                user_email=user_email,
-                api_key_id=api_key_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_method=request_method,
-                request_path=request_path,
-                severity=severity,
-                success=success,
-                event_metadata=metadata or {},
-            )
-            
-            db.add(audit_log)
-            # Commit immediately to ensure the audit log is saved
-            # This is critical for security audit logs - they must be persisted
-            await db.commit()
-            await db.refresh(audit_log)
+            if writer is not None:
+                writer.enqueue(event_row(audit_log))
+            else:
+                db.add(audit_log)
+                await db.flush()
+                await record_stats(db, [event_row(audit_log)])
+                # Commit immediately to ensure the audit log is saved
+                # This is critical for security audit logs - they must be persisted
+                await db.commit()
+                await db.refresh(audit_log)
             
             # Also log to application logger
             log_context = {
@@ -181,7 +234,8 @@ class SecurityAuditLogger:
         except Exception as e:
             # Rollback on error
             try:
-                await db.rollback()
+                if db is not None:
+                    await db.rollback()
             except Exception:
                 pass  # Ignore rollback errors
             
@@ -4,7 +4,7 @@ Tenancy Metrics and Monitoring
 Provides metrics and monitoring capabilities for multi-tenancy.
 """
 
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List
 from datetime import datetime, timedelta
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -144,6 +144,17 @@ class TenancyMetrics:
         }
         
         # Count resources for each tenant-aware model
+        for name, model_class in TenancyMetrics.tenant_resource_models():
+            count = await TenancyMetrics.get_tenant_resource_count(
+                db, model_class, tenant_id
+            )
+            stats["resources"][name] = count
+        
+        return stats
+    
+    @staticmethod
+    def tenant_resource_models() -> List[tuple]:
+        """(name, model class) of the counted resources that are tenant-aware"""
         from app.models.project import Project
         from app.models.form import Form
         from app.models.page import Page
@@ -155,15 +166,64 @@ class TenancyMetrics:
             ("pages", Page),
             ("menus", Menu),
         ]
+        return [(name, model_class) for name, model_class in models if hasattr(model_class, 'team_id')]
+    
+    @staticmethod
+    async def collect_tenant_statistics(
+        db: AsyncSession,
+        tenant_ids: Iterable[int]
+    ) -> Dict[int, Dict]:
+        """
+        Get statistics for many tenants at once.
+        
+        Runs one grouped query per counted table, whatever the number of tenants.
+        
+        Args:
+            db: Database session
+            tenant_ids: Tenant IDs
+        
+        Returns:
+            Dictionary of tenant ID -> statistics (same shape as get_tenant_statistics)
+        """
+        tenant_ids = list(tenant_ids)
+        if not TenancyConfig.is_enabled() or not tenant_ids:
+            return {}
         
-        for name, model_class in models:
-            if hasattr(model_class, 'team_id'):
-                count = await TenancyMetrics.get_tenant_resource_count(
-                    db, model_class, tenant_id
+        from app.models.team import TeamMember
+        
+        resource_models = TenancyMetrics.tenant_resource_models()
+        statistics = {
+            tenant_id: {
+                "tenant_id": tenant_id,
+                "users": 0,
+                "resources": {name: 0 for name, _ in resource_models},
+            }
+            for tenant_id in tenant_ids
+        }
+        
+        result = await db.execute(
+            select(TeamMember.team_id, func.count(TeamMember.user_id))
+            .where(
+                and_(
+                    TeamMember.team_id.in_(tenant_ids),
+                    TeamMember.is_active == True
                 )
-                stats["resources"][name] = count
+            )
+            .group_by(TeamMember.team_id)
+        )
+        for tenant_id, count in result.all():
+            statistics[tenant_id]["users"] = count
+        
+        for name, model_class in resource_models:
+            result = await db.execute(
+                select(model_class.team_id, func.count(model_class.id))
+                .where(model_class.team_id.in_(tenant_ids))
+                .group_by(model_class.team_id)
+            )
+            for tenant_id, count in result.all():
+                statistics[tenant_id]["resources"][name] = count
         
-        return stats
+        return statistics
     
     @staticmethod
     async def get_all_tenants_statistics(db: AsyncSession) -> List[Dict]:
@@ -187,14 +247,9 @@ class TenancyMetrics:
         )
         tenant_ids = [row[0] for row in result.fetchall()]
         
-        # Get statistics for each tenant
-        statistics = []
-        for tenant_id in tenant_ids:
-            stats = await TenancyMetrics.get_tenant_statistics(db, tenant_id)
-            if stats:
-                statistics.append(stats)
-        
-        return statistics
+        # Grouped counts for every tenant
+        statistics = await TenancyMetrics.collect_tenant_statistics(db, tenant_ids)
+        return [statistics[tenant_id] for tenant_id in tenant_ids]
     
     @staticmethod
     async def get_system_statistics(db: AsyncSession) -> Dict:
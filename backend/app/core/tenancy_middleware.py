@@ -11,14 +11,16 @@ This middleware is conditionally enabled based on TENANCY_MODE.
 """
 
 from typing import Optional
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.core.asgi import send_error
 from app.core.tenancy import TenancyConfig, set_current_tenant, get_current_tenant, clear_current_tenant
 from app.core.logging import logger
 
 
-class TenancyMiddleware(BaseHTTPMiddleware):
+class TenancyMiddleware:
     """
     Middleware to extract tenant from request and set it in context.
     
@@ -29,27 +31,34 @@ class TenancyMiddleware(BaseHTTPMiddleware):
     3. User's primary team (if authenticated)
     
     The tenant ID is stored in a context variable for use in query scoping.
+    Pure ASGI: the endpoint runs in the context the tenant was set in.
     """
     
-    def __init__(self, app, header_name: str = "X-Tenant-ID", query_param: str = "tenant_id"):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, header_name: str = "X-Tenant-ID", query_param: str = "tenant_id"):
+        self.app = app
         self.header_name = header_name
         self.query_param = query_param
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and extract tenant ID.
         
         If tenancy is disabled, this middleware does nothing.
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Clear tenant context at start of request
         clear_current_tenant()
         
         # If tenancy is disabled, skip middleware logic
         if TenancyConfig.is_single_mode():
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
+            return
         
+        request = Request(scope)
+
         tenant_id: Optional[int] = None
         
         # Strategy 1: Check X-Tenant-ID header (highest priority)
@@ -59,10 +68,12 @@ class TenancyMiddleware(BaseHTTPMiddleware):
                 tenant_id = int(tenant_header)
             except (ValueError, TypeError):
                 logger.warning(f"Invalid {self.header_name} header value: {tenant_header}")
-                raise HTTPException(
+                await send_error(
+                    scope, receive, send,
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Invalid {self.header_name} header. Must be an integer."
                 )
+                return
         
         # Strategy 2: Check query parameter (for testing/admin)
         if tenant_id is None:
@@ -84,10 +95,8 @@ class TenancyMiddleware(BaseHTTPMiddleware):
             logger.debug(f"Tenant context set: {tenant_id}")
         
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send)
         finally:
             # Always clear tenant context after request
             clear_current_tenant()
-        
-        return response
 
@@ -8,6 +8,7 @@ from sqlalchemy.orm import declarative_base, sessionmaker
 
 # Import settings to get DATABASE_URL
 from app.core.config import settings
+from app.core.query_instrumentation import instrument_engine
 
 # Get database URL from settings and ensure it uses asyncpg
 DATABASE_URL = str(settings.DATABASE_URL).strip()
@@ -49,6 +50,7 @@ engine = create_async_engine(
     pool_size=20,
     max_overflow=0,
 )
+instrument_engine(engine)
 
 # Create session factory
 AsyncSessionLocal = sessionmaker(
@@ -6,7 +6,7 @@ Configured with OpenAPI/Swagger auto-generation
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
@@ -15,9 +15,8 @@ from pydantic import ValidationError as PydanticValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import close_db
 from app.core.cache import init_cache, close_cache
-from app.core.migrations import ensure_theme_preference_column, ensure_avatar_column
 from app.core.exceptions import AppException
 from app.core.error_handler import (
     app_exception_handler,
@@ -27,8 +26,11 @@ from app.core.error_handler import (
     http_exception_handler,
 )
 from app.core.rate_limit import setup_rate_limiting
+from app.core.asgi import RequestLoggingMiddleware, ResponseHeadersMiddleware
 from app.core.compression import CompressionMiddleware
 from app.core.cache_headers import CacheHeadersMiddleware
+from app.core.query_instrumentation import QueryInstrumentationMiddleware
+from app.core.metrics import MetricsMiddleware
 from app.core.csrf import CSRFMiddleware
 from app.core.request_limits import RequestSizeLimitMiddleware
 from app.core.cors import setup_cors
@@ -39,6 +41,7 @@ from app.api.v1.router import api_router
 from app.api import email as email_router
 from app.api.webhooks import stripe as stripe_webhook_router
 from app.api import upload as upload_router
+from app.api import metrics as metrics_router
 
 
 @asynccontextmanager
@@ -86,26 +89,6 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         except:
             logger = None
         
-        # Startup - make database initialization resilient
-        try:
-            await init_db()
-            if logger:
-                logger.info("Database initialized successfully")
-            print("✓ Database initialized", file=sys.stderr)
-        except (ConnectionError, TimeoutError) as e:
-            error_msg = f"Database connection failed: {e}. App will continue but database features may be unavailable."
-            if logger:
-                logger.error(error_msg)
-                logger.warning("The app will start, but database operations will fail until connection is established.")
-            print(f"⚠ {error_msg}", file=sys.stderr)
-        except Exception as e:
-            # Keep generic Exception for unexpected database errors
-            error_msg = f"Database initialization failed: {e}. App will continue but database features may be unavailable."
-            if logger:
-                logger.error(error_msg, exc_info=True)
-                logger.warning("The app will start, but database operations will fail until connection is established.")
-            print(f"⚠ {error_msg}", file=sys.stderr)
-        
         try:
             await init_cache()
             if logger:
@@ -123,80 +106,120 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
                 logger.warning(warning_msg, exc_info=True)
             print(f"⚠ {warning_msg}", file=sys.stderr)
         
-        # Ensure required columns exist (auto-migration) - only if DB is available
+        # Schema bootstrap (DDL, default theme, indexes, ANALYZE) runs as a one-shot
+        # job (scripts/bootstrap_db.py); workers only compare the schema fingerprint
         try:
-            await ensure_theme_preference_column()
+            from app.core.bootstrap import is_bootstrapped, run_bootstrap
+            
+            if await is_bootstrapped():
+                if logger:
+                    logger.info("Database schema fingerprint up to date, skipping bootstrap")
+                print("✓ Database schema up to date", file=sys.stderr)
+            elif settings.AUTO_BOOTSTRAP_ON_STARTUP:
+                # Only the worker that gets the advisory lock bootstraps; the others skip
+                result = await run_bootstrap(wait=False)
+                if logger:
+                    logger.info(f"Database bootstrap {result.status}: steps={result.steps}, errors={result.errors}")
+                print(f"✓ Database bootstrap {result.status}", file=sys.stderr)
+            else:
+                warning_msg = "Database schema not bootstrapped. Run: python scripts/bootstrap_db.py"
+                if logger:
+                    logger.warning(warning_msg)
+                print(f"⚠ {warning_msg}", file=sys.stderr)
         except (ConnectionError, TimeoutError) as e:
+            error_msg = f"Database connection failed: {e}. App will continue but database features may be unavailable."
             if logger:
-                logger.warning(f"Theme preference column migration skipped (connection error): {e}")
+                logger.error(error_msg)
+                logger.warning("The app will start, but database operations will fail until connection is established.")
+            print(f"⚠ {error_msg}", file=sys.stderr)
         except Exception as e:
-            # Keep generic Exception for migration errors
+            error_msg = f"Database bootstrap check failed: {e}. App will continue but database features may be unavailable."
             if logger:
-                logger.warning(f"Theme preference column migration skipped: {e}", exc_info=True)
+                logger.error(error_msg, exc_info=True)
+            print(f"⚠ {error_msg}", file=sys.stderr)
         
-        # Ensure avatar column exists
+        # Stripe webhooks are acknowledged on receipt and processed here
+        if settings.STRIPE_WEBHOOK_WORKER_ENABLED:
+            try:
+                from app.core.database import AsyncSessionLocal
+                from app.services.stripe_webhook_queue import StripeWebhookWorker
+                
+                StripeWebhookWorker.start(AsyncSessionLocal, stripe_webhook_router.process_stripe_event)
+                print("✓ Stripe webhook worker started", file=sys.stderr)
+            except Exception as e:
+                if logger:
+                    logger.error(f"Stripe webhook worker failed to start: {e}", exc_info=True)
+                print(f"⚠ Stripe webhook worker failed to start: {e}", file=sys.stderr)
+        
+        # Audit events logged without a session are inserted in batches
+        if settings.AUDIT_LOG_BATCHED_WRITES:
+            try:
+                from app.core.database import AsyncSessionLocal
+                from app.services.audit_log_storage import AuditLogWriter
+                
+                AuditLogWriter.start(AsyncSessionLocal)
+                print("✓ Security audit log writer started", file=sys.stderr)
+            except Exception as e:
+                if logger:
+                    logger.error(f"Security audit log writer failed to start: {e}", exc_info=True)
+                print(f"⚠ Security audit log writer failed to start: {e}", file=sys.stderr)
+        
+        # WebSocket messages published by Celery workers and other API processes
         try:
-            await ensure_avatar_column()
-        except (ConnectionError, TimeoutError) as e:
-            if logger:
-                logger.warning(f"Avatar column migration skipped (connection error): {e}")
+            from app.core.cache import cache_backend
+            
+            if cache_backend.redis_client is not None:
+                from app.api.v1.endpoints.websocket import manager
+                from app.services.realtime_channel import RealtimeSubscriber
+                
+                RealtimeSubscriber.start(cache_backend.redis_client, manager.send_personal_message)
+                print("✓ Realtime subscriber started", file=sys.stderr)
         except Exception as e:
             if logger:
-                logger.warning(f"Avatar column migration skipped: {e}", exc_info=True)
-        
-        # Ensure default theme exists - CRITICAL for template functionality
-        # This must succeed for the application to work properly
-        theme_created = False
+                logger.error(f"Realtime subscriber failed to start: {e}", exc_info=True)
+            print(f"⚠ Realtime subscriber failed to start: {e}", file=sys.stderr)
+
+        # Documentation index used by the AI template chat (built off the event loop)
         try:
-            from app.core.database import get_db
-            from app.api.v1.endpoints.themes import ensure_default_theme
-            async for db in get_db():
-                try:
-                    theme = await ensure_default_theme(db, created_by=1)
-                    theme_created = True
-                    if logger:
-                        logger.info(f"Default theme ensured: {theme.name} (ID: {theme.id}, Active: {theme.is_active})")
-                    print(f"✓ Default theme ensured: {theme.name} (ID: {theme.id}, Active: {theme.is_active})", file=sys.stderr)
-                except Exception as e:
-                    if logger:
-                        logger.error(f"CRITICAL: Default theme creation failed: {e}", exc_info=True)
-                    print(f"❌ CRITICAL ERROR: Default theme creation failed: {e}", file=sys.stderr)
-                    print("   The application may not function correctly without a theme.", file=sys.stderr)
-                    # Don't break startup, but log the error prominently
-                break
+            from app.services.documentation_service import get_documentation_service
+
+            await get_documentation_service().aget_index()
+            print("✓ Documentation index built", file=sys.stderr)
         except Exception as e:
             if logger:
-                logger.error(f"CRITICAL: Default theme initialization failed: {e}", exc_info=True)
-            print(f"❌ CRITICAL ERROR: Default theme initialization failed: {e}", file=sys.stderr)
-            print("   Database connection may be unavailable. Theme will be created on first API call.", file=sys.stderr)
-        
-        if not theme_created:
-            print("⚠️  WARNING: TemplateTheme was not created during startup.", file=sys.stderr)
-            print("   It will be created automatically when /api/v1/themes/active is first called.", file=sys.stderr)
-        
-        # Create recommended indexes (non-blocking, runs after app starts)
-        # This runs in the background after the app has started serving requests
-        try:
-            from app.core.database_indexes import create_recommended_indexes, analyze_tables
-            from app.core.database import AsyncSessionLocal
-            
-            async with AsyncSessionLocal() as session:
-                index_results = await create_recommended_indexes(session)
-                if index_results.get("created"):
-                    if logger:
-                        logger.info(f"Created {len(index_results['created'])} indexes")
-                if index_results.get("errors"):
-                    if logger:
-                        logger.warning(f"Failed to create {len(index_results['errors'])} indexes")
+                logger.error(f"Documentation index failed to build: {e}", exc_info=True)
+            print(f"⚠ Documentation index failed to build: {e}", file=sys.stderr)
+
+        # Serialized public content (pages, posts, menus, active theme) ready before the first visit
+        if settings.PUBLISHED_CACHE_WARMUP_ON_STARTUP:
+            try:
+                from app.core.cache import cache_backend
+                from app.core.database import AsyncSessionLocal
+                from app.services.published_content_cache import warm_published_content
+
+                if cache_backend.redis_client is not None:
+                    counts = await warm_published_content(AsyncSessionLocal)
+                    print(f"✓ Published content cache warmed: {counts}", file=sys.stderr)
+            except Exception as e:
+                if logger:
+                    logger.error(f"Published content cache warmup failed: {e}", exc_info=True)
+                print(f"⚠ Published content cache warmup failed: {e}", file=sys.stderr)
+
+        # Per-worker metrics snapshots, merged by /metrics across workers
+        if settings.METRICS_ENABLED:
+            try:
+                from app.core.cache import cache_backend
+                from app.core.metrics import MetricsPublisher, register_default_collectors
                 
-                # Analyze tables to update statistics
-                await analyze_tables(session)
+                register_default_collectors()
+                if cache_backend.redis_client is not None:
+                    MetricsPublisher.start(cache_backend.redis_client)
+                    print("✓ Metrics publisher started", file=sys.stderr)
+            except Exception as e:
                 if logger:
-                    logger.info("Index creation/analysis completed")
-        except Exception as e:
-            if logger:
-                logger.warning(f"Index creation/analysis skipped: {e}")
-        
+                    logger.error(f"Metrics publisher failed to start: {e}", exc_info=True)
+                print(f"⚠ Metrics publisher failed to start: {e}", file=sys.stderr)
+
         if logger:
             logger.info("Application startup complete")
     
@@ -224,6 +247,36 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     
     # Shutdown
     print("Shutting down application...", file=sys.stderr)
+    try:
+        from app.services.stripe_webhook_queue import StripeWebhookWorker
+        await StripeWebhookWorker.stop()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Stripe webhook worker shutdown error: {e}")
+    try:
+        from app.services.audit_log_storage import AuditLogWriter
+        await AuditLogWriter.stop()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Security audit log writer shutdown error: {e}")
+    try:
+        from app.services.realtime_channel import RealtimeSubscriber
+        await RealtimeSubscriber.stop()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Realtime subscriber shutdown error: {e}")
+    try:
+        from app.core.metrics import MetricsPublisher
+        await MetricsPublisher.stop()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Metrics publisher shutdown error: {e}")
+    try:
+        from app.services.ai_service import close_clients
+        await close_clients()
+    except Exception as e:
+        if logger:
+            logger.warning(f"AI clients shutdown error: {e}")
     try:
         await close_cache()
     except Exception as e:
@@ -268,29 +321,8 @@ def create_app() -> FastAPI:
     # Request logging middleware (after CORS to log all requests)
     # Note: FastAPI executes middlewares in reverse order of addition
     # So this middleware runs BEFORE CORS middleware (which was added first)
-    # We need to let errors propagate to CORS middleware so it can add headers
-    @app.middleware("http")
-    async def log_requests_middleware(request: Request, call_next):
-        from app.core.logging import logger
-        from starlette.responses import Response
-        import time
-        start_time = time.time()
-        logger.info(f"Incoming request: {request.method} {request.url.path} from {request.client.host if request.client else 'unknown'}")
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            # Ensure response is a Response instance before accessing status_code
-            if isinstance(response, Response):
-                logger.info(f"Request completed: {request.method} {request.url.path} - {response.status_code} ({process_time:.4f}s)")
-            else:
-                logger.info(f"Request completed: {request.method} {request.url.path} ({process_time:.4f}s)")
-            return response
-        except Exception as e:
-            process_time = time.time() - start_time
-            logger.error(f"Request failed: {request.method} {request.url.path} - {str(e)} ({process_time:.4f}s)", exc_info=True)
-            # Re-raise the exception so CORS middleware can catch it and add headers
-            # The CORS middleware will handle the error response with proper headers
-            raise
+    # Errors are re-raised so CORS middleware can catch them and add headers
+    app.add_middleware(RequestLoggingMiddleware)
 
     # Compression Middleware (after CORS)
     # Enhanced compression with Brotli support
@@ -304,6 +336,10 @@ def create_app() -> FastAPI:
     # Cache Headers Middleware
     app.add_middleware(CacheHeadersMiddleware, default_max_age=300)
 
+    # Query Instrumentation Middleware (Server-Timing, N+1 and query budget checks)
+    if settings.QUERY_INSTRUMENTATION_ENABLED:
+        app.add_middleware(QueryInstrumentationMiddleware)
+
     # Request Size Limits Middleware (before CSRF to prevent large request processing)
     app.add_middleware(
         RequestSizeLimitMiddleware,
@@ -362,6 +398,10 @@ def create_app() -> FastAPI:
     else:
         logger.warning("Rate limiting is DISABLED - not recommended for production")
 
+    # Metrics Middleware (outermost: latency per route template, including the other middlewares)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+    
     # Include API router
     app.include_router(api_router, prefix=settings.API_V1_STR)
     
@@ -373,6 +413,10 @@ def create_app() -> FastAPI:
     
     # Include webhooks (no prefix, no auth)
     app.include_router(stripe_webhook_router.router)
+    
+    # Include metrics endpoint (Prometheus scrape)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router.router)
 
     # Register exception handlers
     from fastapi.exceptions import HTTPException as FastAPIHTTPException
@@ -382,67 +426,8 @@ def create_app() -> FastAPI:
     app.add_exception_handler(SQLAlchemyError, database_exception_handler)
     app.add_exception_handler(Exception, general_exception_handler)
 
-    # Add security headers middleware
-    @app.middleware("http")
-    async def add_security_headers_middleware(request: Request, call_next):
-        import time
-        from datetime import datetime, timezone
-        
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        # Add timestamp headers
-        response.headers["X-Response-Time"] = f"{process_time:.4f}s"
-        response.headers["X-Process-Time"] = str(process_time)
-        response.headers["X-Timestamp"] = datetime.now(timezone.utc).isoformat()
-        
-        # Add security headers
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        
-        # Content Security Policy (strict in production, relaxed in development)
-        environment = os.getenv("ENVIRONMENT", "development")
-        
-        if environment == "production":
-            # Strict CSP for production - no unsafe-inline or unsafe-eval
-            # 
-            # SECURITY: Production CSP is strict (no unsafe-inline/unsafe-eval)
-            # Use nonces for inline scripts/styles in production
-            # See: https://developer.mozilla.org/en-US/docs/Web/HTTP/CSP
-            csp_policy = (
-                "default-src 'self'; "
-                "script-src 'self'; "  # Strict: no unsafe-inline/eval (use nonces)
-                "style-src 'self'; "  # Strict: no unsafe-inline (use nonces)
-                "img-src 'self' data: https:; "
-                "font-src 'self' data:; "
-                "connect-src 'self' https://api.stripe.com; "
-                "frame-ancestors 'none'; "
-                "base-uri 'self'; "
-                "form-action 'self';"
-            )
-        else:
-            # Relaxed CSP for development
-            # 
-            # SECURITY: CSP is relaxed in development (unsafe-inline/unsafe-eval)
-            # This is acceptable for dev but MUST be tightened in production using nonces
-            # See: https://developer.mozilla.org/en-US/docs/Web/HTTP/CSP
-            csp_policy = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "  # Development only
-                "style-src 'self' 'unsafe-inline'; "  # Development only
-                "img-src 'self' data: https:; "
-                "font-src 'self' data:; "
-                "connect-src 'self' https://api.stripe.com; "
-                "frame-ancestors 'none';"
-            )
-        response.headers["Content-Security-Policy"] = csp_policy
-        
-        return response
+    # Security headers middleware (timing headers, HSTS, CSP strict in production)
+    app.add_middleware(ResponseHeadersMiddleware, environment=os.getenv("ENVIRONMENT", "development"))
 
     # Custom OpenAPI schema
     def custom_openapi() -> dict:
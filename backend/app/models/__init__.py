@@ -7,6 +7,7 @@ from app.models.user import User
 from app.models.organization import Organization
 from app.models.organization_module import OrganizationModule, AVAILABLE_MODULES
 from app.models.organization_member import OrganizationMember, MEMBER_ROLES
+from app.models.organization_migration import OrganizationMigrationRun, OrganizationMigrationStatus
 from app.models.role import Role, Permission, RolePermission, UserRole, UserPermission
 from app.models.team import Team, TeamMember
 from app.models.invitation import Invitation
@@ -14,6 +15,7 @@ from app.models.plan import Plan, PlanInterval, PlanStatus
 from app.models.subscription import Subscription, SubscriptionStatus
 from app.models.invoice import Invoice, InvoiceStatus
 from app.models.webhook_event import WebhookEvent
+from app.models.metrics_snapshot import MetricsSnapshot
 from app.models.api_key import APIKey
 from app.models.tag import Tag, Category, EntityTag
 from app.models.comment import Comment, CommentReaction
@@ -31,13 +33,14 @@ from app.models.documentation import DocumentationArticle, DocumentationCategory
 from app.models.scheduled_task import ScheduledTask, TaskExecutionLog, TaskStatus, TaskType
 from app.models.backup import Backup, RestoreOperation, BackupType, BackupStatus
 from app.models.email_template import EmailTemplate, EmailTemplateVersion
+from app.models.email_batch import EmailBatch, EmailBatchRecipient
 from app.models.page import Page
 from app.models.form import Form, FormSubmission
 from app.models.menu import Menu
 from app.models.support_ticket import SupportTicket, TicketMessage, TicketStatus, TicketPriority
 from app.models.theme import Theme
 from app.models.theme_font import ThemeFont
-from app.models.notification import Notification, NotificationType
+from app.models.notification import Notification, NotificationCounter, NotificationType
 from app.models.report import Report
 from app.models.post import Post
 from app.models.file import File
@@ -65,6 +68,7 @@ __all__ = [
     "Invoice",
     "InvoiceStatus",
     "WebhookEvent",
+    "MetricsSnapshot",
     "APIKey",
     "Tag",
     "Category",
@@ -105,6 +109,8 @@ __all__ = [
     "BackupStatus",
     "EmailTemplate",
     "EmailTemplateVersion",
+    "EmailBatch",
+    "EmailBatchRecipient",
     "Page",
     "Form",
     "FormSubmission",
@@ -116,6 +122,7 @@ __all__ = [
     "Theme",
     "ThemeFont",
     "Notification",
+    "NotificationCounter",
     "NotificationType",
     "Report",
     "Post",
@@ -131,5 +138,7 @@ __all__ = [
     "CityEvent",
     "EventStatus",
     "SecurityAuditLog",
+    "OrganizationMigrationRun",
+    "OrganizationMigrationStatus",
 ]
 
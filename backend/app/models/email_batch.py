@@ -0,0 +1,76 @@
+"""
+Email Batch Models
+Bulk email sends and the delivery status of each recipient
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, Text, func, text
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class EmailBatch(Base):
+    """
+    Bulk email send
+
+    The template is rendered once per variant (language) when the batch is
+    created; recipients are sent by the Celery worker, many per SendGrid
+    request (see app/services/bulk_email_service.py).
+    """
+    __tablename__ = "email_batches"
+    __table_args__ = (
+        Index("idx_email_batches_status", "status"),
+        Index("idx_email_batches_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    template_key = Column(String(100), nullable=True)
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")  # 'pending', 'sending', 'completed'
+    # Rendered content per variant: {"fr": {"subject", "html_body", "text_body"}}
+    variants = Column(JSON, nullable=False)
+
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
+    sent_count = Column(Integer, nullable=False, default=0, server_default="0")
+    failed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+
+    created_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    recipients = relationship("EmailBatchRecipient", back_populates="batch", cascade="all, delete-orphan", lazy="noload")
+
+    def __repr__(self) -> str:
+        return f"<EmailBatch(id={self.id}, template_key={self.template_key}, status={self.status})>"
+
+
+class EmailBatchRecipient(Base):
+    """Delivery status of one recipient of a bulk email send"""
+    __tablename__ = "email_batch_recipients"
+    __table_args__ = (
+        Index(
+            "idx_email_batch_recipients_pending", "batch_id", "variant", "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index("idx_email_batch_recipients_batch_status", "batch_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(Integer, ForeignKey("email_batches.id", ondelete="CASCADE"), nullable=False)
+    email = Column(String(255), nullable=False)
+    name = Column(String(200), nullable=True)
+    variant = Column(String(10), nullable=False)
+    # Per-recipient template variables, sent as SendGrid substitutions
+    substitutions = Column(JSON, nullable=True)
+
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")  # 'pending', 'sent', 'failed'
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    message_id = Column(String(100), nullable=True)  # X-Message-Id of the SendGrid request
+    error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    batch = relationship("EmailBatch", back_populates="recipients")
+
+    def __repr__(self) -> str:
+        return f"<EmailBatchRecipient(id={self.id}, batch_id={self.batch_id}, status={self.status})>"
@@ -0,0 +1,30 @@
+"""
+Metrics Snapshot Model
+SQLAlchemy model for precomputed dashboard metrics
+"""
+
+from sqlalchemy import Column, DateTime, String, JSON, func
+
+from app.core.database import Base
+
+
+class MetricsSnapshot(Base):
+    """
+    Metrics snapshot model
+
+    One row per (scope, scope_key): 'tenant' rows hold the statistics of one
+    team, 'platform' rows hold platform-wide statistics. Rows are written by
+    the metrics snapshot job (see app/services/metrics_snapshot_service.py)
+    and read by the admin and platform monitoring dashboards.
+    """
+    __tablename__ = "metrics_snapshots"
+
+    scope = Column(String(50), primary_key=True)  # 'tenant', 'platform'
+    scope_key = Column(String(100), primary_key=True)  # team ID, or the platform view name
+    data = Column(JSON, nullable=False)
+    # Latest change seen in the source tables when computed (incremental refresh watermark)
+    source_updated_at = Column(DateTime(timezone=True), nullable=True)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<MetricsSnapshot(scope={self.scope}, scope_key={self.scope_key}, computed_at={self.computed_at})>"
@@ -5,7 +5,7 @@ User notifications system
 
 from datetime import datetime
 from typing import Optional, Dict, Any
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func, Boolean, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import enum
@@ -31,6 +31,14 @@ class Notification(Base):
         Index("idx_notifications_created_at", "created_at"),
         Index("idx_notifications_type", "notification_type"),
         Index("idx_notifications_user_read", "user_id", "read"),  # Composite index for common query
+        # Coalescing lookup: the user's unread notification of a group
+        Index(
+            "idx_notifications_user_group_unread",
+            "user_id",
+            "group_key",
+            "created_at",
+            postgresql_where=text("read = false AND group_key IS NOT NULL"),
+        ),
     )
     
     id = Column(Integer, primary_key=True, index=True)
@@ -54,6 +62,11 @@ class Notification(Base):
     # Database column remains 'metadata' for backward compatibility
     notification_metadata = Column("metadata", JSONB, nullable=True)
     
+    # Coalescing: notifications of the same group sent while the previous one is
+    # still unread (within the coalescing window) update it instead of piling up
+    group_key = Column(String(200), nullable=True)
+    occurrence_count = Column(Integer, default=1, server_default="1", nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(
@@ -75,3 +88,21 @@ class Notification(Base):
         self.read = True
         self.read_at = datetime.now(timezone.utc)
 
+
+
+class NotificationCounter(Base):
+    """
+    Unread notification count per user.
+
+    Maintained in the same transaction as every change to the user's unread
+    notifications, so badges never count rows.
+    """
+
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, default=0, server_default="0", nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<NotificationCounter(user_id={self.user_id}, unread_count={self.unread_count})>"
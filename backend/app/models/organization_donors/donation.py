@@ -5,7 +5,7 @@ Donation/Transaction model for organization-specific databases.
 Tracks all donations made by donors.
 """
 
-from sqlalchemy import Column, String, Boolean, DateTime, Numeric, Text, JSON, ForeignKey, func, Index
+from sqlalchemy import Column, String, Boolean, DateTime, Numeric, Text, JSON, ForeignKey, func, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -30,6 +30,12 @@ class Donation(Base):
         Index("idx_donations_receipt", "receipt_number"),
         Index("idx_donations_campaign", "campaign_id"),
         Index("idx_donations_recurring", "recurring_donation_id"),
+        # Campaign rollups: distinct-donor checks and grouped reconciliation
+        Index(
+            "idx_donations_campaign_donor_completed", "campaign_id", "donor_id",
+            postgresql_where=text("payment_status = 'completed'"),
+            postgresql_include=["amount"],
+        ),
     )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
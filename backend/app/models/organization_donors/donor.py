@@ -54,7 +54,7 @@ class Donor(Base):
     opt_in_postal = Column(Boolean, default=True, nullable=False)
     
     # Tags and Custom Fields
-    tags = Column(JSON, default=list)  # Array of tag names
+    tags = Column(JSON, default=list)  # Read-only mirror of tag names; donor_tag_assignments is authoritative (DonorTagService)
     custom_fields = Column(JSON, default=dict)  # Custom organization-specific fields
     
     # Calculated Statistics (updated via triggers or application logic)
@@ -67,6 +67,10 @@ class Donor(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    # search_text / search_vector are GENERATED columns added by migration add_donor_search_003.
+    # They are intentionally not mapped (the ORM would write NULL into them on INSERT);
+    # DonorSearchService references them directly.
+    
     # Relationships (will be defined in organization DB)
     # Using lazy='select' to avoid loading relationships automatically
     # This prevents errors if tables don't exist yet (before migrations)
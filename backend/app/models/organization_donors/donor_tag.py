@@ -59,6 +59,8 @@ class DonorTagAssignment(Base):
         UniqueConstraint('donor_id', 'tag_id', name='uq_donor_tag'),
         Index("idx_donor_tag_assignments_donor", "donor_id"),
         Index("idx_donor_tag_assignments_tag", "tag_id"),
+        # Tag filters probe by tag and read donor_id from the index only
+        Index("idx_donor_tag_assignments_tag_donor", "tag_id", "donor_id"),
     )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -0,0 +1,83 @@
+"""
+Organization Migration Models
+
+Tracks fleet-wide schema migrations of organization databases so that
+long rollouts can be monitored and resumed.
+"""
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, func, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+import uuid
+
+from app.core.database import Base
+
+
+MIGRATION_RUN_STATUSES = ["running", "completed", "failed"]
+TENANT_MIGRATION_STATUSES = ["pending", "running", "succeeded", "failed", "skipped"]
+
+
+class OrganizationMigrationRun(Base):
+    """
+    Organization Migration Run
+
+    One orchestrated migration pass over all (or a subset of) organization databases.
+    """
+    __tablename__ = "organization_migration_runs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    target_revision = Column(String(64), nullable=False)
+    status = Column(String(20), default="running", nullable=False, index=True)  # running, completed, failed
+
+    total_count = Column(Integer, default=0, nullable=False)
+    succeeded_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    skipped_count = Column(Integer, default=0, nullable=False)
+
+    started_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    tenants = relationship(
+        "OrganizationMigrationStatus",
+        back_populates="run",
+        cascade="all, delete-orphan",
+    )
+
+    def __repr__(self):
+        return f"<OrganizationMigrationRun(id={self.id}, target={self.target_revision}, status={self.status})>"
+
+
+class OrganizationMigrationStatus(Base):
+    """
+    Organization Migration Status
+
+    Progress of a single organization database within a migration run.
+    """
+    __tablename__ = "organization_migration_statuses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(UUID(as_uuid=True), ForeignKey("organization_migration_runs.id", ondelete="CASCADE"), nullable=False)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(20), default="pending", nullable=False)  # pending, running, succeeded, failed, skipped
+
+    from_revision = Column(String(64), nullable=True)
+    to_revision = Column(String(64), nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    run = relationship("OrganizationMigrationRun", back_populates="tenants")
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('run_id', 'organization_id', name='uq_org_migration_run_tenant'),
+        Index('idx_org_migration_statuses_run_status', 'run_id', 'status'),
+    )
+
+    def __repr__(self):
+        return f"<OrganizationMigrationStatus(run={self.run_id}, org={self.organization_id}, status={self.status})>"
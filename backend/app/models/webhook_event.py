@@ -1,34 +1,55 @@
 """
 Webhook Event Model
-SQLAlchemy model for tracking processed webhook events (idempotency)
+SQLAlchemy model for received webhook events (idempotency and processing queue)
 """
 
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, String, Text, Index, func
+from sqlalchemy import Column, DateTime, Integer, String, Text, Index, func, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
 
 class WebhookEvent(Base):
-    """Webhook event model for idempotency"""
+    """
+    Webhook event model
+
+    Events are stored as soon as they are received (status 'pending') and
+    processed in the background (see app/services/stripe_webhook_queue.py).
+    """
     __tablename__ = "webhook_events"
     __table_args__ = (
         Index("idx_webhook_events_stripe_id", "stripe_event_id", unique=True),
         Index("idx_webhook_events_type", "event_type"),
         Index("idx_webhook_events_processed_at", "processed_at"),
+        Index(
+            "idx_webhook_events_queue", "status", "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'processing')"),
+        ),
+        Index(
+            "idx_webhook_events_object_order", "object_key", "stripe_created", "id",
+            postgresql_where=text("status IN ('pending', 'processing')"),
+        ),
     )
 
     id = Column(Integer, primary_key=True, index=True)
     stripe_event_id = Column(String(255), unique=True, nullable=False, index=True)
     event_type = Column(String(100), nullable=False, index=True)
-    processed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True, index=True)
     
     # Store event data for debugging/auditing (optional, can be large)
     event_data = Column(Text, nullable=True)  # JSON string
     
+    # Processing queue
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")  # 'pending', 'processing', 'processed', 'dead'
+    object_key = Column(String(255), nullable=True)  # Events of the same Stripe object are processed in order
+    stripe_created = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     def __repr__(self) -> str:
-        return f"<WebhookEvent(id={self.id}, stripe_event_id={self.stripe_event_id}, event_type={self.event_type})>"
-
+        return f"<WebhookEvent(id={self.id}, stripe_event_id={self.stripe_event_id}, event_type={self.event_type}, status={self.status})>"
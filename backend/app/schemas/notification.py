@@ -6,7 +6,7 @@ Pydantic v2 models for notification management
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 
 from app.models.notification import NotificationType
 
@@ -73,6 +73,8 @@ class NotificationResponse(NotificationBase):
     user_id: int
     read: bool
     read_at: Optional[datetime] = None
+    group_key: Optional[str] = None
+    occurrence_count: int = 1
     created_at: datetime
     updated_at: datetime
     
@@ -96,3 +98,38 @@ class NotificationUnreadCountResponse(BaseModel):
     unread_count: int
     user_id: int
 
+
+
+class NotificationFanoutRequest(NotificationBase):
+    """Notification sent to an audience with one statement"""
+    user_ids: Optional[List[int]] = Field(None, min_length=1, description="Explicit recipients")
+    team_id: Optional[int] = Field(None, description="Active members of this team")
+    all_users: bool = Field(False, description="Every active user")
+    group_key: Optional[str] = Field(
+        None,
+        max_length=200,
+        description="Coalesce into the user's unread notification of this group",
+    )
+    coalesce_window_seconds: Optional[int] = Field(
+        None,
+        ge=0,
+        le=86400,
+        description="Coalescing window (default: NOTIFICATION_COALESCE_WINDOW_SECONDS)",
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    @model_validator(mode="after")
+    def validate_audience(self) -> "NotificationFanoutRequest":
+        """Exactly one audience"""
+        audiences = [self.user_ids is not None, self.team_id is not None, self.all_users]
+        if sum(audiences) != 1:
+            raise ValueError("Provide exactly one of user_ids, team_id or all_users")
+        return self
+
+
+class NotificationFanoutResponse(BaseModel):
+    """Fan-out summary"""
+    notifications: int = Field(..., description="Notifications created")
+    coalesced: int = Field(..., description="Unread notifications updated instead")
+    realtime_published: int = Field(..., description="Realtime messages sent")
@@ -252,3 +252,44 @@ class DatabaseTablesResponse(BaseModel):
     current_schema: Optional[str] = None
     all_schemas: Optional[List[str]] = None
     query_hint: Optional[str] = None
+
+
+# ============= Fleet Migration Schemas =============
+
+class MigrateAllDatabasesRequest(BaseModel):
+    """Start (or resume) a migration run over all organization databases"""
+    organization_ids: Optional[List[UUID]] = Field(default=None, description="Restrict the run to these organizations", alias="organizationIds")
+    max_workers: int = Field(default=4, ge=1, le=32, description="Maximum concurrent Alembic upgrades", alias="maxWorkers")
+    resume_run_id: Optional[UUID] = Field(default=None, description="Resume an earlier run", alias="resumeRunId")
+    
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class OrganizationMigrationTenantStatus(BaseModel):
+    """Migration progress of one organization database"""
+    organization_id: UUID
+    status: str
+    from_revision: Optional[str] = None
+    to_revision: Optional[str] = None
+    duration_ms: Optional[int] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrganizationMigrationRunResponse(BaseModel):
+    """Migration run summary with per-tenant statuses"""
+    id: UUID
+    target_revision: str
+    status: str
+    total_count: int = 0
+    succeeded_count: int = 0
+    failed_count: int = 0
+    skipped_count: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    tenants: List[OrganizationMigrationTenantStatus] = []
+    
+    model_config = ConfigDict(from_attributes=True)
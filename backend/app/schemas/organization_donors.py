@@ -4,7 +4,7 @@ Organization Donors Schemas
 Pydantic schemas for donor management API requests/responses.
 """
 
-from pydantic import BaseModel, Field, EmailStr, validator
+from pydantic import BaseModel, Field, EmailStr, validator, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime, date
 from uuid import UUID
@@ -232,6 +232,19 @@ class DonorList(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    total_is_estimate: bool = False
+
+
+class DonorSuggestion(BaseModel):
+    """Donor search autocomplete suggestion"""
+    id: UUID
+    full_name: str
+    email: str
+
+
+class DonorSuggestionList(BaseModel):
+    """Donor search autocomplete suggestions"""
+    items: List[DonorSuggestion]
 
 
 class DonationList(BaseModel):
@@ -244,11 +257,13 @@ class DonationList(BaseModel):
 
 
 class DonorHistory(BaseModel):
-    """Donor history (donations + activities)"""
+    """Donor history (donations + activities), one page of each"""
     donations: List[Donation]
     activities: List[DonorActivity]
     total_donations: int
     total_activities: int
+    page: int = 1
+    page_size: Optional[int] = None
 
 
 class DonorStats(BaseModel):
@@ -550,3 +565,63 @@ class RecurringDonationList(BaseModel):
     page: int
     page_size: int
     total_pages: int
+
+
+# ============= Donor Profile =============
+
+class DonorProfile(BaseModel):
+    """Donor 360 profile; sections that were not requested are null"""
+    donor: DonorWithStats
+    stats: Optional[DonorStats] = None
+    history: Optional[DonorHistory] = None
+    notes: Optional[List[DonorNote]] = None
+    tags: Optional[List[DonorTag]] = None
+    communications: Optional[DonorCommunicationList] = None
+    recurring: Optional[RecurringDonationList] = None
+
+
+# ============= Bulk Operations =============
+
+class DonorBulkFilter(BaseModel):
+    """Donor selection by filters (same semantics as the donor list)"""
+    search: Optional[str] = None
+    is_active: Optional[bool] = None
+    tags: List[str] = Field(default_factory=list)
+    tag_match: str = Field(default='all', pattern=r'^(all|any)$')
+    min_total_donated: Optional[Decimal] = None
+    max_total_donated: Optional[Decimal] = None
+
+
+class DonorBulkRequest(BaseModel):
+    """Bulk action on a donor ID list or on the donors matching a filter"""
+    action: str = Field(..., pattern=r'^(add_tag|remove_tag|add_to_segment|remove_from_segment|activate|deactivate|delete)$')
+    donor_ids: Optional[List[UUID]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[DonorBulkFilter] = None
+    tag_id: Optional[UUID] = None
+    segment_id: Optional[UUID] = None
+
+    @model_validator(mode='after')
+    def check_target(self):
+        if (self.donor_ids is None) == (self.filter is None):
+            raise ValueError('Provide either donor_ids or filter')
+        if self.action in ('add_tag', 'remove_tag') and self.tag_id is None:
+            raise ValueError('tag_id is required for tag actions')
+        if self.action in ('add_to_segment', 'remove_from_segment') and self.segment_id is None:
+            raise ValueError('segment_id is required for segment actions')
+        return self
+
+
+class DonorBulkItemResult(BaseModel):
+    """Outcome for one requested donor"""
+    donor_id: UUID
+    status: str  # 'applied', 'unchanged' (already in the target state) or 'not_found'
+
+
+class DonorBulkResult(BaseModel):
+    """Bulk action summary; results is set for donor_ids requests"""
+    action: str
+    matched: int
+    applied: int
+    unchanged: int
+    not_found: int
+    results: Optional[List[DonorBulkItemResult]] = None
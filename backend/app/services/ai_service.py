@@ -1,28 +1,31 @@
 """
 Unified AI Service
 Supports both OpenAI and Anthropic (Claude) APIs
+
+- provider clients are created once per process and shared, so requests reuse
+  the SDKs' pooled keep-alive connections (no TLS handshake per call)
+- stream_chat_completion yields the text as the provider generates it
+- deterministic requests (temperature 0) are answered from the cache when the
+  same conversation was already completed
 """
 
+import hashlib
+import json
 import os
-from typing import Optional, List, Dict, Any, Literal
+from typing import Optional, List, Dict, Any, AsyncIterator, Literal, Tuple
 from enum import Enum
 
-try:
-    from openai import AsyncOpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    AsyncOpenAI = None
-
-try:
-    from anthropic import AsyncAnthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-    AsyncAnthropic = None
-
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.lazy_import import is_available, lazy_module
 from app.core.logging import logger
 
+# SDKs are imported on first client creation, not at app import
+openai = lazy_module("openai")
+anthropic = lazy_module("anthropic")
+OPENAI_AVAILABLE = is_available("openai")
+ANTHROPIC_AVAILABLE = is_available("anthropic")
+
 
 class AIProvider(str, Enum):
     """Supported AI providers"""
@@ -31,18 +34,91 @@ class AIProvider(str, Enum):
     AUTO = "auto"  # Auto-select based on availability
 
 
+RESPONSE_CACHE_PREFIX = "ai:chat:"
+
+# Shared clients, by provider and API key
+_clients: Dict[Tuple[str, str], Any] = {}
+
+
+def get_client(provider: "AIProvider", api_key: str) -> Any:
+    """Process-wide client of a provider (its connection pool is reused by every request)"""
+    key = (provider.value, api_key)
+    client = _clients.get(key)
+    if client is None:
+        options = {
+            "api_key": api_key,
+            "timeout": settings.AI_REQUEST_TIMEOUT_SECONDS,
+            "max_retries": 2,
+        }
+        if provider == AIProvider.OPENAI:
+            client = openai.AsyncOpenAI(**options)
+        else:
+            client = anthropic.AsyncAnthropic(**options)
+        _clients[key] = client
+    return client
+
+
+async def close_clients() -> None:
+    """Close the shared provider clients (application shutdown)"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"AI client close error: {e}")
+
+
+def response_cache_key(provider: str, model: str, messages: List[Dict[str, str]], system: Optional[str], max_tokens: int) -> str:
+    """Cache key of an exact request (same provider, model, conversation and limits)"""
+    payload = json.dumps(
+        {"provider": provider, "model": model, "system": system, "messages": messages, "max_tokens": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return RESPONSE_CACHE_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _openai_messages(messages: List[Dict[str, str]], system_prompt: Optional[str]) -> List[Dict[str, str]]:
+    """Messages with the system prompt first (unless the conversation has its own)"""
+    messages = list(messages)
+    if system_prompt and (not messages or messages[0].get("role") != "system"):
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    return messages
+
+
+def _anthropic_messages(messages: List[Dict[str, str]], system_prompt: Optional[str]) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    """System prompt and user/assistant messages (Anthropic takes the system prompt separately)"""
+    anthropic_messages = []
+    for msg in messages:
+        role = msg.get("role", "user")
+        content = msg.get("content", "")
+        
+        # Skip system messages (handled separately)
+        if role == "system":
+            if not system_prompt:
+                system_prompt = content
+            continue
+        
+        if role in ["user", "assistant"]:
+            anthropic_messages.append({"role": role, "content": content})
+    
+    return system_prompt or None, anthropic_messages
+
+
 class AIService:
     """Unified AI service supporting OpenAI and Anthropic"""
     
-    def __init__(self, provider: AIProvider = AIProvider.AUTO):
+    def __init__(self, provider: AIProvider = AIProvider.AUTO, client: Any = None):
         """
         Initialize AI service.
         
         Args:
             provider: AI provider to use (openai, anthropic, or auto)
+            client: Provider client to use instead of the shared one (tests, stub providers)
         """
         self.provider = self._resolve_provider(provider)
-        self._initialize_client()
+        self._initialize_client(client)
     
     def _resolve_provider(self, provider: AIProvider) -> AIProvider:
         """Resolve provider, defaulting to available one"""
@@ -65,32 +141,69 @@ class AIService:
         """Check if Anthropic is configured"""
         return bool(os.getenv("ANTHROPIC_API_KEY"))
     
-    def _initialize_client(self):
-        """Initialize the appropriate client"""
+    def _initialize_client(self, client: Any = None):
+        """Attach the provider's shared client and defaults"""
+        if client is not None:
+            self.client = client
+        
         if self.provider == AIProvider.OPENAI:
-            if not OPENAI_AVAILABLE:
-                raise ValueError("OpenAI library is not installed. Install it with: pip install openai")
-            if not self._is_openai_configured():
-                raise ValueError("OPENAI_API_KEY is not configured")
-            
-            self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            if client is None:
+                if not OPENAI_AVAILABLE:
+                    raise ValueError("OpenAI library is not installed. Install it with: pip install openai")
+                if not self._is_openai_configured():
+                    raise ValueError("OPENAI_API_KEY is not configured")
+                self.client = get_client(AIProvider.OPENAI, os.getenv("OPENAI_API_KEY"))
             self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
             self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", "1000"))
             self.temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
             
         elif self.provider == AIProvider.ANTHROPIC:
-            if not ANTHROPIC_AVAILABLE:
-                raise ValueError("Anthropic library is not installed. Install it with: pip install anthropic")
-            if not self._is_anthropic_configured():
-                raise ValueError("ANTHROPIC_API_KEY is not configured")
-            
-            self.client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            if client is None:
+                if not ANTHROPIC_AVAILABLE:
+                    raise ValueError("Anthropic library is not installed. Install it with: pip install anthropic")
+                if not self._is_anthropic_configured():
+                    raise ValueError("ANTHROPIC_API_KEY is not configured")
+                self.client = get_client(AIProvider.ANTHROPIC, os.getenv("ANTHROPIC_API_KEY"))
             self.model = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
             self.max_tokens = int(os.getenv("ANTHROPIC_MAX_TOKENS", "1024"))
             self.temperature = float(os.getenv("ANTHROPIC_TEMPERATURE", "0.7"))
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
     
+    def _options(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_prompt: Optional[str],
+    ) -> Dict[str, Any]:
+        """Provider request arguments (defaults applied; a temperature of 0 is kept)"""
+        options = {
+            "model": model or self.model,
+            "temperature": self.temperature if temperature is None else temperature,
+            "max_tokens": max_tokens or self.max_tokens,
+        }
+        if self.provider == AIProvider.OPENAI:
+            options["messages"] = _openai_messages(messages, system_prompt)
+        elif self.provider == AIProvider.ANTHROPIC:
+            options["system"], options["messages"] = _anthropic_messages(messages, system_prompt)
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+        return options
+    
+    def _cache_key(self, options: Dict[str, Any]) -> Optional[str]:
+        """Response cache key, for deterministic requests only"""
+        if options["temperature"] != 0 or settings.AI_RESPONSE_CACHE_TTL_SECONDS <= 0:
+            return None
+        return response_cache_key(
+            self.provider.value, options["model"], options["messages"], options.get("system"), options["max_tokens"]
+        )
+    
+    async def _cache_response(self, cache_key: Optional[str], response: Dict[str, Any]) -> None:
+        if cache_key:
+            await cache_backend.set(cache_key, response, expire=settings.AI_RESPONSE_CACHE_TTL_SECONDS)
+    
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -110,40 +223,26 @@ class AIService:
             system_prompt: System prompt (for Anthropic, prepended to messages)
             
         Returns:
-            Response dict with 'content', 'model', 'usage', 'finish_reason', 'provider'
+            Response dict with 'content', 'model', 'usage', 'finish_reason', 'provider', 'cached'
         """
+        options = self._options(messages, model, temperature, max_tokens, system_prompt)
+        cache_key = self._cache_key(options)
+        if cache_key:
+            cached = await cache_backend.get(cache_key)
+            if cached:
+                return {**cached, "cached": True}
+        
         if self.provider == AIProvider.OPENAI:
-            return await self._openai_chat_completion(
-                messages, model, temperature, max_tokens, system_prompt
-            )
-        elif self.provider == AIProvider.ANTHROPIC:
-            return await self._anthropic_chat_completion(
-                messages, model, temperature, max_tokens, system_prompt
-            )
+            response = await self._openai_chat_completion(options)
         else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+            response = await self._anthropic_chat_completion(options)
+        
+        await self._cache_response(cache_key, response)
+        return {**response, "cached": False}
     
-    async def _openai_chat_completion(
-        self,
-        messages: List[Dict[str, str]],
-        model: Optional[str],
-        temperature: Optional[float],
-        max_tokens: Optional[int],
-        system_prompt: Optional[str],
-    ) -> Dict[str, Any]:
+    async def _openai_chat_completion(self, options: Dict[str, Any]) -> Dict[str, Any]:
         """OpenAI chat completion"""
-        # Add system prompt if provided
-        if system_prompt:
-            # Check if first message is already a system message
-            if not messages or messages[0].get("role") != "system":
-                messages.insert(0, {"role": "system", "content": system_prompt})
-        
-        response = await self.client.chat.completions.create(
-            model=model or self.model,
-            messages=messages,
-            temperature=temperature or self.temperature,
-            max_tokens=max_tokens or self.max_tokens,
-        )
+        response = await self.client.chat.completions.create(**options)
         
         return {
             "content": response.choices[0].message.content,
@@ -157,46 +256,9 @@ class AIService:
             "provider": "openai",
         }
     
-    async def _anthropic_chat_completion(
-        self,
-        messages: List[Dict[str, str]],
-        model: Optional[str],
-        temperature: Optional[float],
-        max_tokens: Optional[int],
-        system_prompt: Optional[str],
-    ) -> Dict[str, Any]:
+    async def _anthropic_chat_completion(self, options: Dict[str, Any]) -> Dict[str, Any]:
         """Anthropic (Claude) chat completion"""
-        # Convert messages format for Anthropic
-        # Anthropic uses 'user' and 'assistant' roles, and system is separate
-        anthropic_messages = []
-        
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            
-            # Skip system messages (handled separately)
-            if role == "system":
-                if not system_prompt:
-                    system_prompt = content
-                continue
-            
-            # Convert to Anthropic format
-            if role in ["user", "assistant"]:
-                anthropic_messages.append({
-                    "role": role,
-                    "content": content,
-                })
-        
-        # Use system prompt parameter or the one from messages
-        system = system_prompt or None
-        
-        response = await self.client.messages.create(
-            model=model or self.model,
-            max_tokens=max_tokens or self.max_tokens,
-            temperature=temperature or self.temperature,
-            system=system,
-            messages=anthropic_messages,
-        )
+        response = await self.client.messages.create(**options)
         
         # Extract content (Anthropic returns content as a list)
         content = ""
@@ -217,6 +279,94 @@ class AIService:
             "provider": "anthropic",
         }
     
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a chat completion.
+        
+        Same arguments as chat_completion.
+        
+        Yields:
+            {'type': 'delta', 'content': ...} events as the text is generated, then one
+            {'type': 'done', ...} event with 'model', 'usage', 'finish_reason', 'provider' and 'cached'
+        """
+        options = self._options(messages, model, temperature, max_tokens, system_prompt)
+        cache_key = self._cache_key(options)
+        if cache_key:
+            cached = await cache_backend.get(cache_key)
+            if cached:
+                yield {"type": "delta", "content": cached["content"]}
+                yield {"type": "done", **{k: v for k, v in cached.items() if k != "content"}, "cached": True}
+                return
+        
+        if self.provider == AIProvider.OPENAI:
+            events = self._openai_stream(options)
+        else:
+            events = self._anthropic_stream(options)
+        
+        parts: List[str] = []
+        async for event in events:
+            if event["type"] == "delta":
+                parts.append(event["content"])
+                yield event
+            else:
+                summary = {k: v for k, v in event.items() if k != "type"}
+                await self._cache_response(cache_key, {**summary, "content": "".join(parts)})
+                yield {"type": "done", **summary, "cached": False}
+    
+    async def _openai_stream(self, options: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """OpenAI streamed completion (usage comes in a last chunk without choices)"""
+        stream = await self.client.chat.completions.create(
+            **options, stream=True, stream_options={"include_usage": True}
+        )
+        model, finish_reason, usage = options["model"], None, {}
+        async for chunk in stream:
+            model = getattr(chunk, "model", None) or model
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    yield {"type": "delta", "content": choice.delta.content}
+                finish_reason = choice.finish_reason or finish_reason
+            if getattr(chunk, "usage", None):
+                usage = {
+                    "prompt_tokens": chunk.usage.prompt_tokens,
+                    "completion_tokens": chunk.usage.completion_tokens,
+                    "total_tokens": chunk.usage.total_tokens,
+                }
+        yield {"type": "end", "model": model, "usage": usage, "finish_reason": finish_reason, "provider": "openai"}
+    
+    async def _anthropic_stream(self, options: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Anthropic streamed message (server-sent events of the Messages API)"""
+        stream = await self.client.messages.create(**options, stream=True)
+        model, finish_reason = options["model"], None
+        input_tokens = output_tokens = 0
+        async for event in stream:
+            if event.type == "message_start":
+                model = event.message.model or model
+                input_tokens = event.message.usage.input_tokens
+            elif event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                yield {"type": "delta", "content": event.delta.text}
+            elif event.type == "message_delta":
+                finish_reason = event.delta.stop_reason or finish_reason
+                output_tokens = event.usage.output_tokens
+        yield {
+            "type": "end",
+            "model": model,
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+            "finish_reason": finish_reason,
+            "provider": "anthropic",
+        }
+    
     async def simple_chat(
         self,
         user_message: str,
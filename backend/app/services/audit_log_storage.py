@@ -0,0 +1,435 @@
+"""
+Audit Log Storage
+Storage engine of the security audit log.
+
+- security_audit_logs is range-partitioned by month on timestamp
+  (security_audit_logs_yYYYYmMM, plus security_audit_logs_default as a safety
+  net); ensure_partitions() creates upcoming months and retention drops whole
+  partitions instead of running DELETE
+- every write also bumps security_audit_stats_hourly, so statistics read
+  hourly rollups and only scan raw events for the partial hours at the edges
+  of a date range
+- AuditLogWriter buffers events logged without a session and inserts them in
+  batches (one multi-row INSERT and one rollup upsert per flush)
+- audit trail pages use a keyset cursor on (timestamp, id)
+"""
+
+import asyncio
+import base64
+import re
+from collections import Counter, deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.security_audit import SecurityAuditLog, SecurityAuditStatsHourly
+
+
+PARENT_TABLE = "security_audit_logs"
+DEFAULT_PARTITION = "security_audit_logs_default"
+PARTITION_NAME_RE = re.compile(r"^security_audit_logs_y(\d{4})m(\d{2})$")
+
+# Events kept in memory while the database is unreachable; the oldest are dropped beyond this
+MAX_BUFFERED_EVENTS = 100_000
+
+EVENT_FIELDS = (
+    "timestamp", "event_type", "severity", "user_id", "user_email", "api_key_id",
+    "ip_address", "user_agent", "request_method", "request_path", "description",
+    "event_metadata", "success",
+)
+
+ATTACHED_PARTITIONS_SQL = text("""
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = 'security_audit_logs'
+""")
+
+
+def event_row(audit_log: SecurityAuditLog) -> Dict[str, Any]:
+    """Insertable values of an audit event (id comes from the sequence)"""
+    return {name: getattr(audit_log, name) for name in EVENT_FIELDS}
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive datetimes (query parameters) are taken as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def floor_hour(value: datetime) -> datetime:
+    return _utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value: datetime) -> datetime:
+    floored = floor_hour(value)
+    return floored if floored == _utc(value) else floored + timedelta(hours=1)
+
+
+# Statistics rollups
+
+
+def stats_rows(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate events into hourly rollup increments, sorted by key"""
+    counts = Counter(
+        (
+            row["user_id"] or 0,
+            floor_hour(row["timestamp"]),
+            row["event_type"],
+            row["severity"] or "info",
+            row["success"] or "unknown",
+        )
+        for row in rows
+    )
+    # A stable key order keeps concurrent upserts from deadlocking on each other
+    return [
+        {"user_id": user_id, "bucket": bucket, "event_type": event_type, "severity": severity,
+         "success": success, "event_count": count}
+        for (user_id, bucket, event_type, severity, success), count in sorted(counts.items())
+    ]
+
+
+async def record_stats(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Add events to the hourly rollups (same transaction as the events). Does not commit."""
+    increments = stats_rows(rows)
+    if not increments:
+        return
+    statement = insert(SecurityAuditStatsHourly).values(increments)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["user_id", "bucket", "event_type", "severity", "success"],
+            set_={"event_count": SecurityAuditStatsHourly.event_count + statement.excluded.event_count},
+        )
+    )
+
+
+async def write_events(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert audit events and their rollups in one batch. Does not commit."""
+    if not rows:
+        return
+    await db.execute(insert(SecurityAuditLog).values(rows))
+    await record_stats(db, rows)
+
+
+def split_stats_range(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[Optional[Tuple[Optional[datetime], Optional[datetime]]], List[Tuple[datetime, datetime, bool]]]:
+    """
+    Split the [start, end] range of a statistics query.
+
+    Returns:
+        (rollup_range, raw_ranges): rollup_range is the [from, to) range of whole hour
+        buckets (either bound may be None for unbounded, None when no whole hour is
+        covered); raw_ranges are (from, to, to_inclusive) edges counted from raw events
+    """
+    start = _utc(start) if start else None
+    end = _utc(end) if end else None
+    full_start = ceil_hour(start) if start else None
+    full_end = floor_hour(end) if end else None
+
+    if full_start is not None and full_end is not None and full_start >= full_end:
+        # Less than one whole hour: the raw events are a small, pruned scan
+        return None, [(start, end, True)]
+
+    raw_ranges = []
+    if start is not None and start < full_start:
+        raw_ranges.append((start, full_start, False))
+    if end is not None:
+        raw_ranges.append((full_end, end, True))
+    return (full_start, full_end), raw_ranges
+
+
+async def get_audit_stats(
+    db: AsyncSession,
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Dict[str, int]]:
+    """Event counts by type and by severity for a user, within [start, end]"""
+    rollup_range, raw_ranges = split_stats_range(start, end)
+    counts: Counter = Counter()
+
+    if rollup_range is not None:
+        rollup_start, rollup_end = rollup_range
+        query = (
+            select(
+                SecurityAuditStatsHourly.event_type,
+                SecurityAuditStatsHourly.severity,
+                func.sum(SecurityAuditStatsHourly.event_count),
+            )
+            .where(SecurityAuditStatsHourly.user_id == user_id)
+            .group_by(SecurityAuditStatsHourly.event_type, SecurityAuditStatsHourly.severity)
+        )
+        if rollup_start is not None:
+            query = query.where(SecurityAuditStatsHourly.bucket >= rollup_start)
+        if rollup_end is not None:
+            query = query.where(SecurityAuditStatsHourly.bucket < rollup_end)
+        for event_type, severity, count in (await db.execute(query)).all():
+            counts[(event_type, severity)] += int(count or 0)
+
+    for range_start, range_end, inclusive in raw_ranges:
+        upper = SecurityAuditLog.timestamp <= range_end if inclusive else SecurityAuditLog.timestamp < range_end
+        query = (
+            select(SecurityAuditLog.event_type, SecurityAuditLog.severity, func.count())
+            .where(SecurityAuditLog.user_id == user_id, SecurityAuditLog.timestamp >= range_start, upper)
+            .group_by(SecurityAuditLog.event_type, SecurityAuditLog.severity)
+        )
+        for event_type, severity, count in (await db.execute(query)).all():
+            counts[(event_type, severity)] += int(count or 0)
+
+    event_type_counts: Counter = Counter()
+    severity_counts: Counter = Counter()
+    for (event_type, severity), count in counts.items():
+        event_type_counts[event_type] += count
+        severity_counts[severity] += count
+    return {
+        "event_type_counts": dict(event_type_counts),
+        "severity_counts": dict(severity_counts),
+    }
+
+
+# Keyset pagination
+
+
+def encode_cursor(audit_log: SecurityAuditLog) -> str:
+    """Opaque cursor positioned after an audit log (newest-first order)"""
+    raw = f"{_utc(audit_log.timestamp).isoformat()}|{audit_log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, log_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except Exception as e:
+        raise ValueError(f"Invalid audit trail cursor: {cursor}") from e
+
+
+def paginate(query: Select, cursor: Optional[str], limit: int) -> Select:
+    """Newest-first page of an audit log query, after `cursor` when given"""
+    if cursor:
+        timestamp, log_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(SecurityAuditLog.timestamp, SecurityAuditLog.id) < tuple_(timestamp, log_id)
+        )
+    return query.order_by(SecurityAuditLog.timestamp.desc(), SecurityAuditLog.id.desc()).limit(limit)
+
+
+# Partition management
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month of a monthly partition name (None for other tables)"""
+    match = PARTITION_NAME_RE.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+async def attached_partitions(db: AsyncSession) -> List[str]:
+    result = await db.execute(ATTACHED_PARTITIONS_SQL)
+    return sorted(result.scalars().all())
+
+
+async def create_partition(db: AsyncSession, month: date) -> str:
+    """
+    Create and attach the partition of a month. Does not commit.
+
+    Rows of that month already in the default partition are moved into it, as
+    Postgres refuses to attach a range the default partition still holds.
+    """
+    name = partition_name(month)
+    bounds = {"start": month.isoformat(), "end": add_months(month, 1).isoformat()}
+    await db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    await db.execute(
+        text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE timestamp >= CAST(:start AS timestamptz) AND timestamp < CAST(:end AS timestamptz)
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """),
+        bounds,
+    )
+    await db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    return name
+
+
+async def ensure_partitions(
+    db: AsyncSession, today: Optional[date] = None, months_ahead: Optional[int] = None
+) -> List[str]:
+    """Create the partitions of the current month and the next ones. Does not commit."""
+    today = today or datetime.now(timezone.utc).date()
+    months_ahead = settings.AUDIT_LOG_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    attached = set(await attached_partitions(db))
+
+    created = []
+    current = month_start(today)
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) not in attached:
+            created.append(await create_partition(db, month))
+    if created:
+        logger.info(f"Security audit log partitions created: {', '.join(created)}")
+    return created
+
+
+async def drop_expired_partitions(
+    db: AsyncSession, today: Optional[date] = None, retention_days: Optional[int] = None
+) -> List[str]:
+    """
+    Drop monthly partitions whose whole month is older than the retention period,
+    with their hourly rollups. Does not commit.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    retention_days = retention_days or settings.AUDIT_LOG_RETENTION_DAYS
+    cutoff = today - timedelta(days=retention_days)
+
+    dropped = []
+    dropped_until: Optional[date] = None
+    for name in await attached_partitions(db):
+        month = partition_month(name)
+        if month is None or add_months(month, 1) > cutoff:
+            continue
+        await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        dropped.append(name)
+        dropped_until = max(dropped_until or month, add_months(month, 1))
+
+    if dropped_until is not None:
+        await db.execute(
+            SecurityAuditStatsHourly.__table__.delete().where(
+                SecurityAuditStatsHourly.bucket < datetime.combine(dropped_until, datetime.min.time(), timezone.utc)
+            )
+        )
+        logger.info(f"Security audit log partitions dropped (retention {retention_days} days): {', '.join(dropped)}")
+    return dropped
+
+
+# Batched writer
+
+
+class AuditLogWriter:
+    """
+    Buffers audit events of the API process and inserts them in batches.
+
+    Events are flushed every AUDIT_LOG_FLUSH_INTERVAL seconds, as soon as a full
+    batch is buffered, and on shutdown. A failed flush keeps the events buffered.
+    """
+
+    # Process-wide writer (started from the app lifespan)
+    _instance: Optional["AuditLogWriter"] = None
+    _task: Optional[asyncio.Task] = None
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.AUDIT_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_LOG_FLUSH_INTERVAL
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.counters: Dict[str, int] = {"written": 0, "batches": 0, "failed_flushes": 0, "dropped": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        if len(self._buffer) >= MAX_BUFFERED_EVENTS:
+            self._buffer.popleft()
+            self.counters["dropped"] += 1
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write every buffered event; returns the number written"""
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                try:
+                    async with self.session_factory() as session:
+                        await write_events(session, batch)
+                        await session.commit()
+                except Exception as e:
+                    # Keep the events, in order, for the next flush
+                    self._buffer.extendleft(reversed(batch))
+                    self.counters["failed_flushes"] += 1
+                    logger.error(f"Security audit batch of {len(batch)} events failed: {e}", exc_info=True)
+                    break
+                written += len(batch)
+                self.counters["batches"] += 1
+        self.counters["written"] += written
+        return written
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    @classmethod
+    def start(cls, session_factory: async_sessionmaker) -> "AuditLogWriter":
+        """Start the process-wide writer (idempotent)"""
+        if cls._task is None or cls._task.done():
+            cls._instance = cls(session_factory)
+            cls._task = asyncio.create_task(cls._instance.run_forever())
+            logger.info("Security audit log writer started")
+        return cls._instance
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop the writer and flush what is still buffered"""
+        task, cls._task = cls._task, None
+        instance, cls._instance = cls._instance, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if instance is not None:
+            await instance.flush()
+            if instance.pending:
+                logger.error(f"{instance.pending} security audit events lost at shutdown")
+
+    @classmethod
+    def get(cls) -> Optional["AuditLogWriter"]:
+        return cls._instance
@@ -0,0 +1,480 @@
+"""
+Bulk Email Service
+Batched SendGrid delivery for newsletters, receipts and other mass sends.
+
+- EmailBatchService (API) renders the template once per variant (language)
+  with the shared variables and stores one status row per recipient
+- BulkEmailSender (Celery worker) sends the pending recipients of a variant
+  as SendGrid personalizations, up to SENDGRID_PERSONALIZATIONS_PER_REQUEST
+  per request, over a process-wide pooled HTTP client; per-recipient variables
+  travel as substitutions
+- requests are spaced by an adaptive throttle (slower on 429, back to the
+  configured pace after successes); when SendGrid rejects a request because of
+  some personalizations, only those recipients fail and the others are resent;
+  statuses are updated one request at a time, so a retried task only sends
+  what is still pending
+"""
+
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+import httpx
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.email_batch import EmailBatch, EmailBatchRecipient
+from app.services.email_template_service import EmailTemplateService
+
+
+SENDGRID_MAIL_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+
+# Error field of a recipient-specific rejection, e.g. "personalizations.3.to.0.email"
+PERSONALIZATION_FIELD = re.compile(r"^personalizations\.(\d+)\.")
+
+# Recipient rows per INSERT when a batch is created
+INSERT_CHUNK_SIZE = 1000
+
+# Process-wide client (Celery worker process), created on first use
+_http_client: Optional[httpx.Client] = None
+
+
+class BulkEmailDeferred(Exception):
+    """SendGrid kept throttling or failing: retry the batch task later"""
+
+    def __init__(self, message: str, retry_after: float = 60.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def get_http_client() -> httpx.Client:
+    """Pooled client shared by every send of this process (keep-alive connections)"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+    return _http_client
+
+
+def close_http_client() -> None:
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        client.close()
+
+
+def substitution_tag(name: str) -> str:
+    """Placeholder of a template variable (same syntax as EmailTemplateService)"""
+    return f"{{{{{name}}}}}"
+
+
+def parse_retry_after(headers: Any, now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from Retry-After or SendGrid's X-RateLimit-Reset (epoch seconds)"""
+    value = headers.get("Retry-After")
+    if value is not None:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+    reset = headers.get("X-RateLimit-Reset")
+    if reset is not None:
+        try:
+            return max(float(reset) - (now if now is not None else time.time()), 0.0)
+        except ValueError:
+            pass
+    return None
+
+
+def rejected_personalizations(body: str) -> Set[int]:
+    """Indexes of the personalizations a 400 response blames (empty: the whole request)"""
+    try:
+        errors = json.loads(body).get("errors") or []
+    except (ValueError, AttributeError):
+        return set()
+    indexes = set()
+    for error in errors:
+        match = PERSONALIZATION_FIELD.match(str((error or {}).get("field") or ""))
+        if match is None:
+            # A request-level error fails every recipient
+            return set()
+        indexes.add(int(match.group(1)))
+    return indexes
+
+
+def build_payload(
+    batch_id: int,
+    variant: Dict[str, Any],
+    recipients: Sequence[Any],
+    from_email: str,
+    from_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    mail/send body for recipients of one variant: one personalization each.
+
+    Every personalization carries every per-recipient variable of the request
+    (empty when the recipient has none), so no placeholder is left in the
+    content, and custom_args identifying the recipient row for event webhooks.
+    """
+    variable_names = sorted({name for recipient in recipients for name in (recipient.substitutions or {})})
+    personalizations = []
+    for recipient in recipients:
+        to = {"email": recipient.email}
+        if recipient.name:
+            to["name"] = recipient.name
+        personalization: Dict[str, Any] = {
+            "to": [to],
+            "custom_args": {"email_batch_id": str(batch_id), "email_batch_recipient_id": str(recipient.id)},
+        }
+        if variable_names:
+            values = recipient.substitutions or {}
+            personalization["substitutions"] = {
+                substitution_tag(name): "" if values.get(name) is None else str(values[name])
+                for name in variable_names
+            }
+        personalizations.append(personalization)
+
+    content = []
+    if variant.get("text_body"):
+        content.append({"type": "text/plain", "value": variant["text_body"]})
+    content.append({"type": "text/html", "value": variant["html_body"]})
+
+    sender = {"email": from_email}
+    if from_name:
+        sender["name"] = from_name
+    return {
+        "personalizations": personalizations,
+        "from": sender,
+        "subject": variant["subject"],
+        "content": content,
+    }
+
+
+@dataclass
+class SendResult:
+    """Outcome of one mail/send request"""
+    status_code: int
+    message_id: Optional[str] = None
+    retry_after: Optional[float] = None
+    error: Optional[str] = None
+    rejected: Set[int] = field(default_factory=set)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    @property
+    def throttled(self) -> bool:
+        return self.status_code == 429
+
+    @property
+    def retryable(self) -> bool:
+        """Throttled, server error or network error (status 0)"""
+        return self.throttled or self.status_code == 0 or self.status_code >= 500
+
+
+class SendGridBulkClient:
+    """mail/send over the pooled HTTP client"""
+
+    def __init__(self, api_key: str, http_client: Optional[httpx.Client] = None):
+        self.api_key = api_key
+        self.http_client = http_client
+
+    def send(self, payload: Dict[str, Any]) -> SendResult:
+        client = self.http_client or get_http_client()
+        try:
+            response = client.post(
+                SENDGRID_MAIL_SEND_URL,
+                json=payload,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+        except httpx.HTTPError as e:
+            return SendResult(status_code=0, error=f"{type(e).__name__}: {e}")
+
+        if 200 <= response.status_code < 300:
+            return SendResult(response.status_code, message_id=response.headers.get("X-Message-Id"))
+        return SendResult(
+            response.status_code,
+            retry_after=parse_retry_after(response.headers),
+            error=response.text[:500],
+            rejected=rejected_personalizations(response.text) if response.status_code == 400 else set(),
+        )
+
+
+class AdaptiveThrottle:
+    """
+    Spacing between requests.
+
+    The interval doubles on every throttled or failed request (waiting at
+    least the server's Retry-After) and halves back toward the configured
+    minimum after each success.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.0,
+        max_interval: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.sleep = sleep
+        self.clock = clock
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        delay = self._next_at - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+        self._next_at = self.clock() + self.interval
+
+    def on_success(self) -> None:
+        self.interval = max(self.min_interval, self.interval / 2)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        self.interval = min(self.max_interval, max(self.interval * 2, 1.0))
+        self._next_at = self.clock() + max(self.interval, retry_after or 0.0)
+
+
+def batch_summary(batch: EmailBatch) -> Dict[str, Any]:
+    return {
+        "batch_id": batch.id,
+        "status": batch.status,
+        "total": batch.total_count,
+        "sent": batch.sent_count,
+        "failed": batch.failed_count,
+    }
+
+
+class EmailBatchService:
+    """Service creating bulk email batches (API process)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_batch(
+        self,
+        template_key: str,
+        recipients: Sequence[Dict[str, Any]],
+        variables: Optional[Dict[str, Any]] = None,
+        default_language: str = "en",
+        created_by_id: Optional[int] = None,
+    ) -> EmailBatch:
+        """
+        Render the template once per language and store the recipients.
+
+        Args:
+            recipients: {"email", "name", "language", "variables"} dicts; duplicate
+                addresses are dropped (first one wins)
+            variables: Shared variables, rendered into the variants; per-recipient
+                variables become SendGrid substitutions
+
+        Raises:
+            LookupError: If the template is missing or inactive for a language
+        """
+        unique: Dict[str, Dict[str, Any]] = {}
+        for recipient in recipients:
+            unique.setdefault(recipient["email"].strip().lower(), recipient)
+
+        template_service = EmailTemplateService(self.db)
+        variants: Dict[str, Dict[str, str]] = {}
+        for recipient in unique.values():
+            language = recipient.get("language") or default_language
+            if language in variants:
+                continue
+            rendered = await template_service.render_template(template_key, variables or {}, language=language)
+            if rendered is None:
+                raise LookupError(f"Email template '{template_key}' ({language}) not found or inactive")
+            variants[language] = rendered
+
+        batch = EmailBatch(
+            template_key=template_key,
+            status="pending",
+            variants=variants,
+            total_count=len(unique),
+            created_by_id=created_by_id,
+        )
+        self.db.add(batch)
+        await self.db.flush()
+
+        rows = [
+            {
+                "batch_id": batch.id,
+                "email": email,
+                "name": recipient.get("name"),
+                "variant": recipient.get("language") or default_language,
+                "substitutions": recipient.get("variables") or None,
+            }
+            for email, recipient in unique.items()
+        ]
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            await self.db.execute(insert(EmailBatchRecipient), rows[start:start + INSERT_CHUNK_SIZE])
+        await self.db.commit()
+        await self.db.refresh(batch)
+
+        logger.info(
+            f"Email batch {batch.id} created: template '{template_key}', "
+            f"{len(rows)} recipient(s), {len(variants)} variant(s)"
+        )
+        return batch
+
+    async def get_batch(self, batch_id: int) -> Optional[EmailBatch]:
+        return await self.db.get(EmailBatch, batch_id)
+
+
+class BulkEmailSender:
+    """Sends the pending recipients of a batch (Celery worker, synchronous session)"""
+
+    def __init__(
+        self,
+        db: Session,
+        client: SendGridBulkClient,
+        from_email: str,
+        from_name: Optional[str] = None,
+        throttle: Optional[AdaptiveThrottle] = None,
+        chunk_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.db = db
+        self.client = client
+        self.from_email = from_email
+        self.from_name = from_name
+        self.throttle = throttle or AdaptiveThrottle(min_interval=settings.BULK_EMAIL_MIN_INTERVAL_SECONDS)
+        self.chunk_size = chunk_size or settings.SENDGRID_PERSONALIZATIONS_PER_REQUEST
+        self.max_attempts = max_attempts or settings.BULK_EMAIL_MAX_ATTEMPTS
+        self.requests = 0
+
+    def pending(self, batch_id: int, variant: str) -> List[Any]:
+        result = self.db.execute(
+            select(
+                EmailBatchRecipient.id,
+                EmailBatchRecipient.email,
+                EmailBatchRecipient.name,
+                EmailBatchRecipient.substitutions,
+            )
+            .where(
+                EmailBatchRecipient.batch_id == batch_id,
+                EmailBatchRecipient.variant == variant,
+                EmailBatchRecipient.status == "pending",
+            )
+            .order_by(EmailBatchRecipient.id)
+            .limit(self.chunk_size)
+        )
+        return result.all()
+
+    def send_batch(self, batch_id: int) -> Dict[str, Any]:
+        """
+        Send every pending recipient of the batch.
+
+        Raises:
+            LookupError: If the batch doesn't exist
+            BulkEmailDeferred: If SendGrid kept throttling or failing (sent
+                recipients are recorded, the rest stays pending)
+        """
+        batch = self.db.get(EmailBatch, batch_id)
+        if batch is None:
+            raise LookupError(f"Email batch {batch_id} not found")
+        if batch.status == "completed":
+            return batch_summary(batch)
+
+        batch.status = "sending"
+        batch.started_at = batch.started_at or datetime.now(timezone.utc)
+        self.db.commit()
+
+        for variant_key, variant in batch.variants.items():
+            while True:
+                rows = self.pending(batch.id, variant_key)
+                if not rows:
+                    break
+                self.send_rows(batch.id, variant, rows)
+
+        batch.status = "completed"
+        batch.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        self.db.refresh(batch)
+
+        logger.info(
+            f"Email batch {batch.id} completed: {batch.sent_count} sent, {batch.failed_count} failed "
+            f"({self.requests} SendGrid request(s))"
+        )
+        return batch_summary(batch)
+
+    def send_rows(self, batch_id: int, variant: Dict[str, Any], rows: Sequence[Any]) -> None:
+        """One request for rows (recipients blamed by a rejection fail, the others are resent)"""
+        payload = build_payload(batch_id, variant, rows, self.from_email, self.from_name)
+        ids = [row.id for row in rows]
+
+        result = None
+        for attempt in range(1, self.max_attempts + 1):
+            self.throttle.wait()
+            self.requests += 1
+            result = self.client.send(payload)
+            if result.ok:
+                self.throttle.on_success()
+                self.record(batch_id, ids, "sent", message_id=result.message_id)
+                return
+            if not result.retryable:
+                break
+            logger.warning(
+                f"SendGrid request for email batch {batch_id} ({len(ids)} recipients) "
+                f"returned {result.status_code or 'a network error'}, attempt {attempt}/{self.max_attempts}"
+            )
+            self.throttle.on_throttled(result.retry_after)
+
+        if result.retryable:
+            self.db.execute(
+                update(EmailBatch)
+                .where(EmailBatch.id == batch_id)
+                .values(last_error=result.error)
+            )
+            self.db.commit()
+            raise BulkEmailDeferred(
+                f"SendGrid unavailable for email batch {batch_id}: {result.error}",
+                retry_after=max(result.retry_after or 0.0, 60.0),
+            )
+
+        rejected = [row for index, row in enumerate(rows) if index in result.rejected]
+        if rejected and len(rejected) < len(rows):
+            logger.warning(f"SendGrid rejected {len(rejected)} recipient(s) of email batch {batch_id}: {result.error}")
+            self.record(batch_id, [row.id for row in rejected], "failed", error=result.error)
+            self.send_rows(batch_id, variant, [row for index, row in enumerate(rows) if index not in result.rejected])
+            return
+        logger.warning(f"SendGrid rejected a request of email batch {batch_id} ({len(ids)} recipients): {result.error}")
+        self.record(batch_id, ids, "failed", error=result.error)
+
+    def record(
+        self,
+        batch_id: int,
+        ids: List[int],
+        status: str,
+        message_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Status of a request's recipients and the batch counter, committed together"""
+        self.db.execute(
+            update(EmailBatchRecipient)
+            .where(EmailBatchRecipient.id.in_(ids))
+            .values(
+                status=status,
+                attempts=EmailBatchRecipient.attempts + 1,
+                message_id=message_id,
+                error=error,
+                sent_at=func.now() if status == "sent" else None,
+            )
+        )
+        counter = EmailBatch.sent_count if status == "sent" else EmailBatch.failed_count
+        self.db.execute(
+            update(EmailBatch)
+            .where(EmailBatch.id == batch_id)
+            .values({counter: counter + len(ids)})
+        )
+        self.db.commit()
@@ -0,0 +1,194 @@
+"""
+Campaign Rollup Service
+Keeps campaigns.total_raised, donation_count and donor_count in sync with
+completed donations, so campaign lists and stats are plain reads.
+
+- apply(): incremental update from a donation's before/after state
+  (one UPDATE per affected campaign, distinct donors checked through
+  idx_donations_campaign_donor_completed)
+- reconcile(): one grouped pass over donations that fixes drifted campaigns,
+  or recomputes every campaign of the organization
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import bindparam, case, exists, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.models.organization_donors import Campaign, Donation
+
+
+# Only completed donations count towards campaign totals
+COUNTED_STATUS = "completed"
+
+
+@dataclass(frozen=True)
+class DonationState:
+    """The fields of a donation that campaign rollups depend on"""
+    donation_id: UUID
+    donor_id: UUID
+    campaign_id: Optional[UUID]
+    amount: Decimal
+    payment_status: str
+
+    @classmethod
+    def of(cls, donation: Donation) -> "DonationState":
+        return cls(
+            donation_id=donation.id,
+            donor_id=donation.donor_id,
+            campaign_id=donation.campaign_id,
+            amount=Decimal(donation.amount or 0),
+            payment_status=donation.payment_status,
+        )
+
+    @property
+    def counted(self) -> bool:
+        return self.campaign_id is not None and self.payment_status == COUNTED_STATUS
+
+
+RECONCILE_SQL = """
+    WITH totals AS (
+        SELECT campaign_id,
+               sum(amount) AS total_raised,
+               count(*) AS donation_count,
+               count(DISTINCT donor_id) AS donor_count
+        FROM donations
+        WHERE organization_id = :organization_id
+        AND payment_status = 'completed'
+        AND campaign_id IS NOT NULL
+        {campaign_filter}
+        GROUP BY campaign_id
+    ),
+    expected AS (
+        SELECT c.id,
+               coalesce(t.total_raised, 0) AS total_raised,
+               coalesce(t.donation_count, 0) AS donation_count,
+               coalesce(t.donor_count, 0) AS donor_count
+        FROM campaigns c
+        LEFT JOIN totals t ON t.campaign_id = c.id
+        WHERE c.organization_id = :organization_id
+        {campaign_filter_c}
+    )
+    UPDATE campaigns c
+    SET total_raised = e.total_raised,
+        donation_count = e.donation_count,
+        donor_count = e.donor_count,
+        updated_at = now()
+    FROM expected e
+    WHERE c.id = e.id
+    AND (c.total_raised, c.donation_count, c.donor_count)
+        IS DISTINCT FROM (e.total_raised, e.donation_count, e.donor_count)
+    RETURNING c.id
+"""
+
+
+class CampaignRollupService:
+    """Service for campaign rollups in one organization database"""
+
+    def __init__(self, db: AsyncSession, organization_id: UUID):
+        self.db = db
+        self.organization_id = organization_id
+
+    async def apply(self, before: Optional[DonationState], after: Optional[DonationState]) -> None:
+        """
+        Apply a donation state transition to campaign rollups.
+
+        Call after the donation change is flushed; does not commit.
+
+        Args:
+            before: State before the change (None for a new donation)
+            after: State after the change (None for a deleted donation)
+        """
+        was_counted = before is not None and before.counted
+        is_counted = after is not None and after.counted
+
+        if was_counted and is_counted and (before.campaign_id, before.donor_id) == (after.campaign_id, after.donor_id):
+            # Same campaign and donor: only the amount can have changed
+            if after.amount != before.amount:
+                await self._update(after.campaign_id, amount=after.amount - before.amount)
+            return
+
+        if was_counted:
+            await self._remove(before)
+        if is_counted:
+            await self._add(after)
+
+    async def _add(self, state: DonationState) -> None:
+        first_for_donor = ~self._other_completed(state)
+        await self._update(
+            state.campaign_id,
+            amount=state.amount,
+            donations=1,
+            donors=case((first_for_donor, 1), else_=0),
+        )
+
+    async def _remove(self, state: DonationState) -> None:
+        last_for_donor = ~self._other_completed(state)
+        await self._update(
+            state.campaign_id,
+            amount=-state.amount,
+            donations=-1,
+            donors=case((last_for_donor, -1), else_=0),
+        )
+
+    @staticmethod
+    def _other_completed(state: DonationState):
+        """Whether the donor has another completed donation in the campaign"""
+        return exists().where(
+            Donation.campaign_id == state.campaign_id,
+            Donation.donor_id == state.donor_id,
+            Donation.payment_status == COUNTED_STATUS,
+            Donation.id != state.donation_id,
+        )
+
+    async def _update(self, campaign_id: UUID, amount: Decimal = Decimal("0.00"), donations: int = 0, donors=0) -> None:
+        # Single UPDATE: the campaign row lock serializes concurrent donations
+        await self.db.execute(
+            update(Campaign)
+            .where(Campaign.id == campaign_id, Campaign.organization_id == self.organization_id)
+            .values(
+                total_raised=Campaign.total_raised + amount,
+                donation_count=Campaign.donation_count + donations,
+                donor_count=Campaign.donor_count + donors,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def reconcile(self, campaign_ids: Optional[Iterable[UUID]] = None) -> List[UUID]:
+        """
+        Recompute rollups from donations in one grouped query and fix drifted campaigns.
+
+        Args:
+            campaign_ids: Limit to these campaigns (default: every campaign of the organization)
+
+        Returns:
+            IDs of the campaigns whose rollups were corrected (does not commit)
+        """
+        params = {"organization_id": self.organization_id}
+        campaign_filter = campaign_filter_c = ""
+        bind = []
+        if campaign_ids is not None:
+            params["campaign_ids"] = list(campaign_ids)
+            if not params["campaign_ids"]:
+                return []
+            campaign_filter = "AND campaign_id IN :campaign_ids"
+            campaign_filter_c = "AND c.id IN :campaign_ids"
+            bind.append(bindparam("campaign_ids", expanding=True))
+
+        statement = text(
+            RECONCILE_SQL.format(campaign_filter=campaign_filter, campaign_filter_c=campaign_filter_c)
+        )
+        if bind:
+            statement = statement.bindparams(*bind)
+        result = await self.db.execute(statement, params)
+        corrected = list(result.scalars().all())
+        if corrected:
+            logger.warning(
+                f"Campaign rollups corrected for {len(corrected)} campaign(s) "
+                f"of organization {self.organization_id}"
+            )
+        return corrected
@@ -7,8 +7,11 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy import select, func, and_, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.query_optimization import BatchLoader
 from app.models.comment import Comment, CommentReaction
+from app.models.user import User
 from app.core.logging import logger
 
 
@@ -63,24 +66,28 @@ class CommentService:
         if not include_deleted:
             all_comments_query = all_comments_query.where(Comment.is_deleted == False)
         
-        # Eager load user relationship to prevent N+1 queries
-        all_comments_query = all_comments_query.options(selectinload(Comment.user))
+        all_comments_query = all_comments_query.order_by(Comment.created_at)
         
         all_comments_result = await self.db.execute(all_comments_query)
-        all_comments = {comment.id: comment for comment in all_comments_result.scalars().all()}
+        all_comments = all_comments_result.scalars().all()
+        
+        # Authors of the whole thread in one query
+        users = await BatchLoader.for_session(self.db, User).load_many(
+            comment.user_id for comment in all_comments
+        )
         
-        # Build threaded structure in memory
+        # Build threaded structure in memory; user and replies are set as loaded
+        # so that reading them never lazy-loads per comment
+        replies: Dict[int, List[Comment]] = {comment.id: [] for comment in all_comments}
         top_level_comments = []
-        for comment in all_comments.values():
+        for comment in all_comments:
+            set_committed_value(comment, "user", users.get(comment.user_id))
             if comment.parent_id is None:
                 top_level_comments.append(comment)
-            else:
-                # Attach to parent's replies
-                parent = all_comments.get(comment.parent_id)
-                if parent:
-                    if not hasattr(parent, 'replies') or parent.replies is None:
-                        parent.replies = []
-                    parent.replies.append(comment)
+            elif comment.parent_id in replies:
+                replies[comment.parent_id].append(comment)
+        for comment in all_comments:
+            set_committed_value(comment, "replies", replies[comment.id])
         
         # Sort top-level comments by created_at desc
         top_level_comments.sort(key=lambda c: c.created_at, reverse=True)
@@ -0,0 +1,185 @@
+"""
+Documentation Index
+In-memory BM25 index over markdown documentation chunks.
+
+Documents are split at their headings (long sections at paragraph
+boundaries), so a question retrieves a few focused excerpts instead of whole
+files. The index is immutable: DocumentationService builds a new one when
+the files change and swaps it in.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.logging import logger
+
+
+# BM25 parameters (usual defaults)
+K1 = 1.5
+B = 0.75
+
+# Heading tokens count as much as this many occurrences in the text
+HEADING_WEIGHT = 3
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+# (relative path, mtime_ns, size) of every indexed file
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens (accents kept), single characters dropped"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+
+@dataclass(frozen=True)
+class DocumentChunk:
+    """A section (or part of a long section) of a documentation file"""
+    path: str
+    heading: str
+    text: str
+    position: int
+
+    def format(self) -> str:
+        title = f"{self.path} > {self.heading}" if self.heading else self.path
+        return f"=== {title} ===\n{self.text}"
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split at blank lines so that parts stay under max_chars (hard cut as last resort)"""
+    if len(text) <= max_chars:
+        return [text]
+    parts: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        while len(paragraph) > max_chars:
+            parts.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        current = paragraph
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_markdown(path: str, content: str, max_chars: int = 1500) -> List[DocumentChunk]:
+    """
+    Chunks of a markdown document, one per section.
+
+    The heading of a chunk is its heading trail ("Setup > Database"), so
+    excerpts keep their context.
+    """
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    trail: List[str] = []
+    in_code = False
+    for line in content.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING_PATTERN.match(line)
+        if match:
+            level = len(match.group(1))
+            trail = trail[:level - 1] + [match.group(2)]
+            sections.append((" > ".join(trail), []))
+        else:
+            sections[-1][1].append(line)
+
+    chunks: List[DocumentChunk] = []
+    for heading, lines in sections:
+        text = "\n".join(lines).strip()
+        if not text:
+            continue
+        for part in _split_long(text, max_chars):
+            chunks.append(DocumentChunk(path=path, heading=heading, text=part, position=len(chunks)))
+    return chunks
+
+
+class DocumentationIndex:
+    """BM25 inverted index over documentation chunks"""
+
+    def __init__(self, documents: Dict[str, str], chunk_chars: int = 1500, signature: Signature = ()):
+        self.documents = documents
+        self.signature = signature
+        self.chunks: List[DocumentChunk] = []
+        for path in sorted(documents):
+            self.chunks.extend(chunk_markdown(path, documents[path], chunk_chars))
+
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths: List[int] = []
+        for chunk_id, chunk in enumerate(self.chunks):
+            terms = Counter(tokenize(chunk.text))
+            for token in tokenize(chunk.heading):
+                terms[token] += HEADING_WEIGHT
+            for term, frequency in terms.items():
+                self.postings[term].append((chunk_id, frequency))
+            self.lengths.append(sum(terms.values()))
+
+        count = len(self.chunks)
+        self.average_length = (sum(self.lengths) / count) if count else 0.0
+        self.idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    @property
+    def files(self) -> List[str]:
+        return sorted(self.documents)
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[float, DocumentChunk]]:
+        """Best chunks for the query, highest BM25 score first"""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for chunk_id, frequency in self.postings[term]:
+                norm = K1 * (1 - B + B * self.lengths[chunk_id] / self.average_length)
+                scores[chunk_id] += idf * frequency * (K1 + 1) / (frequency + norm)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(score, self.chunks[chunk_id]) for chunk_id, score in best]
+
+    def context(self, query: str, top_k: int = 8, max_chars: int = 12000) -> str:
+        """Best chunks formatted for a prompt, within max_chars"""
+        sections: List[str] = []
+        total = 0
+        for _, chunk in self.search(query, top_k):
+            section = chunk.format()
+            if total + len(section) > max_chars:
+                continue
+            sections.append(section)
+            total += len(section) + 2
+        return "\n\n".join(sections)
+
+
+def scan_signature(docs_path: Optional[Path]) -> Signature:
+    """Stat-only listing of the markdown files (cheap change detection)"""
+    if docs_path is None or not docs_path.exists():
+        return ()
+    entries = []
+    for md_file in docs_path.glob("**/*.md"):
+        try:
+            stat = md_file.stat()
+        except OSError:
+            continue
+        entries.append((str(md_file.relative_to(docs_path)), stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+def read_documents(docs_path: Path, paths: Iterable[str]) -> Dict[str, str]:
+    documents = {}
+    for relative_path in paths:
+        try:
+            documents[relative_path] = (docs_path / relative_path).read_text(encoding="utf-8")
+        except Exception as e:
+            logger.error(f"Error reading documentation file {relative_path}: {e}")
+    return documents
@@ -1,23 +1,35 @@
 """
 Documentation Service
 Loads and processes documentation files for AI context
+
+The markdown files are read once into a BM25 index (see
+app/services/documentation_index.py) that is rebuilt when a file changes;
+changes are detected from file stats, at most every
+DOCS_INDEX_CHECK_INTERVAL_SECONDS. Async callers check and rebuild in a worker
+thread, so the event loop never reads files.
 """
 
-import os
+import asyncio
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Optional
+
+from app.core.config import settings
 from app.core.logging import logger
+from app.services.documentation_index import DocumentationIndex, Signature, read_documents, scan_signature
 
 
 class DocumentationService:
     """Service for loading and processing documentation files"""
     
-    def __init__(self, docs_path: Optional[str] = None):
+    def __init__(self, docs_path: Optional[str] = None, check_interval: Optional[float] = None):
         """
         Initialize documentation service.
         
         Args:
             docs_path: Path to documentation directory (defaults to project root/docs)
+            check_interval: Seconds between file change checks (default: DOCS_INDEX_CHECK_INTERVAL_SECONDS)
         """
         if docs_path:
             self.docs_path = Path(docs_path)
@@ -32,6 +44,75 @@ class DocumentationService:
         if not self.docs_path.exists():
             logger.warning(f"Documentation path does not exist: {self.docs_path}")
             self.docs_path = None
+        
+        self.check_interval = (
+            settings.DOCS_INDEX_CHECK_INTERVAL_SECONDS if check_interval is None else check_interval
+        )
+        self._index: Optional[DocumentationIndex] = None
+        self._checked_at = 0.0
+        # Rebuilds may run in worker threads
+        self._lock = threading.Lock()
+    
+    def _is_fresh(self) -> bool:
+        return self._index is not None and time.monotonic() - self._checked_at < self.check_interval
+    
+    def _build_index(self, signature: Signature) -> DocumentationIndex:
+        started = time.perf_counter()
+        documents = read_documents(self.docs_path, [entry[0] for entry in signature]) if self.docs_path else {}
+        index = DocumentationIndex(documents, chunk_chars=settings.DOCS_CHUNK_CHARS, signature=signature)
+        logger.info(
+            f"Documentation index built: {len(documents)} files, {len(index.chunks)} chunks "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return index
+    
+    def get_index(self) -> DocumentationIndex:
+        """
+        Current documentation index (blocking: may stat and read files).
+        
+        Returns:
+            The cached index, rebuilt first when a file was added, removed or modified
+        """
+        if self._is_fresh():
+            return self._index
+        with self._lock:
+            if self._is_fresh():
+                return self._index
+            signature = scan_signature(self.docs_path)
+            if self._index is None or signature != self._index.signature:
+                self._index = self._build_index(signature)
+            self._checked_at = time.monotonic()
+            return self._index
+    
+    async def aget_index(self) -> DocumentationIndex:
+        """Current documentation index; checks and rebuilds run in a worker thread"""
+        if self._is_fresh():
+            return self._index
+        return await asyncio.to_thread(self.get_index)
+    
+    async def retrieve_context(
+        self,
+        question: str,
+        top_k: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> str:
+        """
+        Documentation excerpts relevant to a question, formatted for a prompt.
+        
+        Args:
+            question: Text to match (usually the latest user messages)
+            top_k: Chunks to retrieve (default: DOCS_RETRIEVAL_TOP_K)
+            max_chars: Size limit of the excerpts (default: DOCS_CONTEXT_MAX_CHARS)
+            
+        Returns:
+            Excerpts with their file and section, best match first ("" when nothing matches)
+        """
+        index = await self.aget_index()
+        return index.context(
+            question,
+            top_k=top_k or settings.DOCS_RETRIEVAL_TOP_K,
+            max_chars=max_chars or settings.DOCS_CONTEXT_MAX_CHARS,
+        )
     
     def load_all_documentation(self, max_size_per_file: int = 50000) -> Dict[str, str]:
         """
@@ -48,32 +129,11 @@ class DocumentationService:
             return {}
         
         documentation = {}
-        
-        try:
-            # Find all markdown files
-            md_files = list(self.docs_path.glob("**/*.md"))
-            
-            for md_file in md_files:
-                try:
-                    # Read file content
-                    content = md_file.read_text(encoding='utf-8')
-                    
-                    # Limit file size to avoid token limits
-                    if len(content) > max_size_per_file:
-                        content = content[:max_size_per_file] + "\n\n[... content truncated ...]"
-                    
-                    # Use relative path as key
-                    relative_path = md_file.relative_to(self.docs_path)
-                    documentation[str(relative_path)] = content
-                    
-                except Exception as e:
-                    logger.error(f"Error reading documentation file {md_file}: {e}")
-                    continue
-            
-            logger.info(f"Loaded {len(documentation)} documentation files")
-            
-        except Exception as e:
-            logger.error(f"Error loading documentation: {e}")
+        for relative_path, content in self.get_index().documents.items():
+            # Limit file size to avoid token limits
+            if len(content) > max_size_per_file:
+                content = content[:max_size_per_file] + "\n\n[... content truncated ...]"
+            documentation[relative_path] = content
         
         return documentation
     
@@ -87,18 +147,15 @@ class DocumentationService:
         if not self.docs_path or not self.docs_path.exists():
             return "No documentation available"
         
-        try:
-            md_files = list(self.docs_path.glob("**/*.md"))
-            file_list = [str(f.relative_to(self.docs_path)) for f in md_files]
-            return f"Available documentation files ({len(file_list)}):\n" + "\n".join(f"- {f}" for f in sorted(file_list))
-        except Exception as e:
-            logger.error(f"Error getting documentation summary: {e}")
-            return "Error loading documentation summary"
+        file_list = self.get_index().files
+        return f"Available documentation files ({len(file_list)}):\n" + "\n".join(f"- {f}" for f in file_list)
     
     def format_documentation_for_context(self, max_total_size: int = 100000) -> str:
         """
         Format documentation for AI context.
         
+        Prefer retrieve_context, which only sends the excerpts relevant to a question.
+        
         Args:
             max_total_size: Maximum total size in characters (default: 100000)
             
@@ -132,60 +189,27 @@ class DocumentationService:
     
     def search_documentation(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
         """
-        Simple text search in documentation files.
+        Ranked search in documentation sections (BM25).
         
         Args:
             query: Search query
             max_results: Maximum number of results
             
         Returns:
-            List of dicts with 'file' and 'content' keys
+            List of dicts with 'file', 'section', 'content' and 'relevance' keys
         """
         if not self.docs_path or not self.docs_path.exists():
             return []
         
-        query_lower = query.lower()
-        results = []
-        
-        try:
-            md_files = list(self.docs_path.glob("**/*.md"))
-            
-            for md_file in md_files:
-                try:
-                    content = md_file.read_text(encoding='utf-8')
-                    
-                    # Simple text search
-                    if query_lower in content.lower():
-                        # Extract relevant snippet (around the match)
-                        content_lower = content.lower()
-                        index = content_lower.find(query_lower)
-                        
-                        if index >= 0:
-                            # Extract context around match (500 chars before and after)
-                            start = max(0, index - 500)
-                            end = min(len(content), index + len(query) + 500)
-                            snippet = content[start:end]
-                            
-                            results.append({
-                                'file': str(md_file.relative_to(self.docs_path)),
-                                'content': snippet,
-                                'relevance': content_lower.count(query_lower)  # Simple relevance score
-                            })
-                            
-                            if len(results) >= max_results:
-                                break
-                                
-                except Exception as e:
-                    logger.error(f"Error searching in {md_file}: {e}")
-                    continue
-            
-            # Sort by relevance
-            results.sort(key=lambda x: x['relevance'], reverse=True)
-            
-        except Exception as e:
-            logger.error(f"Error searching documentation: {e}")
-        
-        return results[:max_results]
+        return [
+            {
+                'file': chunk.path,
+                'section': chunk.heading,
+                'content': chunk.text,
+                'relevance': round(score, 3),
+            }
+            for score, chunk in self.get_index().search(query, max_results)
+        ]
 
 
 # Singleton instance
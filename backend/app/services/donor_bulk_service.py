@@ -0,0 +1,312 @@
+"""
+Donor Bulk Service
+Set-based bulk operations on donors of an organization database.
+
+Each action runs as one statement over the selected donors, whatever their
+number:
+- add_tag / add_to_segment: INSERT ... SELECT ... ON CONFLICT DO NOTHING
+- remove_tag / remove_from_segment: DELETE ... WHERE donor_id IN (...)
+- activate / deactivate: UPDATE donors ... WHERE id = ANY(...)
+- delete: DELETE FROM donors (assignments and donations cascade)
+
+Statements return the affected donor IDs, so tag and segment donor_count
+are adjusted with one relative UPDATE, and explicit ID lists get a
+per-donor result (applied, unchanged or not_found). Nothing is committed.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Integer, and_, any_, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.logging import logger
+from app.models.organization_donors import (
+    Donation,
+    Donor,
+    DonorSegment,
+    DonorSegmentAssignment,
+    DonorTag,
+    DonorTagAssignment,
+)
+from app.services.campaign_rollup_service import COUNTED_STATUS, CampaignRollupService
+from app.services.donor_search_service import DonorSearchService
+from app.services.donor_tag_service import DonorTagService, array_param, normalize_tag_names
+
+
+BULK_ACTIONS = ("add_tag", "remove_tag", "add_to_segment", "remove_from_segment", "activate", "deactivate", "delete")
+
+# Largest explicit donor ID list accepted in one request
+MAX_BULK_DONOR_IDS = 10000
+
+
+@dataclass
+class DonorSelection:
+    """Donors targeted by a bulk action: explicit IDs or list filters"""
+    donor_ids: Optional[List[UUID]] = None
+    search: Optional[str] = None
+    is_active: Optional[bool] = None
+    tags: List[str] = field(default_factory=list)
+    tag_match: str = "all"
+    min_total_donated: Optional[Any] = None
+    max_total_donated: Optional[Any] = None
+
+    @property
+    def by_ids(self) -> bool:
+        return self.donor_ids is not None
+
+    def has_criteria(self) -> bool:
+        return self.by_ids or any((
+            self.search and self.search.strip(),
+            self.is_active is not None,
+            normalize_tag_names(self.tags),
+            self.min_total_donated is not None,
+            self.max_total_donated is not None,
+        ))
+
+
+class DonorBulkService:
+    """Service for bulk donor operations in one organization database"""
+
+    def __init__(self, db: AsyncSession, organization_id: UUID):
+        self.db = db
+        self.organization_id = organization_id
+
+    async def conditions(self, selection: DonorSelection) -> List[ColumnElement]:
+        """Donor conditions of a selection (same filters as the donor list)"""
+        conditions = [Donor.organization_id == self.organization_id]
+        if selection.by_ids:
+            conditions.append(Donor.id == any_(array_param(selection.donor_ids)))
+            return conditions
+
+        if selection.search and selection.search.strip():
+            # Never dropped: a search without usable tokens matches no donor
+            search_filter, _ = await DonorSearchService(self.db, self.organization_id).search_filter(selection.search)
+            conditions.append(search_filter)
+        if selection.is_active is not None:
+            conditions.append(Donor.is_active == selection.is_active)
+        if selection.tags:
+            tag_filter = await DonorTagService(self.db, self.organization_id).tag_filter(
+                selection.tags, match=selection.tag_match
+            )
+            if tag_filter is None:
+                # Dropping it would widen the selection to every donor
+                raise ValueError("The tags filter has no valid tag name")
+            conditions.append(tag_filter)
+        if selection.min_total_donated is not None:
+            conditions.append(Donor.total_donated >= selection.min_total_donated)
+        if selection.max_total_donated is not None:
+            conditions.append(Donor.total_donated <= selection.max_total_donated)
+        return conditions
+
+    async def run(
+        self,
+        action: str,
+        selection: DonorSelection,
+        tag_id: Optional[UUID] = None,
+        segment_id: Optional[UUID] = None,
+        performed_by: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Apply a bulk action. Does not commit.
+
+        Args:
+            action: One of BULK_ACTIONS
+            selection: Targeted donors
+            tag_id: Tag of add_tag / remove_tag
+            segment_id: Segment of add_to_segment / remove_from_segment
+            performed_by: User ID recorded on new assignments
+
+        Returns:
+            Summary (matched, applied, unchanged, not_found) with per-donor
+            results for explicit ID lists
+
+        Raises:
+            ValueError: Unknown action, missing tag/segment, or a selection without criteria
+            LookupError: Tag or segment not found in this organization
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unknown bulk action: {action}")
+        if not selection.has_criteria():
+            raise ValueError("A donor ID list or at least one filter is required")
+
+        conditions = await self.conditions(selection)
+        matched_ids = None
+        if selection.by_ids:
+            result = await self.db.execute(select(Donor.id).where(*conditions))
+            matched_ids = list(result.scalars().all())
+            matched = len(matched_ids)
+        else:
+            matched = (await self.db.execute(select(func.count()).select_from(Donor).where(*conditions))).scalar() or 0
+
+        if action in ("add_tag", "remove_tag"):
+            applied = await self._tag(action, conditions, await self._require(DonorTag, tag_id, "Tag"), performed_by)
+        elif action in ("add_to_segment", "remove_from_segment"):
+            applied = await self._segment(
+                action, conditions, await self._require(DonorSegment, segment_id, "Segment"), performed_by
+            )
+        elif action == "delete":
+            applied = await self._delete(conditions)
+        else:
+            applied = await self._set_active(conditions, action == "activate")
+
+        logger.info(
+            f"Bulk {action} on organization {self.organization_id}: "
+            f"{len(applied)}/{matched} donor(s) changed"
+        )
+        return self._summary(action, selection, matched, matched_ids, applied)
+
+    async def _require(self, model, object_id: Optional[UUID], label: str) -> UUID:
+        if object_id is None:
+            raise ValueError(f"{label.lower()}_id is required for this action")
+        result = await self.db.execute(
+            select(model.id).where(model.id == object_id, model.organization_id == self.organization_id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise LookupError(f"{label} not found")
+        return object_id
+
+    async def _assign(self, assignment, key: str, key_id: UUID, constraint: str, conditions, performed_by) -> List[UUID]:
+        """INSERT ... SELECT for every selected donor, skipping existing assignments"""
+        rows = select(
+            func.gen_random_uuid(),
+            Donor.id,
+            literal(key_id, PG_UUID(as_uuid=True)),
+            literal(performed_by, Integer),
+        ).where(*conditions)
+        result = await self.db.execute(
+            insert(assignment)
+            .from_select(["id", "donor_id", key, "assigned_by"], rows)
+            .on_conflict_do_nothing(constraint=constraint)
+            .returning(assignment.donor_id)
+        )
+        return list(result.scalars().all())
+
+    async def _unassign(self, assignment, key_column, key_id: UUID, conditions) -> List[UUID]:
+        result = await self.db.execute(
+            delete(assignment)
+            .where(key_column == key_id, assignment.donor_id.in_(select(Donor.id).where(*conditions)))
+            .returning(assignment.donor_id)
+        )
+        return list(result.scalars().all())
+
+    async def _adjust_count(self, model, object_id: UUID, delta: int) -> None:
+        if delta:
+            await self.db.execute(
+                update(model)
+                .where(model.id == object_id)
+                .values(donor_count=func.greatest(model.donor_count + delta, 0))
+                .execution_options(synchronize_session=False)
+            )
+
+    async def _tag(self, action: str, conditions, tag_id: UUID, performed_by: Optional[int]) -> List[UUID]:
+        if action == "add_tag":
+            changed = await self._assign(DonorTagAssignment, "tag_id", tag_id, "uq_donor_tag", conditions, performed_by)
+            await self._adjust_count(DonorTag, tag_id, len(changed))
+        else:
+            changed = await self._unassign(DonorTagAssignment, DonorTagAssignment.tag_id, tag_id, conditions)
+            await self._adjust_count(DonorTag, tag_id, -len(changed))
+        await DonorTagService(self.db, self.organization_id).refresh_mirrors(changed)
+        return changed
+
+    async def _segment(self, action: str, conditions, segment_id: UUID, performed_by: Optional[int]) -> List[UUID]:
+        if action == "add_to_segment":
+            changed = await self._assign(
+                DonorSegmentAssignment, "segment_id", segment_id, "uq_donor_segment", conditions, performed_by
+            )
+            await self._adjust_count(DonorSegment, segment_id, len(changed))
+        else:
+            changed = await self._unassign(
+                DonorSegmentAssignment, DonorSegmentAssignment.segment_id, segment_id, conditions
+            )
+            await self._adjust_count(DonorSegment, segment_id, -len(changed))
+        return changed
+
+    async def _set_active(self, conditions, is_active: bool) -> List[UUID]:
+        result = await self.db.execute(
+            update(Donor)
+            .where(*conditions, Donor.is_active != is_active)
+            .values(is_active=is_active)
+            .returning(Donor.id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.scalars().all())
+
+    async def _delete(self, conditions) -> List[UUID]:
+        """Delete donors and keep tag, segment and campaign counters consistent"""
+        selected = select(Donor.id).where(*conditions)
+
+        # Assignments cascade with the donors: decrement their counters first, one UPDATE per table
+        for model, assignment, key in (
+            (DonorTag, DonorTagAssignment, DonorTagAssignment.tag_id),
+            (DonorSegment, DonorSegmentAssignment, DonorSegmentAssignment.segment_id),
+        ):
+            removed = (
+                select(key.label("object_id"), func.count().label("removed"))
+                .where(assignment.donor_id.in_(selected))
+                .group_by(key)
+                .subquery()
+            )
+            await self.db.execute(
+                update(model)
+                .where(model.id == removed.c.object_id)
+                .values(donor_count=func.greatest(model.donor_count - removed.c.removed, 0))
+                .execution_options(synchronize_session=False)
+            )
+
+        campaigns = await self.db.execute(
+            select(Donation.campaign_id)
+            .where(
+                and_(
+                    Donation.donor_id.in_(selected),
+                    Donation.campaign_id.isnot(None),
+                    Donation.payment_status == COUNTED_STATUS,
+                )
+            )
+            .distinct()
+        )
+        campaign_ids = list(campaigns.scalars().all())
+
+        result = await self.db.execute(
+            delete(Donor).where(*conditions).returning(Donor.id).execution_options(synchronize_session=False)
+        )
+        deleted = list(result.scalars().all())
+
+        if campaign_ids:
+            # Donations went with the donors
+            await CampaignRollupService(self.db, self.organization_id).reconcile(campaign_ids)
+        return deleted
+
+    @staticmethod
+    def _summary(
+        action: str,
+        selection: DonorSelection,
+        matched: int,
+        matched_ids: Optional[Sequence[UUID]],
+        applied: Sequence[UUID],
+    ) -> Dict[str, Any]:
+        summary = {
+            "action": action,
+            "matched": matched,
+            "applied": len(applied),
+            "unchanged": max(matched - len(applied), 0),
+            "not_found": 0,
+            "results": None,
+        }
+        if selection.by_ids:
+            applied_set, matched_set = set(applied), set(matched_ids)
+            results = []
+            for donor_id in dict.fromkeys(selection.donor_ids):
+                if donor_id in applied_set:
+                    item_status = "applied"
+                elif donor_id in matched_set:
+                    item_status = "unchanged"
+                else:
+                    item_status = "not_found"
+                results.append({"donor_id": donor_id, "status": item_status})
+            summary["not_found"] = sum(1 for item in results if item["status"] == "not_found")
+            summary["results"] = results
+        return summary
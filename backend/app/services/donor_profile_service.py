@@ -0,0 +1,270 @@
+"""
+Donor Profile Service
+Donor 360 view for organization databases.
+
+The donor detail page used to call the donor, stats, history, communications,
+tags and recurring endpoints separately, with history and stats loading every
+donation of the donor. A profile is now built with:
+- one query for the donor, its donation statistics (aggregates with FILTER)
+  and the totals of every section (correlated counts)
+- one bounded query per requested section (pages of donations, activities and
+  communications, latest notes, tags, recurring donations)
+
+Sections run back-to-back: the organization session is a single connection,
+which cannot run statements concurrently.
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.organization_donors import (
+    Donation,
+    Donor,
+    DonorActivity,
+    DonorCommunication,
+    DonorNote,
+    DonorTag,
+    DonorTagAssignment,
+    RecurringDonation,
+)
+
+
+# Sections of the donor profile besides the donor itself, in response order
+PROFILE_SECTIONS = ("stats", "history", "notes", "tags", "communications", "recurring")
+
+COMPLETED_STATUS = "completed"
+
+
+def parse_sections(include: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """
+    Requested profile sections (all of them when none are given).
+
+    Accepts repeated values and comma-separated lists (include=stats,history).
+
+    Raises:
+        ValueError: On an unknown section
+    """
+    requested = [part.strip() for value in include or [] for part in value.split(",") if part.strip()]
+    if not requested:
+        return PROFILE_SECTIONS
+    unknown = sorted(set(requested) - set(PROFILE_SECTIONS))
+    if unknown:
+        raise ValueError(f"Unknown profile section(s): {', '.join(unknown)}")
+    return tuple(section for section in PROFILE_SECTIONS if section in requested)
+
+
+def total_pages(total: int, page_size: int) -> int:
+    return (total + page_size - 1) // page_size
+
+
+class DonorProfileService:
+    """Service for donor details, statistics and history in one organization database"""
+
+    def __init__(self, db: AsyncSession, organization_id: UUID):
+        self.db = db
+        self.organization_id = organization_id
+
+    def summary_query(self, donor_id: UUID, now: datetime):
+        """Donor row, completed-donation statistics and section totals in one statement"""
+        year_start = datetime(now.year, 1, 1, tzinfo=timezone.utc)
+        month_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
+        donated_at = func.coalesce(Donation.payment_date, Donation.created_at)
+        completed = Donation.payment_status == COMPLETED_STATUS
+        this_year = and_(completed, donated_at >= year_start)
+        this_month = and_(completed, donated_at >= month_start)
+
+        last_amount = (
+            select(Donation.amount)
+            .where(Donation.donor_id == Donor.id, Donation.payment_status == COMPLETED_STATUS)
+            .order_by(func.coalesce(Donation.payment_date, Donation.created_at).desc())
+            .limit(1)
+            .correlate(Donor)
+            .scalar_subquery()
+        )
+
+        def count_of(model):
+            return (
+                select(func.count())
+                .select_from(model)
+                .where(model.donor_id == Donor.id)
+                .correlate(Donor)
+                .scalar_subquery()
+            )
+
+        return (
+            select(
+                Donor,
+                func.count(Donation.id).label("total_donations"),
+                func.count(Donation.id).filter(completed).label("completed_count"),
+                func.avg(Donation.amount).filter(completed).label("average_donation"),
+                func.max(Donation.amount).filter(completed).label("largest_donation"),
+                last_amount.label("last_donation_amount"),
+                func.coalesce(func.sum(Donation.amount).filter(this_year), 0).label("this_year_total"),
+                func.count(Donation.id).filter(this_year).label("this_year_count"),
+                func.coalesce(func.sum(Donation.amount).filter(this_month), 0).label("this_month_total"),
+                func.count(Donation.id).filter(this_month).label("this_month_count"),
+                count_of(DonorActivity).label("total_activities"),
+                count_of(DonorNote).label("total_notes"),
+                count_of(DonorCommunication).label("total_communications"),
+                count_of(RecurringDonation).label("total_recurring"),
+            )
+            .outerjoin(Donation, Donation.donor_id == Donor.id)
+            .where(Donor.id == donor_id, Donor.organization_id == self.organization_id)
+            # donors.id is the primary key: the donor columns are functionally dependent on it
+            .group_by(Donor.id)
+        )
+
+    async def summary(self, donor_id: UUID, now: Optional[datetime] = None) -> Optional[Row]:
+        """Donor and statistics row (None when the donor is not in this organization)"""
+        result = await self.db.execute(self.summary_query(donor_id, now or datetime.now(timezone.utc)))
+        return result.one_or_none()
+
+    @staticmethod
+    def donor_with_stats(summary: Row) -> Dict[str, Any]:
+        """DonorWithStats fields"""
+        donor = summary.Donor
+        data = {k: v for k, v in donor.__dict__.items() if not k.startswith('_')}
+        data["average_donation"] = summary.average_donation
+        data["last_donation_amount"] = summary.last_donation_amount
+        return data
+
+    @staticmethod
+    def stats(summary: Row) -> Dict[str, Any]:
+        """DonorStats fields"""
+        donor = summary.Donor
+        return {
+            "total_donated": donor.total_donated or Decimal('0.00'),
+            "donation_count": donor.donation_count or 0,
+            "average_donation": summary.average_donation or Decimal('0.00'),
+            "first_donation_date": donor.first_donation_date,
+            "last_donation_date": donor.last_donation_date,
+            "last_donation_amount": summary.last_donation_amount,
+            "largest_donation": summary.largest_donation,
+            "this_year_total": summary.this_year_total,
+            "this_year_count": summary.this_year_count,
+            "this_month_total": summary.this_month_total,
+            "this_month_count": summary.this_month_count,
+        }
+
+    async def history(self, summary: Row, page: int, page_size: int) -> Dict[str, Any]:
+        """One page of donations and of activities, newest first (DonorHistory fields)"""
+        donor_id = summary.Donor.id
+        offset = (page - 1) * page_size
+        donations = await self.db.execute(
+            select(Donation)
+            .where(Donation.donor_id == donor_id)
+            .order_by(Donation.payment_date.desc(), Donation.created_at.desc())
+            .offset(offset)
+            .limit(page_size)
+        )
+        activities = await self.db.execute(
+            select(DonorActivity)
+            .where(DonorActivity.donor_id == donor_id)
+            .order_by(DonorActivity.created_at.desc())
+            .offset(offset)
+            .limit(page_size)
+        )
+        return {
+            "donations": donations.scalars().all(),
+            "activities": activities.scalars().all(),
+            "total_donations": summary.total_donations,
+            "total_activities": summary.total_activities,
+            "page": page,
+            "page_size": page_size,
+        }
+
+    async def notes(self, summary: Row, limit: int) -> List[DonorNote]:
+        result = await self.db.execute(
+            select(DonorNote)
+            .where(DonorNote.donor_id == summary.Donor.id)
+            .order_by(DonorNote.created_at.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def tags(self, summary: Row) -> List[DonorTag]:
+        result = await self.db.execute(
+            select(DonorTag)
+            .join(DonorTagAssignment, DonorTagAssignment.tag_id == DonorTag.id)
+            .where(DonorTagAssignment.donor_id == summary.Donor.id)
+            .order_by(DonorTag.name)
+        )
+        return result.scalars().all()
+
+    async def communications(self, summary: Row, page_size: int) -> Dict[str, Any]:
+        """Latest communications (first page of DonorCommunicationList)"""
+        result = await self.db.execute(
+            select(DonorCommunication)
+            .where(
+                DonorCommunication.donor_id == summary.Donor.id,
+                DonorCommunication.organization_id == self.organization_id,
+            )
+            .order_by(DonorCommunication.created_at.desc())
+            .limit(page_size)
+        )
+        return {
+            "items": result.scalars().all(),
+            "total": summary.total_communications,
+            "page": 1,
+            "page_size": page_size,
+            "total_pages": total_pages(summary.total_communications, page_size),
+        }
+
+    async def recurring(self, summary: Row, page_size: int) -> Dict[str, Any]:
+        """Next recurring donations due (first page of RecurringDonationList)"""
+        result = await self.db.execute(
+            select(RecurringDonation)
+            .where(
+                RecurringDonation.donor_id == summary.Donor.id,
+                RecurringDonation.organization_id == self.organization_id,
+            )
+            .order_by(RecurringDonation.next_payment_date.asc())
+            .limit(page_size)
+        )
+        return {
+            "items": result.scalars().all(),
+            "total": summary.total_recurring,
+            "page": 1,
+            "page_size": page_size,
+            "total_pages": total_pages(summary.total_recurring, page_size),
+        }
+
+    async def profile(
+        self,
+        donor_id: UUID,
+        sections: Iterable[str] = PROFILE_SECTIONS,
+        history_page: int = 1,
+        page_size: int = 20,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Donor 360 profile (DonorProfile fields).
+
+        Args:
+            sections: Sections to load besides the donor (see parse_sections)
+            history_page: Page of donations and activities
+            page_size: Page size of every list section
+
+        Returns:
+            Profile dict with None for the sections not requested, or None
+            when the donor is not in this organization
+        """
+        summary = await self.summary(donor_id)
+        if summary is None:
+            return None
+
+        sections = set(sections)
+        return {
+            "donor": self.donor_with_stats(summary),
+            "stats": self.stats(summary) if "stats" in sections else None,
+            "history": await self.history(summary, history_page, page_size) if "history" in sections else None,
+            "notes": await self.notes(summary, page_size) if "notes" in sections else None,
+            "tags": await self.tags(summary) if "tags" in sections else None,
+            "communications": await self.communications(summary, page_size) if "communications" in sections else None,
+            "recurring": await self.recurring(summary, page_size) if "recurring" in sections else None,
+        }
@@ -0,0 +1,247 @@
+"""
+Donor Search Service
+Indexed donor search for organization databases.
+
+Uses the generated columns and GIN indexes created by migration
+add_donor_search_003:
+- donors.search_vector (tsvector, names weighted A, email B) for prefix matching and ts_rank
+- donors.search_text (lower/unaccented "first last email", pg_trgm) for substring matching
+  and similarity ranking
+
+Databases that have not been migrated yet fall back to ILIKE.
+"""
+
+import json
+import re
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Text, and_, false, func, literal_column, or_, select, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.logging import logger
+from app.models.organization_donors import Donor
+
+
+# Generated columns (not mapped on Donor, see the model)
+search_text = literal_column("donors.search_text", Text)
+search_vector = literal_column("donors.search_vector", TSVECTOR)
+
+# Substring (trigram) matching only pays off from 3 characters
+TRIGRAM_MIN_LENGTH = 3
+
+# Estimated count: exact up to this many rows, planner estimate beyond
+ESTIMATE_COUNT_THRESHOLD = 1000
+
+# How long a "not migrated yet" answer is trusted before re-checking
+CAPABILITY_RECHECK_SECONDS = 60
+
+COUNT_MODES = ("exact", "estimated", "none")
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper that keeps the statement's bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def normalize_search_term(term: str) -> str:
+    """Lowercase, strip accents and collapse whitespace (mirrors donor_search_unaccent(lower(...)))"""
+    decomposed = unicodedata.normalize("NFKD", term.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+
+def build_prefix_tsquery(term: str) -> Optional[str]:
+    """
+    Turn free text into a safe prefix tsquery: "Jean Trem" -> "jean:* & trem:*".
+
+    Only word characters are kept, so user input cannot inject tsquery operators.
+    """
+    tokens = re.findall(r"\w+", normalize_search_term(term))
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class DonorSearchService:
+    """Service for indexed donor search in one organization database"""
+
+    # organization_id -> (indexed search available, checked_at)
+    _capabilities: Dict[str, Tuple[bool, float]] = {}
+
+    def __init__(self, db: AsyncSession, organization_id: UUID):
+        self.db = db
+        self.organization_id = organization_id
+
+    async def supports_indexed_search(self) -> bool:
+        """Whether this organization database has the generated search columns"""
+        key = str(self.organization_id)
+        cached = self._capabilities.get(key)
+        if cached and (cached[0] or time.monotonic() - cached[1] < CAPABILITY_RECHECK_SECONDS):
+            return cached[0]
+
+        result = await self.db.execute(text("""
+            SELECT count(*) FROM information_schema.columns
+            WHERE table_schema = current_schema()
+            AND table_name = 'donors'
+            AND column_name IN ('search_text', 'search_vector')
+        """))
+        available = (result.scalar() or 0) == 2
+        if not available:
+            logger.info(
+                f"Donor search indexes missing for organization {key}; using ILIKE fallback "
+                f"(run the organization database migrations)"
+            )
+        self._capabilities[key] = (available, time.monotonic())
+        return available
+
+    @classmethod
+    def clear_capability_cache(cls) -> None:
+        cls._capabilities.clear()
+
+    @staticmethod
+    def indexed_filter(term: str) -> ColumnElement:
+        """Search condition served by the GIN indexes (matches nothing without a usable token)"""
+        conditions = []
+        tsquery = build_prefix_tsquery(term)
+        if tsquery:
+            conditions.append(search_vector.op("@@")(func.to_tsquery("simple", tsquery)))
+
+        normalized = normalize_search_term(term)
+        if len(normalized) >= TRIGRAM_MIN_LENGTH:
+            pattern = f"%{_escape_like(normalized)}%"
+            conditions.append(search_text.like(func.donor_search_unaccent(func.lower(pattern))))
+
+        if not conditions:
+            # e.g. "!!": the search was asked for, so it must not fall back to every donor
+            return false()
+        return or_(*conditions)
+
+    @staticmethod
+    def fallback_filter(term: str) -> ColumnElement:
+        """Unindexed ILIKE search for databases without the search columns"""
+        return or_(
+            Donor.email.ilike(f"%{term}%"),
+            Donor.first_name.ilike(f"%{term}%"),
+            Donor.last_name.ilike(f"%{term}%"),
+        )
+
+    @staticmethod
+    def rank_expression(term: str) -> ColumnElement:
+        """Relevance: full-text rank on names/email plus trigram similarity"""
+        rank = func.similarity(search_text, normalize_search_term(term))
+        tsquery = build_prefix_tsquery(term)
+        if tsquery:
+            rank = rank + func.ts_rank(search_vector, func.to_tsquery("simple", tsquery))
+        return rank
+
+    async def search_filter(self, term: str) -> Tuple[ColumnElement, Optional[ColumnElement]]:
+        """
+        Build the (filter, rank) pair for a search term.
+
+        Rank is None on databases without the search columns, and for terms
+        that match nothing.
+        """
+        if await self.supports_indexed_search():
+            condition = self.indexed_filter(term)
+            if condition is false():
+                return condition, None
+            return condition, self.rank_expression(term)
+        return self.fallback_filter(term), None
+
+    async def count(self, conditions: List[ColumnElement], mode: str = "exact") -> Tuple[Optional[int], bool]:
+        """
+        Count donors matching conditions.
+
+        Modes:
+            exact: COUNT(*)
+            estimated: exact up to ESTIMATE_COUNT_THRESHOLD, planner estimate beyond
+            none: skip counting
+
+        Returns:
+            Tuple of (count or None, is_estimate)
+        """
+        if mode == "none":
+            return None, False
+
+        where = and_(Donor.organization_id == self.organization_id, *conditions)
+
+        if mode == "estimated":
+            bounded = select(func.count()).select_from(
+                select(Donor.id).where(where).limit(ESTIMATE_COUNT_THRESHOLD + 1).subquery()
+            )
+            bounded_count = (await self.db.execute(bounded)).scalar() or 0
+            if bounded_count <= ESTIMATE_COUNT_THRESHOLD:
+                return bounded_count, False
+
+            estimate = await self._planner_estimate(select(Donor.id).where(where))
+            return max(estimate or 0, bounded_count), True
+
+        result = await self.db.execute(select(func.count(Donor.id)).where(where))
+        return result.scalar() or 0, False
+
+    async def _planner_estimate(self, statement) -> Optional[int]:
+        """Row estimate from the query planner (no rows are read)"""
+        try:
+            result = await self.db.execute(Explain(statement))
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Planner estimate failed for donor count: {e}")
+            return None
+
+    async def autocomplete(self, term: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Prefix suggestions for the donor search box.
+
+        Matches name/email word prefixes (search_vector) and whole-email prefixes
+        (idx_donors_email_lower_prefix), ordered by relevance.
+        """
+        tsquery = build_prefix_tsquery(term)
+        if not tsquery:
+            return []
+
+        columns = (Donor.id, Donor.first_name, Donor.last_name, Donor.email)
+        query = select(*columns).where(Donor.organization_id == self.organization_id)
+
+        if await self.supports_indexed_search():
+            email_prefix = f"{_escape_like(term.strip().lower())}%"
+            ts_query = func.to_tsquery("simple", tsquery)
+            query = query.where(
+                or_(
+                    search_vector.op("@@")(ts_query),
+                    func.lower(Donor.email).like(email_prefix),
+                )
+            ).order_by(func.ts_rank(search_vector, ts_query).desc(), Donor.last_name, Donor.first_name)
+        else:
+            prefix = f"{term.strip()}%"
+            query = query.where(
+                or_(Donor.email.ilike(prefix), Donor.first_name.ilike(prefix), Donor.last_name.ilike(prefix))
+            ).order_by(Donor.last_name, Donor.first_name)
+
+        result = await self.db.execute(query.limit(limit))
+        suggestions = []
+        for donor_id, first_name, last_name, email in result.all():
+            full_name = " ".join(part for part in (first_name, last_name) if part) or email
+            suggestions.append({"id": donor_id, "full_name": full_name, "email": email})
+        return suggestions
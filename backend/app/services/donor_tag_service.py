@@ -0,0 +1,207 @@
+"""
+Donor Tag Service
+Donor tags for organization databases.
+
+donor_tag_assignments is the single source of truth for which tags a donor
+has; donors.tags (JSON) is only a read-only mirror of the tag names kept for
+API responses. Tag filters are served by idx_donor_tag_assignments_tag_donor
+(tag_id, donor_id), see migration add_donor_tag_index_004.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import any_, bindparam, delete, false, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.logging import logger
+from app.models.organization_donors import Donor, DonorTag, DonorTagAssignment
+
+
+TAG_MATCH_MODES = ("all", "any")
+
+# Same limit as donor_tags.name
+MAX_TAG_NAME_LENGTH = 100
+
+
+def array_param(ids: Sequence[UUID]):
+    """Bind a list of IDs as one uuid[] parameter (for = ANY(...))"""
+    return bindparam(None, list(ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+
+
+def normalize_tag_names(names: Optional[Iterable[str]]) -> List[str]:
+    """Strip, drop empty/oversized names and deduplicate, keeping order"""
+    seen = set()
+    normalized = []
+    for name in names or []:
+        if not isinstance(name, str):
+            continue
+        name = name.strip()
+        if not name or len(name) > MAX_TAG_NAME_LENGTH or name in seen:
+            continue
+        seen.add(name)
+        normalized.append(name)
+    return normalized
+
+
+class DonorTagService:
+    """Service for donor tag assignments and tag filters in one organization database"""
+
+    def __init__(self, db: AsyncSession, organization_id: UUID):
+        self.db = db
+        self.organization_id = organization_id
+
+    async def resolve_tag_ids(self, names: Iterable[str], create: bool = False) -> Dict[str, UUID]:
+        """
+        Map tag names to tag IDs.
+
+        Args:
+            names: Tag names
+            create: Create the tags that don't exist yet
+
+        Returns:
+            Dict of name -> tag ID (unknown names are omitted when create is False)
+        """
+        names = normalize_tag_names(names)
+        if not names:
+            return {}
+
+        if create:
+            # ON CONFLICT keeps concurrent creations of the same tag safe
+            await self.db.execute(
+                insert(DonorTag)
+                .values([{"organization_id": self.organization_id, "name": name, "donor_count": 0} for name in names])
+                .on_conflict_do_nothing(constraint="uq_org_tag_name")
+            )
+
+        result = await self.db.execute(
+            select(DonorTag.name, DonorTag.id).where(
+                DonorTag.organization_id == self.organization_id,
+                DonorTag.name.in_(names),
+            )
+        )
+        return {name: tag_id for name, tag_id in result.all()}
+
+    async def tag_filter(self, names: Iterable[str], match: str = "all") -> Optional[ColumnElement]:
+        """
+        Build a donor filter for tag names.
+
+        Args:
+            names: Tag names
+            match: "all" (donor has every tag) or "any" (donor has at least one)
+
+        Returns:
+            Condition on Donor.id, or None when no tag was requested
+        """
+        if match not in TAG_MATCH_MODES:
+            raise ValueError(f"Unknown tag match mode: {match}")
+
+        names = normalize_tag_names(names)
+        if not names:
+            return None
+
+        tag_ids = await self.resolve_tag_ids(names)
+        if not tag_ids or (match == "all" and len(tag_ids) < len(names)):
+            # An unknown tag can't match anything
+            return false()
+
+        matching = select(DonorTagAssignment.donor_id).where(DonorTagAssignment.tag_id.in_(list(tag_ids.values())))
+        if match == "all" and len(tag_ids) > 1:
+            # (donor_id, tag_id) is unique, so a plain count is the number of distinct tags
+            matching = matching.group_by(DonorTagAssignment.donor_id).having(func.count() == len(tag_ids))
+        return Donor.id.in_(matching)
+
+    async def set_donor_tags(self, donor: Donor, names: Iterable[str], assigned_by: Optional[int] = None) -> List[str]:
+        """
+        Replace a donor's tags (creating missing tags) and refresh the JSON mirror.
+
+        Does not commit.
+
+        Returns:
+            The donor's tag names
+        """
+        names = normalize_tag_names(names)
+        tag_ids = await self.resolve_tag_ids(names, create=True)
+
+        result = await self.db.execute(
+            select(DonorTagAssignment.tag_id).where(DonorTagAssignment.donor_id == donor.id)
+        )
+        current = set(result.scalars().all())
+        wanted = set(tag_ids.values())
+        added, removed = wanted - current, current - wanted
+
+        if removed:
+            # Only rows actually removed/inserted move the counts: a concurrent
+            # request may already have made the same change
+            result = await self.db.execute(
+                delete(DonorTagAssignment)
+                .where(
+                    DonorTagAssignment.donor_id == donor.id,
+                    DonorTagAssignment.tag_id.in_(removed),
+                )
+                .returning(DonorTagAssignment.tag_id)
+            )
+            removed = set(result.scalars().all())
+            if removed:
+                await self._adjust_counts(removed, -1)
+
+        if added:
+            result = await self.db.execute(
+                insert(DonorTagAssignment)
+                .values([{"donor_id": donor.id, "tag_id": tag_id, "assigned_by": assigned_by} for tag_id in added])
+                .on_conflict_do_nothing(constraint="uq_donor_tag")
+                .returning(DonorTagAssignment.tag_id)
+            )
+            added = set(result.scalars().all())
+            if added:
+                await self._adjust_counts(added, 1)
+
+        if added or removed:
+            logger.debug(f"Donor {donor.id} tags: +{len(added)} -{len(removed)}")
+
+        donor.tags = [name for name in names if name in tag_ids]
+        return donor.tags
+
+    async def refresh_mirror(self, donor: Donor) -> List[str]:
+        """Rebuild donors.tags from the donor's assignments. Does not commit."""
+        result = await self.db.execute(
+            select(DonorTag.name)
+            .join(DonorTagAssignment, DonorTagAssignment.tag_id == DonorTag.id)
+            .where(DonorTagAssignment.donor_id == donor.id)
+            .order_by(DonorTagAssignment.assigned_at, DonorTag.name)
+        )
+        donor.tags = list(result.scalars().all())
+        return donor.tags
+
+    async def refresh_mirrors(self, donor_ids: Sequence[UUID]) -> None:
+        """Rebuild donors.tags for many donors in one UPDATE. Does not commit."""
+        if not donor_ids:
+            return
+        names = (
+            select(
+                func.coalesce(
+                    func.json_agg(aggregate_order_by(DonorTag.name, DonorTagAssignment.assigned_at, DonorTag.name)),
+                    literal_column("'[]'::json"),
+                )
+            )
+            .select_from(DonorTagAssignment)
+            .join(DonorTag, DonorTag.id == DonorTagAssignment.tag_id)
+            .where(DonorTagAssignment.donor_id == Donor.id)
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            update(Donor)
+            .where(Donor.id == any_(array_param(donor_ids)))
+            .values(tags=names)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _adjust_counts(self, tag_ids: Iterable[UUID], delta: int) -> None:
+        await self.db.execute(
+            update(DonorTag)
+            .where(DonorTag.id.in_(list(tag_ids)))
+            .values(donor_count=func.greatest(DonorTag.donor_count + delta, 0))
+            .execution_options(synchronize_session=False)
+        )
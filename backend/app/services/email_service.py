@@ -2,9 +2,6 @@
 
 import os
 from typing import List, Optional, Dict, Any
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
-from sendgrid.helpers.mail.exceptions import SendGridException
 from app.services.email_templates import EmailTemplates
 from app.core.logging import logger
 
@@ -21,6 +18,8 @@ class EmailService:
             self.client = None
             logger.warning("SENDGRID_API_KEY is not configured. Email sending will be disabled.")
         else:
+            # Imported here so the SDK only loads when email is configured
+            from sendgrid import SendGridAPIClient
             self.client = SendGridAPIClient(api_key=self.api_key)
 
     def is_configured(self) -> bool:
@@ -63,6 +62,9 @@ class EmailService:
         if not self.is_configured():
             raise ValueError("SendGrid service is not configured. Please set SENDGRID_API_KEY.")
 
+        from sendgrid.helpers.mail import Mail, Email, To, Content
+        from sendgrid.helpers.mail.exceptions import SendGridException
+
         from_email = from_email or self.from_email
         from_name = from_name or self.from_name
 
@@ -8,7 +8,6 @@ from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, case
-from sqlalchemy.orm import selectinload
 
 from app.models.user import User
 from app.models.invoice import Invoice
@@ -85,8 +84,7 @@ class ERPService:
         total_result = await self.db.execute(count_query)
         total = total_result.scalar() or 0
         
-        # Get paginated results with user relationship (eager loading to prevent N+1)
-        query = query.options(selectinload(Invoice.user))
+        # Get paginated results (clients are resolved by the caller with a BatchLoader)
         query = query.order_by(Invoice.created_at.desc()).offset(skip).limit(limit)
         result = await self.db.execute(query)
         invoices = result.scalars().all()
@@ -10,24 +10,14 @@ from io import StringIO, BytesIO
 from datetime import datetime
 from decimal import Decimal
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-
-try:
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.units import inch
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-
+from app.core.lazy_import import is_available, lazy_module
 from app.core.logging import logger
 
+# pandas and reportlab are imported on first Excel/PDF export, not at app import
+pd = lazy_module("pandas")
+PANDAS_AVAILABLE = is_available("pandas")
+REPORTLAB_AVAILABLE = is_available("reportlab")
+
 
 class ExportService:
     """Service for exporting data to various formats"""
@@ -211,6 +201,12 @@ class ExportService:
         if not data:
             raise ValueError("No data to export")
 
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.units import inch
+
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter)
         story = []
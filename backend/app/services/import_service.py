@@ -9,14 +9,13 @@ from typing import List, Dict, Any, Optional, Callable
 from io import BytesIO, StringIO
 from datetime import datetime
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-
+from app.core.lazy_import import is_available, lazy_module
 from app.core.logging import logger
 
+# pandas is imported on first Excel import, not at app import
+pd = lazy_module("pandas")
+PANDAS_AVAILABLE = is_available("pandas")
+
 
 class ImportService:
     """Service for importing data from various formats"""
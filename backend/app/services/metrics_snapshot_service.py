@@ -0,0 +1,330 @@
+"""
+Metrics Snapshot Service
+Precomputed tenancy and platform statistics for the admin dashboards.
+
+The refresh job (app/tasks/metrics_snapshot_tasks.py) stores the statistics in
+metrics_snapshots and the dashboards read them back instead of counting live:
+- tenant statistics are computed with grouped queries (one per counted table,
+  whatever the number of tenants, see TenancyMetrics.collect_tenant_statistics)
+- an incremental refresh only recomputes the tenants whose teams, members or
+  resources changed since the last watermark (updated_at); deletions don't
+  touch updated_at, so a periodic full refresh also rebuilds every tenant
+- platform statistics and module usage are a handful of FILTER queries
+
+Readers fall back to computing (and storing) a snapshot that is missing or
+older than METRICS_SNAPSHOT_MAX_AGE_SECONDS.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.tenancy import TenancyConfig
+from app.core.tenancy_metrics import TenancyMetrics
+from app.models import (
+    AVAILABLE_MODULES,
+    MetricsSnapshot,
+    Organization,
+    OrganizationMember,
+    OrganizationModule,
+    Subscription,
+    SubscriptionStatus,
+    Team,
+    TeamMember,
+    User,
+)
+
+
+SCOPE_TENANT = "tenant"
+SCOPE_PLATFORM = "platform"
+
+# Platform snapshot keys
+TENANCY_KEY = "tenancy"  # holds the incremental refresh watermark
+STATS_KEY = "stats"
+MODULES_KEY = "modules"
+
+# Re-read rows changed shortly before the watermark (transactions committing late)
+WATERMARK_OVERLAP = timedelta(minutes=1)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def is_stale(snapshot: Optional[MetricsSnapshot], now: Optional[datetime] = None) -> bool:
+    if snapshot is None or snapshot.computed_at is None:
+        return True
+    max_age = timedelta(seconds=settings.METRICS_SNAPSHOT_MAX_AGE_SECONDS)
+    return (now or _now()) - snapshot.computed_at > max_age
+
+
+class MetricsSnapshotService:
+    """Service for dashboard metrics snapshots (main database)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # Storage
+
+    async def get(self, scope: str, scope_key: str) -> Optional[MetricsSnapshot]:
+        # store() upserts through Core, bypassing the identity map: always reload the row
+        result = await self.db.execute(
+            select(MetricsSnapshot)
+            .where(MetricsSnapshot.scope == scope, MetricsSnapshot.scope_key == scope_key)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def store(self, scope: str, rows: List[Dict[str, Any]]) -> None:
+        """Upsert snapshots ({"scope_key", "data", "source_updated_at"}). Does not commit."""
+        if not rows:
+            return
+        now = _now()
+        statement = insert(MetricsSnapshot).values([
+            {"scope": scope, "computed_at": now, "source_updated_at": None, **row} for row in rows
+        ])
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["scope", "scope_key"],
+                set_={
+                    "data": statement.excluded.data,
+                    "source_updated_at": statement.excluded.source_updated_at,
+                    "computed_at": statement.excluded.computed_at,
+                },
+            )
+        )
+
+    # Tenants
+
+    def changed_tenants_query(self, since: datetime):
+        """Latest change per tenant across teams, members and tenant-aware resources"""
+        sources = [
+            select(Team.id.label("team_id"), Team.updated_at.label("changed_at")).where(Team.updated_at > since),
+            select(TeamMember.team_id, TeamMember.updated_at).where(TeamMember.updated_at > since),
+        ]
+        for _, model_class in TenancyMetrics.tenant_resource_models():
+            sources.append(
+                select(model_class.team_id, model_class.updated_at).where(
+                    and_(model_class.updated_at > since, model_class.team_id.isnot(None))
+                )
+            )
+        changes = union_all(*sources).subquery("changes")
+        return select(changes.c.team_id, func.max(changes.c.changed_at)).group_by(changes.c.team_id)
+
+    async def changed_tenants(self, since: datetime) -> Tuple[List[int], Optional[datetime]]:
+        """Tenants changed after `since`, and the latest change seen"""
+        rows = (await self.db.execute(self.changed_tenants_query(since - WATERMARK_OVERLAP))).all()
+        watermark = max((changed_at for _, changed_at in rows), default=None)
+        return [team_id for team_id, _ in rows], watermark
+
+    async def refresh_tenants(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Recompute tenant snapshots (all of them, or only the changed ones). Does not commit.
+
+        Returns:
+            Summary with the refreshed tenant count and whether the refresh was full
+        """
+        if not TenancyConfig.is_enabled():
+            return {"tenants": 0, "full": full}
+
+        tenancy = await self.get(SCOPE_PLATFORM, TENANCY_KEY)
+        full = full or tenancy is None or tenancy.source_updated_at is None
+        started = _now()
+
+        if full:
+            result = await self.db.execute(select(Team.id).where(Team.is_active == True))
+            tenant_ids = list(result.scalars().all())
+            watermark = started
+        else:
+            changed, latest = await self.changed_tenants(tenancy.source_updated_at)
+            tenant_ids = []
+            if changed:
+                result = await self.db.execute(
+                    select(Team.id).where(Team.id.in_(changed), Team.is_active == True)
+                )
+                tenant_ids = list(result.scalars().all())
+            inactive = set(changed) - set(tenant_ids)
+            if inactive:
+                await self.db.execute(
+                    delete(MetricsSnapshot).where(
+                        MetricsSnapshot.scope == SCOPE_TENANT,
+                        MetricsSnapshot.scope_key.in_([str(tenant_id) for tenant_id in inactive]),
+                    )
+                )
+            watermark = max(latest, tenancy.source_updated_at) if latest else tenancy.source_updated_at
+
+        statistics = await TenancyMetrics.collect_tenant_statistics(self.db, tenant_ids)
+        await self.store(SCOPE_TENANT, [
+            {"scope_key": str(tenant_id), "data": stats, "source_updated_at": watermark}
+            for tenant_id, stats in statistics.items()
+        ])
+
+        if full:
+            # Teams deleted or deactivated since the last full refresh
+            await self.db.execute(
+                delete(MetricsSnapshot).where(
+                    MetricsSnapshot.scope == SCOPE_TENANT,
+                    MetricsSnapshot.scope_key.notin_([str(tenant_id) for tenant_id in tenant_ids]),
+                )
+            )
+
+        await self.store(SCOPE_PLATFORM, [{
+            "scope_key": TENANCY_KEY,
+            "data": {"mode": TenancyConfig.get_mode().value, "last_refresh_full": full},
+            "source_updated_at": watermark,
+        }])
+        return {"tenants": len(statistics), "full": full}
+
+    async def system_statistics(self) -> Dict[str, Any]:
+        """Same shape as TenancyMetrics.get_system_statistics, read from tenant snapshots"""
+        if not TenancyConfig.is_enabled():
+            return {
+                "tenancy_enabled": False,
+                "mode": TenancyConfig.get_mode().value,
+            }
+
+        tenancy = await self.get(SCOPE_PLATFORM, TENANCY_KEY)
+        if is_stale(tenancy):
+            await self.refresh_tenants()
+            await self.db.commit()
+            tenancy = await self.get(SCOPE_PLATFORM, TENANCY_KEY)
+
+        result = await self.db.execute(
+            select(MetricsSnapshot)
+            .where(MetricsSnapshot.scope == SCOPE_TENANT)
+            .order_by(MetricsSnapshot.scope_key)
+            .execution_options(populate_existing=True)
+        )
+        snapshots = list(result.scalars().all())
+        tenants = [snapshot.data for snapshot in snapshots]
+
+        total_resources: Dict[str, int] = {}
+        for stats in tenants:
+            for resource_type, count in stats.get("resources", {}).items():
+                total_resources[resource_type] = total_resources.get(resource_type, 0) + count
+
+        return {
+            "tenancy_enabled": True,
+            "mode": TenancyConfig.get_mode().value,
+            "tenant_count": len(tenants),
+            "total_users": sum(stats.get("users", 0) for stats in tenants),
+            "total_resources": total_resources,
+            "tenants": tenants,
+            # Unchanged tenants are not rewritten: the last refresh is the snapshot time
+            "computed_at": tenancy.computed_at.isoformat() if tenancy and tenancy.computed_at else None,
+        }
+
+    async def tenant_statistics(self, tenant_id: int) -> Dict[str, Any]:
+        """Statistics of one tenant from its snapshot (computed and stored when missing or stale)"""
+        if not TenancyConfig.is_enabled():
+            return {}
+        snapshot = await self.get(SCOPE_TENANT, str(tenant_id))
+        # Snapshots of unchanged tenants stay valid as long as refreshes keep running
+        if snapshot is not None and not is_stale(await self.get(SCOPE_PLATFORM, TENANCY_KEY)):
+            return snapshot.data
+
+        exists = await self.db.execute(select(Team.id).where(Team.id == tenant_id, Team.is_active == True))
+        if exists.scalar_one_or_none() is None:
+            return {}
+        stats = (await TenancyMetrics.collect_tenant_statistics(self.db, [tenant_id]))[tenant_id]
+        await self.store(SCOPE_TENANT, [{
+            "scope_key": str(tenant_id),
+            "data": stats,
+            "source_updated_at": snapshot.source_updated_at if snapshot else None,
+        }])
+        await self.db.commit()
+        return stats
+
+    # Platform
+
+    async def compute_platform_stats(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Platform-wide counts, one FILTER query per table"""
+        seven_days_ago = (now or _now()) - timedelta(days=7)
+
+        organizations = (await self.db.execute(select(
+            func.count().label("total"),
+            func.count().filter(Organization.is_active == True).label("active"),
+            func.count().filter(Organization.is_active == False).label("inactive"),
+            func.count().filter(Organization.created_at >= seven_days_ago).label("new_last_7_days"),
+        ).select_from(Organization))).one()
+        users = (await self.db.execute(select(
+            func.count().label("total"),
+            func.count().filter(User.is_active == True).label("active"),
+            func.count().filter(User.is_active == False).label("inactive"),
+            func.count().filter(User.created_at >= seven_days_ago).label("new_last_7_days"),
+        ).select_from(User))).one()
+        modules = (await self.db.execute(select(
+            func.count().filter(OrganizationModule.is_enabled == True).label("total_enabled"),
+            func.count().label("total_configured"),
+        ).select_from(OrganizationModule))).one()
+        members = (await self.db.execute(select(
+            func.count().label("total"),
+            func.count().filter(OrganizationMember.joined_at.isnot(None)).label("joined"),
+            func.count().filter(OrganizationMember.joined_at.is_(None)).label("pending"),
+        ).select_from(OrganizationMember))).one()
+        subscriptions = (await self.db.execute(select(
+            func.count().label("total"),
+            func.count().filter(Subscription.status == SubscriptionStatus.ACTIVE).label("active"),
+        ).select_from(Subscription))).one()
+
+        return {
+            "organizations": dict(organizations._mapping),
+            "users": dict(users._mapping),
+            "modules": dict(modules._mapping),
+            "members": dict(members._mapping),
+            "subscriptions": dict(subscriptions._mapping),
+            "recent_activity": [],
+        }
+
+    async def compute_module_usage(self) -> List[Dict[str, Any]]:
+        """Enabled count per module, in one grouped query"""
+        total_orgs = (await self.db.execute(select(func.count()).select_from(Organization))).scalar() or 1
+        result = await self.db.execute(
+            select(OrganizationModule.module_key, func.count())
+            .where(OrganizationModule.is_enabled == True)
+            .group_by(OrganizationModule.module_key)
+        )
+        enabled = dict(result.all())
+        return [
+            {
+                "module_key": module_key,
+                "enabled_count": enabled.get(module_key, 0),
+                "total_organizations": total_orgs,
+                "usage_percentage": (enabled.get(module_key, 0) / total_orgs) * 100,
+            }
+            for module_key in AVAILABLE_MODULES
+        ]
+
+    async def refresh_platform(self) -> None:
+        """Recompute the platform snapshots. Does not commit."""
+        await self.store(SCOPE_PLATFORM, [
+            {"scope_key": STATS_KEY, "data": await self.compute_platform_stats()},
+            {"scope_key": MODULES_KEY, "data": await self.compute_module_usage()},
+        ])
+
+    async def platform_view(self, key: str, force: bool = False) -> Any:
+        """Platform snapshot data (stats or modules), refreshed when missing or stale"""
+        snapshot = None if force else await self.get(SCOPE_PLATFORM, key)
+        if is_stale(snapshot):
+            await self.refresh_platform()
+            await self.db.commit()
+            snapshot = await self.get(SCOPE_PLATFORM, key)
+        return snapshot.data
+
+    async def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """Refresh tenant and platform snapshots and commit"""
+        start = _now()
+        summary = await self.refresh_tenants(full=full)
+        await self.refresh_platform()
+        await self.db.commit()
+        duration_ms = (_now() - start).total_seconds() * 1000
+        logger.info(
+            f"Metrics snapshots refreshed: {summary['tenants']} tenant(s) "
+            f"({'full' if summary['full'] else 'incremental'}) in {duration_ms:.0f}ms"
+        )
+        return {**summary, "duration_ms": round(duration_ms, 1)}
@@ -5,10 +5,12 @@ Manages newsletter subscriptions and contact lists
 
 import os
 from typing import Optional, Dict, Any, List
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail.exceptions import SendGridException
+from app.core.lazy_import import lazy_module
 from app.core.logging import logger
 
+# Only resolved when a SendGrid call actually raises
+sendgrid_exceptions = lazy_module("sendgrid.helpers.mail.exceptions")
+
 
 class NewsletterService:
     """Service for managing newsletter subscriptions via SendGrid"""
@@ -19,6 +21,8 @@ class NewsletterService:
             self.client = None
             logger.warning("SENDGRID_API_KEY is not configured. Newsletter service will be disabled.")
         else:
+            # Imported here so the SDK only loads when SendGrid is configured
+            from sendgrid import SendGridAPIClient
             self.client = SendGridAPIClient(api_key=self.api_key)
         
         # Default list ID from environment
@@ -95,7 +99,7 @@ class NewsletterService:
                     "error": f"SendGrid API returned status {response.status_code}",
                 }
 
-        except SendGridException as e:
+        except sendgrid_exceptions.SendGridException as e:
             logger.error(f"SendGrid error subscribing {email}: {e}")
             raise RuntimeError(f"Failed to subscribe to newsletter: {e}")
 
@@ -130,7 +134,7 @@ class NewsletterService:
                     "error": f"SendGrid API returned status {response.status_code}",
                 }
 
-        except SendGridException as e:
+        except sendgrid_exceptions.SendGridException as e:
             logger.error(f"SendGrid error unsubscribing {email}: {e}")
             raise RuntimeError(f"Failed to unsubscribe from newsletter: {e}")
 
@@ -158,7 +162,7 @@ class NewsletterService:
                     return data["result"][0]
             return None
 
-        except SendGridException as e:
+        except sendgrid_exceptions.SendGridException as e:
             logger.error(f"SendGrid error getting contact {email}: {e}")
             return None
 
@@ -178,7 +182,7 @@ class NewsletterService:
                 return response.body.get("result", [])
             return []
 
-        except SendGridException as e:
+        except sendgrid_exceptions.SendGridException as e:
             logger.error(f"SendGrid error getting lists: {e}")
             return []
 
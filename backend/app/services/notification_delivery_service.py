@@ -0,0 +1,182 @@
+"""
+Notification Delivery Service
+Batched notification delivery for Celery workers (synchronous session).
+
+A batch is delivered in three steps:
+- recipients are resolved with one query, then every notification is stored
+  and counted by the fan-out statement (one INSERT ... SELECT, coalescing
+  grouped notifications, see app/services/notification_fanout_service.py) in
+  one transaction (all or nothing, so a retried task can't duplicate them)
+- notifications and unread counts go through the cross-process channel in one
+  pipeline (see app/services/realtime_channel.py)
+- optional emails are sent last, not for coalesced notifications; their
+  failures don't fail the batch
+"""
+
+from datetime import datetime
+from html import escape
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+from app.models.notification import NotificationType
+from app.models.user import User
+from app.services.notification_fanout_service import (
+    NotificationPayload,
+    audience_query,
+    coalesce_since,
+    fanout_messages,
+    fanout_statement,
+)
+from app.services.realtime_channel import publish_user_messages
+
+
+def normalize_notification_type(notification_type: str) -> NotificationType:
+    try:
+        return NotificationType(notification_type.lower())
+    except ValueError:
+        logger.warning(f"Invalid notification type '{notification_type}', defaulting to INFO")
+        return NotificationType.INFO
+
+
+def unique_user_ids(user_ids: Iterable[Any]) -> List[int]:
+    """Integer user IDs, deduplicated, in request order"""
+    return list(dict.fromkeys(int(user_id) for user_id in user_ids))
+
+
+class NotificationDeliveryService:
+    """Service storing and delivering one notification to many users"""
+
+    def __init__(
+        self,
+        db: Session,
+        email_service: Optional[Any] = None,
+        publish: Callable[[Iterable[Tuple[int, Dict[str, Any]]]], int] = publish_user_messages,
+    ):
+        self.db = db
+        self.email_service = email_service
+        self.publish = publish
+
+    def load_recipients(self, user_ids: List[int]) -> Dict[int, str]:
+        """Existing users among user_ids -> email"""
+        if not user_ids:
+            return {}
+        result = self.db.execute(select(User.id, User.email).where(User.id.in_(user_ids)))
+        return {user_id: email for user_id, email in result.all()}
+
+    def store(self, user_ids: List[int], payload: NotificationPayload, since: Optional[datetime] = None) -> List[Any]:
+        """Fan the payload out to user_ids; returns the fan-out rows. Does not commit."""
+        if not user_ids:
+            return []
+        audience = audience_query(user_ids=user_ids, active_only=False)
+        return self.db.execute(fanout_statement(audience, payload, since)).all()
+
+    def send_emails(self, recipients: Dict[int, str], title: str, message: str, notification_type: str) -> int:
+        """Email each recipient; returns the number of emails sent"""
+        email_service = self.email_service
+        if email_service is None:
+            from app.services.email_service import EmailService
+            email_service = self.email_service = EmailService()
+        if not email_service.is_configured():
+            logger.warning(f"Email service not configured, {len(recipients)} notification email(s) skipped")
+            return 0
+
+        html_content = f"""
+        <html>
+        <body>
+            <h2>{escape(title)}</h2>
+            <p>{escape(message)}</p>
+            <p><small>Type: {escape(notification_type)}</small></p>
+        </body>
+        </html>
+        """
+        sent = 0
+        for user_id, email in recipients.items():
+            try:
+                email_service.send_email(
+                    to_email=email,
+                    subject=f"Notification: {title}",
+                    html_content=html_content,
+                    text_content=message,
+                )
+                sent += 1
+            except Exception as e:
+                logger.error(f"Failed to send notification email to user {user_id}: {e}")
+        return sent
+
+    def deliver(
+        self,
+        user_ids: Iterable[Any],
+        title: str,
+        message: str,
+        notification_type: str = "info",
+        email_notification: bool = True,
+        user_emails: Optional[Dict[int, str]] = None,
+        action_url: Optional[str] = None,
+        action_label: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        group_key: Optional[str] = None,
+        coalesce_window_seconds: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store, publish and email one notification for every user.
+
+        Args:
+            user_ids: Recipients (unknown users are skipped)
+            user_emails: Email overrides per user ID (default: the user's email)
+            group_key: Coalesce into the users' unread notification of this group
+            coalesce_window_seconds: Coalescing window (default: NOTIFICATION_COALESCE_WINDOW_SECONDS)
+
+        Returns:
+            Summary with the notification ID per user, skipped users and delivery counts
+        """
+        notif_type = normalize_notification_type(notification_type)
+        requested = unique_user_ids(user_ids)
+        recipients = self.load_recipients(requested)
+        skipped = [user_id for user_id in requested if user_id not in recipients]
+        if skipped:
+            logger.warning(f"Notification '{title}' skipped for {len(skipped)} unknown user(s)")
+
+        payload = NotificationPayload(
+            title=title,
+            message=message,
+            notification_type=notif_type.value,
+            action_url=action_url,
+            action_label=action_label,
+            metadata=metadata,
+            group_key=group_key,
+        )
+        stored = self.store(list(recipients), payload, coalesce_since(payload, coalesce_window_seconds))
+        self.db.commit()
+
+        published = self.publish(fanout_messages(stored, payload))
+        created = {row.user_id for row in stored if not row.coalesced}
+
+        emails_sent = 0
+        if email_notification and created:
+            emails = {
+                user_id: (user_emails or {}).get(user_id) or email
+                for user_id, email in recipients.items()
+                if user_id in created
+            }
+            emails_sent = self.send_emails(
+                {user_id: email for user_id, email in emails.items() if email}, title, message, notif_type.value
+            )
+
+        logger.info(
+            f"Notification '{title}' delivered to {len(stored)} user(s), {len(stored) - len(created)} coalesced "
+            f"(realtime: {published}, emails: {emails_sent})"
+        )
+        return {
+            "status": "sent",
+            "type": notif_type.value,
+            "notifications": [
+                {"user_id": row.user_id, "notification_id": row.notification_id, "coalesced": row.coalesced}
+                for row in stored
+            ],
+            "skipped_user_ids": skipped,
+            "realtime_published": published,
+            "emails_sent": emails_sent,
+        }
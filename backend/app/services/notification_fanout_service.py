@@ -0,0 +1,269 @@
+"""
+Notification Fan-out Service
+Send one notification to a whole audience with a single statement.
+
+- the audience is any SELECT of user IDs (see audience_query); one
+  INSERT ... SELECT stores a notification per user, whatever the audience size
+- notifications with a group_key coalesce: while a user's notification of the
+  same group is unread and younger than the window, it is updated
+  (occurrence_count + 1) instead of adding a row
+- the unread counters are incremented by the same statement, and the
+  notifications and new counts are pushed over WebSocket in one pipeline
+
+The statements are shared with the Celery delivery path
+(app/services/notification_delivery_service.py).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, String, Text, cast, false, func, select, text, true, union_all, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.notification import Notification, NotificationCounter
+from app.models.team import TeamMember
+from app.models.user import User
+from app.services.notification_service import unread_count_message
+from app.services.realtime_channel import publish_user_messages_async
+
+
+notifications_table = Notification.__table__
+counters_table = NotificationCounter.__table__
+
+# Counters touched this recently are left alone by the reconciliation (a
+# concurrent fan-out may not be visible to its snapshot yet)
+RECONCILE_GRACE = "1 minute"
+
+RECONCILE_COUNTERS_SQL = text(
+    f"""
+    WITH actual AS (
+        SELECT user_id, count(*) AS unread_count
+        FROM notifications
+        WHERE NOT read
+        GROUP BY user_id
+    )
+    INSERT INTO notification_counters (user_id, unread_count, updated_at)
+    SELECT coalesce(a.user_id, c.user_id), coalesce(a.unread_count, 0), now()
+    FROM actual a
+    FULL JOIN notification_counters c ON c.user_id = a.user_id
+    WHERE c.unread_count IS DISTINCT FROM coalesce(a.unread_count, 0)
+      AND (c.updated_at IS NULL OR c.updated_at < now() - interval '{RECONCILE_GRACE}')
+    ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = EXCLUDED.unread_count, updated_at = now()
+        WHERE notification_counters.updated_at < now() - interval '{RECONCILE_GRACE}'
+    RETURNING user_id, unread_count
+    """
+)
+
+
+@dataclass
+class NotificationPayload:
+    """Content of a fanned-out notification"""
+    title: str
+    message: str
+    notification_type: str = "info"
+    action_url: Optional[str] = None
+    action_label: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    group_key: Optional[str] = None
+
+
+def audience_query(
+    user_ids: Optional[Sequence[int]] = None,
+    team_id: Optional[int] = None,
+    active_only: bool = True,
+) -> Select:
+    """SELECT of the audience's user IDs (column user_id); no criteria means every user"""
+    query = select(User.id.label("user_id"))
+    if user_ids is not None:
+        query = query.where(User.id.in_(list(user_ids)))
+    if team_id is not None:
+        query = query.join(TeamMember, TeamMember.user_id == User.id).where(
+            TeamMember.team_id == team_id,
+            TeamMember.is_active == True,
+        )
+    if active_only:
+        query = query.where(User.is_active == True)
+    return query
+
+
+def coalesce_since(
+    payload: NotificationPayload,
+    window_seconds: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """Oldest notification a grouped payload coalesces into (None: no coalescing)"""
+    if window_seconds is None:
+        window_seconds = settings.NOTIFICATION_COALESCE_WINDOW_SECONDS
+    if not payload.group_key or window_seconds <= 0:
+        return None
+    return (now or datetime.now(timezone.utc)) - timedelta(seconds=window_seconds)
+
+
+def fanout_statement(audience: Select, payload: NotificationPayload, since: Optional[datetime] = None):
+    """
+    Store the payload for every user of the audience, in one statement.
+
+    Rows: user_id, notification_id, created_at, occurrence_count, coalesced
+    and unread_count (the user's counter after the statement).
+    """
+    audience_cte = select(audience.subquery().c.user_id).distinct().cte("audience")
+    recipients = select(audience_cte.c.user_id)
+    returned = (
+        notifications_table.c.id,
+        notifications_table.c.user_id,
+        notifications_table.c.created_at,
+        notifications_table.c.occurrence_count,
+    )
+
+    coalesced = None
+    if since is not None and payload.group_key:
+        coalesced = (
+            update(notifications_table)
+            .where(
+                notifications_table.c.user_id == audience_cte.c.user_id,
+                notifications_table.c.group_key == payload.group_key,
+                notifications_table.c.read == false(),
+                notifications_table.c.created_at >= since,
+            )
+            .values(
+                title=payload.title,
+                message=payload.message,
+                action_url=payload.action_url,
+                action_label=payload.action_label,
+                occurrence_count=notifications_table.c.occurrence_count + 1,
+                updated_at=func.now(),
+            )
+            .returning(*returned)
+            .cte("coalesced")
+        )
+        recipients = recipients.where(audience_cte.c.user_id.not_in(select(coalesced.c.user_id)))
+
+    recipients = recipients.subquery("recipients")
+    inserted = (
+        pg_insert(notifications_table)
+        .from_select(
+            [
+                "user_id", "title", "message", "notification_type", "read",
+                "action_url", "action_label", "metadata", "group_key", "occurrence_count",
+            ],
+            select(
+                recipients.c.user_id,
+                cast(payload.title, String(200)),
+                cast(payload.message, Text),
+                cast(payload.notification_type, String(20)),
+                false(),
+                cast(payload.action_url, String(500)),
+                cast(payload.action_label, String(100)),
+                cast(payload.metadata, JSONB),
+                cast(payload.group_key, String(200)),
+                cast(1, Integer),
+            ),
+        )
+        .returning(*returned)
+        .cte("inserted")
+    )
+
+    counter_upsert = pg_insert(counters_table).from_select(
+        ["user_id", "unread_count"], select(inserted.c.user_id, cast(1, Integer))
+    )
+    counters = (
+        counter_upsert.on_conflict_do_update(
+            index_elements=[counters_table.c.user_id],
+            set_={"unread_count": counters_table.c.unread_count + 1, "updated_at": func.now()},
+        )
+        .returning(counters_table.c.user_id, counters_table.c.unread_count)
+        .cte("counters")
+    )
+
+    inserted_rows = select(
+        inserted.c.user_id,
+        inserted.c.id.label("notification_id"),
+        inserted.c.created_at,
+        inserted.c.occurrence_count,
+        false().label("coalesced"),
+        counters.c.unread_count,
+    ).join_from(inserted, counters, counters.c.user_id == inserted.c.user_id)
+    if coalesced is None:
+        return inserted_rows
+
+    # Coalesced notifications stay unread: the counter (pre-statement snapshot) is unchanged
+    coalesced_rows = select(
+        coalesced.c.user_id,
+        coalesced.c.id.label("notification_id"),
+        coalesced.c.created_at,
+        coalesced.c.occurrence_count,
+        true().label("coalesced"),
+        func.coalesce(counters_table.c.unread_count, 0).label("unread_count"),
+    ).outerjoin_from(coalesced, counters_table, counters_table.c.user_id == coalesced.c.user_id)
+    return union_all(inserted_rows, coalesced_rows)
+
+
+def notification_message(row: Any, payload: NotificationPayload) -> Dict[str, Any]:
+    """WebSocket payload of a stored (or coalesced) notification"""
+    return {
+        "type": "notification",
+        "data": {
+            "id": row.notification_id,
+            "title": payload.title,
+            "message": payload.message,
+            "type": payload.notification_type,
+            "user_id": str(row.user_id),
+            "read": False,
+            "group_key": payload.group_key,
+            "occurrence_count": row.occurrence_count,
+            "coalesced": row.coalesced,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        },
+    }
+
+
+def fanout_messages(rows: Iterable[Any], payload: NotificationPayload) -> List[Tuple[int, Dict[str, Any]]]:
+    """Notification and unread count messages of every user reached"""
+    messages = []
+    for row in rows:
+        messages.append((row.user_id, notification_message(row, payload)))
+        messages.append((row.user_id, unread_count_message(row.unread_count)))
+    return messages
+
+
+def fanout_summary(rows: Sequence[Any]) -> Dict[str, int]:
+    coalesced = sum(1 for row in rows if row.coalesced)
+    return {"notifications": len(rows) - coalesced, "coalesced": coalesced}
+
+
+class NotificationFanoutService:
+    """Service sending a notification to an audience (API process)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def fan_out(
+        self,
+        audience: Select,
+        payload: NotificationPayload,
+        coalesce_window_seconds: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Store, count and push the payload for every user of the audience.
+
+        Returns:
+            Number of notifications created, coalesced and realtime messages sent
+        """
+        since = coalesce_since(payload, coalesce_window_seconds)
+        result = await self.db.execute(fanout_statement(audience, payload, since))
+        rows = result.all()
+        await self.db.commit()
+
+        published = await publish_user_messages_async(fanout_messages(rows, payload))
+        summary = fanout_summary(rows)
+        logger.info(
+            f"Notification '{payload.title}' fanned out: {summary['notifications']} created, "
+            f"{summary['coalesced']} coalesced (realtime: {published})"
+        )
+        return {**summary, "realtime_published": published}
@@ -1,17 +1,44 @@
 """
 Notification Service
 Service for managing user notifications
+
+The unread count of every user is kept in notification_counters and adjusted
+in the same transaction as the notifications themselves; the new count is
+pushed to the user's WebSocket connections, so badges never count rows.
 """
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
-from sqlalchemy import select, and_, func, desc
+from sqlalchemy import select, and_, func, desc, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.notification import Notification, NotificationType
+from app.models.notification import Notification, NotificationCounter, NotificationType
+from app.services.realtime_channel import publish_user_message
 from app.core.logging import logger
 
 
+def adjust_unread_statement(user_id: int, delta: int):
+    """Upsert adding delta to a user's unread counter (never below 0); returns the new count"""
+    return (
+        pg_insert(NotificationCounter)
+        .values(user_id=user_id, unread_count=max(delta, 0))
+        .on_conflict_do_update(
+            index_elements=[NotificationCounter.user_id],
+            set_={
+                "unread_count": func.greatest(NotificationCounter.unread_count + delta, 0),
+                "updated_at": func.now(),
+            },
+        )
+        .returning(NotificationCounter.unread_count)
+    )
+
+
+def unread_count_message(unread_count: int) -> Dict[str, Any]:
+    """WebSocket payload carrying a user's unread count"""
+    return {"type": "notification_count", "data": {"unread_count": unread_count}}
+
+
 class NotificationService:
     """Service for notification operations"""
 
@@ -40,10 +67,13 @@ class NotificationService:
         )
         
         self.db.add(notification)
+        await self.db.flush()
+        unread_count = await self._adjust_unread(user_id, 1)
         await self.db.commit()
         await self.db.refresh(notification)
         
         logger.info(f"Created notification {notification.id} for user {user_id}")
+        await self._push_unread(user_id, unread_count)
         return notification
 
     async def get_notification(
@@ -83,15 +113,9 @@ class NotificationService:
         return list(result.scalars().all())
 
     async def get_unread_count(self, user_id: int) -> int:
-        """Get count of unread notifications for a user"""
+        """Get count of unread notifications for a user (counter row, no row means 0)"""
         result = await self.db.execute(
-            select(func.count(Notification.id))
-            .where(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.read == False
-                )
-            )
+            select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
         )
         return result.scalar() or 0
 
@@ -101,43 +125,50 @@ class NotificationService:
         user_id: int
     ) -> Optional[Notification]:
         """Mark a notification as read"""
-        notification = await self.get_notification(notification_id, user_id)
-        
-        if not notification:
-            return None
-        
-        if not notification.read:
-            notification.mark_as_read()
+        # Conditional update: concurrent requests decrement the counter once
+        result = await self.db.execute(
+            update(Notification)
+            .where(
+                and_(
+                    Notification.id == notification_id,
+                    Notification.user_id == user_id,
+                    Notification.read == False
+                )
+            )
+            .values(read=True, read_at=datetime.now(timezone.utc))
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.first() is not None:
+            unread_count = await self._adjust_unread(user_id, -1)
             await self.db.commit()
-            await self.db.refresh(notification)
             logger.info(f"Marked notification {notification_id} as read for user {user_id}")
+            await self._push_unread(user_id, unread_count)
         
-        return notification
+        return await self.get_notification(notification_id, user_id)
 
     async def mark_all_as_read(self, user_id: int) -> int:
         """Mark all notifications as read for a user"""
         result = await self.db.execute(
-            select(Notification)
+            update(Notification)
             .where(
                 and_(
                     Notification.user_id == user_id,
                     Notification.read == False
                 )
             )
+            .values(read=True, read_at=datetime.now(timezone.utc))
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
         )
-        notifications = result.scalars().all()
-        
-        count = 0
-        now = datetime.now(timezone.utc)
-        for notification in notifications:
-            if not notification.read:
-                notification.read = True
-                notification.read_at = now
-                count += 1
+        count = len(result.all())
         
         if count > 0:
+            # Decrement rather than reset: notifications created meanwhile stay counted
+            unread_count = await self._adjust_unread(user_id, -count)
             await self.db.commit()
             logger.info(f"Marked {count} notifications as read for user {user_id}")
+            await self._push_unread(user_id, unread_count)
         
         return count
 
@@ -147,33 +178,46 @@ class NotificationService:
         user_id: int
     ) -> bool:
         """Delete a notification (only if it belongs to the user)"""
-        notification = await self.get_notification(notification_id, user_id)
+        result = await self.db.execute(
+            delete(Notification)
+            .where(
+                and_(
+                    Notification.id == notification_id,
+                    Notification.user_id == user_id
+                )
+            )
+            .returning(Notification.read)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.first()
         
-        if not notification:
+        if deleted is None:
             return False
         
-        await self.db.delete(notification)
+        unread_count = None
+        if not deleted.read:
+            unread_count = await self._adjust_unread(user_id, -1)
         await self.db.commit()
         
         logger.info(f"Deleted notification {notification_id} for user {user_id}")
+        if unread_count is not None:
+            await self._push_unread(user_id, unread_count)
         return True
 
     async def delete_all_read(self, user_id: int) -> int:
         """Delete all read notifications for a user"""
         result = await self.db.execute(
-            select(Notification)
+            delete(Notification)
             .where(
                 and_(
                     Notification.user_id == user_id,
                     Notification.read == True
                 )
             )
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
         )
-        notifications = result.scalars().all()
-        
-        count = len(notifications)
-        for notification in notifications:
-            await self.db.delete(notification)
+        count = len(result.all())
         
         if count > 0:
             await self.db.commit()
@@ -198,3 +242,14 @@ class NotificationService:
             "read": read_count
         }
 
+    async def _adjust_unread(self, user_id: int, delta: int) -> int:
+        """Adjust the user's unread counter in the current transaction; returns the new count"""
+        result = await self.db.execute(adjust_unread_statement(user_id, delta))
+        return result.scalar_one()
+
+    async def _push_unread(self, user_id: int, unread_count: int) -> None:
+        """Push the new count to the user's connections (best effort, after commit)"""
+        try:
+            await publish_user_message(user_id, unread_count_message(unread_count))
+        except Exception as e:
+            logger.warning(f"Failed to push unread count to user {user_id}: {e}")
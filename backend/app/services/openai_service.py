@@ -3,12 +3,11 @@
 import os
 from typing import Optional, List, Dict, Any
 
-try:
-    from openai import AsyncOpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    AsyncOpenAI = None
+from app.core.lazy_import import is_available, lazy_module
+
+# Imported on first client creation, not at app import
+openai = lazy_module("openai")
+OPENAI_AVAILABLE = is_available("openai")
 
 # OpenAI configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -28,7 +27,7 @@ class OpenAIService:
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is not configured")
         
-        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        self.client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
         self.model = OPENAI_MODEL
         self.max_tokens = OPENAI_MAX_TOKENS
         self.temperature = OPENAI_TEMPERATURE
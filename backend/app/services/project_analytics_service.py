@@ -0,0 +1,171 @@
+"""
+Project Analytics Service
+Dashboard project analytics in one grouped query per view.
+
+- insights(): totals, active count, previous-period count and the monthly
+  created / cumulative series come from a single GROUP BY date_trunc('month')
+  with FILTER clauses and a running-sum window
+- period_metrics(): current and previous period counts in one FILTER query
+
+Results are cached per (user, tenant, range) and invalidated on project writes
+(invalidate_project_analytics).
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_backend, invalidate_cache_pattern_async
+from app.core.tenancy import get_current_tenant
+from app.core.tenancy_helpers import apply_tenant_scope
+from app.models.project import Project, ProjectStatus
+
+
+CACHE_PREFIX = "analytics"
+CACHE_TTL_SECONDS = 300
+
+# Months in the insights trend and growth charts
+SERIES_MONTHS = 6
+
+
+def growth_percentage(current: int, previous: int) -> float:
+    """Growth of `current` over `previous` (100% when starting from zero)"""
+    if previous > 0:
+        return ((current - previous) / previous) * 100
+    return 100.0 if current > 0 else 0.0
+
+
+def month_starts(today: date, months: int) -> List[date]:
+    """First day of the last `months` calendar months, oldest first, current month included"""
+    index = today.year * 12 + today.month - 1
+    return [date((index - offset) // 12, (index - offset) % 12 + 1, 1) for offset in range(months - 1, -1, -1)]
+
+
+def cache_bucket(moment: datetime) -> datetime:
+    """`moment` rounded down to the cache granularity (CACHE_TTL_SECONDS)"""
+    minutes = CACHE_TTL_SECONDS // 60
+    return moment.replace(minute=moment.minute - moment.minute % minutes, second=0, microsecond=0)
+
+
+def cache_key(user_id: int, view: str, *range_parts: Any) -> str:
+    tenant_id = get_current_tenant()
+    parts = ":".join(str(part) for part in range_parts)
+    return f"{CACHE_PREFIX}:user:{user_id}:tenant:{tenant_id if tenant_id is not None else 'none'}:{view}:{parts}"
+
+
+async def invalidate_project_analytics(user_id: int) -> int:
+    """Drop every cached analytics view of a user (called after project writes)"""
+    return await invalidate_cache_pattern_async(f"{CACHE_PREFIX}:user:{user_id}:*")
+
+
+class ProjectAnalyticsService:
+    """Service for dashboard analytics over a user's projects"""
+
+    def __init__(self, db: AsyncSession, user_id: int):
+        self.db = db
+        self.user_id = user_id
+
+    def monthly_query(self, previous_start: datetime, previous_end: datetime):
+        """Per-month counts with a running total over the user's whole history"""
+        month = func.date_trunc("month", Project.created_at)
+        query = (
+            select(
+                month.label("month"),
+                func.count().label("created"),
+                func.count().filter(Project.status == ProjectStatus.ACTIVE).label("active"),
+                func.count().filter(
+                    and_(Project.created_at >= previous_start, Project.created_at < previous_end)
+                ).label("previous_period"),
+                func.sum(func.count()).over(order_by=month).label("cumulative"),
+            )
+            .where(Project.user_id == self.user_id)
+            .group_by(month)
+            .order_by(month)
+        )
+        return apply_tenant_scope(query, Project)
+
+    def period_query(self, start: datetime, end: datetime, previous_start: datetime):
+        """Counts of [start, end] and of the previous period of the same length"""
+        in_period = and_(Project.created_at >= start, Project.created_at <= end)
+        query = select(
+            func.count().filter(in_period).label("total"),
+            func.count().filter(and_(in_period, Project.status == ProjectStatus.ACTIVE)).label("active"),
+            func.count().filter(Project.created_at < start).label("previous"),
+        ).where(
+            Project.user_id == self.user_id,
+            Project.created_at >= previous_start,
+            Project.created_at <= end,
+        )
+        return apply_tenant_scope(query, Project)
+
+    async def insights(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Dashboard insights: totals, 30-day growth and the last SERIES_MONTHS months.
+
+        Returns:
+            Dict with total, active, previous_period, growth, trend and cumulative
+            (lists of {"label", "value"})
+        """
+        now = now or datetime.now(timezone.utc)
+        key = cache_key(self.user_id, "insights", now.date().isoformat())
+        cached = await cache_backend.get(key)
+        if cached is not None:
+            return cached
+
+        rows = (await self.db.execute(
+            self.monthly_query(now - timedelta(days=60), now - timedelta(days=30))
+        )).all()
+
+        total = sum(row.created for row in rows)
+        previous = sum(row.previous_period for row in rows)
+        by_month = {row.month.date(): row for row in rows}
+
+        trend, cumulative = [], []
+        running = 0
+        months = month_starts(now.date(), SERIES_MONTHS)
+        # Running total before the charted window
+        for row in rows:
+            if row.month.date() < months[0]:
+                running = int(row.cumulative)
+        for month in months:
+            row = by_month.get(month)
+            if row is not None:
+                running = int(row.cumulative)
+            trend.append({"label": month.strftime("%b"), "value": float(row.created if row else 0)})
+            cumulative.append({"label": month.strftime("%b"), "value": float(running)})
+
+        data = {
+            "total": total,
+            "active": sum(row.active for row in rows),
+            "previous_period": previous,
+            "growth": growth_percentage(total, previous),
+            "trend": trend,
+            "cumulative": cumulative,
+        }
+        await cache_backend.set(key, data, CACHE_TTL_SECONDS)
+        return data
+
+    async def period_metrics(self, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Project counts for [start, end] compared with the previous period of the same length.
+
+        Both bounds are rounded down to the cache granularity, so a window that
+        moves with "now" gets a new cache entry every CACHE_TTL_SECONDS.
+        """
+        start, end = cache_bucket(start), cache_bucket(end)
+        key = cache_key(self.user_id, "metrics", start.isoformat(), end.isoformat())
+        cached = await cache_backend.get(key)
+        if cached is not None:
+            return cached
+
+        row = (await self.db.execute(self.period_query(start, end, start - (end - start)))).one()
+        data = {
+            "total": row.total or 0,
+            "active": row.active or 0,
+            "previous": row.previous or 0,
+            "growth": growth_percentage(row.total or 0, row.previous or 0),
+        }
+        await cache_backend.set(key, data, CACHE_TTL_SECONDS)
+        return data
@@ -0,0 +1,228 @@
+"""
+Published Content Cache
+Serialized responses of the public content, ready to send
+
+- published pages and posts (by slug), menus (by location), SEO settings and
+  the active theme are stored as their final JSON body, with an ETag
+- a cache hit is one Redis GET: no query and no model validation; clients
+  revalidate with If-None-Match and get a 304 when nothing changed
+- the create/update/delete handlers invalidate the exact keys they affect;
+  the TTL (PUBLISHED_CACHE_TTL_SECONDS) only bounds what a missed
+  invalidation could leave behind
+- pages, posts and menus keys are scoped by tenant when multi-tenancy is enabled
+
+Without Redis every read goes to the database, with the same ETags.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.tenancy import TenancyConfig, get_current_tenant
+
+
+CACHE_PREFIX = "published"
+
+# Kinds of content
+PAGE = "page"
+POST = "post"
+MENUS = "menus"
+SEO = "seo"
+THEME = "theme"
+
+# Kinds that are the same for every tenant (the theme is global, SEO settings per user)
+UNSCOPED_KINDS = frozenset({SEO, THEME})
+
+# Identifier of the active theme
+ACTIVE_THEME = "active"
+
+# User preference holding the SEO settings
+SEO_SETTINGS_KEY = "seo_settings"
+
+# Identifiers of the menus lists (every location, then each one)
+MENU_LISTS = ("all", "header", "footer", "sidebar")
+
+# Browsers may keep a copy but revalidate it (cheap with the ETag). Only the
+# active theme is served without authentication: the other kinds must not be
+# stored by shared caches and CDNs.
+PUBLIC_KINDS = frozenset({THEME})
+PUBLIC_CACHE_CONTROL = "no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass
+class CachedContent:
+    """A serialized response and its validators"""
+    body: str
+    etag: str
+    last_modified: Optional[str] = None
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header designates this version"""
+        if not if_none_match:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or self.etag in candidates
+
+
+def serialize(payload: Any) -> str:
+    """JSON body of a response model (or list of models), as FastAPI would send it"""
+    if isinstance(payload, BaseModel):
+        return payload.model_dump_json()
+    if isinstance(payload, (list, tuple)):
+        return "[" + ",".join(serialize(item) for item in payload) + "]"
+    return json.dumps(payload, default=str, separators=(",", ":"))
+
+
+def make_content(payload: Any, updated_at: Optional[datetime] = None) -> CachedContent:
+    body = serialize(payload)
+    etag = '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+    last_modified = format_datetime(updated_at, usegmt=True) if isinstance(updated_at, datetime) and updated_at.tzinfo else None
+    return CachedContent(body=body, etag=etag, last_modified=last_modified)
+
+
+def content_response(request: Request, content: CachedContent, kind: str) -> Response:
+    """The cached body, or 304 Not Modified when the client already has this version"""
+    cache_control = PUBLIC_CACHE_CONTROL if kind in PUBLIC_KINDS else PRIVATE_CACHE_CONTROL
+    headers = {"ETag": content.etag, "Cache-Control": cache_control}
+    if content.last_modified:
+        headers["Last-Modified"] = content.last_modified
+    if content.matches(request.headers.get("If-None-Match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content.body, media_type="application/json", headers=headers)
+
+
+class PublishedContentCache:
+    """Cache of serialized published content (see module docstring)"""
+
+    def __init__(self, backend=cache_backend):
+        self.backend = backend
+
+    def key(self, kind: str, ident: Any, tenant_id: Optional[int] = None) -> str:
+        if kind not in UNSCOPED_KINDS and tenant_id is None and TenancyConfig.is_enabled():
+            tenant_id = get_current_tenant()
+        scope = "global" if tenant_id is None else f"t{tenant_id}"
+        return f"{CACHE_PREFIX}:{scope}:{kind}:{ident}"
+
+    async def get(self, kind: str, ident: Any) -> Optional[CachedContent]:
+        cached = await self.backend.get(self.key(kind, ident))
+        if not cached:
+            return None
+        return CachedContent(**cached)
+
+    async def put(
+        self,
+        kind: str,
+        ident: Any,
+        payload: Any,
+        updated_at: Optional[datetime] = None,
+        tenant_id: Optional[int] = None,
+    ) -> CachedContent:
+        """Serialize and store a response (returned even if the cache is unavailable)"""
+        content = make_content(payload, updated_at)
+        await self.backend.set(
+            self.key(kind, ident, tenant_id),
+            {"body": content.body, "etag": content.etag, "last_modified": content.last_modified},
+            expire=settings.PUBLISHED_CACHE_TTL_SECONDS,
+            compress=False,
+        )
+        return content
+
+    async def get_or_build(
+        self,
+        kind: str,
+        ident: Any,
+        build: Callable[[], Awaitable[Any]],
+    ) -> Optional[CachedContent]:
+        """
+        Cached content, or the content built by build() (stored when cacheable).
+
+        build() returns None (not found), a (payload, updated_at, cacheable) tuple.
+        """
+        content = await self.get(kind, ident)
+        if content:
+            return content
+        built = await build()
+        if built is None:
+            return None
+        payload, updated_at, cacheable = built
+        if not cacheable:
+            return make_content(payload, updated_at)
+        return await self.put(kind, ident, payload, updated_at)
+
+    async def invalidate(self, kind: str, *idents: Any) -> None:
+        """Drop the cached content of the given identifiers (call after the commit)"""
+        for ident in dict.fromkeys(i for i in idents if i is not None):
+            await self.backend.delete(self.key(kind, ident))
+
+    async def invalidate_menus(self) -> None:
+        await self.invalidate(MENUS, *MENU_LISTS)
+
+
+published_content = PublishedContentCache()
+
+
+async def warm_published_content(session_factory, limit: int = 1000) -> Dict[str, int]:
+    """
+    Serialize the published pages and posts, the menus and the active theme.
+
+    With multi-tenancy enabled only the active theme is warmed.
+
+    Returns:
+        Number of entries stored per kind
+    """
+    from app.api.v1.endpoints.menus import menus_payload
+    from app.api.v1.endpoints.pages import PageResponse
+    from app.api.v1.endpoints.posts import _post_responses
+    from app.models.page import Page
+    from app.models.post import Post
+    from app.models.theme import Theme
+    from app.schemas.theme import ThemeConfigResponse
+
+    counts = {PAGE: 0, POST: 0, MENUS: 0, THEME: 0}
+    # Tenant content is only known once a request sets the tenant: it fills on first read
+    warm_tenant_content = not TenancyConfig.is_enabled()
+
+    async with session_factory() as db:
+        theme = (await db.execute(select(Theme).where(Theme.is_active == True))).scalar_one_or_none()
+        if theme and theme.config and "mode" in theme.config:
+            await published_content.put(
+                THEME, ACTIVE_THEME, ThemeConfigResponse.model_validate(theme), theme.updated_at
+            )
+            counts[THEME] += 1
+
+        if not warm_tenant_content:
+            return counts
+
+        pages = (await db.execute(
+            select(Page).where(Page.status == "published").order_by(Page.updated_at.desc()).limit(limit)
+        )).scalars().all()
+        for page in pages:
+            await published_content.put(PAGE, page.slug, PageResponse.model_validate(page), page.updated_at)
+            counts[PAGE] += 1
+
+        posts = (await db.execute(
+            select(Post).where(Post.status == "published").order_by(Post.updated_at.desc()).limit(limit)
+        )).scalars().all()
+        for post, response in zip(posts, await _post_responses(db, posts), strict=True):
+            await published_content.put(POST, post.slug, response, post.updated_at)
+            counts[POST] += 1
+
+        for location in MENU_LISTS:
+            payload, updated_at = await menus_payload(db, None if location == "all" else location)
+            await published_content.put(MENUS, location, payload, updated_at)
+            counts[MENUS] += 1
+
+    logger.info(f"Published content cache warmed: {counts}")
+    return counts
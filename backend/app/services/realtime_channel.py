@@ -0,0 +1,204 @@
+"""
+Realtime Channel
+Cross-process delivery of WebSocket messages to users.
+
+WebSocket connections live in the API processes (ConnectionManager in
+app/api/v1/endpoints/websocket.py), out of reach of Celery workers and of
+other API replicas. Messages are published on a Redis pub/sub channel and
+every API process forwards them to its own connections (RealtimeSubscriber,
+started from the app lifespan).
+
+Without Redis, API code delivers to the local connections directly and
+Celery workers skip realtime delivery (notifications are still stored).
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+try:
+    import redis as sync_redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    sync_redis = None
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+CHANNEL = "realtime:user-messages"
+
+# Wait before resubscribing after a Redis error
+RECONNECT_DELAY_SECONDS = 5.0
+
+UserId = Union[int, str]
+Deliver = Callable[[Dict[str, Any], str], Awaitable[None]]
+
+# Synchronous client of this process (Celery workers), created on first publish
+_sync_client = None
+
+
+def encode(user_id: UserId, message: Dict[str, Any]) -> str:
+    return json.dumps({"user_id": str(user_id), "message": message}, default=str)
+
+
+def decode(raw: Union[bytes, str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(user_id, message) of a channel payload, None when malformed"""
+    try:
+        payload = json.loads(raw)
+        return str(payload["user_id"]), payload["message"]
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def _get_sync_client():
+    global _sync_client
+    if _sync_client is None and REDIS_AVAILABLE and settings.REDIS_URL:
+        _sync_client = sync_redis.Redis.from_url(settings.REDIS_URL)
+    return _sync_client
+
+
+def publish_user_messages(messages: Iterable[Tuple[UserId, Dict[str, Any]]]) -> int:
+    """
+    Publish messages from synchronous code (Celery workers) in one pipeline.
+
+    Returns:
+        Number of messages published (0 without Redis or on error)
+    """
+    messages = list(messages)
+    client = _get_sync_client()
+    if client is None or not messages:
+        return 0
+    try:
+        pipeline = client.pipeline(transaction=False)
+        for user_id, message in messages:
+            pipeline.publish(CHANNEL, encode(user_id, message))
+        pipeline.execute()
+        return len(messages)
+    except Exception as e:
+        logger.warning(f"Realtime publish failed for {len(messages)} message(s): {e}")
+        return 0
+
+
+async def publish_user_message(user_id: UserId, message: Dict[str, Any]) -> bool:
+    """
+    Send a message to a user's connections from the API process.
+
+    Goes through Redis so every API process gets it; delivers to this
+    process's connections directly when Redis is not configured.
+    """
+    from app.core.cache import cache_backend
+
+    if cache_backend.redis_client is not None:
+        try:
+            await cache_backend.redis_client.publish(CHANNEL, encode(user_id, message))
+            return True
+        except Exception as e:
+            logger.warning(f"Realtime publish failed for user {user_id}: {e}")
+
+    from app.api.v1.endpoints.websocket import manager
+    await manager.send_personal_message(message, str(user_id))
+    return True
+
+
+async def publish_user_messages_async(messages: Iterable[Tuple[UserId, Dict[str, Any]]]) -> int:
+    """
+    Send many messages from the API process (fan-out) in one Redis pipeline.
+
+    Falls back to this process's connections when Redis is not configured.
+
+    Returns:
+        Number of messages sent
+    """
+    from app.core.cache import cache_backend
+
+    messages = list(messages)
+    if not messages:
+        return 0
+    if cache_backend.redis_client is not None:
+        try:
+            pipeline = cache_backend.redis_client.pipeline(transaction=False)
+            for user_id, message in messages:
+                pipeline.publish(CHANNEL, encode(user_id, message))
+            await pipeline.execute()
+            return len(messages)
+        except Exception as e:
+            logger.warning(f"Realtime publish failed for {len(messages)} message(s): {e}")
+
+    from app.api.v1.endpoints.websocket import manager
+    for user_id, message in messages:
+        await manager.send_personal_message(message, str(user_id))
+    return len(messages)
+
+
+class RealtimeSubscriber:
+    """Forwards channel messages to the WebSocket connections of this process"""
+
+    # Process-wide subscriber (started from the app lifespan)
+    _instance: Optional["RealtimeSubscriber"] = None
+    _task: Optional[asyncio.Task] = None
+
+    def __init__(self, redis_client: Any, deliver: Deliver):
+        self.redis_client = redis_client
+        self.deliver = deliver
+        self.counters: Dict[str, int] = {"delivered": 0, "malformed": 0, "failed": 0}
+
+    async def handle(self, raw: Union[bytes, str]) -> bool:
+        decoded = decode(raw)
+        if decoded is None:
+            self.counters["malformed"] += 1
+            return False
+        user_id, message = decoded
+        try:
+            await self.deliver(message, user_id)
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.warning(f"Realtime delivery to user {user_id} failed: {e}")
+            return False
+        self.counters["delivered"] += 1
+        return True
+
+    async def listen(self) -> None:
+        pubsub = self.redis_client.pubsub()
+        await pubsub.subscribe(CHANNEL)
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    await self.handle(item["data"])
+        finally:
+            await pubsub.unsubscribe(CHANNEL)
+            await pubsub.close()
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Realtime subscriber error: {e}", exc_info=True)
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    @classmethod
+    def start(cls, redis_client: Any, deliver: Deliver) -> "RealtimeSubscriber":
+        """Start the process-wide subscriber (idempotent)"""
+        if cls._task is None or cls._task.done():
+            cls._instance = cls(redis_client, deliver)
+            cls._task = asyncio.create_task(cls._instance.run_forever())
+            logger.info("Realtime subscriber started")
+        return cls._instance
+
+    @classmethod
+    async def stop(cls) -> None:
+        task, cls._task = cls._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    @classmethod
+    def get(cls) -> Optional["RealtimeSubscriber"]:
+        return cls._instance
@@ -0,0 +1,331 @@
+"""
+Recurring Donation Processor
+Charges due recurring donations of one organization database.
+
+Due schedules are claimed in next_payment_date order (idx_recurring_donations_next_payment),
+in batches locked with FOR UPDATE SKIP LOCKED, so several workers can process the same
+organization without charging a schedule twice. Each batch is charged with bounded
+concurrency, its Donation rows are inserted in one statement and the schedules and donor
+totals are advanced with executemany updates, then the batch commits and releases its locks.
+"""
+
+import asyncio
+import calendar
+from abc import ABC, abstractmethod
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.organization_donors import Donation, Donor, PaymentMethod, RecurringDonation
+
+
+FREQUENCY_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+def _add_months(anchor: datetime, months: int) -> datetime:
+    """`anchor` moved by whole calendar months, its day clamped to the end of shorter months"""
+    month_index = anchor.month - 1 + months
+    year, month = anchor.year + month_index // 12, month_index % 12 + 1
+    day = min(anchor.day, calendar.monthrange(year, month)[1])
+    return anchor.replace(year=year, month=month, day=day)
+
+
+def payment_date_after(start: datetime, frequency: str, after: datetime) -> datetime:
+    """
+    First due date of a schedule started at `start` that is later than `after`.
+
+    Months are calendar months; the day is clamped to the end of shorter
+    months (Jan 31 -> Feb 28 -> Mar 31), replacing the 30/90/365-day
+    approximation of RecurringDonation.calculate_next_payment_date. Every due
+    date is computed from `start`, so neither late retries nor short months
+    move the billing anchor.
+    """
+    if after < start:
+        return start
+    if frequency == "weekly":
+        return start + ((after - start) // timedelta(weeks=1) + 1) * timedelta(weeks=1)
+    months = FREQUENCY_MONTHS.get(frequency)
+    if months is None:
+        raise ValueError(f"Unknown recurring donation frequency: {frequency}")
+    periods = ((after.year - start.year) * 12 + after.month - start.month) // months
+    next_date = _add_months(start, periods * months)
+    while next_date <= after:
+        periods += 1
+        next_date = _add_months(start, periods * months)
+    return next_date
+
+
+@dataclass
+class ChargeResult:
+    """Outcome of one charge attempt"""
+    success: bool
+    reference: Optional[str] = None
+    failure_reason: Optional[str] = None
+
+
+class RecurringChargeGateway(ABC):
+    """Payment layer used by the processor; subclasses charge one schedule"""
+
+    @abstractmethod
+    async def charge(self, schedule: RecurringDonation, payment_method: PaymentMethod, idempotency_key: str) -> ChargeResult:
+        """Charge one period of a schedule"""
+
+
+class StripeRecurringGateway(RecurringChargeGateway):
+    """
+    Off-session Stripe PaymentIntents.
+
+    The payment method's metadata must hold stripe_customer_id and stripe_payment_method_id.
+    The idempotency key makes a retried batch (e.g. after a crash before commit) reuse the
+    original charge instead of charging again.
+    """
+
+    async def charge(self, schedule: RecurringDonation, payment_method: PaymentMethod, idempotency_key: str) -> ChargeResult:
+        import stripe
+
+        if not stripe.api_key:
+            stripe.api_key = settings.STRIPE_SECRET_KEY
+
+        metadata = payment_method.extra_data or {}
+        customer_id = metadata.get("stripe_customer_id")
+        stripe_payment_method_id = metadata.get("stripe_payment_method_id")
+        if not customer_id or not stripe_payment_method_id:
+            return ChargeResult(success=False, failure_reason="Payment method is not a saved Stripe payment method")
+
+        try:
+            intent = await asyncio.to_thread(
+                stripe.PaymentIntent.create,
+                amount=int(Decimal(schedule.amount) * 100),
+                currency=(schedule.currency or "CAD").lower(),
+                customer=customer_id,
+                payment_method=stripe_payment_method_id,
+                off_session=True,
+                confirm=True,
+                metadata={
+                    "recurring_donation_id": str(schedule.id),
+                    "organization_id": str(schedule.organization_id),
+                    "type": "recurring_donation",
+                },
+                idempotency_key=idempotency_key,
+            )
+        except stripe.StripeError as e:
+            return ChargeResult(success=False, failure_reason=str(getattr(e, "user_message", None) or e)[:255])
+
+        if intent.status != "succeeded":
+            return ChargeResult(success=False, reference=intent.id, failure_reason=f"PaymentIntent {intent.status}")
+        return ChargeResult(success=True, reference=intent.id)
+
+
+@dataclass
+class ProcessingStats:
+    """Summary of a processing run for one organization"""
+    organization_id: UUID
+    batches: int = 0
+    charged: int = 0
+    failed: int = 0
+    deactivated: int = 0
+    amount: Decimal = Decimal("0.00")
+    duration_ms: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "organization_id": str(self.organization_id),
+            "batches": self.batches,
+            "charged": self.charged,
+            "failed": self.failed,
+            "deactivated": self.deactivated,
+            "amount": str(self.amount),
+            "duration_ms": round(self.duration_ms, 1),
+            "errors": self.errors,
+        }
+
+
+class RecurringDonationProcessor:
+    """Processes due recurring donations of one organization database"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        organization_id: UUID,
+        gateway: Optional[RecurringChargeGateway] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_failures: Optional[int] = None,
+        retry_delay: Optional[timedelta] = None,
+    ):
+        self.session_factory = session_factory
+        self.organization_id = organization_id
+        self.gateway = gateway or StripeRecurringGateway()
+        self.batch_size = batch_size or settings.RECURRING_DONATION_BATCH_SIZE
+        self.concurrency = concurrency or settings.RECURRING_DONATION_CONCURRENCY
+        self.max_failures = max_failures or settings.RECURRING_DONATION_MAX_FAILURES
+        self.retry_delay = retry_delay or timedelta(hours=settings.RECURRING_DONATION_RETRY_HOURS)
+
+    def due_query(self, now: datetime):
+        """Next batch of due schedules, locked for this worker"""
+        return (
+            select(RecurringDonation, PaymentMethod)
+            .join(PaymentMethod, PaymentMethod.id == RecurringDonation.payment_method_id)
+            .where(
+                RecurringDonation.organization_id == self.organization_id,
+                RecurringDonation.status == "active",
+                RecurringDonation.next_payment_date <= now,
+                or_(RecurringDonation.end_date.is_(None), RecurringDonation.end_date >= RecurringDonation.next_payment_date),
+            )
+            .order_by(RecurringDonation.next_payment_date)
+            .limit(self.batch_size)
+            .with_for_update(of=RecurringDonation, skip_locked=True)
+        )
+
+    async def process_due(self, now: Optional[datetime] = None, max_batches: Optional[int] = None) -> ProcessingStats:
+        """
+        Charge every due schedule, batch by batch, until none is left.
+
+        Args:
+            now: Reference time (default: current UTC time)
+            max_batches: Stop after this many batches
+
+        Returns:
+            ProcessingStats for the run
+        """
+        now = now or datetime.now(timezone.utc)
+        stats = ProcessingStats(organization_id=self.organization_id)
+        start = time.perf_counter()
+
+        while max_batches is None or stats.batches < max_batches:
+            async with self.session_factory() as session:
+                processed = await self._process_batch(session, now, stats)
+            if not processed:
+                break
+            stats.batches += 1
+
+        stats.duration_ms = (time.perf_counter() - start) * 1000
+        if stats.charged or stats.failed:
+            logger.info(
+                f"Recurring donations for organization {self.organization_id}: "
+                f"{stats.charged} charged ({stats.amount}), {stats.failed} failed, "
+                f"{stats.deactivated} deactivated in {stats.duration_ms:.0f}ms"
+            )
+        return stats
+
+    async def _process_batch(self, session: AsyncSession, now: datetime, stats: ProcessingStats) -> int:
+        rows = (await session.execute(self.due_query(now))).all()
+        if not rows:
+            await session.rollback()
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def charge(schedule: RecurringDonation, payment_method: PaymentMethod) -> ChargeResult:
+            async with semaphore:
+                if not payment_method.is_active:
+                    return ChargeResult(success=False, failure_reason="Payment method is inactive")
+                key = f"recurring:{schedule.id}:{schedule.next_payment_date.isoformat()}"
+                try:
+                    return await self.gateway.charge(schedule, payment_method, key)
+                except Exception as e:
+                    logger.error(f"Recurring charge error for {schedule.id}: {e}", exc_info=True)
+                    return ChargeResult(success=False, failure_reason=str(e)[:255])
+
+        results = await asyncio.gather(*(charge(schedule, pm) for schedule, pm in rows))
+
+        donations: List[Dict[str, Any]] = []
+        schedule_updates: List[Dict[str, Any]] = []
+        donor_updates: List[Dict[str, Any]] = []
+
+        for (schedule, _), result in zip(rows, results, strict=True):
+            if result.success:
+                donations.append(self._donation_row(schedule, result, now))
+                donor_updates.append({"b_donor_id": schedule.donor_id, "b_amount": schedule.amount, "b_date": now})
+                schedule_updates.append(self._schedule_success(schedule, now))
+                stats.charged += 1
+                stats.amount += Decimal(schedule.amount)
+            else:
+                values = self._schedule_failure(schedule, result, now)
+                schedule_updates.append(values)
+                stats.failed += 1
+                if values["status"] == "failed":
+                    stats.deactivated += 1
+
+        try:
+            if donations:
+                await session.execute(insert(Donation), donations)
+                # Core executemany on the table: an ORM update() with a list of
+                # parameters is an ORM bulk UPDATE by primary key, which this isn't
+                donors = Donor.__table__
+                await session.execute(
+                    update(donors)
+                    .where(donors.c.id == bindparam("b_donor_id"))
+                    .values(
+                        total_donated=donors.c.total_donated + bindparam("b_amount"),
+                        donation_count=donors.c.donation_count + 1,
+                        first_donation_date=func.coalesce(donors.c.first_donation_date, bindparam("b_date")),
+                        last_donation_date=bindparam("b_date"),
+                    ),
+                    donor_updates,
+                )
+            # ORM bulk UPDATE by primary key (executemany)
+            await session.execute(update(RecurringDonation), schedule_updates)
+            await session.commit()
+        except Exception as e:
+            # Charges went through: the idempotency keys make the retry reuse them
+            await session.rollback()
+            stats.errors.append(str(e))
+            logger.error(f"Failed to record recurring donation batch for {self.organization_id}: {e}", exc_info=True)
+            raise
+
+        return len(rows)
+
+    def _donation_row(self, schedule: RecurringDonation, result: ChargeResult, now: datetime) -> Dict[str, Any]:
+        return {
+            "id": uuid4(),
+            "donor_id": schedule.donor_id,
+            "organization_id": schedule.organization_id,
+            "amount": schedule.amount,
+            "currency": schedule.currency,
+            "donation_type": "recurring",
+            "payment_method_id": schedule.payment_method_id,
+            "payment_status": "completed",
+            "payment_date": now,
+            "transaction_id": result.reference,
+            "recurring_donation_id": schedule.id,
+        }
+
+    def _schedule_success(self, schedule: RecurringDonation, now: datetime) -> Dict[str, Any]:
+        # Back on the anchored dates after a retry; missed periods are skipped rather than charged back-to-back
+        next_date = payment_date_after(schedule.start_date, schedule.frequency, now)
+        return {
+            "id": schedule.id,
+            "next_payment_date": next_date,
+            "last_payment_date": now,
+            "total_payments": (schedule.total_payments or 0) + 1,
+            "total_amount": (schedule.total_amount or Decimal("0.00")) + Decimal(schedule.amount),
+            "consecutive_failures": 0,
+            "last_failure_reason": None,
+            "status": "active",
+        }
+
+    def _schedule_failure(self, schedule: RecurringDonation, result: ChargeResult, now: datetime) -> Dict[str, Any]:
+        failures = (schedule.consecutive_failures or 0) + 1
+        # The retry only moves next_payment_date: the next success goes back to the
+        # dates anchored on start_date (see _schedule_success)
+        # Same keys as _schedule_success so the batch runs as a single executemany
+        return {
+            "id": schedule.id,
+            "next_payment_date": now + self.retry_delay,
+            "last_payment_date": schedule.last_payment_date,
+            "total_payments": schedule.total_payments or 0,
+            "total_amount": schedule.total_amount or Decimal("0.00"),
+            "consecutive_failures": failures,
+            "last_failure_reason": (result.failure_reason or "Unknown error")[:255],
+            "status": "failed" if failures >= self.max_failures else "active",
+        }
@@ -1,14 +1,19 @@
 """S3 service for file operations."""
 
 import os
+import threading
 import uuid
 from typing import Optional
 from datetime import datetime, timedelta, timezone
 
-import boto3
-from botocore.exceptions import ClientError
 from fastapi import UploadFile
 
+from app.core.lazy_import import lazy_module
+
+# boto3 is imported when the client is first needed, not at app import
+boto3 = lazy_module("boto3")
+botocore_exceptions = lazy_module("botocore.exceptions")
+
 # AWS S3 configuration
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
@@ -16,16 +21,25 @@ AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
 AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")  # For S3-compatible services like DigitalOcean Spaces
 
-# Initialize S3 client
+# S3 client, created on first use (see get_s3_client)
 s3_client = None
-if AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY:
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION,
-        endpoint_url=AWS_S3_ENDPOINT_URL,
-    )
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """Return the shared S3 client, creating it on first call (None if AWS credentials are missing)."""
+    global s3_client
+    if s3_client is None and AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY:
+        with _s3_client_lock:
+            if s3_client is None:
+                s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+                    region_name=AWS_REGION,
+                    endpoint_url=AWS_S3_ENDPOINT_URL,
+                )
+    return s3_client
 
 
 class S3Service:
@@ -33,7 +47,8 @@ class S3Service:
 
     def __init__(self):
         """Initialize S3 service."""
-        if not s3_client:
+        self.client = get_s3_client()
+        if not self.client:
             raise ValueError("S3 client not configured. Please set AWS credentials.")
 
     def upload_file(
@@ -67,7 +82,7 @@ class S3Service:
 
         # Upload to S3
         try:
-            s3_client.put_object(
+            self.client.put_object(
                 Bucket=AWS_S3_BUCKET,
                 Key=file_key,
                 Body=file_content,
@@ -89,7 +104,7 @@ class S3Service:
                 "content_type": file.content_type or "application/octet-stream",
                 "filename": file.filename,
             }
-        except ClientError as e:
+        except botocore_exceptions.ClientError as e:
             raise ValueError(f"Failed to upload file to S3: {str(e)}")
 
     def delete_file(self, file_key: str) -> bool:
@@ -106,9 +121,9 @@ class S3Service:
             raise ValueError("AWS_S3_BUCKET is not configured")
 
         try:
-            s3_client.delete_object(Bucket=AWS_S3_BUCKET, Key=file_key)
+            self.client.delete_object(Bucket=AWS_S3_BUCKET, Key=file_key)
             return True
-        except ClientError as e:
+        except botocore_exceptions.ClientError as e:
             raise ValueError(f"Failed to delete file from S3: {str(e)}")
 
     def generate_presigned_url(
@@ -130,13 +145,13 @@ class S3Service:
             raise ValueError("AWS_S3_BUCKET is not configured")
 
         try:
-            url = s3_client.generate_presigned_url(
+            url = self.client.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': AWS_S3_BUCKET, 'Key': file_key},
                 ExpiresIn=expiration,
             )
             return url
-        except ClientError as e:
+        except botocore_exceptions.ClientError as e:
             raise ValueError(f"Failed to generate presigned URL: {str(e)}")
 
     def get_file_metadata(self, file_key: str) -> dict:
@@ -153,14 +168,14 @@ class S3Service:
             raise ValueError("AWS_S3_BUCKET is not configured")
 
         try:
-            response = s3_client.head_object(Bucket=AWS_S3_BUCKET, Key=file_key)
+            response = self.client.head_object(Bucket=AWS_S3_BUCKET, Key=file_key)
             return {
                 "size": response.get("ContentLength", 0),
                 "content_type": response.get("ContentType", ""),
                 "last_modified": response.get("LastModified"),
                 "metadata": response.get("Metadata", {}),
             }
-        except ClientError as e:
+        except botocore_exceptions.ClientError as e:
             raise ValueError(f"Failed to get file metadata: {str(e)}")
 
     @staticmethod
@@ -170,6 +185,5 @@ class S3Service:
             AWS_ACCESS_KEY_ID
             and AWS_SECRET_ACCESS_KEY
             and AWS_S3_BUCKET
-            and s3_client
         )
 
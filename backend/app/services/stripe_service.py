@@ -224,7 +224,9 @@ class StripeService:
             )
 
             return {
+                "id": event["id"],
                 "type": event["type"],
+                "created": event.get("created"),
                 "data": event["data"],
             }
 
@@ -0,0 +1,323 @@
+"""
+Stripe Webhook Queue
+Durable ingestion and background processing of Stripe webhook events.
+
+The webhook endpoint only verifies the signature and stores the raw event
+(idempotent on the Stripe event ID), so Stripe gets its 2xx in milliseconds.
+StripeWebhookWorker then processes stored events:
+- events of the same Stripe object (subscription, customer...) are processed
+  one at a time, in Stripe creation order
+- events of different objects are processed concurrently
+- failures are retried with exponential backoff, then dead-lettered
+- claims use FOR UPDATE SKIP LOCKED plus a lease, so several API processes
+  can run workers against the same queue
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.webhook_event import WebhookEvent
+
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_PROCESSED = "processed"
+STATUS_DEAD = "dead"
+
+# Exponential backoff between attempts: 30s, 1m, 2m... capped at 1h
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# A claimed event is handed to another worker if not finished within the lease
+CLAIM_LEASE_SECONDS = 300
+
+# Samples kept for the processing latency percentiles
+LATENCY_WINDOW = 1000
+
+EventHandler = Callable[[str, Dict[str, Any], AsyncSession], Awaitable[None]]
+
+
+def event_object_key(event: Dict[str, Any]) -> Optional[str]:
+    """
+    Ordering key of an event: the Stripe object whose state it changes.
+
+    Subscription lifecycle, invoice and checkout events of one subscription
+    share a key; otherwise the customer, then the object itself.
+    """
+    obj = (event.get("data") or {}).get("object") or {}
+    object_type = obj.get("object")
+    if object_type == "subscription" and obj.get("id"):
+        return f"subscription:{obj['id']}"
+    if obj.get("subscription") and isinstance(obj["subscription"], str):
+        return f"subscription:{obj['subscription']}"
+    if obj.get("customer") and isinstance(obj["customer"], str):
+        return f"customer:{obj['customer']}"
+    if object_type and obj.get("id"):
+        return f"{object_type}:{obj['id']}"
+    return None
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Delay before the next attempt after `attempts` failed attempts"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+async def enqueue_event(db: AsyncSession, event: Dict[str, Any]) -> bool:
+    """
+    Store a verified Stripe event for background processing and commit.
+
+    Returns:
+        False if the event was already received (Stripe retry)
+    """
+    created = event.get("created")
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        insert(WebhookEvent)
+        .values(
+            stripe_event_id=event["id"],
+            event_type=event["type"],
+            event_data=json.dumps(event),
+            status=STATUS_PENDING,
+            object_key=event_object_key(event),
+            stripe_created=datetime.fromtimestamp(created, tz=timezone.utc) if created else now,
+            attempts=0,
+            next_attempt_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=["stripe_event_id"])
+        .returning(WebhookEvent.id)
+    )
+    inserted = result.scalar_one_or_none() is not None
+    await db.commit()
+    return inserted
+
+
+CLAIM_SQL = text("""
+    UPDATE webhook_events
+    SET status = 'processing',
+        attempts = attempts + 1,
+        locked_until = now() + make_interval(secs => :lease)
+    WHERE id IN (
+        SELECT e.id FROM webhook_events e
+        WHERE (
+            (e.status = 'pending' AND e.next_attempt_at <= now())
+            OR (e.status = 'processing' AND e.locked_until < now())
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM webhook_events p
+            WHERE p.object_key = e.object_key
+            AND p.status IN ('pending', 'processing')
+            AND (p.stripe_created, p.id) < (e.stripe_created, e.id)
+        )
+        ORDER BY e.stripe_created, e.id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, stripe_event_id, event_type, event_data, attempts, created_at
+""")
+
+QUEUE_STATS_SQL = text("""
+    SELECT
+        count(*) FILTER (WHERE status = 'pending') AS pending,
+        count(*) FILTER (WHERE status = 'processing') AS processing,
+        count(*) FILTER (WHERE status = 'dead') AS dead,
+        extract(epoch FROM now() - min(created_at) FILTER (WHERE status IN ('pending', 'processing'))) AS oldest_pending_seconds,
+        count(*) FILTER (WHERE status = 'processed' AND processed_at > now() - interval '5 minutes') AS processed_last_5m
+    FROM webhook_events
+    WHERE status <> 'processed' OR processed_at > now() - interval '5 minutes'
+""")
+
+
+class StripeWebhookWorker:
+    """Background processor of stored Stripe webhook events"""
+
+    # Process-wide worker (started from the app lifespan)
+    _instance: Optional["StripeWebhookWorker"] = None
+    _task: Optional[asyncio.Task] = None
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        handler: EventHandler,
+        concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.handler = handler
+        self.concurrency = concurrency or settings.STRIPE_WEBHOOK_WORKER_CONCURRENCY
+        self.max_attempts = max_attempts or settings.STRIPE_WEBHOOK_MAX_ATTEMPTS
+        self.poll_interval = poll_interval or settings.STRIPE_WEBHOOK_POLL_INTERVAL
+        self._wakeup = asyncio.Event()
+        self.counters: Dict[str, int] = {"processed": 0, "retried": 0, "dead": 0}
+        # (finished_at, received -> processed lag in seconds)
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=LATENCY_WINDOW)
+
+    async def claim(self, limit: int) -> List[Any]:
+        """Claim up to `limit` events, at most one per Stripe object"""
+        async with self.session_factory() as session:
+            result = await session.execute(CLAIM_SQL, {"limit": limit, "lease": CLAIM_LEASE_SECONDS})
+            rows = list(result.all())
+            await session.commit()
+            return rows
+
+    async def process_event(self, row: Any) -> bool:
+        """Run the handler for one claimed event and record the outcome"""
+        event = json.loads(row.event_data) if row.event_data else {}
+        event_object = (event.get("data") or {}).get("object") or {}
+        try:
+            async with self.session_factory() as session:
+                await self.handler(row.event_type, event_object, session)
+                await session.commit()
+        except Exception as e:
+            await self._record_failure(row, e)
+            return False
+
+        async with self.session_factory() as session:
+            await session.execute(
+                text("""
+                    UPDATE webhook_events
+                    SET status = 'processed', processed_at = now(), locked_until = NULL, last_error = NULL
+                    WHERE id = :id
+                """),
+                {"id": row.id},
+            )
+            await session.commit()
+
+        self.counters["processed"] += 1
+        if row.created_at is not None:
+            lag = (datetime.now(timezone.utc) - row.created_at).total_seconds()
+            self._latencies.append((time.monotonic(), lag))
+        return True
+
+    async def _record_failure(self, row: Any, error: Exception) -> None:
+        dead = row.attempts >= self.max_attempts
+        if dead:
+            self.counters["dead"] += 1
+            logger.error(
+                f"Stripe webhook {row.stripe_event_id} ({row.event_type}) dead-lettered after "
+                f"{row.attempts} attempts: {error}",
+                exc_info=error,
+            )
+        else:
+            self.counters["retried"] += 1
+            logger.warning(
+                f"Stripe webhook {row.stripe_event_id} ({row.event_type}) failed "
+                f"(attempt {row.attempts}/{self.max_attempts}): {error}"
+            )
+        async with self.session_factory() as session:
+            await session.execute(
+                text("""
+                    UPDATE webhook_events
+                    SET status = :status, next_attempt_at = :next_attempt_at,
+                        locked_until = NULL, last_error = :error
+                    WHERE id = :id
+                """),
+                {
+                    "id": row.id,
+                    "status": STATUS_DEAD if dead else STATUS_PENDING,
+                    "next_attempt_at": datetime.now(timezone.utc) + retry_delay(row.attempts),
+                    "error": str(error)[:2000],
+                },
+            )
+            await session.commit()
+
+    async def run_once(self) -> int:
+        """Process claimable events until the queue has nothing ready; returns the number handled"""
+        handled = 0
+        while True:
+            rows = await self.claim(self.concurrency)
+            if not rows:
+                return handled
+            # One event per object per round: ordering within an object is preserved
+            await asyncio.gather(*(self.process_event(row) for row in rows))
+            handled += len(rows)
+
+    def notify(self) -> None:
+        """Wake the worker (called right after an event is stored)"""
+        self._wakeup.set()
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stripe webhook worker error: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def metrics(self, window_seconds: float = 300) -> Dict[str, Any]:
+        """In-process throughput and lag over the last `window_seconds`"""
+        cutoff = time.monotonic() - window_seconds
+        lags = sorted(lag for finished, lag in self._latencies if finished >= cutoff)
+        return {
+            **self.counters,
+            "throughput_per_minute": round(len(lags) * 60 / window_seconds, 2),
+            "lag_p50_seconds": round(lags[len(lags) // 2], 3) if lags else None,
+            "lag_max_seconds": round(lags[-1], 3) if lags else None,
+        }
+
+    @classmethod
+    def start(cls, session_factory: async_sessionmaker, handler: EventHandler) -> "StripeWebhookWorker":
+        """Start the process-wide worker (idempotent)"""
+        if cls._task is None or cls._task.done():
+            cls._instance = cls(session_factory, handler)
+            cls._task = asyncio.create_task(cls._instance.run_forever())
+            logger.info("Stripe webhook worker started")
+        return cls._instance
+
+    @classmethod
+    async def stop(cls) -> None:
+        task, cls._task = cls._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    @classmethod
+    def get(cls) -> Optional["StripeWebhookWorker"]:
+        return cls._instance
+
+
+async def get_queue_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Queue depth, dead letters and lag (shared by all workers)"""
+    row = (await db.execute(QUEUE_STATS_SQL)).one()
+    return {
+        "pending": row.pending or 0,
+        "processing": row.processing or 0,
+        "dead": row.dead or 0,
+        "oldest_pending_seconds": round(float(row.oldest_pending_seconds), 3) if row.oldest_pending_seconds is not None else None,
+        "processed_last_5m": row.processed_last_5m or 0,
+    }
+
+
+async def requeue_event(db: AsyncSession, stripe_event_id: str) -> bool:
+    """Put a dead-lettered event back in the queue (attempts reset). Returns False if not dead."""
+    result = await db.execute(
+        text("""
+            UPDATE webhook_events
+            SET status = 'pending', attempts = 0, next_attempt_at = now(), last_error = NULL
+            WHERE stripe_event_id = :event_id AND status = 'dead'
+            RETURNING id
+        """),
+        {"event_id": stripe_event_id},
+    )
+    requeued = result.scalar_one_or_none() is not None
+    await db.commit()
+    return requeued
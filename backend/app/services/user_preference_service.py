@@ -10,6 +10,7 @@ from sqlalchemy.exc import ProgrammingError, OperationalError
 
 from app.models.user_preference import UserPreference
 from app.core.logging import logger
+from app.services.published_content_cache import SEO, SEO_SETTINGS_KEY, published_content
 
 
 class UserPreferenceService:
@@ -18,6 +19,11 @@ class UserPreferenceService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _invalidate_cached(self, user_id: int, key: str) -> None:
+        """Drop the cached SEO settings response when they change"""
+        if key == SEO_SETTINGS_KEY:
+            await published_content.invalidate(SEO, user_id)
+
     async def get_preference(
         self,
         user_id: int,
@@ -78,6 +84,7 @@ class UserPreferenceService:
             existing.value = value
             await self.db.commit()
             await self.db.refresh(existing)
+            await self._invalidate_cached(user_id, key)
             return existing
         else:
             preference = UserPreference(
@@ -88,6 +95,7 @@ class UserPreferenceService:
             self.db.add(preference)
             await self.db.commit()
             await self.db.refresh(preference)
+            await self._invalidate_cached(user_id, key)
             return preference
 
     async def set_preferences(
@@ -114,6 +122,7 @@ class UserPreferenceService:
         
         await self.db.delete(preference)
         await self.db.commit()
+        await self._invalidate_cached(user_id, key)
         return True
 
     async def delete_all_preferences(
@@ -133,6 +142,7 @@ class UserPreferenceService:
             await self.db.delete(pref)
         
         await self.db.commit()
+        await self._invalidate_cached(user_id, SEO_SETTINGS_KEY)
         return count
 
     async def get_preference_value(
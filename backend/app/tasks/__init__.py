@@ -9,8 +9,17 @@ from app.tasks.email_tasks import (
     send_subscription_created_email_task,
     send_subscription_cancelled_email_task,
     send_trial_ending_email_task,
+    send_email_batch_task,
 )
-from app.tasks.notification_tasks import send_notification_task
+from app.tasks.notification_tasks import (
+    send_notification_task,
+    send_notifications_batch_task,
+    reconcile_notification_counters_task,
+)
+from app.tasks.campaign_rollup_tasks import reconcile_campaign_rollups_task
+from app.tasks.recurring_donation_tasks import process_recurring_donations_task
+from app.tasks.security_audit_tasks import maintain_security_audit_partitions_task
+from app.tasks.metrics_snapshot_tasks import refresh_metrics_snapshots_task
 
 __all__ = [
     "send_email_task",
@@ -21,5 +30,12 @@ __all__ = [
     "send_subscription_created_email_task",
     "send_subscription_cancelled_email_task",
     "send_trial_ending_email_task",
+    "send_email_batch_task",
     "send_notification_task",
+    "send_notifications_batch_task",
+    "reconcile_notification_counters_task",
+    "reconcile_campaign_rollups_task",
+    "process_recurring_donations_task",
+    "maintain_security_audit_partitions_task",
+    "refresh_metrics_snapshots_task",
 ]
@@ -0,0 +1,45 @@
+"""Campaign rollup tasks."""
+
+import asyncio
+from typing import Dict
+
+from app.celery_app import celery_app
+from app.core.logging import logger
+from app.models.organization import Organization
+from app.services.campaign_rollup_service import CampaignRollupService
+from app.tasks.organization_db import load_active_organizations, organization_session_factory
+
+
+async def reconcile_organization(organization: Organization) -> int:
+    """Reconcile campaign rollups of one organization; returns the number of corrected campaigns"""
+    async with organization_session_factory(organization) as session_factory:
+        async with session_factory() as session:
+            corrected = await CampaignRollupService(session, organization.id).reconcile()
+            await session.commit()
+            return len(corrected)
+
+
+async def reconcile_all_organizations() -> Dict[str, int]:
+    """Reconcile campaign rollups of every active organization database"""
+    corrected: Dict[str, int] = {}
+    for organization in await load_active_organizations():
+        try:
+            corrected[organization.slug] = await reconcile_organization(organization)
+        except Exception as e:
+            # One unreachable tenant must not stop the pass
+            logger.error(f"Campaign rollup reconciliation failed for {organization.slug}: {e}", exc_info=True)
+    return corrected
+
+
+@celery_app.task(bind=True)
+def reconcile_campaign_rollups_task(self):
+    """
+    Periodic safety net for incremental campaign rollups.
+
+    Scheduled by celery beat (see app/celery_app.py).
+    """
+    corrected = asyncio.run(reconcile_all_organizations())
+    drifted = {slug: count for slug, count in corrected.items() if count}
+    if drifted:
+        logger.warning(f"Campaign rollups reconciled: {drifted}")
+    return {"organizations": len(corrected), "corrected": drifted}
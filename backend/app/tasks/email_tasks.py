@@ -25,10 +25,13 @@ Available Tasks:
     - send_subscription_created_email_task: Subscription confirmation
     - send_subscription_cancelled_email_task: Subscription cancellation
     - send_trial_ending_email_task: Trial ending reminder
+    - send_email_batch_task: Bulk send of an email batch (many recipients per SendGrid request)
 """
 
 from app.celery_app import celery_app
+from app.services.bulk_email_service import BulkEmailDeferred, BulkEmailSender, SendGridBulkClient
 from app.services.email_service import EmailService
+from app.tasks.worker_db import worker_session
 from app.core.logging import logger
 
 
@@ -160,3 +163,29 @@ def send_trial_ending_email_task(self, email: str, name: str, days_remaining: in
         return result
     except Exception as exc:
         raise self.retry(exc=exc, countdown=60)
+
+
+@celery_app.task(bind=True, max_retries=10)
+def send_email_batch_task(self, batch_id: int):
+    """
+    Send the pending recipients of an email batch.
+
+    Resumable: statuses are committed per SendGrid request, so a retry only
+    sends the recipients still pending. When SendGrid keeps throttling or
+    failing, the task is retried after the advertised delay.
+    """
+    email_service = EmailService()
+    if not email_service.is_configured():
+        logger.warning("SendGrid not configured. Email batch skipped", context={"batch_id": batch_id})
+        return {"status": "skipped", "batch_id": batch_id, "reason": "SendGrid not configured"}
+
+    sender_kwargs = {
+        "client": SendGridBulkClient(email_service.api_key),
+        "from_email": email_service.from_email,
+        "from_name": email_service.from_name,
+    }
+    try:
+        with worker_session() as db:
+            return BulkEmailSender(db, **sender_kwargs).send_batch(batch_id)
+    except BulkEmailDeferred as exc:
+        raise self.retry(exc=exc, countdown=exc.retry_after)
@@ -0,0 +1,25 @@
+"""Dashboard metrics snapshot tasks."""
+
+import asyncio
+from typing import Any, Dict
+
+from app.celery_app import celery_app
+from app.services.metrics_snapshot_service import MetricsSnapshotService
+from app.tasks.organization_db import main_session_factory
+
+
+async def refresh_snapshots(full: bool = False) -> Dict[str, Any]:
+    async with main_session_factory() as session_factory:
+        async with session_factory() as session:
+            return await MetricsSnapshotService(session).refresh(full=full)
+
+
+@celery_app.task(bind=True)
+def refresh_metrics_snapshots_task(self, full: bool = False):
+    """
+    Refresh tenancy and platform metrics snapshots.
+
+    Scheduled by celery beat (see app/celery_app.py): incremental every few
+    minutes, full hourly to catch deletions.
+    """
+    return asyncio.run(refresh_snapshots(full=full))
@@ -0,0 +1,51 @@
+"""Organization database access for Celery tasks."""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.organization_database_manager import OrganizationDatabaseManager
+from app.models.organization import Organization
+
+
+@asynccontextmanager
+async def organization_session_factory(organization: Organization) -> AsyncIterator[async_sessionmaker]:
+    """
+    Session factory for one organization database, disposed on exit.
+
+    Celery runs each task in a fresh event loop, so the API's pooled engines
+    (bound to another loop) can't be reused here.
+    """
+    spec = OrganizationDatabaseManager.get_connection_spec(organization.db_connection_string)
+    engine = create_async_engine(spec.asyncpg_url, poolclass=NullPool)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def main_session_factory() -> AsyncIterator[async_sessionmaker]:
+    """Session factory for the main database, disposed on exit"""
+    engine = create_async_engine(str(settings.DATABASE_URL), poolclass=NullPool)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+async def load_active_organizations() -> List[Organization]:
+    """Active organizations that have a dedicated database"""
+    async with main_session_factory() as session_factory:
+        async with session_factory() as session:
+            result = await session.execute(
+                select(Organization).where(
+                    Organization.is_active == True,
+                    Organization.db_connection_string.isnot(None),
+                ).order_by(Organization.slug)
+            )
+            return list(result.scalars().all())
@@ -0,0 +1,47 @@
+"""Recurring donation tasks."""
+
+import asyncio
+from typing import Any, Dict, List
+
+from app.celery_app import celery_app
+from app.core.logging import logger
+from app.models.organization import Organization
+from app.services.recurring_donation_processor import RecurringDonationProcessor
+from app.tasks.organization_db import load_active_organizations, organization_session_factory
+
+
+async def process_organization(organization: Organization) -> Dict[str, Any]:
+    """Charge the due recurring donations of one organization"""
+    async with organization_session_factory(organization) as session_factory:
+        stats = await RecurringDonationProcessor(session_factory, organization.id).process_due()
+        return stats.to_dict()
+
+
+async def process_all_organizations() -> List[Dict[str, Any]]:
+    """Charge due recurring donations in every active organization database"""
+    results: List[Dict[str, Any]] = []
+    for organization in await load_active_organizations():
+        try:
+            results.append(await process_organization(organization))
+        except Exception as e:
+            # One failing tenant must not block the others
+            logger.error(f"Recurring donation processing failed for {organization.slug}: {e}", exc_info=True)
+            results.append({"organization_id": str(organization.id), "errors": [str(e)]})
+    return results
+
+
+@celery_app.task(bind=True)
+def process_recurring_donations_task(self):
+    """
+    Charge due recurring donations.
+
+    Scheduled by celery beat (see app/celery_app.py). Several workers can run it
+    at the same time: schedules are claimed with FOR UPDATE SKIP LOCKED.
+    """
+    results = asyncio.run(process_all_organizations())
+    return {
+        "organizations": len(results),
+        "charged": sum(r.get("charged", 0) for r in results),
+        "failed": sum(r.get("failed", 0) for r in results),
+        "errors": [r for r in results if r.get("errors")],
+    }
@@ -0,0 +1,28 @@
+"""Security audit log maintenance tasks."""
+
+import asyncio
+from typing import Dict, List
+
+from app.celery_app import celery_app
+from app.services.audit_log_storage import drop_expired_partitions, ensure_partitions
+from app.tasks.organization_db import main_session_factory
+
+
+async def maintain_partitions() -> Dict[str, List[str]]:
+    """Create upcoming monthly partitions and drop the expired ones"""
+    async with main_session_factory() as session_factory:
+        async with session_factory() as session:
+            created = await ensure_partitions(session)
+            dropped = await drop_expired_partitions(session)
+            await session.commit()
+    return {"created": created, "dropped": dropped}
+
+
+@celery_app.task(bind=True)
+def maintain_security_audit_partitions_task(self):
+    """
+    Daily partition maintenance of security_audit_logs.
+
+    Scheduled by celery beat (see app/celery_app.py).
+    """
+    return asyncio.run(maintain_partitions())
@@ -0,0 +1,67 @@
+"""Process-wide synchronous database engine for Celery workers."""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+
+
+def sync_database_url() -> str:
+    """Main database URL for the synchronous (psycopg2) driver"""
+    return str(settings.DATABASE_URL).replace("+asyncpg", "")
+
+
+def init_worker_engine() -> Engine:
+    """
+    Create this process's pooled engine (idempotent).
+
+    Called on worker_process_init, i.e. after the prefork pool forked: pooled
+    connections must not be shared between processes.
+    """
+    global _engine, _session_factory
+    if _engine is None:
+        _engine = create_engine(
+            sync_database_url(),
+            pool_pre_ping=True,
+            pool_size=settings.CELERY_DB_POOL_SIZE,
+            max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+            pool_recycle=1800,
+        )
+        _session_factory = sessionmaker(bind=_engine, expire_on_commit=False)
+        logger.info(
+            f"Celery worker database engine ready (pool {settings.CELERY_DB_POOL_SIZE}"
+            f"+{settings.CELERY_DB_MAX_OVERFLOW})"
+        )
+    return _engine
+
+
+def dispose_worker_engine() -> None:
+    """Close the pooled connections (worker_process_shutdown)"""
+    global _engine, _session_factory
+    engine, _engine, _session_factory = _engine, None, None
+    if engine is not None:
+        engine.dispose()
+
+
+@contextmanager
+def worker_session() -> Iterator[Session]:
+    """Session from the process engine; rolled back on error, always closed"""
+    if _session_factory is None:
+        init_worker_engine()
+    session = _session_factory()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
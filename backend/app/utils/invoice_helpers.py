@@ -3,16 +3,20 @@ Invoice Helper Utilities
 Shared utilities for invoice data conversion
 """
 
+from typing import Optional
+
 from app.models.invoice import Invoice
+from app.models.user import User
 from app.schemas.erp import ERPInvoiceResponse
 
 
-def convert_invoice_to_erp_response(invoice: Invoice) -> dict:
+def convert_invoice_to_erp_response(invoice: Invoice, client: Optional[User] = None) -> dict:
     """
     Convert Invoice model to ERP invoice response dictionary
     
     Args:
-        invoice: Invoice model instance with user relationship loaded
+        invoice: Invoice model instance
+        client: User the invoice belongs to (e.g. from a BatchLoader)
         
     Returns:
         Dictionary ready for ERPInvoiceResponse.model_validate()
@@ -29,10 +33,10 @@ def convert_invoice_to_erp_response(invoice: Invoice) -> dict:
         "paid_at": invoice.paid_at,
         "client_id": invoice.user_id,
         "client_name": (
-            f"{invoice.user.first_name or ''} {invoice.user.last_name or ''}".strip()
-            if invoice.user else None
+            f"{client.first_name or ''} {client.last_name or ''}".strip()
+            if client else None
         ),
-        "client_email": invoice.user.email if invoice.user else None,
+        "client_email": client.email if client else None,
         "pdf_url": invoice.invoice_pdf_url or invoice.hosted_invoice_url,
         "created_at": invoice.created_at,
         "updated_at": invoice.updated_at,
@@ -130,24 +130,16 @@ if [ -n "$DATABASE_URL" ]; then
     if [ "$MIGRATION_STATUS" = "success" ]; then
         echo "✅ Database migrations completed successfully"
         
-        # Verify avatar column migration was applied
+        # One-shot schema bootstrap (columns, default theme, indexes, ANALYZE)
+        # Guarded by an advisory lock and skipped when the schema fingerprint is unchanged,
+        # so workers don't run this DDL at boot
         echo "=========================================="
-        echo "Verifying avatar column migration..."
+        echo "Bootstrapping database schema..."
         echo "=========================================="
         if command -v timeout >/dev/null 2>&1; then
-            timeout 30 python scripts/ensure_avatar_migration.py 2>&1 || echo "⚠️  Avatar column verification skipped (will be created by auto-migration if needed)"
+            timeout 120 python scripts/bootstrap_db.py 2>&1 || echo "⚠️  Database bootstrap incomplete (a worker will retry at startup)"
         else
-            python scripts/ensure_avatar_migration.py 2>&1 || echo "⚠️  Avatar column verification skipped (will be created by auto-migration if needed)"
-        fi
-        
-        # Ensure default theme exists after migrations (with timeout)
-        echo "=========================================="
-        echo "Ensuring default theme exists..."
-        echo "=========================================="
-        if command -v timeout >/dev/null 2>&1; then
-            timeout 30 python scripts/create_default_theme.py 2>&1 || echo "⚠️  Could not ensure default theme (will be created on first API call)"
-        else
-            python scripts/create_default_theme.py 2>&1 || echo "⚠️  Could not ensure default theme (will be created on first API call)"
+            python scripts/bootstrap_db.py 2>&1 || echo "⚠️  Database bootstrap incomplete (a worker will retry at startup)"
         fi
     else
         echo "⚠️  Database migrations failed, timed out, or skipped!"
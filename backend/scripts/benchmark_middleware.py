@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Middleware Overhead Benchmark
+Measures the per-request cost of the middleware stack, in process (no network).
+
+Stacks compared, on the same one-route app returning a small JSON body:
+    none        no middleware (reference)
+    base        N pass-through BaseHTTPMiddleware layers (the previous stack's cost)
+    asgi        N pass-through pure ASGI layers
+    pipeline    the application pipeline, in the order of app.main.create_app
+
+Usage:
+    python scripts/benchmark_middleware.py
+    python scripts/benchmark_middleware.py --requests 5000 --layers 12
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.api_versioning import APIVersioningMiddleware
+from app.core.asgi import RequestLoggingMiddleware, ResponseHeadersMiddleware
+from app.core.cache_headers import CacheHeadersMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.cors import CORSHeadersMiddleware
+from app.core.csrf import CSRFMiddleware
+from app.core.logging import logger
+from app.core.metrics import MetricsMiddleware
+from app.core.query_instrumentation import QueryInstrumentationMiddleware
+from app.core.request_limits import RequestSizeLimitMiddleware
+from app.core.tenancy_middleware import TenancyMiddleware
+
+
+class PassThroughHTTPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+class PassThroughASGIMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+def build_app(stack: str, layers: int) -> FastAPI:
+    """One-route app wrapped in the given middleware stack"""
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok", "items": list(range(20))}
+
+    if stack in ("base", "asgi"):
+        middleware = PassThroughHTTPMiddleware if stack == "base" else PassThroughASGIMiddleware
+        for _ in range(layers):
+            app.add_middleware(middleware)
+    elif stack == "pipeline":
+        app.add_middleware(CORSHeadersMiddleware, cors_origins=["*"], allowed_headers=["Content-Type"], is_production=False)
+        app.add_middleware(RequestLoggingMiddleware)
+        app.add_middleware(CompressionMiddleware, min_size=1024, compress_level=6, use_brotli=True)
+        app.add_middleware(CacheHeadersMiddleware, default_max_age=300)
+        app.add_middleware(QueryInstrumentationMiddleware)
+        app.add_middleware(RequestSizeLimitMiddleware)
+        app.add_middleware(APIVersioningMiddleware, default_version="v1", supported_versions=["v1"])
+        app.add_middleware(TenancyMiddleware)
+        app.add_middleware(CSRFMiddleware, secret_key="benchmark", cookie_name="csrf_token")
+        app.add_middleware(MetricsMiddleware)
+        app.add_middleware(ResponseHeadersMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, warmup: int) -> list[float]:
+    """Duration of each request, in microseconds"""
+    transport = httpx.ASGITransport(app=app)
+    durations = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(warmup + requests):
+            start = time.perf_counter()
+            response = await client.get("/api/v1/ping", headers={"Accept-Encoding": "gzip"})
+            elapsed = (time.perf_counter() - start) * 1_000_000
+            response.raise_for_status()
+            if i >= warmup:
+                durations.append(elapsed)
+    return durations
+
+
+async def run(requests: int, warmup: int, layers: int) -> None:
+    results = {}
+    for stack in ("none", "base", "asgi", "pipeline"):
+        durations = await measure(build_app(stack, layers), requests, warmup)
+        results[stack] = (statistics.mean(durations), statistics.median(durations))
+
+    reference = results["none"][0]
+    print(f"{requests} requests per stack, {layers} pass-through layers\n")
+    print(f"{'stack':<10} {'mean µs':>10} {'median µs':>10} {'overhead µs':>12}")
+    for stack, (mean, median) in results.items():
+        print(f"{stack:<10} {mean:>10.1f} {median:>10.1f} {mean - reference:>12.1f}")
+
+    base_per_layer = (results["base"][0] - reference) / layers
+    asgi_per_layer = (results["asgi"][0] - reference) / layers
+    print(f"\nPer layer: BaseHTTPMiddleware {base_per_layer:.1f} µs, pure ASGI {asgi_per_layer:.1f} µs")
+
+
+def main() -> None:
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the per-request middleware overhead")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per stack")
+    parser.add_argument("--warmup", type=int, default=200, help="Requests sent before measuring")
+    parser.add_argument("--layers", type=int, default=12, help="Pass-through layers in the base/asgi stacks")
+    args = parser.parse_args()
+
+    # Request logs would dominate the measure
+    logger.logger.disabled = True
+    asyncio.run(run(args.requests, args.warmup, args.layers))
+
+
+if __name__ == "__main__":
+    main()
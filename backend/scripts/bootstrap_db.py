@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Database Bootstrap Script
+One-shot schema bootstrap to run once per deploy (release job / entrypoint),
+instead of on every worker boot.
+
+Usage:
+    python scripts/bootstrap_db.py           # Apply if the schema fingerprint changed
+    python scripts/bootstrap_db.py --check   # Exit 1 if a bootstrap is needed
+    python scripts/bootstrap_db.py --force   # Re-run every step
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.bootstrap import compute_schema_fingerprint, is_bootstrapped, run_bootstrap
+from app.core.database import close_db
+
+
+async def main_async(check: bool, force: bool) -> int:
+    try:
+        if check:
+            up_to_date = await is_bootstrapped()
+            print(f"Schema fingerprint {compute_schema_fingerprint()[:12]}: {'up to date' if up_to_date else 'bootstrap needed'}")
+            return 0 if up_to_date else 1
+
+        result = await run_bootstrap(force=force)
+        print(f"Bootstrap {result.status} ({result.fingerprint[:12]})")
+        for step in result.steps:
+            print(f"  ✓ {step}")
+        for error in result.errors:
+            print(f"  ❌ {error}")
+        return 1 if result.errors else 0
+    finally:
+        await close_db()
+
+
+def main() -> None:
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(description="Bootstrap the main database schema")
+    parser.add_argument("--check", action="store_true", help="Only report whether a bootstrap is needed")
+    parser.add_argument("--force", action="store_true", help="Run all steps even if the fingerprint matches")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main_async(check=args.check, force=args.force)))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ Script pour exécuter les migrations sur toutes les bases de données d'organisa
 
 Usage:
     python scripts/migrate_organizations.py
+    python scripts/migrate_organizations.py --max-workers 8
+    python scripts/migrate_organizations.py --resume <run-uuid>
     python scripts/migrate_organizations.py --organization-id <uuid>
 """
 
@@ -68,8 +70,13 @@ async def migrate_organization(org: Organization) -> bool:
         return False
 
 
-async def migrate_all_organizations():
-    """Migrate all organization databases"""
+async def migrate_all_organizations(max_workers: int = 4, resume_run_id: UUID | None = None):
+    """Migrate all organization databases in parallel, skipping up-to-date tenants"""
+    from app.core.organization_migration_orchestrator import (
+        OrganizationMigrationOrchestrator,
+        get_migration_run_statuses,
+    )
+    
     # Connect to main database
     main_db_url = settings.DATABASE_URL
     engine = create_async_engine(main_db_url)
@@ -77,18 +84,18 @@ async def migrate_all_organizations():
     
     try:
         async with async_session() as session:
-            # Get all organizations
-            result = await session.execute(select(Organization))
-            organizations = result.scalars().all()
-            
-            print(f"📊 Trouvé {len(organizations)} organisation(s)\n")
+            orchestrator = OrganizationMigrationOrchestrator(session, max_workers=max_workers)
+            run = await orchestrator.run(resume_run_id=resume_run_id)
             
-            success_count = 0
-            for org in organizations:
-                if await migrate_organization(org):
-                    success_count += 1
+            print(f"\n📊 Run {run.id} ({run.target_revision}): {run.status}")
+            print(f"   ✅ {run.succeeded_count} migrée(s), ⏭️  {run.skipped_count} à jour, ❌ {run.failed_count} en échec")
             
-            print(f"\n✅ {success_count}/{len(organizations)} organisation(s) migrée(s) avec succès")
+            data = await get_migration_run_statuses(session, run.id)
+            for tenant in data.get("tenants", []):
+                if tenant.status == "failed":
+                    print(f"   ❌ {tenant.organization_id}: {tenant.error}")
+            if run.failed_count:
+                print(f"\n↻ Relancer avec: --resume {run.id}")
             
     finally:
         await engine.dispose()
@@ -126,6 +133,17 @@ async def main():
         type=str,
         help="UUID of a specific organization to migrate (if not provided, migrates all)"
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=4,
+        help="Maximum number of organization databases migrated concurrently"
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        help="UUID of an earlier migration run to resume"
+    )
     
     args = parser.parse_args()
     
@@ -137,7 +155,12 @@ async def main():
             print(f"❌ UUID invalide: {args.organization_id}")
             sys.exit(1)
     else:
-        await migrate_all_organizations()
+        try:
+            resume_run_id = UUID(args.resume) if args.resume else None
+        except ValueError:
+            print(f"❌ UUID invalide: {args.resume}")
+            sys.exit(1)
+        await migrate_all_organizations(max_workers=args.max_workers, resume_run_id=resume_run_id)
 
 
 if __name__ == "__main__":
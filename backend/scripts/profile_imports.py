@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Import-Time Profiler Script
+Reports the cold import cost of the app per package and per module.
+
+Usage:
+    python scripts/profile_imports.py
+    python scripts/profile_imports.py --module app.api.v1.router --top 40
+    python scripts/profile_imports.py --budget-ms 4000   # exit 1 if over budget
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.import_profiler import HEAVY_MODULES, format_report, profile_imports
+
+
+def main() -> None:
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(description="Profile cold import time")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of packages/modules to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the cold import exceeds this budget")
+    args = parser.parse_args()
+
+    profile = profile_imports(args.module)
+    print(format_report(profile, top=args.top))
+
+    failed = False
+    if args.budget_ms is not None and profile.total_ms > args.budget_ms:
+        print(f"\n❌ Import budget exceeded: {profile.total_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    heavy = [name for name in HEAVY_MODULES if profile.imported(name)]
+    if heavy:
+        print(f"\n⚠️  Heavy modules on the cold import path: {', '.join(heavy)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
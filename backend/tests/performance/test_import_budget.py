@@ -0,0 +1,42 @@
+"""
+Cold-Import Budget Tests
+Import app.main in a fresh interpreter and fail if heavy optional
+dependencies land on the import path or the budget is exceeded.
+
+Override the budget with IMPORT_TIME_BUDGET_MS (milliseconds).
+"""
+
+import os
+
+import pytest
+
+from app.core.import_profiler import (
+    DEFAULT_IMPORT_BUDGET_MS,
+    HEAVY_MODULES,
+    format_report,
+    profile_imports,
+)
+
+
+@pytest.fixture(scope="module")
+def app_import_profile():
+    return profile_imports("app.main")
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestImportBudget:
+    """Test app cold-import cost"""
+
+    def test_heavy_modules_are_lazy(self, app_import_profile):
+        """pandas, reportlab, boto3, openai, anthropic, sendgrid... load on first use only"""
+        heavy = [name for name in HEAVY_MODULES if app_import_profile.imported(name)]
+        assert not heavy, f"Heavy modules imported at startup: {heavy}\n{format_report(app_import_profile)}"
+
+    def test_cold_import_within_budget(self, app_import_profile):
+        """Importing app.main stays within the cold-start budget"""
+        budget_ms = float(os.getenv("IMPORT_TIME_BUDGET_MS", DEFAULT_IMPORT_BUDGET_MS))
+        assert app_import_profile.total_ms <= budget_ms, (
+            f"Cold import took {app_import_profile.total_ms:.0f} ms (budget {budget_ms:.0f} ms)\n"
+            f"{format_report(app_import_profile)}"
+        )
@@ -0,0 +1,191 @@
+"""
+Unit tests for AI chat streaming, shared clients and response caching
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.api import ai as ai_api
+from app.services import ai_service
+from app.services.ai_service import AIProvider, AIService, get_client
+
+
+class StubStream:
+    def __init__(self, items):
+        self.items = list(items)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self.items:
+            yield item
+
+
+class StubOpenAI:
+    """Local stand-in for AsyncOpenAI: streams the reply word by word"""
+
+    def __init__(self, reply="Bonjour le monde"):
+        self.reply = reply
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **options):
+        self.calls.append(options)
+        usage = SimpleNamespace(prompt_tokens=5, completion_tokens=3, total_tokens=8)
+        if not options.get("stream"):
+            message = SimpleNamespace(content=self.reply)
+            return SimpleNamespace(
+                model="stub-model", usage=usage, choices=[SimpleNamespace(message=message, finish_reason="stop")]
+            )
+        words = self.reply.split(" ")
+        chunks = [
+            SimpleNamespace(
+                model="stub-model",
+                usage=None,
+                choices=[SimpleNamespace(
+                    delta=SimpleNamespace(content=word if i == 0 else f" {word}"),
+                    finish_reason="stop" if i == len(words) - 1 else None,
+                )],
+            )
+            for i, word in enumerate(words)
+        ]
+        chunks.append(SimpleNamespace(model="stub-model", usage=usage, choices=[]))
+        return StubStream(chunks)
+
+
+class StubAnthropic:
+    def __init__(self):
+        self.calls = []
+        self.messages = SimpleNamespace(create=self.create)
+
+    async def create(self, **options):
+        self.calls.append(options)
+        return StubStream([
+            SimpleNamespace(type="message_start", message=SimpleNamespace(model="claude-stub", usage=SimpleNamespace(input_tokens=7))),
+            SimpleNamespace(type="content_block_start"),
+            SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text="Salut")),
+            SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=" !")),
+            SimpleNamespace(type="message_delta", delta=SimpleNamespace(stop_reason="end_turn"), usage=SimpleNamespace(output_tokens=2)),
+            SimpleNamespace(type="message_stop"),
+        ])
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    store = {}
+
+    async def get(key):
+        return store.get(key)
+
+    async def set(key, value, expire=300, compress=True):
+        store[key] = value
+        return True
+
+    monkeypatch.setattr(ai_service.cache_backend, "get", get)
+    monkeypatch.setattr(ai_service.cache_backend, "set", set)
+    monkeypatch.setattr(ai_service.settings, "AI_RESPONSE_CACHE_TTL_SECONDS", 60)
+    return store
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_forwards_deltas_then_usage(memory_cache):
+    client = StubOpenAI()
+    service = AIService(AIProvider.OPENAI, client=client)
+
+    events = await collect(service.stream_chat_completion(
+        [{"role": "user", "content": "Salut"}], system_prompt="Sois bref", temperature=0.7
+    ))
+
+    assert [e["content"] for e in events if e["type"] == "delta"] == ["Bonjour", " le", " monde"]
+    assert events[-1] == {
+        "type": "done", "model": "stub-model", "finish_reason": "stop", "provider": "openai", "cached": False,
+        "usage": {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8},
+    }
+    assert client.calls[0]["stream"] is True
+    assert client.calls[0]["messages"][0] == {"role": "system", "content": "Sois bref"}
+    # Sampled responses are not cached
+    assert memory_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_anthropic_stream_reads_message_events(memory_cache):
+    client = StubAnthropic()
+    service = AIService(AIProvider.ANTHROPIC, client=client)
+
+    events = await collect(service.stream_chat_completion(
+        [{"role": "system", "content": "Réponds en français"}, {"role": "user", "content": "Bonjour"}]
+    ))
+
+    assert "".join(e["content"] for e in events if e["type"] == "delta") == "Salut !"
+    assert events[-1]["usage"] == {"input_tokens": 7, "output_tokens": 2, "total_tokens": 9}
+    assert events[-1]["finish_reason"] == "end_turn"
+    assert client.calls[0]["system"] == "Réponds en français"
+    assert client.calls[0]["messages"] == [{"role": "user", "content": "Bonjour"}]
+
+
+@pytest.mark.asyncio
+async def test_deterministic_responses_are_cached(memory_cache):
+    client = StubOpenAI()
+    service = AIService(AIProvider.OPENAI, client=client)
+    messages = [{"role": "user", "content": "Quelle est la capitale ?"}]
+
+    streamed = await collect(service.stream_chat_completion(messages, temperature=0))
+    first = await service.chat_completion(messages, temperature=0)
+    replay = await collect(service.stream_chat_completion(messages, temperature=0))
+
+    # Only the first request reaches the provider; a temperature of 0 is sent as is
+    assert len(client.calls) == 1 and client.calls[0]["temperature"] == 0
+    assert streamed[-1]["cached"] is False
+    assert first["content"] == "Bonjour le monde" and first["cached"] is True
+    assert replay == [
+        {"type": "delta", "content": "Bonjour le monde"},
+        {**streamed[-1], "cached": True},
+    ]
+
+    await service.chat_completion([{"role": "user", "content": "Autre question"}], temperature=0)
+    assert len(client.calls) == 2
+
+
+def test_provider_clients_are_shared(monkeypatch):
+    created = []
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **options):
+            created.append(options)
+
+    monkeypatch.setattr(ai_service, "openai", SimpleNamespace(AsyncOpenAI=FakeAsyncOpenAI))
+    monkeypatch.setattr(ai_service, "_clients", {})
+
+    first = get_client(AIProvider.OPENAI, "sk-test")
+    assert get_client(AIProvider.OPENAI, "sk-test") is first
+    assert get_client(AIProvider.OPENAI, "sk-other") is not first
+    assert len(created) == 2 and created[0]["api_key"] == "sk-test"
+
+
+@pytest.mark.asyncio
+async def test_sse_response_emits_events_and_errors(memory_cache):
+    request = ai_api.ChatRequest(messages=[{"role": "user", "content": "Salut"}], provider="openai")
+    service = AIService(AIProvider.OPENAI, client=StubOpenAI())
+
+    response = ai_api._sse_response(service, request, None)
+    lines = [chunk async for chunk in response.body_iterator]
+
+    assert response.media_type == "text/event-stream"
+    events = [json.loads(line[len("data: "):]) for line in lines]
+    assert [e["type"] for e in events] == ["delta", "delta", "delta", "done"]
+
+    async def failing(**options):
+        raise RuntimeError("connection reset")
+
+    broken = StubOpenAI()
+    broken.chat.completions.create = failing
+    response = ai_api._sse_response(AIService(AIProvider.OPENAI, client=broken), request, None)
+    lines = [chunk async for chunk in response.body_iterator]
+    assert json.loads(lines[-1][len("data: "):]) == {"type": "error", "detail": "AI service error: connection reset"}
@@ -0,0 +1,113 @@
+"""
+Unit tests for the pure ASGI middleware pipeline
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import asgi
+from app.core.asgi import PRODUCTION_CSP, RequestLoggingMiddleware, ResponseHeadersMiddleware
+from app.core.cache_headers import CacheHeadersMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.csrf import CSRFMiddleware
+from app.core.ip_whitelist import IPWhitelistMiddleware
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/donors")
+    async def donors():
+        return {"donors": [{"id": i, "name": f"Donor {i}"} for i in range(100)]}
+
+    @app.get("/export")
+    async def export():
+        async def rows():
+            for i in range(3):
+                yield f"{i},Donor {i}\n" * 200
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    @app.post("/forms")
+    async def submit_form():
+        return {"status": "ok"}
+
+    @app.get("/api/v1/admin/stats")
+    async def admin_stats():
+        return {"status": "ok"}
+
+    return app
+
+
+def test_compression_and_etag_on_whole_bodies(app):
+    app.add_middleware(CompressionMiddleware, min_size=100, use_brotli=False)
+    app.add_middleware(CacheHeadersMiddleware, default_max_age=300)
+    client = TestClient(app)
+
+    response = client.get("/donors", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert response.headers["cache-control"] == "public, max-age=300, must-revalidate"
+    assert response.json()["donors"][99] == {"id": 99, "name": "Donor 99"}
+
+    etag = response.headers["etag"]
+    not_modified = client.get("/donors", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert "content-length" not in not_modified.headers
+
+    # Non-GET responses are never cached
+    assert client.post("/forms").headers["cache-control"] == "no-cache, no-store, must-revalidate"
+
+
+def test_streaming_responses_pass_through(app):
+    app.add_middleware(CompressionMiddleware, min_size=100)
+    app.add_middleware(CacheHeadersMiddleware)
+    client = TestClient(app)
+
+    response = client.get("/export", headers={"Accept-Encoding": "gzip"})
+
+    assert response.text.splitlines()[-1] == "2,Donor 2"
+    assert "content-encoding" not in response.headers and "etag" not in response.headers
+    assert response.headers["cache-control"] == "public, max-age=300, must-revalidate"
+
+
+def test_rejections_are_json_errors(app):
+    app.add_middleware(CSRFMiddleware, secret_key="test_secret")
+    app.add_middleware(IPWhitelistMiddleware, whitelist=["10.0.0.1"])
+    client = TestClient(app)
+
+    response = client.get("/donors")
+    cookie = response.headers["set-cookie"]
+    assert cookie.startswith("csrf_token=") and "Max-Age=3600" in cookie and "SameSite=strict" in cookie
+
+    response = client.post("/forms", cookies={"csrf_token": "a"}, headers={"X-CSRF-Token": "b"})
+    assert response.status_code == 403 and response.json() == {"detail": "CSRF token mismatch"}
+    token = client.cookies["csrf_token"]
+    assert client.post("/forms", headers={"X-CSRF-Token": token}).status_code == 200
+
+    response = client.get("/api/v1/admin/stats")
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Access denied: IP address not whitelisted"}
+    assert client.get("/api/v1/admin/stats", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 200
+
+
+def test_request_logging_and_response_headers(app, monkeypatch):
+    log = MagicMock()
+    monkeypatch.setattr(asgi, "logger", log)
+    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(ResponseHeadersMiddleware, environment="production")
+    client = TestClient(app)
+
+    response = client.get("/donors")
+
+    assert response.headers["content-security-policy"] == PRODUCTION_CSP
+    assert response.headers["x-frame-options"] == "DENY"
+    assert response.headers["x-response-time"].endswith("s")
+    messages = [call.args[0] for call in log.info.call_args_list]
+    assert messages[0] == "Incoming request: GET /donors from testclient"
+    assert messages[1].startswith("Request completed: GET /donors - 200 (")
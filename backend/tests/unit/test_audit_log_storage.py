@@ -0,0 +1,224 @@
+"""
+Unit tests for the partitioned security audit log storage
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.security_audit import SecurityAuditLog
+from app.services.audit_log_storage import (
+    AuditLogWriter,
+    add_months,
+    decode_cursor,
+    drop_expired_partitions,
+    encode_cursor,
+    ensure_partitions,
+    get_audit_stats,
+    paginate,
+    partition_month,
+    partition_name,
+    split_stats_range,
+    stats_rows,
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def event(timestamp, event_type="login_success", user_id=1, severity="info", success="success"):
+    return {
+        "timestamp": timestamp, "event_type": event_type, "severity": severity, "user_id": user_id,
+        "user_email": None, "api_key_id": None, "ip_address": None, "user_agent": None,
+        "request_method": None, "request_path": None, "description": "d", "event_metadata": {},
+        "success": success,
+    }
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def make_session(partitions=()):
+    session = MagicMock()
+    listing = MagicMock()
+    listing.scalars.return_value.all.return_value = list(partitions)
+    session.execute = AsyncMock(side_effect=lambda *args, **kwargs: listing)
+    return session
+
+
+def executed_sql(session):
+    return [str(call.args[0]) for call in session.execute.await_args_list]
+
+
+class TestStatsRollups:
+    def test_events_are_aggregated_per_hour(self):
+        rows = stats_rows([
+            event(utc(2026, 3, 1, 10, 5)),
+            event(utc(2026, 3, 1, 10, 55)),
+            event(utc(2026, 3, 1, 11, 0)),
+            event(utc(2026, 3, 1, 10, 30), user_id=None, event_type="login_failure", severity="error"),
+        ])
+
+        assert [(r["user_id"], r["bucket"].hour, r["event_type"], r["event_count"]) for r in rows] == [
+            (0, 10, "login_failure", 1),
+            (1, 10, "login_success", 2),
+            (1, 11, "login_success", 1),
+        ]
+
+    def test_whole_hours_come_from_rollups(self):
+        rollup, raw = split_stats_range(utc(2026, 3, 1, 10, 0), utc(2026, 3, 1, 14, 0))
+
+        assert rollup == (utc(2026, 3, 1, 10), utc(2026, 3, 1, 14))
+        # end is inclusive: events stamped exactly at 14:00 are counted from raw logs
+        assert raw == [(utc(2026, 3, 1, 14), utc(2026, 3, 1, 14), True)]
+
+    def test_partial_edges_come_from_raw_logs(self):
+        rollup, raw = split_stats_range(utc(2026, 3, 1, 10, 30), utc(2026, 3, 1, 14, 15))
+
+        assert rollup == (utc(2026, 3, 1, 11), utc(2026, 3, 1, 14))
+        assert raw == [
+            (utc(2026, 3, 1, 10, 30), utc(2026, 3, 1, 11), False),
+            (utc(2026, 3, 1, 14), utc(2026, 3, 1, 14, 15), True),
+        ]
+
+    def test_range_within_one_hour_is_raw_only(self):
+        rollup, raw = split_stats_range(utc(2026, 3, 1, 10, 10), utc(2026, 3, 1, 10, 50))
+
+        assert rollup is None
+        assert raw == [(utc(2026, 3, 1, 10, 10), utc(2026, 3, 1, 10, 50), True)]
+
+    def test_unbounded_range_is_rollups_only(self):
+        assert split_stats_range(None, None) == ((None, None), [])
+        # Naive query parameters are UTC
+        assert split_stats_range(datetime(2026, 3, 1, 9), None) == ((utc(2026, 3, 1, 9), None), [])
+
+    @pytest.mark.asyncio
+    async def test_stats_merge_rollups_and_edges(self):
+        rollup_result = MagicMock()
+        rollup_result.all.return_value = [("login_success", "info", 5), ("login_failure", "error", 2)]
+        edge_result = MagicMock()
+        edge_result.all.return_value = [("login_success", "info", 1)]
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[rollup_result, edge_result, edge_result])
+
+        stats = await get_audit_stats(db, 7, utc(2026, 3, 1, 10, 30), utc(2026, 3, 2, 9, 15))
+
+        assert stats == {
+            "event_type_counts": {"login_success": 7, "login_failure": 2},
+            "severity_counts": {"info": 7, "error": 2},
+        }
+        queries = [compiled(call.args[0]) for call in db.execute.await_args_list]
+        assert "security_audit_stats_hourly" in queries[0]
+        assert "security_audit_stats_hourly.bucket >=" in queries[0]
+        assert all("security_audit_logs.timestamp >=" in q for q in queries[1:])
+
+
+class TestKeysetPagination:
+    def test_cursor_round_trip(self):
+        log = SimpleNamespace(timestamp=utc(2026, 3, 1, 10, 0, 0, 123456), id=42)
+
+        assert decode_cursor(encode_cursor(log)) == (utc(2026, 3, 1, 10, 0, 0, 123456), 42)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_page_after_cursor(self):
+        cursor = encode_cursor(SimpleNamespace(timestamp=utc(2026, 3, 1), id=42))
+
+        sql = compiled(paginate(select(SecurityAuditLog), cursor, 50))
+
+        assert "(security_audit_logs.timestamp, security_audit_logs.id) <" in sql
+        assert "ORDER BY security_audit_logs.timestamp DESC, security_audit_logs.id DESC" in sql
+        assert "OFFSET" not in sql
+
+
+class TestPartitions:
+    def test_partition_names(self):
+        assert partition_name(date(2026, 3, 1)) == "security_audit_logs_y2026m03"
+        assert partition_month("security_audit_logs_y2026m03") == date(2026, 3, 1)
+        assert partition_month("security_audit_logs_default") is None
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+
+    @pytest.mark.asyncio
+    async def test_missing_months_are_created(self):
+        session = make_session(["security_audit_logs_y2026m03", "security_audit_logs_default"])
+
+        created = await ensure_partitions(session, today=date(2026, 3, 17), months_ahead=2)
+
+        assert created == ["security_audit_logs_y2026m04", "security_audit_logs_y2026m05"]
+        sql = executed_sql(session)
+        assert any("DELETE FROM security_audit_logs_default" in s for s in sql)
+        assert any(
+            "ATTACH PARTITION security_audit_logs_y2026m05 FOR VALUES FROM ('2026-05-01') TO ('2026-06-01')" in s
+            for s in sql
+        )
+
+    @pytest.mark.asyncio
+    async def test_retention_drops_whole_partitions(self):
+        session = make_session([
+            "security_audit_logs_default",
+            "security_audit_logs_y2025m01",
+            "security_audit_logs_y2025m02",
+            "security_audit_logs_y2025m03",
+        ])
+
+        # Cutoff 2025-03-12: February ends on the cutoff month, March is still partly retained
+        dropped = await drop_expired_partitions(session, today=date(2026, 3, 12), retention_days=365)
+
+        assert dropped == ["security_audit_logs_y2025m01", "security_audit_logs_y2025m02"]
+        sql = executed_sql(session)
+        assert "DROP TABLE IF EXISTS security_audit_logs_y2025m02" in sql
+        assert not any("DELETE FROM security_audit_logs" in s and "stats" not in s for s in sql)
+        assert any("DELETE FROM security_audit_stats_hourly" in s for s in sql)
+
+
+def make_session_factory(fail=False):
+    sessions = []
+
+    @asynccontextmanager
+    async def factory():
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=RuntimeError("db down") if fail else None)
+        session.commit = AsyncMock()
+        sessions.append(session)
+        yield session
+
+    return factory, sessions
+
+
+class TestAuditLogWriter:
+    @pytest.mark.asyncio
+    async def test_flush_writes_batches(self):
+        factory, sessions = make_session_factory()
+        writer = AuditLogWriter(factory, batch_size=2, flush_interval=1)
+        for minute in range(5):
+            writer.enqueue(event(utc(2026, 3, 1, 10, minute)))
+
+        assert await writer.flush() == 5
+
+        assert len(sessions) == 3
+        # One INSERT for the events and one rollup upsert per batch
+        assert all(s.execute.await_count == 2 and s.commit.await_count == 1 for s in sessions)
+        assert writer.pending == 0
+        assert writer.counters["batches"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_events_in_order(self):
+        factory, _ = make_session_factory(fail=True)
+        writer = AuditLogWriter(factory, batch_size=2, flush_interval=1)
+        rows = [event(utc(2026, 3, 1, 10, minute)) for minute in range(3)]
+        for row in rows:
+            writer.enqueue(row)
+
+        assert await writer.flush() == 0
+
+        assert list(writer._buffer) == rows
+        assert writer.counters["failed_flushes"] == 1
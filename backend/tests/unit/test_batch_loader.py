@@ -0,0 +1,155 @@
+"""
+Unit tests for the request-scoped BatchLoader and the endpoints using it
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.api.v1.endpoints.posts import _post_responses
+from app.core.query_optimization import BatchLoader
+from app.models.comment import Comment
+from app.models.tag import Category
+from app.models.user import User
+from app.services.comment_service import CommentService
+
+
+NOW = datetime(2026, 3, 18, 9, 0, tzinfo=timezone.utc)
+
+
+def in_keys(statement):
+    """Keys of the IN list of a loader query"""
+    params = statement.compile().params
+    return next(value for value in params.values() if isinstance(value, list))
+
+
+def make_db(rows_by_model):
+    """Session answering loader queries from in-memory rows, recording the statements"""
+    statements = []
+
+    async def execute(statement):
+        statements.append(statement)
+        model = statement.column_descriptions[0]["entity"]
+        keys = set(in_keys(statement))
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [
+            row for row in rows_by_model.get(model, []) if row.id in keys
+        ]
+        return result
+
+    db = MagicMock()
+    db.info = {}
+    db.execute = AsyncMock(side_effect=execute)
+    return db, statements
+
+
+def user(user_id):
+    return SimpleNamespace(id=user_id, first_name=f"Prénom{user_id}", last_name="Nom", email=f"u{user_id}@example.com")
+
+
+@pytest.mark.asyncio
+async def test_load_many_uses_one_in_query_and_caches_misses():
+    db, statements = make_db({User: [user(1), user(2)]})
+    loader = BatchLoader(db, User)
+
+    found = await loader.load_many([1, 2, 2, None, 3])
+
+    assert sorted(found) == [1, 2]
+    assert len(statements) == 1 and sorted(in_keys(statements[0])) == [1, 2, 3]
+    # Hits and misses are cached for the rest of the request
+    assert await loader.load_many([2, 3]) == {2: found[2]}
+    assert await loader.load(3) is None
+    assert loader.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced():
+    db, statements = make_db({User: [user(i) for i in range(1, 6)]})
+    loader = BatchLoader(db, User)
+
+    users = await asyncio.gather(*(loader.load(i) for i in [1, 2, 3, 2, 9]))
+
+    assert [u.id if u else None for u in users] == [1, 2, 3, 2, None]
+    assert len(statements) == 1 and sorted(in_keys(statements[0])) == [1, 2, 3, 9]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_task_is_referenced_while_in_flight():
+    db, _ = make_db({User: [user(1)]})
+    loader = BatchLoader(db, User)
+    tasks_in_flight = []
+    execute = db.execute.side_effect
+
+    async def recording_execute(statement):
+        tasks_in_flight.append(set(loader._tasks))
+        return await execute(statement)
+
+    db.execute.side_effect = recording_execute
+
+    assert (await loader.load(1)).id == 1
+    assert len(tasks_in_flight[0]) == 1
+
+
+@pytest.mark.asyncio
+async def test_loaders_are_shared_per_session_and_chunked():
+    db, statements = make_db({User: [user(i) for i in range(1, 6)]})
+
+    loader = BatchLoader.for_session(db, User)
+    assert BatchLoader.for_session(db, User) is loader
+    assert BatchLoader.for_session(db, Category) is not loader
+
+    loader.prime(1, user(1))
+    loader.chunk_size = 2
+    await loader.load_many(range(1, 6))
+    # The primed key is not queried; the others go in IN lists of at most chunk_size
+    assert [len(in_keys(s)) for s in statements] == [2, 2]
+    assert sorted(key for s in statements for key in in_keys(s)) == [2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_post_page_loads_authors_and_categories_once():
+    posts = [
+        SimpleNamespace(
+            id=i, title=f"Post {i}", slug=f"post-{i}", excerpt=None, content="...", content_html=None,
+            status="published", author_id=1 + i % 3, category_id=10 + i % 2, tags=["don"],
+            meta_title=None, meta_description=None, meta_keywords=None,
+            published_at=None, created_at=NOW, updated_at=NOW,
+        )
+        for i in range(50)
+    ]
+    categories = [SimpleNamespace(id=10, name="Actualités"), SimpleNamespace(id=11, name="Campagnes")]
+    db, statements = make_db({User: [user(1), user(2), user(3)], Category: categories})
+
+    responses = await _post_responses(db, posts)
+
+    assert len(statements) == 2
+    assert responses[0].author_name == "Prénom1 Nom" and responses[0].category_name == "Actualités"
+    assert responses[1].author_name == "Prénom2 Nom" and responses[1].category_name == "Campagnes"
+
+
+@pytest.mark.asyncio
+async def test_comment_thread_is_built_without_lazy_loads():
+    comments = [
+        Comment(id=1, parent_id=None, user_id=1, created_at=NOW),
+        Comment(id=2, parent_id=1, user_id=2, created_at=NOW),
+        Comment(id=3, parent_id=2, user_id=1, created_at=NOW),
+    ]
+    users = [User(id=1, email="a@example.com"), User(id=2, email="b@example.com")]
+    thread = MagicMock()
+    thread.scalars.return_value.all.return_value = comments
+    authors = MagicMock()
+    authors.scalars.return_value.all.return_value = users
+    db = MagicMock()
+    db.info = {}
+    db.execute = AsyncMock(side_effect=[thread, authors])
+
+    top_level = await CommentService(db).get_comments_for_entity("project", 5)
+
+    assert [c.id for c in top_level] == [1]
+    assert [c.id for c in top_level[0].replies] == [2]
+    assert [c.id for c in top_level[0].replies[0].replies] == [3]
+    assert comments[2].replies == [] and comments[1].user.email == "b@example.com"
+    assert db.execute.await_count == 2
@@ -0,0 +1,113 @@
+"""
+Unit tests for the one-shot database bootstrap
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core import bootstrap
+from app.core.bootstrap import compute_schema_fingerprint, run_bootstrap
+
+
+class FakeConnection:
+    """Records SQL and answers the advisory lock / fingerprint queries"""
+
+    def __init__(self, lock_acquired=True, applied_fingerprint=None):
+        self.lock_acquired = lock_acquired
+        self.applied_fingerprint = applied_fingerprint
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        result = MagicMock()
+        if "pg_try_advisory_lock" in sql:
+            result.scalar.return_value = self.lock_acquired
+        elif "to_regclass" in sql:
+            result.scalar.return_value = "schema_bootstrap_state" if self.applied_fingerprint else None
+        elif "SELECT fingerprint" in sql:
+            result.scalar.return_value = self.applied_fingerprint
+        return result
+
+    async def commit(self):
+        pass
+
+    def ran(self, fragment):
+        return any(fragment in sql for sql in self.statements)
+
+
+def make_engine(conn):
+    engine = MagicMock()
+
+    @asynccontextmanager
+    async def connect():
+        yield conn
+
+    engine.connect = connect
+    return engine
+
+
+@pytest.fixture
+def steps():
+    first, second = AsyncMock(), AsyncMock()
+    with patch.object(bootstrap, "BOOTSTRAP_STEPS", [("first", first), ("second", second)]):
+        yield first, second
+
+
+class TestSchemaFingerprint:
+    """Test the schema fingerprint"""
+
+    def test_fingerprint_is_stable(self):
+        assert compute_schema_fingerprint() == compute_schema_fingerprint()
+
+    def test_fingerprint_changes_with_index_set(self):
+        before = compute_schema_fingerprint()
+        extra = {"name": "idx_extra", "table": "users", "columns": ["id"], "description": ""}
+        with patch("app.core.database_indexes.RECOMMENDED_INDEXES", [extra]):
+            assert compute_schema_fingerprint() != before
+
+
+class TestRunBootstrap:
+    """Test advisory locking and fingerprint short-circuiting"""
+
+    @pytest.mark.asyncio
+    async def test_skips_when_locked(self, steps):
+        conn = FakeConnection(lock_acquired=False)
+        result = await run_bootstrap(engine=make_engine(conn), wait=False)
+
+        assert result.status == "locked"
+        assert all(step.await_count == 0 for step in steps)
+        assert not conn.ran("pg_advisory_unlock")
+
+    @pytest.mark.asyncio
+    async def test_skips_when_fingerprint_matches(self, steps):
+        conn = FakeConnection(applied_fingerprint=compute_schema_fingerprint())
+        result = await run_bootstrap(engine=make_engine(conn))
+
+        assert result.status == "up_to_date"
+        assert all(step.await_count == 0 for step in steps)
+        assert conn.ran("pg_advisory_unlock")
+
+    @pytest.mark.asyncio
+    async def test_applies_and_records_fingerprint(self, steps):
+        conn = FakeConnection(applied_fingerprint="outdated")
+        result = await run_bootstrap(engine=make_engine(conn), wait=False)
+
+        assert result.status == "applied"
+        assert result.steps == ["first", "second"]
+        assert all(step.await_count == 1 for step in steps)
+        assert conn.ran("INSERT INTO schema_bootstrap_state")
+        assert conn.ran("pg_advisory_unlock")
+
+    @pytest.mark.asyncio
+    async def test_failed_step_is_not_recorded(self, steps):
+        steps[0].side_effect = RuntimeError("boom")
+        conn = FakeConnection()
+        result = await run_bootstrap(engine=make_engine(conn))
+
+        assert result.errors == ["first: boom"]
+        assert result.steps == ["second"]
+        assert not conn.ran("INSERT INTO schema_bootstrap_state")
+        assert conn.ran("pg_advisory_unlock")
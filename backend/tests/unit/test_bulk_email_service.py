@@ -0,0 +1,219 @@
+"""
+Unit tests for batched SendGrid delivery
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select
+
+from app.services import bulk_email_service
+from app.services.bulk_email_service import (
+    AdaptiveThrottle,
+    BulkEmailDeferred,
+    BulkEmailSender,
+    EmailBatchService,
+    SendResult,
+    build_payload,
+    parse_retry_after,
+    rejected_personalizations,
+)
+
+
+VARIANT = {"subject": "Votre reçu", "html_body": "<p>Merci {{first_name}}</p>", "text_body": "Merci {{first_name}}"}
+
+
+def recipient(recipient_id, substitutions=None, name=None):
+    return SimpleNamespace(
+        id=recipient_id, email=f"donor{recipient_id}@example.com", name=name, substitutions=substitutions
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeClient:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.payloads = []
+
+    def send(self, payload):
+        self.payloads.append(payload)
+        return self.results.pop(0)
+
+
+def make_sender(recipients, client, chunk_size=2, max_attempts=3):
+    """Sender over a fake session serving recipients as pending rows"""
+    pending = list(recipients)
+    updates = []
+    batch = SimpleNamespace(
+        id=7, status="pending", started_at=None, completed_at=None,
+        variants={"fr": VARIANT}, total_count=len(recipients), sent_count=0, failed_count=0,
+    )
+
+    def execute(statement):
+        if isinstance(statement, Select):
+            result = MagicMock()
+            result.all.return_value = pending[:chunk_size]
+            return result
+        compiled = statement.compile(dialect=postgresql.dialect())
+        updates.append((str(compiled), compiled.params))
+        ids = next((value for key, value in compiled.params.items() if key.startswith("id_")), None)
+        if ids is not None and not isinstance(ids, int):
+            pending[:] = [row for row in pending if row.id not in ids]
+        return MagicMock()
+
+    db = MagicMock()
+    db.get.return_value = batch
+    db.execute.side_effect = execute
+    clock = FakeClock()
+    sender = BulkEmailSender(
+        db, client, "noreply@example.org", "Fondation",
+        throttle=AdaptiveThrottle(sleep=clock.sleep, clock=clock.clock),
+        chunk_size=chunk_size, max_attempts=max_attempts,
+    )
+    return sender, batch, updates, clock
+
+
+def recipient_updates(updates, status):
+    return [params for sql, params in updates if sql.startswith("UPDATE email_batch_recipients") and params["status"] == status]
+
+
+def test_payload_has_one_personalization_per_recipient():
+    payload = build_payload(
+        7, VARIANT, [recipient(1, {"first_name": "Ana", "amount": 50}), recipient(2, name="Léo")], "noreply@example.org"
+    )
+
+    first, second = payload["personalizations"]
+    assert first["substitutions"] == {"{{amount}}": "50", "{{first_name}}": "Ana"}
+    # Variables missing for a recipient are blanked, not left as placeholders
+    assert second["substitutions"] == {"{{amount}}": "", "{{first_name}}": ""}
+    assert second["to"] == [{"email": "donor2@example.com", "name": "Léo"}]
+    assert first["custom_args"] == {"email_batch_id": "7", "email_batch_recipient_id": "1"}
+    assert [item["type"] for item in payload["content"]] == ["text/plain", "text/html"]
+    assert payload["subject"] == "Votre reçu"
+
+
+def test_rejections_and_retry_after_parsing():
+    body = json.dumps({"errors": [{"field": "personalizations.1.to.0.email", "message": "Invalid email"}]})
+
+    assert rejected_personalizations(body) == {1}
+    assert rejected_personalizations(json.dumps({"errors": [{"field": "from.email"}]})) == set()
+    assert rejected_personalizations("not json") == set()
+    assert parse_retry_after({"Retry-After": "3"}) == 3.0
+    assert parse_retry_after({"X-RateLimit-Reset": "1010"}, now=1000.0) == 10.0
+    assert parse_retry_after({}) is None
+
+
+def test_throttle_backs_off_on_429_and_recovers():
+    clock = FakeClock()
+    throttle = AdaptiveThrottle(min_interval=0.5, sleep=clock.sleep, clock=clock.clock)
+
+    throttle.wait()
+    throttle.on_throttled(retry_after=5)
+    throttle.wait()
+    assert clock.sleeps == [5]
+    assert throttle.interval == 1.0
+
+    throttle.on_success()
+    assert throttle.interval == 0.5
+
+
+def test_batch_is_sent_in_chunks_and_retries_throttled_requests():
+    client = FakeClient(
+        SendResult(429, retry_after=2.0, error="rate limited"),
+        SendResult(202, message_id="msg-1"),
+        SendResult(202, message_id="msg-2"),
+    )
+    sender, batch, updates, clock = make_sender([recipient(1), recipient(2), recipient(3)], client)
+
+    sender.send_batch(7)
+
+    assert [len(payload["personalizations"]) for payload in client.payloads] == [2, 2, 1]
+    # Retry-After, then the backed-off spacing once more before recovering
+    assert clock.sleeps == [2.0, 1.0]
+    sent = recipient_updates(updates, "sent")
+    assert [(params["id_1"], params["message_id"]) for params in sent] == [([1, 2], "msg-1"), ([3], "msg-2")]
+    assert batch.status == "completed"
+
+
+def test_recipients_blamed_by_a_rejection_fail_and_the_others_are_resent():
+    body = json.dumps({"errors": [{"field": "personalizations.0.to.0.email", "message": "Invalid email"}]})
+    client = FakeClient(SendResult(400, error=body, rejected={0}), SendResult(202, message_id="msg-1"))
+    sender, batch, updates, _ = make_sender([recipient(1), recipient(2)], client)
+
+    sender.send_batch(7)
+
+    assert [params["id_1"] for params in recipient_updates(updates, "failed")] == [[1]]
+    assert [params["id_1"] for params in recipient_updates(updates, "sent")] == [[2]]
+    assert [p["to"][0]["email"] for p in client.payloads[1]["personalizations"]] == ["donor2@example.com"]
+
+
+def test_persistent_outage_defers_the_batch():
+    client = FakeClient(*[SendResult(503, error="unavailable")] * 3)
+    sender, batch, updates, _ = make_sender([recipient(1)], client)
+
+    with pytest.raises(BulkEmailDeferred) as exc_info:
+        sender.send_batch(7)
+
+    assert exc_info.value.retry_after == 60.0
+    assert recipient_updates(updates, "sent") == [] and recipient_updates(updates, "failed") == []
+    assert batch.status == "sending"
+
+
+@pytest.mark.asyncio
+async def test_create_batch_renders_once_per_language(monkeypatch):
+    render = AsyncMock(side_effect=lambda key, variables, language: {
+        "subject": f"Reçu ({language})", "html_body": "<p>{{first_name}}</p>", "text_body": ""
+    })
+    monkeypatch.setattr(bulk_email_service.EmailTemplateService, "render_template", lambda self, *a, **kw: render(*a, **kw))
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.flush = AsyncMock(side_effect=lambda: setattr(db.add.call_args.args[0], "id", 3))
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock()
+
+    batch = await EmailBatchService(db).create_batch(
+        "receipt",
+        [
+            {"email": "a@example.com", "variables": {"first_name": "Ana"}},
+            {"email": "A@example.com "},
+            {"email": "b@example.com", "language": "fr"},
+            {"email": "c@example.com", "language": "fr"},
+        ],
+        variables={"year": 2026},
+    )
+
+    assert render.await_count == 2
+    assert sorted(batch.variants) == ["en", "fr"]
+    assert batch.total_count == 3
+    rows = db.execute.await_args.args[1]
+    assert [(row["email"], row["variant"]) for row in rows] == [
+        ("a@example.com", "en"), ("b@example.com", "fr"), ("c@example.com", "fr")
+    ]
+    assert rows[0]["substitutions"] == {"first_name": "Ana"}
+
+
+@pytest.mark.asyncio
+async def test_create_batch_requires_an_active_template(monkeypatch):
+    monkeypatch.setattr(
+        bulk_email_service.EmailTemplateService, "render_template", AsyncMock(return_value=None)
+    )
+    db = MagicMock()
+
+    with pytest.raises(LookupError):
+        await EmailBatchService(db).create_batch("missing", [{"email": "a@example.com"}])
+    db.add.assert_not_called()
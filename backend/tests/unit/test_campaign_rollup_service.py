@@ -0,0 +1,161 @@
+"""
+Unit tests for incremental campaign rollups
+"""
+
+from dataclasses import replace
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.campaign_rollup_service import CampaignRollupService, DonationState
+
+
+def compile_pg(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def make_service():
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock())
+    return CampaignRollupService(db, uuid4()), db
+
+
+def state(campaign_id=None, donor_id=None, amount="50.00", status="completed", donation_id=None):
+    return DonationState(
+        donation_id=donation_id or uuid4(),
+        donor_id=donor_id or uuid4(),
+        campaign_id=campaign_id,
+        amount=Decimal(amount),
+        payment_status=status,
+    )
+
+
+def updates(db):
+    return [call.args[0] for call in db.execute.await_args_list]
+
+
+class TestApply:
+    """Test donation state transitions"""
+
+    @pytest.mark.asyncio
+    async def test_new_completed_donation_adds(self):
+        service, db = make_service()
+        await service.apply(None, state(campaign_id=uuid4()))
+
+        (statement,) = updates(db)
+        sql = compile_pg(statement)
+        assert sql.startswith("UPDATE campaigns SET")
+        assert "donation_count=(campaigns.donation_count +" in sql
+        assert "NOT (EXISTS (SELECT" in sql
+        assert statement.compile().params["total_raised_1"] == Decimal("50.00")
+
+    @pytest.mark.asyncio
+    async def test_pending_or_unassigned_donation_is_ignored(self):
+        service, db = make_service()
+        await service.apply(None, state(campaign_id=uuid4(), status="pending"))
+        await service.apply(None, state(campaign_id=None))
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_refund_removes(self):
+        service, db = make_service()
+        before = state(campaign_id=uuid4())
+        after = replace(before, payment_status="refunded")
+        await service.apply(before, after)
+
+        (statement,) = updates(db)
+        assert statement.compile().params["total_raised_1"] == Decimal("-50.00")
+
+    @pytest.mark.asyncio
+    async def test_amount_change_only_adjusts_total(self):
+        service, db = make_service()
+        before = state(campaign_id=uuid4(), amount="50.00")
+        after = replace(before, amount=Decimal("80.00"))
+        await service.apply(before, after)
+
+        (statement,) = updates(db)
+        assert statement.compile().params["total_raised_1"] == Decimal("30.00")
+        assert "EXISTS" not in compile_pg(statement)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_donation_does_nothing(self):
+        service, db = make_service()
+        before = state(campaign_id=uuid4())
+        await service.apply(before, before)
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_campaign_move_updates_both_campaigns(self):
+        service, db = make_service()
+        before = state(campaign_id=uuid4())
+        after = replace(before, campaign_id=uuid4())
+        await service.apply(before, after)
+
+        removed, added = updates(db)
+        assert removed.compile().params["total_raised_1"] == Decimal("-50.00")
+        assert added.compile().params["total_raised_1"] == Decimal("50.00")
+
+
+class TestReconcile:
+    """Test the grouped reconciliation pass"""
+
+    @pytest.mark.asyncio
+    async def test_reconcile_returns_corrected_ids(self):
+        service, db = make_service()
+        drifted = uuid4()
+        db.execute.return_value.scalars.return_value.all.return_value = [drifted]
+
+        assert await service.reconcile() == [drifted]
+        sql = str(db.execute.await_args.args[0])
+        assert "GROUP BY campaign_id" in sql
+        assert "IS DISTINCT FROM" in sql
+        assert ":campaign_ids" not in sql
+
+    @pytest.mark.asyncio
+    async def test_reconcile_subset(self):
+        service, db = make_service()
+        db.execute.return_value.scalars.return_value.all.return_value = []
+        ids = [uuid4(), uuid4()]
+
+        await service.reconcile(campaign_ids=ids)
+        statement, params = db.execute.await_args.args
+        assert params["campaign_ids"] == ids
+        assert "IN (__[POSTCOMPILE_campaign_ids])" in compile_pg(statement)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_empty_subset_is_noop(self):
+        service, db = make_service()
+        assert await service.reconcile(campaign_ids=[]) == []
+        db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_donor_reconciles_their_campaigns(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.api.v1.endpoints import organization_donors
+
+    campaign_id = uuid4()
+    donor = SimpleNamespace(id=uuid4(), organization_id=uuid4())
+    reconcile = AsyncMock(return_value=[campaign_id])
+    monkeypatch.setattr(organization_donors.CampaignRollupService, "reconcile", reconcile)
+    found, campaigns = MagicMock(), MagicMock()
+    found.scalar_one_or_none.return_value = donor
+    campaigns.scalars.return_value.all.return_value = [campaign_id]
+    org_db = MagicMock()
+    org_db.execute = AsyncMock(side_effect=[found, campaigns])
+    org_db.delete, org_db.flush, org_db.commit = AsyncMock(), AsyncMock(), AsyncMock()
+
+    await organization_donors.delete_donor(donor.organization_id, donor.id, org_db=org_db, db=MagicMock(),
+                                           current_user=MagicMock())
+
+    sql = compile_pg(org_db.execute.await_args_list[1].args[0])
+    assert "donations.payment_status = %(payment_status_1)s" in sql
+    org_db.delete.assert_awaited_once_with(donor)
+    # Reconciled after the donations are gone, before the commit
+    reconcile.assert_awaited_once_with([campaign_id])
+    org_db.flush.assert_awaited_once()
+    org_db.commit.assert_awaited_once()
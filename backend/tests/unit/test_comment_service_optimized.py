@@ -44,8 +44,8 @@ async def test_get_comments_for_entity_optimized_query(db: AsyncSession):
             offset=0
         )
         
-        # Verify that execute was called only once (optimized query)
-        assert mock_execute.call_count == 1
+        # One query for the comments, one batched query for their authors
+        assert mock_execute.call_count == 2
         
         # Verify that result contains top-level comments
         assert len(result) == 2  # Two parent comments
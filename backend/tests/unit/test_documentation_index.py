@@ -0,0 +1,105 @@
+"""
+Unit tests for the documentation index and its cached service
+"""
+
+import os
+
+import pytest
+
+from app.services.documentation_index import DocumentationIndex, chunk_markdown, tokenize
+from app.services.documentation_service import DocumentationService
+
+
+GUIDE = """# Setup
+
+Install the dependencies.
+
+## Database
+
+Run the Alembic migrations with `alembic upgrade head`.
+
+```bash
+# not a heading
+alembic upgrade head
+```
+
+## Stripe
+
+Configure the Stripe webhook secret.
+"""
+
+
+def test_markdown_is_chunked_by_section_with_heading_trail():
+    chunks = chunk_markdown("SETUP.md", GUIDE)
+
+    assert [chunk.heading for chunk in chunks] == ["Setup", "Setup > Database", "Setup > Stripe"]
+    # Comments inside code fences are not headings
+    assert "# not a heading" in chunks[1].text
+    assert chunks[2].format() == "=== SETUP.md > Setup > Stripe ===\nConfigure the Stripe webhook secret."
+
+
+def test_long_sections_are_split_at_paragraphs():
+    content = "# Long\n\n" + "\n\n".join(f"Paragraph {i} " + "word " * 20 for i in range(10))
+
+    chunks = chunk_markdown("LONG.md", content, max_chars=300)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.text) <= 300 for chunk in chunks)
+    assert all(chunk.heading == "Long" for chunk in chunks)
+
+
+def test_search_ranks_matching_sections_first():
+    index = DocumentationIndex({
+        "SETUP.md": GUIDE,
+        "THEME.md": "# Theming\n\nCustomize the colors and fonts of the theme.",
+    })
+
+    results = index.search("how do I customize the theme colors?", top_k=2)
+
+    assert results[0][1].path == "THEME.md"
+    assert index.search("stripe webhook")[0][1].heading == "Setup > Stripe"
+    assert index.search("kubernetes") == []
+    assert tokenize("Configurer l'API à Montréal") == ["configurer", "api", "montréal"]
+
+
+def test_context_respects_character_budget():
+    index = DocumentationIndex({f"DOC{i}.md": f"# Migrations {i}\n\nmigrations " + "x" * 400 for i in range(5)})
+
+    context = index.context("migrations", top_k=5, max_chars=1000)
+
+    assert 0 < len(context) <= 1000
+    assert context.count("=== DOC") == 2
+
+
+def test_service_rebuilds_index_only_when_files_change(tmp_path):
+    guide = tmp_path / "GUIDE.md"
+    guide.write_text("# Guide\n\nDeploy on Railway.", encoding="utf-8")
+    service = DocumentationService(str(tmp_path), check_interval=0)
+
+    first = service.get_index()
+    assert service.get_index() is first
+
+    guide.write_text("# Guide\n\nDeploy on Railway or Render.", encoding="utf-8")
+    stat = guide.stat()
+    os.utime(guide, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "FAQ.md").write_text("# FAQ\n\nAsk anything.", encoding="utf-8")
+
+    second = service.get_index()
+    assert second is not first
+    assert second.files == ["GUIDE.md", os.path.join("nested", "FAQ.md")]
+    assert service.search_documentation("render")[0]["file"] == "GUIDE.md"
+    assert "Available documentation files (2)" in service.get_documentation_summary()
+
+
+@pytest.mark.asyncio
+async def test_retrieve_context_uses_cached_index(tmp_path):
+    (tmp_path / "API.md").write_text("# Donors\n\nList donors with GET /api/v1/donors.", encoding="utf-8")
+    service = DocumentationService(str(tmp_path), check_interval=3600)
+
+    context = await service.retrieve_context("how to list donors", top_k=3, max_chars=2000)
+
+    assert context.startswith("=== API.md > Donors ===")
+    (tmp_path / "API.md").unlink()
+    # Within the check interval the cached index is served without touching the files
+    assert await service.retrieve_context("donors") == context
@@ -0,0 +1,166 @@
+"""
+Unit tests for set-based bulk donor operations
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import donor_bulk_service
+from app.services.donor_bulk_service import DonorBulkService, DonorSelection
+
+
+ORG_ID = uuid4()
+
+
+def compile_pg(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def rows_result(rows=(), scalar=None):
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    result.scalars.return_value.all.return_value = list(rows)
+    result.scalar.return_value = scalar
+    result.scalar_one_or_none.return_value = scalar
+    return result
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    return db
+
+
+def executed(db):
+    return [compile_pg(call.args[0]) for call in db.execute.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_add_tag_to_id_list_reports_each_donor():
+    tag_id = uuid4()
+    new, tagged, missing = uuid4(), uuid4(), uuid4()
+    db = make_db(
+        rows_result([new, tagged]),  # donors of the organization
+        rows_result(scalar=tag_id),  # tag exists
+        rows_result([new]),  # INSERT ... RETURNING
+        rows_result(),  # donor_count
+        rows_result(),  # tag mirror
+    )
+
+    summary = await DonorBulkService(db, ORG_ID).run(
+        "add_tag", DonorSelection(donor_ids=[new, tagged, missing, new]), tag_id=tag_id, performed_by=1
+    )
+
+    assert summary["matched"] == 2
+    assert summary["applied"] == 1
+    assert summary["unchanged"] == 1
+    assert summary["not_found"] == 1
+    assert summary["results"] == [
+        {"donor_id": new, "status": "applied"},
+        {"donor_id": tagged, "status": "unchanged"},
+        {"donor_id": missing, "status": "not_found"},
+    ]
+    sql = executed(db)
+    assert "donors.id = ANY (%(param_1)s::UUID[])" in sql[0]
+    assert sql[2].startswith("INSERT INTO donor_tag_assignments (id, donor_id, tag_id, assigned_by) SELECT")
+    assert "ON CONFLICT ON CONSTRAINT uq_donor_tag DO NOTHING RETURNING" in sql[2]
+    # Relative counter update, no read-modify-write
+    assert "donor_count=greatest(donor_tags.donor_count + %(donor_count_1)s::INTEGER" in sql[3]
+    assert sql[4].startswith("UPDATE donors SET tags=")
+
+
+@pytest.mark.asyncio
+async def test_remove_from_segment_by_filter():
+    segment_id = uuid4()
+    db = make_db(
+        rows_result(scalar=250),  # matched count
+        rows_result(scalar=segment_id),
+        rows_result([uuid4(), uuid4()]),  # DELETE ... RETURNING
+        rows_result(),  # donor_count
+    )
+
+    summary = await DonorBulkService(db, ORG_ID).run(
+        "remove_from_segment", DonorSelection(is_active=False), segment_id=segment_id
+    )
+
+    assert summary == {
+        "action": "remove_from_segment", "matched": 250, "applied": 2,
+        "unchanged": 248, "not_found": 0, "results": None,
+    }
+    sql = executed(db)
+    assert sql[2].startswith("DELETE FROM donor_segment_assignments")
+    assert "donors.is_active = false" in sql[2]
+    assert sql[3].startswith("UPDATE donor_segments SET donor_count=greatest(donor_segments.donor_count + ")
+    assert db.execute.await_args_list[3].args[0].compile().params["donor_count_1"] == -2
+
+
+@pytest.mark.asyncio
+async def test_deactivate_skips_inactive_donors():
+    donor_id = uuid4()
+    db = make_db(rows_result([donor_id]), rows_result([]))
+
+    summary = await DonorBulkService(db, ORG_ID).run("deactivate", DonorSelection(donor_ids=[donor_id]))
+
+    assert summary["results"] == [{"donor_id": donor_id, "status": "unchanged"}]
+    assert "donors.is_active != false" in executed(db)[1]
+
+
+@pytest.mark.asyncio
+async def test_delete_keeps_counters_consistent(monkeypatch):
+    campaign_id, donor_id = uuid4(), uuid4()
+    reconcile = AsyncMock(return_value=[campaign_id])
+    monkeypatch.setattr(donor_bulk_service.CampaignRollupService, "reconcile", reconcile)
+    db = make_db(
+        rows_result([donor_id]),
+        rows_result(),  # tag counters
+        rows_result(),  # segment counters
+        rows_result([campaign_id]),  # campaigns with completed donations
+        rows_result([donor_id]),  # DELETE ... RETURNING
+    )
+
+    summary = await DonorBulkService(db, ORG_ID).run("delete", DonorSelection(donor_ids=[donor_id]))
+
+    assert summary["applied"] == 1
+    sql = executed(db)
+    assert sql[1].startswith("UPDATE donor_tags SET donor_count=greatest(donor_tags.donor_count - anon_1.removed")
+    assert sql[2].startswith("UPDATE donor_segments")
+    assert sql[4].startswith("DELETE FROM donors")
+    reconcile.assert_awaited_once_with([campaign_id])
+
+
+@pytest.mark.asyncio
+async def test_unknown_tag():
+    db = make_db(rows_result([uuid4()]), rows_result(scalar=None))
+
+    with pytest.raises(LookupError):
+        await DonorBulkService(db, ORG_ID).run("add_tag", DonorSelection(donor_ids=[uuid4()]), tag_id=uuid4())
+
+
+@pytest.mark.asyncio
+async def test_empty_filter_is_rejected():
+    db = make_db()
+
+    with pytest.raises(ValueError):
+        await DonorBulkService(db, ORG_ID).run("delete", DonorSelection(search="  "))
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_blank_tags_filter_is_rejected():
+    db = make_db()
+
+    with pytest.raises(ValueError):
+        await DonorBulkService(db, ORG_ID).run("delete", DonorSelection(tags=[" ", "x" * 101]))
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_without_tokens_selects_no_donor():
+    db = make_db(rows_result(scalar=2))  # search columns available
+
+    conditions = await DonorBulkService(db, uuid4()).conditions(DonorSelection(search="!!"))
+
+    assert [compile_pg(condition) for condition in conditions][1:] == ["false"]
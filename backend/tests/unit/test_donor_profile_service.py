@@ -0,0 +1,138 @@
+"""
+Unit tests for the donor 360 profile
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.donor_profile_service import (
+    PROFILE_SECTIONS,
+    DonorProfileService,
+    parse_sections,
+)
+
+
+ORG_ID = uuid4()
+
+
+def compile_pg(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def rows_result(rows=(), one=None):
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    result.scalars.return_value.all.return_value = list(rows)
+    result.one_or_none.return_value = one
+    return result
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    return db
+
+
+def make_summary(**overrides):
+    donor = SimpleNamespace(
+        id=uuid4(),
+        total_donated=Decimal("150.00"),
+        donation_count=3,
+        first_donation_date=None,
+        last_donation_date=None,
+    )
+    values = dict(
+        Donor=donor,
+        total_donations=4,
+        average_donation=Decimal("50.00"),
+        largest_donation=Decimal("100.00"),
+        last_donation_amount=Decimal("20.00"),
+        this_year_total=Decimal("120.00"),
+        this_year_count=2,
+        this_month_total=Decimal("0"),
+        this_month_count=0,
+        total_activities=7,
+        total_notes=1,
+        total_communications=45,
+        total_recurring=1,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class TestParseSections:
+    def test_all_sections_by_default(self):
+        assert parse_sections(None) == PROFILE_SECTIONS
+
+    def test_repeated_and_comma_separated(self):
+        assert parse_sections(["history,stats", "tags"]) == ("stats", "history", "tags")
+
+    def test_unknown_section(self):
+        with pytest.raises(ValueError):
+            parse_sections(["stats", "secrets"])
+
+
+def test_summary_is_one_grouped_query():
+    now = datetime(2026, 3, 17, tzinfo=timezone.utc)
+    sql = compile_pg(DonorProfileService(MagicMock(), ORG_ID).summary_query(uuid4(), now))
+
+    assert "LEFT OUTER JOIN donations ON donations.donor_id = donors.id" in sql
+    assert "GROUP BY donors.id" in sql
+    assert "avg(donations.amount) FILTER (WHERE donations.payment_status" in sql
+    assert "donors.organization_id =" in sql
+    # Section totals are correlated counts, not separate round trips
+    assert "FROM donor_activities" in sql and "WHERE donor_activities.donor_id = donors.id" in sql
+
+
+def test_stats_come_from_the_summary_row():
+    stats = DonorProfileService.stats(make_summary())
+
+    assert stats["total_donated"] == Decimal("150.00")
+    assert stats["average_donation"] == Decimal("50.00")
+    assert stats["last_donation_amount"] == Decimal("20.00")
+    assert stats["this_year_count"] == 2
+
+
+def test_stats_without_completed_donations():
+    stats = DonorProfileService.stats(make_summary(average_donation=None, largest_donation=None))
+
+    assert stats["average_donation"] == Decimal("0.00")
+    assert stats["largest_donation"] is None
+
+
+@pytest.mark.asyncio
+async def test_unknown_donor():
+    db = make_db(rows_result(one=None))
+
+    assert await DonorProfileService(db, ORG_ID).profile(uuid4()) is None
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_only_requested_sections_are_loaded():
+    summary = make_summary()
+    db = make_db(
+        rows_result(one=summary),
+        rows_result(["donation"]),
+        rows_result(["activity"]),
+        rows_result(["communication"]),
+    )
+
+    profile = await DonorProfileService(db, ORG_ID).profile(
+        summary.Donor.id, ("history", "communications"), history_page=2, page_size=10
+    )
+
+    assert db.execute.await_count == 4
+    assert profile["stats"] is None and profile["notes"] is None and profile["tags"] is None
+    assert profile["history"]["total_donations"] == 4
+    assert profile["history"]["page"] == 2
+    assert profile["communications"]["total"] == 45
+    assert profile["communications"]["total_pages"] == 5
+    donations_sql = compile_pg(db.execute.await_args_list[1].args[0])
+    assert "LIMIT" in donations_sql and "OFFSET" in donations_sql
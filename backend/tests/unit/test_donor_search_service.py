@@ -0,0 +1,133 @@
+"""
+Unit tests for indexed donor search
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.donor_search_service import (
+    ESTIMATE_COUNT_THRESHOLD,
+    DonorSearchService,
+    build_prefix_tsquery,
+    normalize_search_term,
+)
+
+
+def compile_pg(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def scalar_result(value):
+    result = MagicMock()
+    result.scalar.return_value = value
+    return result
+
+
+@pytest.fixture(autouse=True)
+def clear_capabilities():
+    DonorSearchService.clear_capability_cache()
+    yield
+    DonorSearchService.clear_capability_cache()
+
+
+class TestSearchTerms:
+    """Test search term normalization"""
+
+    def test_normalize_strips_accents_and_whitespace(self):
+        assert normalize_search_term("  Hélène   TREMBLAY ") == "helene tremblay"
+
+    def test_prefix_tsquery(self):
+        assert build_prefix_tsquery("Jean Trem") == "jean:* & trem:*"
+
+    def test_prefix_tsquery_drops_operators(self):
+        assert build_prefix_tsquery("jean & !(x | y):*") == "jean:* & x:* & y:*"
+
+    def test_prefix_tsquery_empty(self):
+        assert build_prefix_tsquery(" &|! ") is None
+
+
+class TestFilters:
+    """Test the generated search conditions"""
+
+    def test_indexed_filter_uses_vector_and_trigram(self):
+        sql = compile_pg(DonorSearchService.indexed_filter("trem"))
+        assert "donors.search_vector @@ to_tsquery" in sql
+        assert "donors.search_text LIKE donor_search_unaccent" in sql
+
+    def test_short_term_skips_trigram(self):
+        sql = compile_pg(DonorSearchService.indexed_filter("tr"))
+        assert "@@" in sql
+        assert "search_text" not in sql
+
+    def test_term_without_tokens_matches_nothing(self):
+        assert compile_pg(DonorSearchService.indexed_filter("!!")) == "false"
+
+    def test_fallback_filter_uses_ilike(self):
+        sql = compile_pg(DonorSearchService.fallback_filter("trem"))
+        assert "ILIKE" in sql
+
+
+class TestCapabilityCache:
+    """Test the per-organization capability cache"""
+
+    @pytest.mark.asyncio
+    async def test_capability_checked_once(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=scalar_result(2))
+        org_id = uuid4()
+
+        assert await DonorSearchService(db, org_id).supports_indexed_search()
+        assert await DonorSearchService(db, org_id).supports_indexed_search()
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unmigrated_database_falls_back(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=scalar_result(0))
+        condition, rank = await DonorSearchService(db, uuid4()).search_filter("trem")
+
+        assert rank is None
+        assert "ILIKE" in compile_pg(condition)
+
+    @pytest.mark.asyncio
+    async def test_search_without_tokens_is_not_dropped(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=scalar_result(2))
+        condition, rank = await DonorSearchService(db, uuid4()).search_filter("!!")
+
+        assert compile_pg(condition) == "false"
+        assert rank is None
+
+
+class TestCount:
+    """Test exact and estimated counts"""
+
+    @pytest.mark.asyncio
+    async def test_estimated_small_result_is_exact(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=scalar_result(42))
+        total, is_estimate = await DonorSearchService(db, uuid4()).count([], mode="estimated")
+
+        assert (total, is_estimate) == (42, False)
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_estimated_large_result_uses_planner(self):
+        plan = [{"Plan": {"Plan Rows": 250000}}]
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[scalar_result(ESTIMATE_COUNT_THRESHOLD + 1), scalar_result(plan)])
+        total, is_estimate = await DonorSearchService(db, uuid4()).count([], mode="estimated")
+
+        assert (total, is_estimate) == (250000, True)
+        assert "EXPLAIN (FORMAT JSON)" in compile_pg(db.execute.await_args_list[1].args[0])
+
+    @pytest.mark.asyncio
+    async def test_planner_failure_keeps_lower_bound(self):
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[scalar_result(ESTIMATE_COUNT_THRESHOLD + 1), RuntimeError("boom")])
+        total, is_estimate = await DonorSearchService(db, uuid4()).count([], mode="estimated")
+
+        assert (total, is_estimate) == (ESTIMATE_COUNT_THRESHOLD + 1, True)
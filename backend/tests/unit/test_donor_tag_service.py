@@ -0,0 +1,146 @@
+"""
+Unit tests for donor tag assignments and tag filters
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.donor_tag_service import DonorTagService, normalize_tag_names
+
+
+def compile_pg(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def rows_result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    result.scalars.return_value.all.return_value = rows
+    return result
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    return db
+
+
+class TestNormalizeTagNames:
+    """Test tag name normalization"""
+
+    def test_strips_and_deduplicates(self):
+        assert normalize_tag_names([" vip ", "vip", "", "mensuel", None]) == ["vip", "mensuel"]
+
+    def test_drops_oversized_names(self):
+        assert normalize_tag_names(["x" * 101, "ok"]) == ["ok"]
+
+
+class TestTagFilter:
+    """Test AND/OR tag filters"""
+
+    @pytest.mark.asyncio
+    async def test_all_groups_by_donor(self):
+        db = make_db(rows_result([("vip", uuid4()), ("mensuel", uuid4())]))
+        condition = await DonorTagService(db, uuid4()).tag_filter(["vip", "mensuel"], match="all")
+
+        sql = compile_pg(condition)
+        assert "donors.id IN (SELECT donor_tag_assignments.donor_id" in sql
+        assert "GROUP BY donor_tag_assignments.donor_id" in sql
+        assert "HAVING count(*) =" in sql
+
+    @pytest.mark.asyncio
+    async def test_any_is_a_plain_semi_join(self):
+        db = make_db(rows_result([("vip", uuid4())]))
+        condition = await DonorTagService(db, uuid4()).tag_filter(["vip", "inconnu"], match="any")
+
+        sql = compile_pg(condition)
+        assert "donor_tag_assignments.tag_id IN" in sql
+        assert "GROUP BY" not in sql
+
+    @pytest.mark.asyncio
+    async def test_unknown_tag_with_all_matches_nothing(self):
+        db = make_db(rows_result([("vip", uuid4())]))
+        condition = await DonorTagService(db, uuid4()).tag_filter(["vip", "inconnu"], match="all")
+
+        assert compile_pg(condition) == "false"
+
+    @pytest.mark.asyncio
+    async def test_no_tags_means_no_filter(self):
+        db = make_db()
+        assert await DonorTagService(db, uuid4()).tag_filter([" "]) is None
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_invalid_match_mode(self):
+        with pytest.raises(ValueError):
+            await DonorTagService(make_db(), uuid4()).tag_filter(["vip"], match="some")
+
+
+class TestSetDonorTags:
+    """Test replacing a donor's tags"""
+
+    @pytest.mark.asyncio
+    async def test_diffs_assignments_and_updates_mirror(self):
+        kept, dropped, added = uuid4(), uuid4(), uuid4()
+        db = make_db(
+            MagicMock(),  # INSERT ... ON CONFLICT DO NOTHING into donor_tags
+            rows_result([("vip", kept), ("nouveau", added)]),
+            rows_result([kept, dropped]),  # current assignments
+            rows_result([dropped]), MagicMock(),  # delete + count update
+            rows_result([added]), MagicMock(),  # insert + count update
+        )
+        donor = SimpleNamespace(id=uuid4(), tags=["vip", "ancien"])
+
+        names = await DonorTagService(db, uuid4()).set_donor_tags(donor, ["vip", "nouveau"])
+
+        assert names == ["vip", "nouveau"]
+        assert donor.tags == ["vip", "nouveau"]
+        statements = [compile_pg(call.args[0]) for call in db.execute.await_args_list]
+        assert statements[3].startswith("DELETE FROM donor_tag_assignments")
+        assert statements[5].startswith("INSERT INTO donor_tag_assignments")
+        assert "ON CONFLICT ON CONSTRAINT uq_donor_tag DO NOTHING" in statements[5]
+        assert statements[5].endswith("RETURNING donor_tag_assignments.tag_id")
+        assert statements[6].startswith("UPDATE donor_tags SET donor_count=greatest(donor_tags.donor_count +")
+
+    @pytest.mark.asyncio
+    async def test_counts_skip_assignments_already_made(self):
+        tag = uuid4()
+        db = make_db(
+            MagicMock(),  # INSERT ... ON CONFLICT DO NOTHING into donor_tags
+            rows_result([("vip", tag)]),
+            rows_result([]),  # current assignments
+            rows_result([]),  # insert skipped: a concurrent request assigned the tag
+        )
+        donor = SimpleNamespace(id=uuid4(), tags=[])
+
+        await DonorTagService(db, uuid4()).set_donor_tags(donor, ["vip"])
+
+        # No donor_count update for the conflicting row
+        assert db.execute.await_count == 4
+        assert donor.tags == ["vip"]
+
+
+class TestRefreshMirrors:
+    """Test the set-based donors.tags refresh"""
+
+    @pytest.mark.asyncio
+    async def test_one_update_for_many_donors(self):
+        db = make_db(rows_result([]))
+
+        await DonorTagService(db, uuid4()).refresh_mirrors([uuid4(), uuid4()])
+
+        sql = compile_pg(db.execute.await_args.args[0])
+        assert sql.startswith("UPDATE donors SET tags=(SELECT coalesce(json_agg(donor_tags.name ORDER BY")
+        assert "WHERE donors.id = ANY (" in sql
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_refresh(self):
+        db = make_db()
+
+        await DonorTagService(db, uuid4()).refresh_mirrors([])
+
+        db.execute.assert_not_awaited()
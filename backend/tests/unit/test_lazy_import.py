@@ -0,0 +1,53 @@
+"""
+Unit tests for lazy imports and the import-time profiler
+"""
+
+import sys
+
+from app.core.import_profiler import parse_importtime
+from app.core.lazy_import import is_available, lazy_module
+
+
+class TestLazyImport:
+    """Test deferred module loading"""
+
+    def test_is_available_does_not_import(self):
+        sys.modules.pop("colorsys", None)
+        assert is_available("colorsys")
+        assert "colorsys" not in sys.modules
+        assert not is_available("definitely_not_a_module_xyz")
+        assert not is_available("definitely_not_a_module_xyz.sub")
+
+    def test_lazy_module_loads_on_first_attribute(self):
+        sys.modules.pop("colorsys", None)
+        colorsys = lazy_module("colorsys")
+        assert not colorsys.is_loaded
+        assert "colorsys" not in sys.modules
+
+        assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert colorsys.is_loaded
+        assert "colorsys" in sys.modules
+
+
+class TestParseImporttime:
+    """Test parsing of python -X importtime output"""
+
+    OUTPUT = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   encodings.utf_8",
+        "import time:        50 |         50 |     app.core.config",
+        "import time:       300 |        350 |   app.core",
+        "import time:       800 |       1270 | app.main",
+        "some unrelated stderr line",
+    ])
+
+    def test_parse(self):
+        profile = parse_importtime(self.OUTPUT, "app.main")
+
+        assert profile.modules == ["encodings.utf_8", "app.core.config", "app.core", "app.main"]
+        assert profile.total_ms == 1.27
+        assert profile.records[1].depth == 2
+        assert profile.imported("app.core")
+        assert not profile.imported("pandas")
+        assert list(profile.by_package()) == ["app", "encodings"]
+        assert profile.slowest(1)[0].module == "app.main"
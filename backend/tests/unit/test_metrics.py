@@ -0,0 +1,161 @@
+"""
+Unit tests for the metrics registry, middleware, collectors and /metrics endpoint
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import metrics as metrics_api
+from app.core import metrics
+from app.core.cache import CacheBackend
+from app.core.metrics import MetricsMiddleware, MetricsRegistry
+
+
+class FakeRedis:
+    def __init__(self, store=None):
+        self.store = dict(store or {})
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key.encode() if isinstance(key, str) else key] = value.encode() if isinstance(value, str) else value
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    async def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*").encode()
+        for key in list(self.store):
+            if key.startswith(prefix):
+                yield key
+
+    async def llen(self, key):
+        return 4
+
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("jobs_total", "Jobs processed", ("kind",))
+    latency = registry.histogram("job_seconds", "Job latency", buckets=(0.1, 1.0))
+
+    requests.inc(("email",))
+    requests.inc(("email",), 2)
+    requests.inc(('say "hi"\n',))
+    for value in (0.05, 0.5, 3.0):
+        latency.observe((), value)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs processed",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="email"} 3',
+        'jobs_total{kind="say \\"hi\\"\\n"} 1',
+        "# HELP job_seconds Job latency",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{le="0.1"} 1',
+        'job_seconds_bucket{le="1"} 2',
+        'job_seconds_bucket{le="+Inf"} 3',
+        "job_seconds_sum 3.55",
+        "job_seconds_count 3",
+    ]
+
+
+def test_worker_snapshots_are_merged():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests")
+    connections = registry.gauge("connections", "Connections")
+    depth = registry.gauge("queue_depth", "Queue depth", aggregate="max")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(1.0,))
+
+    requests.inc()
+    connections.set((), 2)
+    depth.set((), 7)
+    latency.observe((), 0.5)
+    other_worker = json.loads(json.dumps(registry.snapshot()))
+    depth.set((), 9)
+
+    lines = registry.render([other_worker, registry.snapshot()]).splitlines()
+
+    assert "requests_total 2" in lines
+    assert "connections 4" in lines
+    assert "queue_depth 9" in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines and "latency_seconds_count 2" in lines
+
+
+def test_middleware_labels_requests_by_route_template():
+    metrics.HTTP_REQUEST_DURATION.clear()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/donors/{donor_id}")
+    async def donor(donor_id: int):
+        return {"id": donor_id}
+
+    client = TestClient(app)
+    for donor_id in (1, 2, 3):
+        assert client.get(f"/donors/{donor_id}").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    samples = {tuple(labels): value for labels, value in metrics.HTTP_REQUEST_DURATION.snapshot()}
+    assert samples[("GET", "/donors/{donor_id}", "2xx")][2] == 3
+    assert samples[("GET", "unmatched", "4xx")][2] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_lookups_are_counted():
+    metrics.CACHE_REQUESTS.clear()
+    backend = CacheBackend()
+    backend.use_redis = True
+    backend.use_msgpack = False
+    backend.redis_client = FakeRedis({"present": b'{"a": 1}'})
+
+    assert await backend.get("present") == {"a": 1}
+    assert await backend.get("absent") is None
+
+    assert dict((tuple(labels), value) for labels, value in metrics.CACHE_REQUESTS.snapshot()) == {
+        ("hit",): 1.0,
+        ("miss",): 1.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_collectors_read_pools_websockets_and_queues(monkeypatch):
+    from app.api.v1.endpoints.websocket import manager
+    from app.core.cache import cache_backend
+
+    monkeypatch.setattr(manager, "active_connections", {"1": [object(), object()], "anonymous": [object()]})
+    monkeypatch.setattr(cache_backend, "redis_client", FakeRedis())
+
+    await metrics.collect_db_pools()
+    await metrics.collect_websockets()
+    await metrics.collect_celery_queues()
+
+    pools = {tuple(labels): value for labels, value in metrics.DB_POOL_SIZE.snapshot()}
+    assert ("main",) in pools
+    assert metrics.WEBSOCKET_CONNECTIONS.snapshot() == [[[], 3.0]]
+    assert metrics.CELERY_QUEUE_DEPTH.snapshot() == [[["celery"], 4.0]]
+
+
+def test_metrics_endpoint_merges_workers_and_checks_token(monkeypatch):
+    from app.core.cache import cache_backend
+
+    metrics.RATE_LIMIT_REJECTIONS.clear()
+    metrics.RATE_LIMIT_REJECTIONS.inc(("/api/v1/auth/login",))
+    other = {"rate_limit_rejections_total": [[["/api/v1/auth/login"], 2.0]]}
+    redis = FakeRedis({b"metrics:worker:web-2:41": json.dumps(other).encode()})
+    monkeypatch.setattr(cache_backend, "redis_client", redis)
+    monkeypatch.setattr(metrics.registry, "collectors", [])
+    monkeypatch.setattr(metrics_api.settings, "METRICS_TOKEN", "s3cret")
+    app = FastAPI()
+    app.include_router(metrics_api.router)
+    client = TestClient(app)
+
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'rate_limit_rejections_total{route="/api/v1/auth/login"} 3' in response.text.splitlines()
@@ -0,0 +1,188 @@
+"""
+Unit tests for precomputed dashboard metrics snapshots
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.tenancy import TenancyConfig, TenancyMode
+from app.core.tenancy_metrics import TenancyMetrics
+from app.models import AVAILABLE_MODULES
+from app.services.metrics_snapshot_service import (
+    SCOPE_PLATFORM,
+    SCOPE_TENANT,
+    STATS_KEY,
+    TENANCY_KEY,
+    MetricsSnapshotService,
+    is_stale,
+)
+
+
+NOW = datetime(2026, 3, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def rows_result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    result.scalars.return_value.all.return_value = rows
+    result.scalar.return_value = rows[0] if rows else None
+    return result
+
+
+@pytest.fixture
+def tenancy_enabled(monkeypatch):
+    monkeypatch.setattr(TenancyConfig, "is_enabled", classmethod(lambda cls: True))
+    monkeypatch.setattr(TenancyConfig, "get_mode", classmethod(lambda cls: TenancyMode.SHARED_DB))
+
+
+def make_service(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.commit = AsyncMock()
+    service = MetricsSnapshotService(db)
+    service.store = AsyncMock()
+    return service, db
+
+
+def test_is_stale(monkeypatch):
+    from app.services import metrics_snapshot_service
+    monkeypatch.setattr(metrics_snapshot_service.settings, "METRICS_SNAPSHOT_MAX_AGE_SECONDS", 900)
+
+    assert is_stale(None)
+    assert is_stale(SimpleNamespace(computed_at=None))
+    assert not is_stale(SimpleNamespace(computed_at=NOW - timedelta(minutes=10)), now=NOW)
+    assert is_stale(SimpleNamespace(computed_at=NOW - timedelta(minutes=20)), now=NOW)
+
+
+@pytest.mark.asyncio
+async def test_tenant_statistics_are_grouped_queries(tenancy_enabled):
+    resource_models = TenancyMetrics.tenant_resource_models()
+    results = [rows_result([(1, 3), (2, 1)])]
+    results += [rows_result([(2, 5)]) for _ in resource_models]
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=results)
+
+    statistics = await TenancyMetrics.collect_tenant_statistics(db, [1, 2, 3])
+
+    # One query for members and one per resource table, whatever the tenant count
+    assert db.execute.await_count == 1 + len(resource_models)
+    assert statistics[1]["users"] == 3
+    assert statistics[3] == {"tenant_id": 3, "users": 0, "resources": {name: 0 for name, _ in resource_models}}
+    assert all(count == 5 for count in statistics[2]["resources"].values())
+    assert all("GROUP BY" in compiled(call.args[0]) for call in db.execute.await_args_list)
+
+
+def test_changed_tenants_query_unions_sources():
+    sql = compiled(MetricsSnapshotService(MagicMock()).changed_tenants_query(NOW))
+
+    assert "UNION ALL" in sql
+    assert "teams.updated_at >" in sql
+    assert "team_members.updated_at >" in sql
+    assert "max(changes.changed_at)" in sql
+    assert "GROUP BY changes.team_id" in sql
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_only_recomputes_changed_tenants(tenancy_enabled, monkeypatch):
+    watermark = NOW - timedelta(minutes=5)
+    latest = NOW - timedelta(minutes=1)
+    collect = AsyncMock(return_value={4: {"tenant_id": 4, "users": 2, "resources": {}}})
+    monkeypatch.setattr(TenancyMetrics, "collect_tenant_statistics", collect)
+    service, db = make_service(
+        rows_result([(4, latest), (9, latest)]),  # changed tenants
+        rows_result([4]),  # still active
+        rows_result([]),  # delete the deactivated tenant 9
+    )
+    service.get = AsyncMock(return_value=SimpleNamespace(source_updated_at=watermark, computed_at=NOW))
+
+    summary = await service.refresh_tenants()
+
+    assert summary == {"tenants": 1, "full": False}
+    collect.assert_awaited_once_with(db, [4])
+    assert "metrics_snapshots.scope_key IN" in compiled(db.execute.await_args_list[2].args[0])
+    tenant_rows = service.store.await_args_list[0].args
+    assert tenant_rows[0] == SCOPE_TENANT
+    assert [row["scope_key"] for row in tenant_rows[1]] == ["4"]
+    scope, platform_rows = service.store.await_args_list[1].args
+    assert scope == SCOPE_PLATFORM
+    assert platform_rows[0]["scope_key"] == TENANCY_KEY
+    assert platform_rows[0]["source_updated_at"] == latest
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_is_full(tenancy_enabled, monkeypatch):
+    collect = AsyncMock(return_value={1: {}, 2: {}})
+    monkeypatch.setattr(TenancyMetrics, "collect_tenant_statistics", collect)
+    service, db = make_service(rows_result([1, 2]), rows_result([]))
+    service.get = AsyncMock(return_value=None)
+
+    summary = await service.refresh_tenants()
+
+    assert summary == {"tenants": 2, "full": True}
+    collect.assert_awaited_once_with(db, [1, 2])
+    # Snapshots of teams that are gone are dropped
+    assert "metrics_snapshots.scope_key NOT IN" in compiled(db.execute.await_args_list[1].args[0])
+
+
+@pytest.mark.asyncio
+async def test_module_usage_is_one_grouped_query():
+    service, db = make_service(rows_result([4]), rows_result([(AVAILABLE_MODULES[0], 3)]))
+
+    usage = await service.compute_module_usage()
+
+    assert db.execute.await_count == 2
+    assert [item["module_key"] for item in usage] == list(AVAILABLE_MODULES)
+    assert usage[0]["enabled_count"] == 3
+    assert usage[0]["usage_percentage"] == 75.0
+    assert all(item["enabled_count"] == 0 for item in usage[1:])
+
+
+@pytest.mark.asyncio
+async def test_fresh_platform_snapshot_is_served_as_is():
+    service, db = make_service()
+    service.get = AsyncMock(return_value=SimpleNamespace(data={"users": {"total": 3}}, computed_at=datetime.now(timezone.utc)))
+    service.refresh_platform = AsyncMock()
+
+    assert await service.platform_view(STATS_KEY) == {"users": {"total": 3}}
+
+    service.refresh_platform.assert_not_awaited()
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_platform_snapshot_is_served_refreshed(monkeypatch):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.models import MetricsSnapshot
+    from app.services import metrics_snapshot_service
+
+    # SQLite drops time zones: keep every timestamp naive
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    monkeypatch.setattr(metrics_snapshot_service, "_now", lambda: now)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(MetricsSnapshot.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        db.add(MetricsSnapshot(scope=SCOPE_PLATFORM, scope_key=STATS_KEY, data={"users": {"total": 1}},
+                               computed_at=now - timedelta(days=1)))
+        await db.commit()
+
+    async with session_factory() as db:
+        service = MetricsSnapshotService(db)
+        service.compute_platform_stats = AsyncMock(return_value={"users": {"total": 2}})
+        service.compute_module_usage = AsyncMock(return_value=[])
+
+        assert await service.platform_view(STATS_KEY) == {"users": {"total": 2}}
+        assert (await service.get(SCOPE_PLATFORM, STATS_KEY)).computed_at == now
+
+    await engine.dispose()
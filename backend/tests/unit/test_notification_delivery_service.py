@@ -0,0 +1,126 @@
+"""
+Unit tests for batched notification delivery
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.notification_delivery_service import NotificationDeliveryService, unique_user_ids
+
+
+CREATED = datetime(2026, 3, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def rows_result(rows):
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    return result
+
+
+def make_db(recipients, stored):
+    db = MagicMock()
+    db.execute.side_effect = [rows_result(recipients), rows_result(stored)]
+    return db
+
+
+def stored_row(notification_id, user_id, coalesced=False, unread_count=1):
+    return SimpleNamespace(
+        notification_id=notification_id,
+        user_id=user_id,
+        created_at=CREATED,
+        occurrence_count=2 if coalesced else 1,
+        coalesced=coalesced,
+        unread_count=unread_count,
+    )
+
+
+def make_email_service(configured=True, fail_for=()):
+    service = MagicMock()
+    service.is_configured.return_value = configured
+
+    def send_email(to_email, **kwargs):
+        if to_email in fail_for:
+            raise RuntimeError("SendGrid error")
+        return {"status": "sent"}
+
+    service.send_email.side_effect = send_email
+    return service
+
+
+def test_unique_user_ids_keep_order():
+    assert unique_user_ids(["3", 1, 3, "2"]) == [3, 1, 2]
+
+
+def test_batch_is_one_transaction_with_one_insert_select():
+    published = []
+    db = make_db(
+        recipients=[(1, "a@example.com"), (2, "b@example.com")],
+        stored=[stored_row(10, 1, unread_count=3), stored_row(11, 2)],
+    )
+    email_service = make_email_service(fail_for=("b@example.com",))
+
+    summary = NotificationDeliveryService(
+        db, email_service=email_service, publish=lambda messages: published.extend(messages) or len(published)
+    ).deliver([1, 2, 99, 1], "Reçu disponible", "Votre reçu <2026>", notification_type="SUCCESS")
+
+    assert summary["notifications"] == [
+        {"user_id": 1, "notification_id": 10, "coalesced": False},
+        {"user_id": 2, "notification_id": 11, "coalesced": False},
+    ]
+    assert summary["skipped_user_ids"] == [99]
+    assert summary["type"] == "success"
+    # Notification + unread count per user
+    assert summary["realtime_published"] == 4
+    # A failed email doesn't fail the batch
+    assert summary["emails_sent"] == 1
+    assert db.execute.call_count == 2
+    db.commit.assert_called_once()
+
+    insert_sql = str(db.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+    assert "INSERT INTO notifications" in insert_sql and "VALUES" not in insert_sql
+    assert "INSERT INTO notification_counters" in insert_sql
+
+    user_id, message = published[0]
+    assert user_id == 1
+    assert message["type"] == "notification"
+    assert message["data"]["id"] == 10
+    assert message["data"]["created_at"] == CREATED.isoformat()
+    assert published[1] == (1, {"type": "notification_count", "data": {"unread_count": 3}})
+    html = email_service.send_email.call_args_list[0].kwargs["html_content"]
+    assert "&lt;2026&gt;" in html
+
+
+def test_coalesced_notifications_are_not_emailed_again():
+    db = make_db(
+        recipients=[(1, "a@example.com"), (2, "b@example.com")],
+        stored=[stored_row(10, 1, coalesced=True), stored_row(11, 2)],
+    )
+    email_service = make_email_service()
+
+    summary = NotificationDeliveryService(db, email_service=email_service, publish=lambda messages: 0).deliver(
+        [1, 2], "Nouveau don", "m", group_key="donation:42", coalesce_window_seconds=600
+    )
+
+    assert [item["coalesced"] for item in summary["notifications"]] == [True, False]
+    assert summary["emails_sent"] == 1
+    assert email_service.send_email.call_args.kwargs["to_email"] == "b@example.com"
+    sql = str(db.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+    assert "coalesced AS" in sql and "UNION ALL" in sql
+
+
+def test_email_override_and_unconfigured_email():
+    db = make_db(
+        recipients=[(1, "a@example.com")],
+        stored=[stored_row(10, 1)],
+    )
+    email_service = make_email_service(configured=False)
+
+    summary = NotificationDeliveryService(db, email_service=email_service, publish=lambda messages: 0).deliver(
+        [1], "t", "m", user_emails={1: "override@example.com"}
+    )
+
+    assert summary["emails_sent"] == 0
+    email_service.send_email.assert_not_called()
@@ -0,0 +1,140 @@
+"""
+Unit tests for notification fan-out, coalescing and unread counters
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import notification_fanout_service, notification_service
+from app.services.notification_fanout_service import (
+    NotificationFanoutService,
+    NotificationPayload,
+    audience_query,
+    coalesce_since,
+    fanout_statement,
+)
+from app.services.notification_service import NotificationService
+
+
+NOW = datetime(2026, 3, 18, 9, 0, tzinfo=timezone.utc)
+
+
+def compile_pg(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def rows_result(rows):
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    result.first.return_value = rows[0] if rows else None
+    result.scalar.return_value = rows[0] if rows else None
+    result.scalar_one.return_value = rows[0] if rows else None
+    return result
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.commit = AsyncMock()
+    return db
+
+
+def test_fanout_is_one_insert_select_with_counter_upsert():
+    sql = compile_pg(fanout_statement(audience_query(team_id=3), NotificationPayload("Campagne", "Objectif atteint")))
+
+    assert sql.count("INSERT INTO notifications") == 1
+    assert "VALUES" not in sql
+    assert "JOIN team_members ON team_members.user_id = users.id" in sql
+    assert "SELECT DISTINCT" in sql
+    assert "INSERT INTO notification_counters (user_id, unread_count) SELECT inserted.user_id" in sql
+    assert "ON CONFLICT (user_id) DO UPDATE SET unread_count = (notification_counters.unread_count +" in sql
+    assert "UPDATE notifications" not in sql
+
+
+def test_grouped_fanout_updates_unread_notification_in_window():
+    payload = NotificationPayload("Nouveau don", "3 nouveaux dons", group_key="donations:7")
+    statement = fanout_statement(audience_query(user_ids=[1, 2]), payload, since=NOW)
+    sql = compile_pg(statement)
+    params = statement.compile(dialect=postgresql.dialect()).params
+
+    assert "coalesced AS \n(UPDATE notifications SET" in sql
+    assert "occurrence_count=(notifications.occurrence_count +" in sql
+    assert "notifications.read = false" in sql
+    assert "audience.user_id NOT IN (SELECT coalesced.user_id" in sql
+    assert "UNION ALL" in sql
+    assert NOW in params.values() and "donations:7" in params.values()
+
+
+def test_coalescing_needs_group_and_window(monkeypatch):
+    monkeypatch.setattr(notification_fanout_service.settings, "NOTIFICATION_COALESCE_WINDOW_SECONDS", 300)
+
+    assert coalesce_since(NotificationPayload("t", "m"), now=NOW) is None
+    assert coalesce_since(NotificationPayload("t", "m", group_key="g"), window_seconds=0, now=NOW) is None
+    assert coalesce_since(NotificationPayload("t", "m", group_key="g"), now=NOW) == datetime(
+        2026, 3, 18, 8, 55, tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.asyncio
+async def test_fan_out_commits_then_pushes_notification_and_count(monkeypatch):
+    published = []
+
+    async def publish(messages):
+        published.extend(messages)
+        return len(published)
+
+    monkeypatch.setattr(notification_fanout_service, "publish_user_messages_async", publish)
+    rows = [
+        SimpleNamespace(notification_id=10, user_id=1, created_at=NOW, occurrence_count=1, coalesced=False, unread_count=4),
+        SimpleNamespace(notification_id=7, user_id=2, created_at=NOW, occurrence_count=3, coalesced=True, unread_count=1),
+    ]
+    db = make_db(rows_result(rows))
+
+    summary = await NotificationFanoutService(db).fan_out(
+        audience_query(), NotificationPayload("t", "m", group_key="g"), coalesce_window_seconds=60
+    )
+
+    assert summary == {"notifications": 1, "coalesced": 1, "realtime_published": 4}
+    db.commit.assert_awaited_once()
+    assert published[1] == (1, {"type": "notification_count", "data": {"unread_count": 4}})
+    assert published[2][1]["data"]["occurrence_count"] == 3 and published[2][1]["data"]["coalesced"] is True
+
+
+@pytest.mark.asyncio
+async def test_unread_count_reads_counter_row():
+    db = make_db(rows_result([]))
+
+    assert await NotificationService(db).get_unread_count(5) == 0
+    assert "FROM notification_counters" in compile_pg(db.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_mark_all_as_read_decrements_counter_and_pushes(monkeypatch):
+    pushed = AsyncMock()
+    monkeypatch.setattr(notification_service, "publish_user_message", pushed)
+    db = make_db(rows_result([(1,), (2,), (3,)]), rows_result([2]))
+
+    assert await NotificationService(db).mark_all_as_read(5) == 3
+
+    counter_statement = db.execute.await_args_list[1].args[0]
+    sql = compile_pg(counter_statement)
+    assert "greatest(notification_counters.unread_count +" in sql
+    assert -3 in counter_statement.compile(dialect=postgresql.dialect()).params.values()
+    db.commit.assert_awaited_once()
+    pushed.assert_awaited_once_with(5, {"type": "notification_count", "data": {"unread_count": 2}})
+
+
+@pytest.mark.asyncio
+async def test_deleting_read_notification_keeps_counter(monkeypatch):
+    pushed = AsyncMock()
+    monkeypatch.setattr(notification_service, "publish_user_message", pushed)
+    db = make_db(rows_result([SimpleNamespace(read=True)]))
+
+    assert await NotificationService(db).delete_notification(9, 5) is True
+
+    assert db.execute.await_count == 1
+    pushed.assert_not_awaited()
@@ -0,0 +1,130 @@
+"""
+Unit tests for the organization database health prober
+"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.organization_health_prober import (
+    OrganizationHealthProber,
+    STATUS_HEALTHY,
+    STATUS_TIMEOUT,
+    STATUS_UNHEALTHY,
+    percentile,
+)
+
+
+def make_org(slug: str):
+    return SimpleNamespace(id=uuid.uuid4(), slug=slug, db_connection_string=f"postgresql://u:p@h:5432/{slug}")
+
+
+@pytest.fixture(autouse=True)
+def reset_prober():
+    OrganizationHealthProber.reset()
+    yield
+    OrganizationHealthProber.reset()
+
+
+class TestPercentile:
+    """Test nearest-rank percentiles"""
+
+    def test_percentiles(self):
+        samples = list(range(1, 101))
+        assert percentile(samples, 50) == 50
+        assert percentile(samples, 95) == 95
+        assert percentile(samples, 99) == 99
+        assert percentile([7.0], 99) == 7.0
+        assert percentile([], 50) is None
+
+
+class TestOrganizationHealthProber:
+    """Test concurrent probing and snapshot caching"""
+
+    @pytest.mark.asyncio
+    async def test_probe_all_is_bounded(self):
+        """Probes run concurrently up to the configured concurrency"""
+        orgs = [make_org(f"org{i}") for i in range(8)]
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_ping(organization_id, db_connection_string):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        with patch.object(OrganizationHealthProber, "_ping", side_effect=fake_ping):
+            snapshot = await OrganizationHealthProber.probe_all(orgs, concurrency=3, timeout=1)
+
+        assert max_in_flight == 3
+        assert [t.slug for t in snapshot.tenants] == [o.slug for o in orgs]
+        assert all(t.status == STATUS_HEALTHY for t in snapshot.tenants)
+        assert snapshot.summary()["healthy"] == 8
+
+    @pytest.mark.asyncio
+    async def test_timeouts_and_errors_are_reported(self):
+        """A slow or failing tenant does not fail the round"""
+        slow, down, ok = make_org("slow"), make_org("down"), make_org("ok")
+
+        async def fake_ping(organization_id, db_connection_string):
+            if organization_id == slow.id:
+                await asyncio.sleep(1)
+            if organization_id == down.id:
+                raise ConnectionError("connection refused")
+
+        with patch.object(OrganizationHealthProber, "_ping", side_effect=fake_ping):
+            snapshot = await OrganizationHealthProber.probe_all([slow, down, ok], concurrency=3, timeout=0.05)
+
+        by_slug = {t.slug: t for t in snapshot.tenants}
+        assert by_slug["slow"].status == STATUS_TIMEOUT
+        assert by_slug["down"].status == STATUS_UNHEALTHY
+        assert "refused" in by_slug["down"].error
+        assert by_slug["ok"].healthy
+        assert snapshot.summary()["status"] == "degraded"
+
+    @pytest.mark.asyncio
+    async def test_latency_window_accumulates(self):
+        """Each round adds a latency sample to the tenant's window"""
+        org = make_org("a")
+        with patch.object(OrganizationHealthProber, "_ping", new=AsyncMock()):
+            for _ in range(3):
+                snapshot = await OrganizationHealthProber.probe_all([org], timeout=1)
+
+        tenant = snapshot.tenants[0]
+        assert tenant.samples == 3
+        assert tenant.p50_ms is not None and tenant.p99_ms >= tenant.p50_ms
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_served_while_refreshing(self):
+        """A stale snapshot is returned immediately and refreshed in the background"""
+        org = make_org("a")
+        with patch.object(OrganizationHealthProber, "_ping", new=AsyncMock()):
+            first = await OrganizationHealthProber.probe_all([org], timeout=1)
+
+        refreshed = asyncio.Event()
+
+        async def fake_refresh(db=None):
+            refreshed.set()
+
+        with patch.object(OrganizationHealthProber, "refresh", side_effect=fake_refresh) as refresh:
+            fresh = await OrganizationHealthProber.get_snapshot(max_age=60)
+            assert fresh is first
+            refresh.assert_not_called()
+
+            stale = await OrganizationHealthProber.get_snapshot(max_age=0)
+            assert stale is first
+            await asyncio.wait_for(refreshed.wait(), timeout=1)
+            assert refresh.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_snapshot_without_waiting(self):
+        """With no snapshot yet, callers can opt out of waiting for the first round"""
+        with patch.object(OrganizationHealthProber, "refresh", new=AsyncMock()) as refresh:
+            assert await OrganizationHealthProber.get_snapshot(wait_if_missing=False) is None
+            await asyncio.sleep(0)
+            refresh.assert_called_once()
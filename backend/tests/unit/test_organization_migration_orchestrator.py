@@ -0,0 +1,130 @@
+"""
+Unit tests for the organization migration orchestrator
+"""
+
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.organization_migration_orchestrator import (
+    OrganizationMigrationOrchestrator,
+    TenantRevision,
+    UNREACHABLE,
+)
+
+
+def make_org(slug: str):
+    return SimpleNamespace(id=uuid.uuid4(), slug=slug, db_connection_string=f"postgresql://u:p@h:5432/{slug}")
+
+
+class TestOrganizationMigrationOrchestrator:
+    """Test revision discovery and planning"""
+
+    @pytest.fixture
+    def orchestrator(self):
+        return OrganizationMigrationOrchestrator(MagicMock(), target_revision="rev_2", probe_concurrency=2)
+
+    def test_partition_skips_up_to_date_tenants(self, orchestrator):
+        """Tenants already at the target revision are not upgraded"""
+        revisions = [
+            TenantRevision(uuid.uuid4(), "a", "", "rev_2"),
+            TenantRevision(uuid.uuid4(), "b", "", "rev_1"),
+            TenantRevision(uuid.uuid4(), "c", "", None),
+            TenantRevision(uuid.uuid4(), "d", "", UNREACHABLE, error="timeout"),
+        ]
+
+        needs_upgrade, up_to_date = orchestrator.partition(revisions)
+
+        assert [r.slug for r in up_to_date] == ["a"]
+        assert [r.slug for r in needs_upgrade] == ["b", "c", "d"]
+        assert not needs_upgrade[2].reachable
+
+    @pytest.mark.asyncio
+    async def test_read_revisions_is_bounded_and_ordered(self, orchestrator):
+        """Probes run concurrently up to probe_concurrency and keep input order"""
+        orgs = [make_org(f"org{i}") for i in range(6)]
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_read(org):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "rev_2" if org.slug.endswith(("0", "2")) else "rev_1"
+
+        with patch.object(OrganizationMigrationOrchestrator, "read_revision", side_effect=fake_read):
+            revisions = await orchestrator.read_revisions(orgs)
+
+        assert [r.slug for r in revisions] == [o.slug for o in orgs]
+        assert max_in_flight == 2
+        needs_upgrade, up_to_date = orchestrator.partition(revisions)
+        assert len(up_to_date) == 2
+        assert len(needs_upgrade) == 4
+
+    @pytest.mark.asyncio
+    async def test_read_revisions_marks_unreachable(self, orchestrator):
+        """A failing probe is reported as unreachable instead of aborting the run"""
+        orgs = [make_org("ok"), make_org("down")]
+
+        async def fake_read(org):
+            if org.slug == "down":
+                raise ConnectionError("refused")
+            return "rev_2"
+
+        with patch.object(OrganizationMigrationOrchestrator, "read_revision", side_effect=fake_read):
+            revisions = await orchestrator.read_revisions(orgs)
+
+        assert revisions[0].current_revision == "rev_2"
+        assert revisions[1].current_revision == UNREACHABLE
+        assert "refused" in revisions[1].error
+
+    @pytest.mark.asyncio
+    async def test_upgrade_tenant_records_failure(self, orchestrator):
+        """Upgrade failures are persisted with their duration"""
+        tenant = TenantRevision(uuid.uuid4(), "a", "postgresql://u:p@h:5432/a", "rev_1")
+        orchestrator._upsert_status = AsyncMock()
+
+        with patch(
+            "app.core.organization_migration_orchestrator.OrganizationDatabaseManager.run_migrations_for_organization_sync",
+            side_effect=ValueError("boom"),
+        ):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                ok = await orchestrator._upgrade_tenant(uuid.uuid4(), tenant, executor)
+
+        assert ok is False
+        final = orchestrator._upsert_status.call_args_list[-1].kwargs
+        assert final["status"] == "failed"
+        assert final["error"] == "boom"
+        assert final["duration_ms"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_execute_runs_upgrades_in_worker_processes(self, orchestrator):
+        """Alembic state is process-global: each upgrade gets a spawned worker process"""
+        tenants = [TenantRevision(uuid.uuid4(), slug, f"postgresql://u:p@h:5432/{slug}", "rev_1") for slug in "ab"]
+        orchestrator._load_organizations = AsyncMock(return_value=[])
+        orchestrator._completed_organizations = AsyncMock(return_value=set())
+        orchestrator.read_revisions = AsyncMock(return_value=tenants)
+        orchestrator._upsert_status = AsyncMock()
+        orchestrator._finish_run = AsyncMock()
+        pools = []
+
+        def fake_pool(**kwargs):
+            pools.append(kwargs)
+            return ThreadPoolExecutor(max_workers=kwargs["max_workers"])
+
+        with patch("app.core.organization_migration_orchestrator.ProcessPoolExecutor", side_effect=fake_pool), patch(
+            "app.core.organization_migration_orchestrator.OrganizationDatabaseManager.run_migrations_for_organization_sync"
+        ) as upgrade:
+            await orchestrator.execute(
+                SimpleNamespace(id=uuid.uuid4(), status="completed", succeeded_count=2, failed_count=0, skipped_count=0)
+            )
+
+        assert len(pools) == 1
+        assert pools[0]["mp_context"].get_start_method() == "spawn"
+        assert sorted(call.args[0] for call in upgrade.call_args_list) == [t.db_connection_string for t in tenants]
@@ -0,0 +1,142 @@
+"""
+Unit tests for single-pass project analytics
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import project_analytics_service
+from app.services.project_analytics_service import (
+    ProjectAnalyticsService,
+    growth_percentage,
+    month_starts,
+)
+
+
+NOW = datetime(2026, 3, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def month_row(year, month, created, active=0, previous_period=0, cumulative=0):
+    return SimpleNamespace(
+        month=datetime(year, month, 1, tzinfo=timezone.utc),
+        created=created,
+        active=active,
+        previous_period=previous_period,
+        cumulative=cumulative,
+    )
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    backend = MagicMock()
+    backend.get = AsyncMock(return_value=None)
+    backend.set = AsyncMock(return_value=True)
+    monkeypatch.setattr(project_analytics_service, "cache_backend", backend)
+    return backend
+
+
+def make_db(result):
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+def test_growth_percentage():
+    assert growth_percentage(15, 10) == 50.0
+    assert growth_percentage(3, 0) == 100.0
+    assert growth_percentage(0, 0) == 0.0
+
+
+def test_month_starts_cross_year():
+    assert month_starts(date(2026, 2, 10), 4) == [
+        date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1),
+    ]
+
+
+def test_monthly_query_is_one_grouped_pass():
+    sql = compiled(ProjectAnalyticsService(MagicMock(), 7).monthly_query(NOW, NOW))
+
+    assert sql.count("SELECT") == 1
+    assert "date_trunc" in sql
+    assert "FILTER (WHERE projects.status" in sql
+    assert "sum(count(*)) OVER (ORDER BY date_trunc" in sql
+    assert "GROUP BY date_trunc" in sql
+
+
+def test_period_query_counts_both_periods_with_filters():
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    sql = compiled(ProjectAnalyticsService(MagicMock(), 7).period_query(start, NOW, datetime(2026, 2, 13, tzinfo=timezone.utc)))
+
+    assert sql.count("SELECT") == 1
+    assert sql.count("FILTER (WHERE") == 3
+
+
+@pytest.mark.asyncio
+async def test_insights_series_from_one_query(cache):
+    result = MagicMock()
+    result.all.return_value = [
+        month_row(2025, 6, 4, active=1, cumulative=4),  # before the charted window
+        month_row(2025, 11, 2, active=2, cumulative=6),
+        month_row(2026, 2, 3, active=3, previous_period=2, cumulative=9),
+        month_row(2026, 3, 1, active=1, cumulative=10),
+    ]
+    db = make_db(result)
+
+    data = await ProjectAnalyticsService(db, 7).insights(now=NOW)
+
+    assert db.execute.await_count == 1
+    assert data["total"] == 10
+    assert data["active"] == 7
+    assert data["previous_period"] == 2
+    assert [p["label"] for p in data["trend"]] == ["Oct", "Nov", "Dec", "Jan", "Feb", "Mar"]
+    assert [p["value"] for p in data["trend"]] == [0.0, 2.0, 0.0, 0.0, 3.0, 1.0]
+    assert [p["value"] for p in data["cumulative"]] == [4.0, 6.0, 6.0, 6.0, 9.0, 10.0]
+    cache.set.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cached_insights_skip_the_database(cache):
+    cache.get.return_value = {"total": 1}
+    db = make_db(MagicMock())
+
+    assert await ProjectAnalyticsService(db, 7).insights(now=NOW) == {"total": 1}
+
+    db.execute.assert_not_awaited()
+    key = cache.get.await_args.args[0]
+    assert key.startswith("analytics:user:7:tenant:")
+
+
+@pytest.mark.asyncio
+async def test_moving_period_is_cached_per_bucket(cache):
+    row = MagicMock(total=3, active=1, previous=2)
+    db = make_db(MagicMock(one=MagicMock(return_value=row)))
+    service = ProjectAnalyticsService(db, 7)
+
+    for end in (NOW + timedelta(minutes=1), NOW + timedelta(minutes=4, seconds=59), NOW + timedelta(minutes=5)):
+        await service.period_metrics(end - timedelta(days=30), end)
+
+    keys = [call.args[0] for call in cache.get.await_args_list]
+    assert keys[0] == keys[1] != keys[2]
+    assert keys[0].endswith(":metrics:2026-02-15T12:00:00+00:00:2026-03-17T12:00:00+00:00")
+    # The query uses the rounded bounds the entry is cached under
+    assert db.execute.await_args_list[0].args[0].compile().params["created_at_1"] == datetime(
+        2026, 2, 15, 12, 0, tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_per_user(monkeypatch):
+    invalidate = AsyncMock(return_value=2)
+    monkeypatch.setattr(project_analytics_service, "invalidate_cache_pattern_async", invalidate)
+
+    await project_analytics_service.invalidate_project_analytics(7)
+
+    invalidate.assert_awaited_once_with("analytics:user:7:*")
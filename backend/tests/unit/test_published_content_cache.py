@@ -0,0 +1,187 @@
+"""
+Unit tests for the published content cache and the endpoints serving from it
+"""
+
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import menus as menus_api
+from app.api.v1.endpoints import pages as pages_api
+from app.core.cache_headers import CacheHeadersMiddleware
+from app.services import published_content_cache as pcc
+from app.services.published_content_cache import (
+    MENUS,
+    PAGE,
+    SEO,
+    THEME,
+    content_response,
+    make_content,
+    published_content,
+)
+
+
+UPDATED = datetime(2026, 5, 4, 12, 30, tzinfo=timezone.utc)
+
+
+class MemoryBackend:
+    def __init__(self):
+        self.store = {}
+        self.expires = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, expire=300, compress=True):
+        self.store[key] = value
+        self.expires[key] = expire
+        return True
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+        return True
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    memory = MemoryBackend()
+    monkeypatch.setattr(published_content, "backend", memory)
+    monkeypatch.setattr(pcc.TenancyConfig, "is_enabled", classmethod(lambda cls: False))
+    return memory
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def page_row(slug="a-propos", status="published"):
+    return SimpleNamespace(
+        id=1, title="À propos", slug=slug, content="Notre mission", content_html=None, sections=None,
+        status=status, meta_title=None, meta_description=None, meta_keywords=None, user_id=3,
+        created_at="2026-05-01T10:00:00", updated_at=UPDATED, published_at=None,
+    )
+
+
+def db_returning(*rows):
+    results = []
+    for row in rows:
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = row
+        result.scalars.return_value.all.return_value = row if isinstance(row, list) else [row]
+        results.append(result)
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=results)
+    return db
+
+
+def test_conditional_requests_get_not_modified():
+    content = make_content({"settings": {"title": "Cause"}}, UPDATED)
+
+    response = content_response(make_request(), content, SEO)
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"settings": {"title": "Cause"}}
+    assert response.headers["ETag"] == content.etag
+    assert response.headers["Last-Modified"] == "Mon, 04 May 2026 12:30:00 GMT"
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert content_response(make_request(), content, THEME).headers["Cache-Control"] == "no-cache"
+
+    for if_none_match in [content.etag, f'"other", W/{content.etag}', "*"]:
+        not_modified = content_response(make_request(if_none_match), content, SEO)
+        assert not_modified.status_code == 304 and not_modified.body == b""
+    assert content_response(make_request('"stale"'), content, SEO).status_code == 200
+    # The same payload always gets the same ETag
+    assert make_content({"settings": {"title": "Cause"}}).etag == content.etag
+
+
+@pytest.mark.asyncio
+async def test_published_page_is_served_from_cache_until_invalidated(backend, monkeypatch):
+    monkeypatch.setattr(pcc.settings, "PUBLISHED_CACHE_TTL_SECONDS", 600)
+    db = db_returning(page_row(), page_row(status="draft"))
+
+    first = await pages_api.get_page(make_request(), "a-propos", current_user=None, db=db)
+    second = await pages_api.get_page(make_request(), "a-propos", current_user=None, db=db)
+
+    assert db.execute.await_count == 1
+    assert second.body == first.body and json.loads(first.body)["title"] == "À propos"
+    assert backend.expires == {"published:global:page:a-propos": 600}
+
+    await published_content.invalidate(PAGE, "a-propos", "nouveau-slug", None)
+    # Drafts are answered but never cached
+    draft = await pages_api.get_page(make_request(), "a-propos", current_user=None, db=db)
+    assert json.loads(draft.body)["status"] == "draft"
+    assert db.execute.await_count == 2 and backend.store == {}
+
+
+@pytest.mark.asyncio
+async def test_missing_page_is_not_cached(backend):
+    db = db_returning(None)
+
+    with pytest.raises(Exception) as error:
+        await pages_api.get_page(make_request(), "inconnue", current_user=None, db=db)
+
+    assert error.value.status_code == 404
+    assert backend.store == {}
+
+
+@pytest.mark.asyncio
+async def test_menus_are_cached_per_location_and_invalidated_together(backend):
+    menu = SimpleNamespace(
+        id=7, name="Principal", location="header", items=[{"id": "1", "label": "Dons", "url": "/dons"}],
+        user_id=3, created_at="2026-05-01T10:00:00", updated_at="2026-05-02T10:00:00",
+    )
+    db = db_returning([menu], [menu], [])
+
+    await menus_api.list_menus(make_request(), location="header", current_user=None, db=db)
+    await menus_api.list_menus(make_request(), location=None, current_user=None, db=db)
+    await menus_api.list_menus(make_request(), location="header", current_user=None, db=db)
+    unknown = await menus_api.list_menus(make_request(), location="popup", current_user=None, db=db)
+
+    assert db.execute.await_count == 3
+    assert json.loads(unknown.body) == []
+    assert sorted(backend.store) == ["published:global:menus:all", "published:global:menus:header"]
+
+    await published_content.invalidate_menus()
+    assert backend.store == {}
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_by_tenant_except_global_content(backend, monkeypatch):
+    monkeypatch.setattr(pcc.TenancyConfig, "is_enabled", classmethod(lambda cls: True))
+    monkeypatch.setattr(pcc, "get_current_tenant", lambda: 42)
+
+    await published_content.put(PAGE, "accueil", {"title": "Accueil"})
+    await published_content.put(THEME, "active", {"name": "TemplateTheme"})
+    await published_content.put(MENUS, "all", [], tenant_id=7)
+
+    assert sorted(backend.store) == [
+        "published:global:theme:active",
+        "published:t42:page:accueil",
+        "published:t7:menus:all",
+    ]
+
+
+def test_middleware_keeps_headers_of_validated_responses():
+    app = FastAPI()
+    app.add_middleware(CacheHeadersMiddleware, default_max_age=300)
+    content = make_content({"name": "TemplateTheme"})
+
+    @app.get("/themes/active")
+    async def active(request: Request):
+        return content_response(request, content, THEME)
+
+    @app.get("/plain")
+    async def plain():
+        return {"ok": True}
+
+    client = TestClient(app)
+    response = client.get("/themes/active")
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["etag"] == content.etag
+    assert client.get("/themes/active", headers={"If-None-Match": content.etag}).status_code == 304
+    assert client.get("/plain").headers["cache-control"] == "public, max-age=300, must-revalidate"
@@ -0,0 +1,124 @@
+"""
+Unit tests for per-request SQL instrumentation (engine events, middleware, budgets)
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import query_instrumentation as qi
+from app.core.query_instrumentation import (
+    QueryBudgetExceeded,
+    QueryInstrumentationMiddleware,
+    assert_max_queries,
+    instrument_engine,
+    query_budget,
+    statement_shape,
+    track_queries,
+)
+from app.core.query_optimization_advanced import QueryOptimizer
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE donors (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO donors (id, name) VALUES (1, 'Léa'), (2, 'Marc'), (3, 'Inès')"))
+    return engine
+
+
+def fetch_one_by_one(engine, ids):
+    with engine.connect() as conn:
+        return [conn.execute(text("SELECT name FROM donors WHERE id = :id"), {"id": i}).scalar() for i in ids]
+
+
+def test_statement_shapes_erase_parameters_and_literals():
+    assert statement_shape("SELECT * FROM users WHERE id = $1::INTEGER") == "SELECT * FROM users WHERE id = ?"
+    assert statement_shape("SELECT *\n  FROM users WHERE email = 'a@b.c' LIMIT 10") == (
+        "SELECT * FROM users WHERE email = ? LIMIT ?"
+    )
+    assert statement_shape("SELECT users_1.id FROM users AS users_1 WHERE users_1.id IN ($1, $2, $3)") == (
+        "SELECT users_1.id FROM users AS users_1 WHERE users_1.id IN (?)"
+    )
+    assert statement_shape("SELECT id FROM t WHERE id IN (%(id_1)s, %(id_2)s)") == "SELECT id FROM t WHERE id IN (?)"
+
+
+def test_tracked_block_counts_statements_by_shape(engine):
+    with track_queries() as stats:
+        assert fetch_one_by_one(engine, [1, 2, 3]) == ["Léa", "Marc", "Inès"]
+
+    assert stats.count == 3 and stats.duration > 0
+    assert stats.repeated(3) == [("SELECT name FROM donors WHERE id = ?", 3)]
+    assert stats.server_timing().startswith("db;dur=") and stats.server_timing().endswith('desc="3 queries"')
+    # Nothing is collected outside a tracked block
+    fetch_one_by_one(engine, [1])
+    assert stats.count == 3 and qi.current_query_stats() is None
+
+
+def test_assert_max_queries(engine):
+    with assert_max_queries(3):
+        fetch_one_by_one(engine, [1, 2, 3])
+
+    with pytest.raises(QueryBudgetExceeded) as error:
+        with assert_max_queries(2):
+            fetch_one_by_one(engine, [1, 2, 3])
+    assert "3 queries executed, budget is 2" in str(error.value)
+
+
+def test_middleware_reports_timing_n_plus_one_and_budget(engine, monkeypatch):
+    log = MagicMock()
+    monkeypatch.setattr(qi, "logger", log)
+    monkeypatch.setattr(qi.settings, "QUERY_N_PLUS_ONE_THRESHOLD", 3)
+    monkeypatch.setattr(qi.settings, "QUERY_SERVER_TIMING_ENABLED", True)
+    app = FastAPI()
+    app.add_middleware(QueryInstrumentationMiddleware)
+
+    @app.get("/donors")
+    @query_budget(2)
+    def donors():
+        return fetch_one_by_one(engine, [1, 2, 3])
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    client = TestClient(app)
+
+    monkeypatch.setattr(qi.settings, "QUERY_BUDGET_STRICT", False)
+    response = client.get("/donors")
+    assert response.json() == ["Léa", "Marc", "Inès"]
+    assert response.headers["server-timing"].endswith('desc="3 queries"')
+    messages = [call.args[0] for call in log.warning.call_args_list]
+    assert messages[0] == "N+1 query pattern on GET /donors: 3 executions of the same statement"
+    assert messages[1].startswith("Query budget exceeded on GET /donors: 3 queries executed, budget is 2")
+
+    assert "server-timing" not in client.get("/health").headers
+
+    monkeypatch.setattr(qi.settings, "QUERY_BUDGET_STRICT", True)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/donors")
+
+
+def test_detect_n_plus_one_groups_statements_by_shape():
+    queries = [f"SELECT * FROM users WHERE id = {i}" for i in range(6)] + ["SELECT * FROM teams WHERE id = 1"]
+
+    patterns = QueryOptimizer.detect_n_plus_one(queries)
+
+    assert patterns == [{
+        "query": "SELECT * FROM users WHERE id = ?",
+        "occurrences": 6,
+        "suggestion": "Consider using JOIN or eager loading",
+    }]
+
+
+def test_instrument_engine_ignores_objects_that_are_not_engines():
+    # Mocked engines (organization engine cache tests) are left alone instead of raising
+    instrument_engine(MagicMock())
+    instrument_engine(object())
@@ -0,0 +1,47 @@
+"""
+Unit tests for the cross-process realtime channel
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import realtime_channel
+from app.services.realtime_channel import CHANNEL, RealtimeSubscriber, decode, encode, publish_user_messages
+
+
+def test_payload_round_trip():
+    raw = encode(7, {"type": "notification", "data": {"id": 1}})
+
+    assert decode(raw.encode()) == ("7", {"type": "notification", "data": {"id": 1}})
+    assert decode(b"not json") is None
+    assert decode('{"message": {}}') is None
+
+
+def test_publish_without_redis(monkeypatch):
+    monkeypatch.setattr(realtime_channel, "_get_sync_client", lambda: None)
+
+    assert publish_user_messages([(1, {"type": "notification"})]) == 0
+
+
+def test_publish_uses_one_pipeline(monkeypatch):
+    client = MagicMock()
+    monkeypatch.setattr(realtime_channel, "_get_sync_client", lambda: client)
+
+    assert publish_user_messages([(1, {"a": 1}), (2, {"b": 2})]) == 2
+
+    pipeline = client.pipeline.return_value
+    assert [call.args[0] for call in pipeline.publish.call_args_list] == [CHANNEL, CHANNEL]
+    pipeline.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_subscriber_forwards_to_local_connections():
+    deliver = AsyncMock()
+    subscriber = RealtimeSubscriber(MagicMock(), deliver)
+
+    assert await subscriber.handle(encode(7, {"type": "notification"}).encode())
+    assert not await subscriber.handle(b"garbage")
+
+    deliver.assert_awaited_once_with({"type": "notification"}, "7")
+    assert subscriber.counters == {"delivered": 1, "malformed": 1, "failed": 0}
@@ -0,0 +1,223 @@
+"""
+Unit tests for the recurring donation processor
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.recurring_donation_processor import (
+    ChargeResult,
+    RecurringChargeGateway,
+    RecurringDonationProcessor,
+    payment_date_after,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeGateway(RecurringChargeGateway):
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.keys = []
+
+    async def charge(self, schedule, payment_method, idempotency_key):
+        self.keys.append(idempotency_key)
+        if schedule.id in self.failing:
+            return ChargeResult(success=False, failure_reason="card_declined")
+        return ChargeResult(success=True, reference=f"pi_{schedule.id.hex[:8]}")
+
+
+def schedule(frequency="monthly", failures=0, next_payment_date=NOW - timedelta(hours=1)):
+    return SimpleNamespace(
+        id=uuid4(), donor_id=uuid4(), organization_id=uuid4(), payment_method_id=uuid4(),
+        amount=Decimal("25.00"), currency="CAD", frequency=frequency,
+        start_date=next_payment_date - timedelta(days=59), next_payment_date=next_payment_date, last_payment_date=None,
+        total_payments=2, total_amount=Decimal("50.00"),
+        consecutive_failures=failures,
+    )
+
+
+def make_session_factory(batches):
+    """Each session returns the next batch of (schedule, payment_method) rows"""
+    sessions = []
+    remaining = list(batches)
+
+    @asynccontextmanager
+    async def factory():
+        session = MagicMock()
+        rows = remaining.pop(0) if remaining else []
+        select_result = MagicMock()
+        select_result.all.return_value = rows
+        session.execute = AsyncMock(side_effect=[select_result] + [MagicMock()] * 3)
+        session.commit = AsyncMock()
+        session.rollback = AsyncMock()
+        sessions.append(session)
+        yield session
+
+    return factory, sessions
+
+
+class TestPaymentDateAfter:
+    """Test calendar-aware due dates anchored on the start date"""
+
+    def test_monthly_clamps_without_drifting(self):
+        start = datetime(2026, 1, 31)
+        assert payment_date_after(start, "monthly", datetime(2026, 2, 1)) == datetime(2026, 2, 28)
+        assert payment_date_after(start, "monthly", datetime(2026, 2, 28)) == datetime(2026, 3, 31)
+
+    def test_quarterly_crosses_year(self):
+        assert payment_date_after(datetime(2026, 11, 15), "quarterly", datetime(2026, 11, 16)) == datetime(2027, 2, 15)
+
+    def test_weekly_and_yearly(self):
+        assert payment_date_after(datetime(2026, 3, 1), "weekly", datetime(2026, 3, 1)) == datetime(2026, 3, 8)
+        assert payment_date_after(datetime(2028, 2, 29), "yearly", datetime(2029, 1, 1)) == datetime(2029, 2, 28)
+        assert payment_date_after(datetime(2028, 2, 29), "yearly", datetime(2031, 6, 1)) == datetime(2032, 2, 29)
+
+    def test_not_started_yet(self):
+        assert payment_date_after(datetime(2026, 5, 1), "monthly", datetime(2026, 3, 1)) == datetime(2026, 5, 1)
+
+    def test_unknown_frequency(self):
+        with pytest.raises(ValueError):
+            payment_date_after(datetime(2026, 3, 1), "daily", datetime(2026, 3, 2))
+
+
+class TestDueQuery:
+    """Test the batch claim query"""
+
+    def test_skip_locked_in_index_order(self):
+        processor = RecurringDonationProcessor(MagicMock(), uuid4(), gateway=FakeGateway(), batch_size=50)
+        sql = str(processor.due_query(NOW).compile(dialect=postgresql.dialect()))
+
+        assert "ORDER BY recurring_donations.next_payment_date" in sql
+        assert "LIMIT" in sql
+        assert sql.endswith("FOR UPDATE OF recurring_donations SKIP LOCKED")
+
+
+class TestProcessDue:
+    """Test batch processing"""
+
+    @pytest.mark.asyncio
+    async def test_charges_and_advances_batch(self):
+        ok, declined = schedule(), schedule(failures=2)
+        payment_method = SimpleNamespace(is_active=True)
+        factory, sessions = make_session_factory([[(ok, payment_method), (declined, payment_method)]])
+        gateway = FakeGateway(failing={declined.id})
+
+        stats = await RecurringDonationProcessor(factory, uuid4(), gateway=gateway, max_failures=3).process_due(now=NOW)
+
+        assert (stats.batches, stats.charged, stats.failed, stats.deactivated) == (1, 1, 1, 1)
+        assert stats.amount == Decimal("25.00")
+        assert len(set(gateway.keys)) == 2
+
+        session = sessions[0]
+        session.commit.assert_awaited_once()
+        _, insert_call, donor_call, schedule_call = session.execute.await_args_list
+        (donation,) = insert_call.args[1]
+        assert donation["recurring_donation_id"] == ok.id
+        assert donation["payment_status"] == "completed"
+        assert donor_call.args[1] == [{"b_donor_id": ok.donor_id, "b_amount": Decimal("25.00"), "b_date": NOW}]
+
+        success, failure = schedule_call.args[1]
+        assert success["next_payment_date"] == payment_date_after(ok.start_date, "monthly", NOW)
+        assert success["total_payments"] == 3
+        assert failure["status"] == "failed"
+        assert failure["next_payment_date"] > NOW
+        assert set(success) == set(failure)
+
+        # Second session found nothing left to do
+        assert len(sessions) == 2
+
+    @pytest.mark.asyncio
+    async def test_missed_periods_are_skipped(self):
+        overdue = schedule(frequency="weekly", next_payment_date=NOW - timedelta(weeks=3, hours=1))
+        factory, sessions = make_session_factory([[(overdue, SimpleNamespace(is_active=True))]])
+
+        await RecurringDonationProcessor(factory, uuid4(), gateway=FakeGateway()).process_due(now=NOW)
+
+        updated = sessions[0].execute.await_args_list[-1].args[1][0]
+        assert NOW < updated["next_payment_date"] <= NOW + timedelta(weeks=1)
+
+    @pytest.mark.asyncio
+    async def test_inactive_payment_method_is_not_charged(self):
+        factory, _ = make_session_factory([[(schedule(), SimpleNamespace(is_active=False))]])
+        gateway = FakeGateway()
+
+        stats = await RecurringDonationProcessor(factory, uuid4(), gateway=gateway).process_due(now=NOW)
+
+        assert gateway.keys == []
+        assert stats.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_successful_retry_returns_to_the_anchored_date(self):
+        # Anchored on the 31st, declined on Feb 28 and retried the next day
+        retried = schedule(next_payment_date=datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc), failures=1)
+        retried.start_date = datetime(2026, 1, 31, 9, 0, tzinfo=timezone.utc)
+        factory, sessions = make_session_factory([[(retried, SimpleNamespace(is_active=True))]])
+
+        await RecurringDonationProcessor(factory, uuid4(), gateway=FakeGateway()).process_due(now=NOW)
+
+        updated = sessions[0].execute.await_args_list[-1].args[1][0]
+        assert updated["next_payment_date"] == datetime(2026, 3, 31, 9, 0, tzinfo=timezone.utc)
+        assert updated["consecutive_failures"] == 0
+
+    def test_gateway_must_implement_charge(self):
+        with pytest.raises(TypeError):
+            RecurringChargeGateway()
+
+
+@pytest.mark.asyncio
+async def test_batch_is_recorded_on_a_real_database():
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.models.organization_donors import Donation, Donor, PaymentMethod, RecurringDonation
+
+    # SQLite drops time zones: keep every timestamp naive
+    now = NOW.replace(tzinfo=None)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for model in (Donor, PaymentMethod, RecurringDonation, Donation):
+            await conn.run_sync(model.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    organization_id = uuid4()
+    async with session_factory() as db:
+        donors = [
+            Donor(organization_id=organization_id, email="premier@example.com"),
+            Donor(organization_id=organization_id, email="fidele@example.com", total_donated=Decimal("100.00"),
+                  donation_count=4, first_donation_date=now - timedelta(days=365)),
+        ]
+        db.add_all(donors)
+        await db.flush()
+        for donor in donors:
+            payment_method = PaymentMethod(donor_id=donor.id, organization_id=organization_id, type="credit_card")
+            db.add(payment_method)
+            await db.flush()
+            db.add(RecurringDonation(
+                donor_id=donor.id, organization_id=organization_id, amount=Decimal("25.00"), frequency="monthly",
+                payment_method_id=payment_method.id, start_date=now - timedelta(days=59, hours=1),
+                next_payment_date=now - timedelta(hours=1),
+            ))
+        await db.commit()
+
+    stats = await RecurringDonationProcessor(session_factory, organization_id, gateway=FakeGateway()).process_due(now=now)
+
+    assert (stats.charged, stats.failed, stats.errors) == (2, 0, [])
+    async with session_factory() as db:
+        first, loyal = [await db.get(Donor, donor.id) for donor in donors]
+        assert (first.total_donated, first.donation_count) == (Decimal("25.00"), 1)
+        assert first.first_donation_date == first.last_donation_date == now
+        assert (loyal.total_donated, loyal.donation_count) == (Decimal("125.00"), 5)
+        assert loyal.first_donation_date == now - timedelta(days=365)
+        assert len((await db.execute(select(Donation))).scalars().all()) == 2
+        schedules = (await db.execute(select(RecurringDonation))).scalars().all()
+        assert all(s.next_payment_date > now and s.total_payments == 1 for s in schedules)
+
+    await engine.dispose()
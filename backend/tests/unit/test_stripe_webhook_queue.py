@@ -0,0 +1,157 @@
+"""
+Unit tests for Stripe webhook ingestion and background processing
+"""
+
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.stripe_webhook_queue import (
+    CLAIM_SQL,
+    RETRY_MAX_SECONDS,
+    StripeWebhookWorker,
+    enqueue_event,
+    event_object_key,
+    retry_delay,
+)
+
+
+def stripe_event(event_type="customer.subscription.updated", obj=None, event_id="evt_1"):
+    return {
+        "id": event_id,
+        "type": event_type,
+        "created": 1767225600,
+        "data": {"object": obj or {"object": "subscription", "id": "sub_1", "customer": "cus_1"}},
+    }
+
+
+def claimed(event, attempts=1):
+    return SimpleNamespace(
+        id=1,
+        stripe_event_id=event["id"],
+        event_type=event["type"],
+        event_data=json.dumps(event),
+        attempts=attempts,
+        created_at=datetime.now(timezone.utc) - timedelta(seconds=2),
+    )
+
+
+def make_session_factory():
+    sessions = []
+
+    @asynccontextmanager
+    async def factory():
+        session = MagicMock()
+        session.execute = AsyncMock()
+        session.commit = AsyncMock()
+        sessions.append(session)
+        yield session
+
+    return factory, sessions
+
+
+def executed_params(sessions):
+    return [call.args[1] for s in sessions for call in s.execute.await_args_list if len(call.args) > 1]
+
+
+class TestObjectKey:
+    """Test per-object ordering keys"""
+
+    def test_subscription_event(self):
+        assert event_object_key(stripe_event()) == "subscription:sub_1"
+
+    def test_invoice_follows_its_subscription(self):
+        event = stripe_event("invoice.paid", {"object": "invoice", "id": "in_1", "subscription": "sub_1", "customer": "cus_1"})
+        assert event_object_key(event) == "subscription:sub_1"
+
+    def test_falls_back_to_customer_then_object(self):
+        intent = {"object": "payment_intent", "id": "pi_1", "customer": "cus_9"}
+        assert event_object_key(stripe_event("payment_intent.succeeded", intent)) == "customer:cus_9"
+        intent.pop("customer")
+        assert event_object_key(stripe_event("payment_intent.succeeded", intent)) == "payment_intent:pi_1"
+
+
+class TestRetryDelay:
+    """Test exponential backoff"""
+
+    def test_backoff_grows_and_caps(self):
+        assert retry_delay(1) == timedelta(seconds=30)
+        assert retry_delay(3) == timedelta(seconds=120)
+        assert retry_delay(20) == timedelta(seconds=RETRY_MAX_SECONDS)
+
+
+class TestEnqueue:
+    """Test idempotent ingestion"""
+
+    @pytest.mark.asyncio
+    async def test_insert_is_idempotent(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(scalar_one_or_none=MagicMock(return_value=None)))
+        db.commit = AsyncMock()
+
+        assert await enqueue_event(db, stripe_event()) is False
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (stripe_event_id) DO NOTHING" in sql
+        db.commit.assert_awaited_once()
+
+    def test_claim_respects_object_order(self):
+        sql = str(CLAIM_SQL)
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "p.object_key = e.object_key" in sql
+
+
+class TestWorker:
+    """Test event processing outcomes"""
+
+    @pytest.mark.asyncio
+    async def test_success_marks_processed(self):
+        factory, sessions = make_session_factory()
+        handler = AsyncMock()
+        worker = StripeWebhookWorker(factory, handler, max_attempts=3)
+
+        assert await worker.process_event(claimed(stripe_event()))
+
+        event_type, event_object, _ = handler.await_args.args
+        assert (event_type, event_object["id"]) == ("customer.subscription.updated", "sub_1")
+        assert "status = 'processed'" in str(sessions[-1].execute.await_args.args[0])
+        assert worker.counters["processed"] == 1
+        assert worker.metrics()["lag_p50_seconds"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_failure_is_retried(self):
+        factory, sessions = make_session_factory()
+        worker = StripeWebhookWorker(factory, AsyncMock(side_effect=RuntimeError("db down")), max_attempts=3)
+
+        assert not await worker.process_event(claimed(stripe_event(), attempts=1))
+
+        (params,) = executed_params(sessions)
+        assert params["status"] == "pending"
+        assert params["error"] == "db down"
+        assert worker.counters["retried"] == 1
+
+    @pytest.mark.asyncio
+    async def test_last_attempt_is_dead_lettered(self):
+        factory, sessions = make_session_factory()
+        worker = StripeWebhookWorker(factory, AsyncMock(side_effect=RuntimeError("boom")), max_attempts=3)
+
+        await worker.process_event(claimed(stripe_event(), attempts=3))
+
+        (params,) = executed_params(sessions)
+        assert params["status"] == "dead"
+        assert worker.counters["dead"] == 1
+
+    @pytest.mark.asyncio
+    async def test_run_once_drains_rounds(self):
+        factory, _ = make_session_factory()
+        worker = StripeWebhookWorker(factory, AsyncMock(), concurrency=2)
+        rounds = [[claimed(stripe_event(event_id="evt_1")), claimed(stripe_event(event_id="evt_2"))], [claimed(stripe_event(event_id="evt_3"))], []]
+        worker.claim = AsyncMock(side_effect=rounds)
+        worker.process_event = AsyncMock(return_value=True)
+
+        assert await worker.run_once() == 3
+        assert worker.claim.await_count == 3